@@ -0,0 +1,165 @@
+# ============================================================================
+# 헤드리스 배치 실행기
+# JSONL 파일의 창작 브리프를 Streamlit 없이 창작 파트너 팀 파이프라인으로 처리
+#
+# 사용 예:
+#   python batch_runner.py briefs.jsonl results.jsonl --concurrency 8
+#
+# 입력 JSONL 한 줄 형식:
+#   {"id": "brief-001", "service_type": "YouTube", "input_data": {"topic": "...", ...}}
+#   (id가 없으면 service_type + input_data 해시를 id로 사용)
+# 결과는 브리프가 끝나는 즉시 출력 JSONL에 한 줄씩 추가되며, 다시 실행하면
+# 이미 성공한 id는 건너뛰고 중단된 브리프는 단계별 체크포인트부터 이어서 진행
+# ============================================================================
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from checkpoint_store import CheckpointStore, make_input_hash
+from context_budget import HandoffCompressor
+from creative_team import CreativeTeam
+from metrics import MetricsCollector
+from prompt_templates import create_prefix_cache
+from rate_limiter import RateLimitScheduler, current_session
+from resilience import ResiliencePolicy
+from response_cache import ResponseCache
+from single_flight import SingleFlight
+from token_budget import DEFAULT_BATCH_USAGE_PATH, TokenBudget
+
+
+def load_briefs(path):
+    """
+    입력 JSONL에서 브리프 목록 읽기
+    Returns:
+        list: {"id", "service_type", "input_data"} 딕셔너리 목록
+    """
+    briefs = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            brief = json.loads(line)
+            if "service_type" not in brief or "input_data" not in brief:
+                raise ValueError(f"{path}:{line_number}: service_type과 input_data가 필요합니다")
+            brief.setdefault("id", make_input_hash(brief["service_type"], brief["input_data"]))
+            briefs.append(brief)
+    return briefs
+
+
+def load_completed_ids(path):
+    """
+    출력 JSONL에서 이미 성공한 브리프 id 읽기 (중단 후 재실행 시 건너뛰기용)
+    """
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 충돌로 마지막 줄이 잘린 경우 무시
+                continue
+            if record.get("status") == "ok":
+                completed.add(record["id"])
+    return completed
+
+
+async def run_batch(team, briefs, output_path, concurrency=4, checkpoints=None, fused=False):
+    """
+    브리프를 동시 실행 수를 제한하여 처리하고 결과를 끝나는 순서대로 기록
+    Args:
+        team (CreativeTeam): 창작 파트너 팀
+        briefs (list): 처리할 브리프 목록
+        output_path (str): 결과 JSONL 경로 (추가 모드)
+        concurrency (int): 동시에 진행할 최대 브리프 수
+        checkpoints (CheckpointStore): 단계별 체크포인트 저장소
+        fused (bool): True이면 단일 호출 통합 모드를 먼저 시도
+    Returns:
+        dict: {"ok": 성공 수, "error": 실패 수}
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"ok": 0, "error": 0}
+
+    with open(output_path, "a", encoding="utf-8") as output:
+        async def process(brief):
+            # 브리프마다 별도 세션으로 표시하여 스케줄러가 브리프 간에 공정하게 순서를 배분
+            current_session.set(brief["id"])
+            async with semaphore:
+                started = time.perf_counter()
+                record = {"id": brief["id"], "service_type": brief["service_type"]}
+                try:
+                    record["result"] = await team.get_creative_advice_async(
+                        brief["service_type"], brief["input_data"], checkpoints, fused=fused
+                    )
+                    record["status"] = "ok"
+                except Exception as e:
+                    record["status"] = "error"
+                    record["error"] = f"{type(e).__name__}: {e}"
+                record["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+                record["finished_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+                # 한 브리프가 끝날 때마다 즉시 기록
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                counts[record["status"]] += 1
+                print(f"[{record['status']}] {brief['id']} ({record['elapsed_seconds']}s)", file=sys.stderr)
+
+        await asyncio.gather(*[process(brief) for brief in briefs])
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="창작 브리프 JSONL을 창작 파트너 팀 파이프라인으로 일괄 처리합니다.")
+    parser.add_argument("input", help="브리프 JSONL 경로")
+    parser.add_argument("output", help="결과 JSONL 경로 (이미 있으면 성공한 id는 건너뜀)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 처리할 최대 브리프 수 (기본 4)")
+    parser.add_argument("--api-key", default=os.environ.get("GOOGLE_API_KEY"),
+                        help="Google AI API 키 (기본값: GOOGLE_API_KEY 환경 변수)")
+    parser.add_argument("--no-cache", action="store_true", help="응답 캐시를 사용하지 않음")
+    parser.add_argument("--rpm", type=int, default=int(os.environ.get("CREATOR_PARTNER_RPM", 60)),
+                        help="분당 최대 요청 수 (기본값: CREATOR_PARTNER_RPM 또는 60)")
+    parser.add_argument("--tpm", type=int, default=int(os.environ.get("CREATOR_PARTNER_TPM", 1_000_000)),
+                        help="분당 최대 토큰 수 (기본값: CREATOR_PARTNER_TPM 또는 1000000)")
+    parser.add_argument("--metrics-jsonl", default=os.environ.get("CREATOR_PARTNER_METRICS_JSONL"),
+                        help="단계별 호출 지표를 한 줄씩 추가할 JSONL 경로 (기본값: CREATOR_PARTNER_METRICS_JSONL)")
+    parser.add_argument("--metrics-prom", help="종료 시 Prometheus 텍스트 형식 지표를 저장할 경로")
+    parser.add_argument("--usage-path", default=DEFAULT_BATCH_USAGE_PATH,
+                        help="토큰 사용량 저장소 경로 (기본값: CREATOR_PARTNER_BATCH_USAGE_PATH, 웹 앱과 별도)")
+    parser.add_argument("--global-token-budget", type=int, default=0,
+                        help="배치 전체가 시간 창 안에서 쓸 수 있는 토큰 수 (기본값 0: 제한 없음, 브리프별 한도만 적용)")
+    parser.add_argument("--fused", action="store_true",
+                        help="세 전문가의 분석을 JSON 응답 한 번으로 받는 단일 호출 통합 모드 사용")
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("--api-key 또는 GOOGLE_API_KEY 환경 변수가 필요합니다")
+
+    briefs = load_briefs(args.input)
+    completed = load_completed_ids(args.output)
+    pending = [brief for brief in briefs if brief["id"] not in completed]
+    print(f"전체 {len(briefs)}건 중 완료 {len(briefs) - len(pending)}건 건너뜀, {len(pending)}건 처리", file=sys.stderr)
+
+    scheduler = RateLimitScheduler(rpm=args.rpm, tpm=args.tpm, max_concurrency=args.concurrency)
+    metrics = MetricsCollector(jsonl_path=args.metrics_jsonl)
+    team = CreativeTeam(args.api_key, cache=None if args.no_cache else ResponseCache(), scheduler=scheduler,
+                        resilience=ResiliencePolicy.from_env(), compressor=HandoffCompressor.from_env(),
+                        prefix_cache=create_prefix_cache(), metrics=metrics, single_flight=SingleFlight(),
+                        budget=TokenBudget.from_env(path=args.usage_path, global_tokens=args.global_token_budget))
+
+    counts = asyncio.run(run_batch(team, pending, args.output, args.concurrency, CheckpointStore(),
+                                   args.fused))
+    if args.metrics_prom:
+        metrics.write_prometheus(args.metrics_prom)
+    print(f"완료: 성공 {counts['ok']}건, 실패 {counts['error']}건", file=sys.stderr)
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+# ============================================================================
+# 창작 파트너 팀 성능 벤치마크
+# 가짜 GenerativeModel(fake_model)로 실제 API 없이 파이프라인 성능을 측정
+#
+# 사용 예:
+#   python -m benchmarks.pipeline_benchmark --concurrency 1,4,16 --output bench.json
+# ============================================================================
@@ -0,0 +1,131 @@
+# ============================================================================
+# 벤치마크용 가짜 GenerativeModel
+# 실제 Gemini API 없이 지연 시간, 초당 토큰 생성 속도, 오류율, 응답 크기를 설정하여
+# 창작 파트너 팀 파이프라인의 성능을 재현 가능하게 측정
+# ============================================================================
+
+import asyncio
+import itertools
+import random
+import threading
+import time
+import types
+
+from rate_limiter import estimate_tokens
+
+# 응답 텍스트를 만들 때 반복하는 문단 (제목, 번호 목록, 글머리표가 섞인 실제 응답 형태)
+_RESPONSE_LINES = [
+    "## 핵심 전략",
+    "1. 타겟 오디언스의 관심사를 중심으로 콘텐츠 방향을 설정합니다.",
+    "- 초반 10초 안에 핵심 가치를 전달하는 훅을 배치합니다.",
+    "시청자가 끝까지 머무르도록 이야기 구조를 세 단계로 나누고, 각 단계마다 질문을 던져 참여를 유도합니다.",
+    "2. 플랫폼별 발행 주기와 교차 홍보 흐름을 설계합니다.",
+    "- 성과 지표를 주간 단위로 점검하고 다음 콘텐츠에 반영합니다.",
+]
+
+
+class ServiceUnavailable(Exception):
+    """
+    가짜 모델이 일정 확률로 발생시키는 일시적 오류 (재시도 대상 이름과 같음)
+    """
+
+
+class FakeResponse:
+    """
+    generate_content 응답 흉내 (text, parts, usage_metadata, 스트리밍 반복)
+    """
+
+    def __init__(self, text, prompt_tokens, chunks=None):
+        self.text = text
+        self.parts = [text] if text else []
+        self._chunks = chunks
+        response_tokens = estimate_tokens(text)
+        self.usage_metadata = types.SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=response_tokens,
+            total_token_count=prompt_tokens + response_tokens,
+            cached_content_token_count=None
+        )
+
+    def __iter__(self):
+        return iter(self._chunks if self._chunks is not None else [self])
+
+
+class FakeGenerativeModel:
+    """
+    설정 가능한 가짜 GenerativeModel
+    첫 토큰까지 latency초가 걸리고, 이후 response_tokens개 토큰을 초당 tokens_per_second개 속도로 생성
+    """
+
+    def __init__(self, model_name="fake-gemini", latency=0.05, tokens_per_second=2000.0,
+                 response_tokens=300, error_rate=0.0, seed=None):
+        """
+        Args:
+            model_name (str): 모델 이름 (캐시 키, 체크포인트 구분용)
+            latency (float): 첫 토큰까지의 지연 시간 (초)
+            tokens_per_second (float): 초당 생성 토큰 수
+            response_tokens (int): 응답 한 번의 토큰 수
+            error_rate (float): 호출이 ServiceUnavailable로 실패할 확률 (0~1)
+            seed (int): 오류 발생 난수 시드 (재현용)
+        """
+        self.model_name = model_name
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self.calls = 0
+        self.errors = 0
+
+    def generate_content(self, contents, generation_config=None, stream=False, request_options=None):
+        prompt_tokens, text, failed = self._prepare(contents)
+        time.sleep(self.latency)
+        if failed:
+            raise ServiceUnavailable("fake model overloaded")
+        if stream:
+            return FakeResponse(text, prompt_tokens, self._stream_chunks(text, prompt_tokens))
+        time.sleep(self._generation_seconds(text))
+        return FakeResponse(text, prompt_tokens)
+
+    async def generate_content_async(self, contents, generation_config=None, request_options=None):
+        prompt_tokens, text, failed = self._prepare(contents)
+        await asyncio.sleep(self.latency)
+        if failed:
+            raise ServiceUnavailable("fake model overloaded")
+        await asyncio.sleep(self._generation_seconds(text))
+        return FakeResponse(text, prompt_tokens)
+
+    def count_tokens(self, contents):
+        return types.SimpleNamespace(total_tokens=estimate_tokens(str(contents)))
+
+    async def count_tokens_async(self, contents):
+        return self.count_tokens(contents)
+
+    def _prepare(self, contents):
+        with self._lock:
+            self.calls += 1
+            call_id = next(self._ids)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return estimate_tokens(str(contents)), self._response_text(call_id), failed
+
+    def _response_text(self, call_id):
+        # 응답 토큰 수(로컬 추정 기준)를 맞출 때까지 문단을 반복 (호출마다 다른 응답)
+        lines = [f"# 응답 {call_id}"]
+        for line in itertools.cycle(_RESPONSE_LINES):
+            if estimate_tokens("\n".join(lines)) >= self.response_tokens:
+                break
+            lines.append(line)
+        return "\n".join(lines)
+
+    def _generation_seconds(self, text):
+        return estimate_tokens(text) / self.tokens_per_second
+
+    def _stream_chunks(self, text, prompt_tokens):
+        # 줄 단위 조각을 생성 속도에 맞춰 순차적으로 반환
+        for line in text.splitlines(keepends=True):
+            time.sleep(self._generation_seconds(line))
+            yield types.SimpleNamespace(text=line, parts=[line])
@@ -0,0 +1,106 @@
+# ============================================================================
+# 임포트 시간(콜드 스타트) 벤치마크
+# 새 파이썬 프로세스에서 파이프라인 핵심 모듈을 임포트하는 시간을 여러 번 측정하고,
+# 중앙값이 예산을 넘거나 Streamlit/Gemini SDK가 함께 임포트되면 실패 코드(1)로 종료 (CI용)
+#
+# 사용 예:
+#   python -m benchmarks.import_benchmark --budget-ms 300 --output import_bench.json
+#   python -m benchmarks.import_benchmark --module batch_runner --runs 10
+# ============================================================================
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+# 핵심 모듈 임포트 시 함께 로드되면 안 되는 무거운 모듈
+FORBIDDEN_MODULES = ["streamlit", "google.generativeai"]
+
+# 자식 프로세스에서 실행할 측정 코드: 임포트 시간(초)과 로드된 금지 모듈 목록을 JSON으로 출력
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in {forbidden!r} if name in sys.modules]}}))
+"""
+
+
+def _repo_root():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module, runs=5):
+    """
+    새 프로세스에서 모듈 임포트 시간을 runs번 측정
+    Args:
+        module (str): 측정할 모듈 이름
+        runs (int): 측정 횟수 (프로세스마다 한 번, 바이트코드 캐시는 첫 실행 후 재사용)
+    Returns:
+        dict: 측정값 목록, 중앙값, 최소/최대, 함께 로드된 금지 모듈
+    """
+    probe = _PROBE.format(module=module, forbidden=FORBIDDEN_MODULES)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [_repo_root(), os.environ.get("PYTHONPATH")])))
+    samples, loaded = [], set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+                                cwd=_repo_root(), env=env).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        loaded.update(result["loaded"])
+    return {
+        "module": module,
+        "runs": runs,
+        "samples_ms": [round(seconds * 1000, 3) for seconds in samples],
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "min_ms": round(min(samples) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+        "forbidden_loaded": sorted(loaded)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="파이프라인 핵심 모듈의 임포트 시간을 측정하고 예산 초과 시 실패합니다.")
+    parser.add_argument("--module", action="append",
+                        help="측정할 모듈 (여러 번 지정 가능, 기본 creative_team)")
+    parser.add_argument("--runs", type=int, default=5, help="모듈별 측정 횟수 (기본 5)")
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ.get("CREATOR_PARTNER_IMPORT_BUDGET_MS", 300)),
+                        help="중앙값 임포트 시간 예산 (밀리초, 기본 300 또는 CREATOR_PARTNER_IMPORT_BUDGET_MS)")
+    parser.add_argument("--output", help="결과 JSON 경로 (없으면 저장하지 않음)")
+    args = parser.parse_args(argv)
+
+    results = []
+    failed = False
+    for module in args.module or ["creative_team"]:
+        result = measure_import(module, args.runs)
+        result["over_budget"] = result["median_ms"] > args.budget_ms
+        results.append(result)
+        failed = failed or result["over_budget"] or bool(result["forbidden_loaded"])
+        status = "실패" if result["over_budget"] or result["forbidden_loaded"] else "통과"
+        print(f"[{module}] 중앙값 {result['median_ms']}ms (예산 {args.budget_ms}ms), "
+              f"최소 {result['min_ms']}ms, 최대 {result['max_ms']}ms - {status}", file=sys.stderr)
+        if result["forbidden_loaded"]:
+            print(f"[{module}] 함께 임포트된 무거운 모듈: {', '.join(result['forbidden_loaded'])}", file=sys.stderr)
+
+    if args.output:
+        report = {
+            "benchmark": "import",
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "budget_ms": args.budget_ms,
+            "results": results
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+# ============================================================================
+# 파이프라인 종단 간 벤치마크
+# 네 가지 서비스 유형을 여러 동시 실행 수준에서 CreativeTeam.get_creative_advice로 처리하고,
+# 종단 간 지연 시간 백분위, 처리량, 최대 메모리를 JSON 파일로 기록 (릴리스 간 비교용)
+#
+# 사용 예:
+#   python -m benchmarks.pipeline_benchmark --concurrency 1,4,16 --output bench.json
+#   python -m benchmarks.pipeline_benchmark --latency 0.2 --tokens-per-second 80 --error-rate 0.05
+# ============================================================================
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.fake_model import FakeGenerativeModel
+from creative_team import CreativeTeam
+from resilience import ResiliencePolicy, StagePolicy
+
+SERVICE_TYPES = ["YouTube", "블로그", "인스타그램", "통합 콘텐츠"]
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def make_input(service_type, index):
+    """
+    서비스 유형별 벤치마크 입력 (요청마다 주제를 달리하여 캐시 적중을 피함)
+    """
+    input_data = {
+        "topic": f"벤치마크 주제 {index}",
+        "goals": "구독자 증가와 브랜드 인지도 향상",
+        "target_audience": "20-30대 직장인",
+        "additional_info": ""
+    }
+    if service_type == "YouTube":
+        input_data.update({"channel_style": "정보 전달형", "channel_size": "신규/소규모"})
+    elif service_type == "블로그":
+        input_data.update({"blog_style": "전문적/정보성", "blog_platform": "네이버 블로그"})
+    elif service_type == "인스타그램":
+        input_data.update({"visual_style": "미니멀", "account_size": "신규/소규모"})
+    else:
+        input_data.update({"primary_platform": "YouTube", "brand_style": "친근한",
+                           "current_status": "신규/소규모", "content_volume": "주 1-2회"})
+    return input_data
+
+
+def run_level(team, service_type, concurrency, requests):
+    """
+    한 서비스 유형을 주어진 동시 실행 수로 requests건 처리
+    Returns:
+        dict: 지연 시간 백분위, 처리량, 오류 수, 최대 추적 메모리
+    """
+    latencies = []
+    errors = 0
+
+    def one(index):
+        started = time.perf_counter()
+        team.get_creative_advice(service_type, make_input(service_type, f"{concurrency}-{index}"))
+        return time.perf_counter() - started
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(one, index) for index in range(requests)]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "service_type": service_type,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 4) if elapsed else None,
+        "latency_seconds": {
+            "mean": round(sum(latencies) / len(latencies), 4) if latencies else None,
+            **{f"p{int(q * 100)}": round(_percentile(latencies, q), 4) if latencies else None
+               for q in (0.5, 0.9, 0.95, 0.99)},
+            "max": round(max(latencies), 4) if latencies else None
+        },
+        "peak_traced_bytes": peak
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(model_config, concurrency_levels, requests_per_level=None, service_types=SERVICE_TYPES,
+                  max_attempts=3):
+    """
+    전체 벤치마크 실행
+    Args:
+        model_config (dict): FakeGenerativeModel 설정
+        concurrency_levels (list): 측정할 동시 실행 수 목록
+        requests_per_level (int): 수준별 요청 수 (기본값: 동시 실행 수의 2배, 최소 4건)
+        service_types (list): 측정할 서비스 유형
+        max_attempts (int): 단계별 최대 시도 횟수 (가짜 모델 오류 재시도용)
+    Returns:
+        dict: 실행 환경, 설정, 결과를 담은 보고서
+    """
+    model = FakeGenerativeModel(**model_config)
+    resilience = ResiliencePolicy(StagePolicy(timeout=None, max_attempts=max_attempts, base_delay=0.01, max_delay=0.1))
+    team = CreativeTeam("benchmark", model=model, resilience=resilience)
+
+    results = []
+    for concurrency in concurrency_levels:
+        requests = requests_per_level or max(4, concurrency * 2)
+        for service_type in service_types:
+            result = run_level(team, service_type, concurrency, requests)
+            results.append(result)
+            print(f"[{service_type} x{concurrency}] p50 {result['latency_seconds']['p50']}s, "
+                  f"p95 {result['latency_seconds']['p95']}s, {result['throughput_rps']} req/s, "
+                  f"오류 {result['errors']}건", file=sys.stderr)
+
+    return {
+        "benchmark": "pipeline",
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "model": model_config,
+            "concurrency_levels": concurrency_levels,
+            "requests_per_level": requests_per_level,
+            "max_attempts": max_attempts
+        },
+        "model_calls": model.calls,
+        "model_errors": model.errors,
+        # 리눅스는 KB, macOS는 바이트 단위
+        "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "results": results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 모델로 창작 파트너 팀 파이프라인 성능을 측정합니다.")
+    parser.add_argument("--output", default="bench_output.json", help="결과 JSON 경로 (기본 bench_output.json)")
+    parser.add_argument("--concurrency", default="1,4,16", help="쉼표로 구분한 동시 실행 수 목록 (기본 1,4,16)")
+    parser.add_argument("--requests", type=int, default=None,
+                        help="수준별 요청 수 (기본값: 동시 실행 수의 2배, 최소 4건)")
+    parser.add_argument("--service-types", default=",".join(SERVICE_TYPES), help="쉼표로 구분한 서비스 유형 목록")
+    parser.add_argument("--latency", type=float, default=0.05, help="첫 토큰까지의 지연 시간 (초, 기본 0.05)")
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0, help="초당 생성 토큰 수 (기본 2000)")
+    parser.add_argument("--response-tokens", type=int, default=300, help="응답 한 번의 토큰 수 (기본 300)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="호출 실패 확률 (0~1, 기본 0)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="단계별 최대 시도 횟수 (기본 3)")
+    parser.add_argument("--seed", type=int, default=0, help="오류 발생 난수 시드 (기본 0)")
+    args = parser.parse_args(argv)
+
+    model_config = {
+        "latency": args.latency,
+        "tokens_per_second": args.tokens_per_second,
+        "response_tokens": args.response_tokens,
+        "error_rate": args.error_rate,
+        "seed": args.seed
+    }
+    report = run_benchmark(
+        model_config,
+        [int(level) for level in args.concurrency.split(",")],
+        args.requests,
+        [service_type.strip() for service_type in args.service_types.split(",")],
+        args.max_attempts
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"결과 저장: {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
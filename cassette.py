@@ -0,0 +1,497 @@
+# ============================================================================
+# 모델 호출 녹화/재생 (카세트)
+# 전문가들의 모델 호출(프롬프트, 생성 설정, 응답 텍스트, usage_metadata, 관측한 지연 시간)을
+# gzip으로 압축한 JSONL 카세트 파일에 기록하고, Gemini API 없이 같은 순서로 다시 재생
+#   - 운영 환경의 실행을 그대로 재현하거나, 실제 API를 쓰지 않고 앱 전체(main())를 부하 테스트할 때 사용
+#   - 재생 속도: 1이면 기록된 지연 시간 그대로, 10이면 10배 빠르게, 0이면 대기 없이 즉시
+#   - 호출 실패(쿼터 초과, 과부하 등)도 같은 이름의 오류로 재생하여 재시도/보조 모델 전환 경로까지 재현
+#   - 접두부 컨텍스트 캐시 업로드(create_cached_content)와 캐시에 묶인 모델의 호출도 녹화하므로,
+#     녹화 중에도 운영 환경과 같은 프롬프트(캐시 핸들 + 접미부)를 보내고 재생 시 같은 경로로 조회
+#   - 녹화는 프로세스마다 별도 파일(run.cassette.<pid>.jsonl.gz)에 추가하므로 웹 프로세스와 작업자 프로세스가
+#     같은 gzip 파일에 동시에 쓰지 않고, 재생 시 카세트 경로와 모든 프로세스별 파일을 함께 읽음
+#
+# 사용 예:
+#   CREATOR_PARTNER_CASSETTE=run.cassette.jsonl.gz CREATOR_PARTNER_CASSETTE_MODE=record streamlit run creator_partner.py
+#   CREATOR_PARTNER_CASSETTE=run.cassette.jsonl.gz CREATOR_PARTNER_CASSETTE_MODE=replay \
+#       CREATOR_PARTNER_REPLAY_SPEED=0 streamlit run creator_partner.py
+# ============================================================================
+
+import asyncio
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import types
+
+from rate_limiter import estimate_tokens
+
+# usage_metadata 필드
+USAGE_FIELDS = ("prompt_token_count", "candidates_token_count", "total_token_count", "cached_content_token_count")
+
+# 카세트 파일 확장자 (프로세스별 파일 이름은 확장자 앞에 프로세스 ID를 붙임)
+CASSETTE_SUFFIX = ".jsonl.gz"
+
+
+class CassetteMiss(RuntimeError):
+    """
+    재생 중 카세트에 기록되지 않은 호출이 들어온 경우 (실제 API로 보내지 않고 실패)
+    """
+
+
+def make_interaction_key(model_name, contents, generation_config=None, cached_prefix=None):
+    """
+    녹화/재생 호출 식별 키 (모델 이름 + 전송한 프롬프트 + 생성 설정 + 참조한 캐시 접두부)
+    캐시 이름은 업로드할 때마다 달라지므로 캐시된 접두부 내용의 해시(cached_prefix)로 구분
+    """
+    payload = {"model": model_name, "contents": str(contents), "generation_config": generation_config}
+    if cached_prefix is not None:
+        payload["cached_prefix"] = cached_prefix
+    payload = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_prefix_id(system_instruction):
+    """
+    캐시 접두부 식별자 (녹화/재생 양쪽에서 같은 접두부에 같은 값)
+    """
+    return hashlib.sha256(system_instruction.encode("utf-8")).hexdigest()[:16]
+
+
+def _split_suffix(path):
+    # run.cassette.jsonl.gz -> ("run.cassette", ".jsonl.gz")
+    if path.endswith(CASSETTE_SUFFIX):
+        return path[:-len(CASSETTE_SUFFIX)], CASSETTE_SUFFIX
+    return path, ""
+
+
+def segment_path(path, pid=None):
+    """
+    프로세스별 녹화 파일 경로
+    Args:
+        path (str): 카세트 경로
+        pid (int): 프로세스 ID (기본값: 현재 프로세스)
+    Returns:
+        str: 예) run.cassette.jsonl.gz -> run.cassette.1234.jsonl.gz
+    """
+    base, suffix = _split_suffix(path)
+    return f"{base}.{pid or os.getpid()}{suffix}"
+
+
+def cassette_files(path):
+    """
+    재생할 카세트 파일 목록 (카세트 경로 자체와 프로세스별 녹화 파일, 이름 순)
+    """
+    base, suffix = _split_suffix(path)
+    pattern = re.compile(re.escape(base) + r"\.\d+" + re.escape(suffix) + "$")
+    segments = sorted(name for name in glob.glob(f"{glob.escape(base)}.*{suffix}") if pattern.match(name))
+    return ([path] if os.path.exists(path) else []) + segments
+
+
+def _usage_dict(response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    return {field: getattr(usage, field, None) for field in USAGE_FIELDS}
+
+
+def _candidate_texts(response):
+    # 후보가 여러 개인 응답(변형 후보 생성)은 후보별 텍스트를 기록
+    candidates = getattr(response, "candidates", None) or []
+    if len(candidates) < 2:
+        return None
+    return ["".join(getattr(part, "text", "") for part in candidate.content.parts) for candidate in candidates]
+
+
+def _response_text(response):
+    # 후보가 여러 개이거나 안전 필터로 텍스트가 없으면 response.text가 오류를 내므로 None으로 기록
+    try:
+        return response.text
+    except Exception:
+        return None
+
+
+class Cassette:
+    """
+    녹화된 모델 호출 모음 (gzip JSONL 파일, 녹화는 프로세스별 파일로 나뉨)
+    녹화 중에는 호출이 끝날 때마다 한 줄씩 추가하므로 중간에 프로세스가 종료되어도 그때까지의 기록은 남음
+    같은 프로세스의 스레드는 잠금으로, 다른 프로세스는 파일을 나누어 gzip 스트림이 섞이지 않게 함
+    재생 시 같은 키의 기록이 여러 개면 기록된 순서대로 돌려주고, 끝까지 쓰면 처음부터 다시 사용
+    """
+
+    def __init__(self, path, mode="replay", speed=0.0):
+        """
+        Args:
+            path (str): 카세트 파일 경로 (.jsonl.gz)
+            mode (str): "record" | "replay"
+            speed (float): 재생 속도 배율 (1=기록된 지연 시간 그대로, 0=대기 없음)
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"알 수 없는 카세트 모드입니다: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._interactions = {}  # 키 -> 기록 목록
+        self._positions = {}     # 키 -> 다음에 재생할 기록 위치
+        self._stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        if mode == "replay":
+            self._load()
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """
+        환경 변수 설정으로 카세트 생성 (설정이 없으면 None)
+        CREATOR_PARTNER_CASSETTE, CREATOR_PARTNER_CASSETTE_MODE, CREATOR_PARTNER_REPLAY_SPEED
+        """
+        path = os.environ.get("CREATOR_PARTNER_CASSETTE")
+        if not path:
+            return None
+        return cls(path, os.environ.get("CREATOR_PARTNER_CASSETTE_MODE", "replay"),
+                   float(os.environ.get("CREATOR_PARTNER_REPLAY_SPEED", 0)))
+
+    def wrap(self, model_name, factory):
+        """
+        모델 핸들을 카세트 모드에 맞게 감싸기
+        Args:
+            model_name (str): 모델 이름
+            factory (callable): 실제 모델을 만드는 함수 (녹화 모드에서만 호출)
+        Returns:
+            RecordingModel | ReplayModel: 녹화 또는 재생 모델
+        """
+        if self.mode == "replay":
+            return ReplayModel(model_name, self)
+        return RecordingModel(factory(), self)
+
+    def record(self, interaction):
+        """
+        호출 하나의 기록 추가 (이 프로세스의 녹화 파일에 즉시 한 줄 추가)
+        """
+        line = json.dumps(interaction, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._interactions.setdefault(interaction["key"], []).append(interaction)
+            # 녹화 중 포크된 프로세스도 자기 파일에 쓰도록 호출마다 프로세스 ID로 경로 결정
+            with gzip.open(segment_path(self.path), "at", encoding="utf-8") as f:
+                f.write(line)
+            self._stats["recorded"] += 1
+
+    def next(self, kind, key):
+        """
+        재생할 다음 기록
+        Args:
+            kind (str): "generate" | "count_tokens" | "cache"
+            key (str): 호출 식별 키
+        Returns:
+            dict | None: 기록 (없으면 None)
+        """
+        with self._lock:
+            interactions = [item for item in self._interactions.get(key, ()) if item["kind"] == kind]
+            if not interactions:
+                self._stats["misses"] += 1
+                return None
+            position = self._positions.get((kind, key), 0)
+            self._positions[(kind, key)] = position + 1
+            self._stats["replayed"] += 1
+            return interactions[position % len(interactions)]
+
+    def rewind(self):
+        """
+        재생 위치를 처음으로 되돌림 (같은 흐름을 반복 재생할 때)
+        """
+        with self._lock:
+            self._positions.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["interactions"] = sum(len(items) for items in self._interactions.values())
+        return stats
+
+    def delay(self, seconds):
+        # 재생 속도를 반영한 대기 시간
+        if not seconds or not self.speed:
+            return 0.0
+        return seconds / self.speed
+
+    def _load(self):
+        paths = cassette_files(self.path)
+        if not paths:
+            raise FileNotFoundError(f"카세트 파일이 없습니다: {self.path}")
+        for path in paths:
+            self._load_file(path)
+
+    def _load_file(self, path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    try:
+                        interaction = json.loads(line)
+                    except ValueError:
+                        # 녹화 중 종료되어 마지막 줄이 잘린 경우 무시
+                        continue
+                    self._interactions.setdefault(interaction["key"], []).append(interaction)
+            except EOFError:
+                # 녹화 중 종료되어 gzip 스트림이 닫히지 않은 경우: 읽은 데까지만 사용
+                pass
+
+
+class RecordingModel:
+    """
+    실제 GenerativeModel을 감싸 호출마다 카세트에 기록하는 모델
+    접두부 캐시 업로드와 캐시에 묶인 모델도 감싸므로 녹화 중에도 운영 환경과 같은 프롬프트를 전송
+    """
+
+    def __init__(self, model, cassette, cached_prefix=None):
+        """
+        Args:
+            model (GenerativeModel): 실제 모델
+            cassette (Cassette): 기록할 카세트
+            cached_prefix (str): 모델이 참조하는 캐시 접두부 식별자 (캐시에 묶이지 않은 모델이면 None)
+        """
+        self.model = model
+        self.model_name = model.model_name
+        self.cassette = cassette
+        self.cached_prefix = cached_prefix
+        self._cached_prefixes = {}  # 캐시 이름 -> 접두부 식별자
+
+    def generate_content(self, contents, generation_config=None, stream=False, request_options=None):
+        started = time.perf_counter()
+        try:
+            response = self.model.generate_content(contents, generation_config=generation_config, stream=stream,
+                                                   request_options=request_options)
+        except Exception as e:
+            self._record_error(contents, generation_config, stream, started, e)
+            raise
+        if stream:
+            return RecordingStream(self, response, contents, generation_config, started)
+        self._record_response(contents, generation_config, response, started)
+        return response
+
+    async def generate_content_async(self, contents, generation_config=None, request_options=None):
+        started = time.perf_counter()
+        try:
+            response = await self.model.generate_content_async(contents, generation_config=generation_config,
+                                                               request_options=request_options)
+        except Exception as e:
+            self._record_error(contents, generation_config, False, started, e)
+            raise
+        self._record_response(contents, generation_config, response, started)
+        return response
+
+    def count_tokens(self, contents):
+        response = self.model.count_tokens(contents)
+        self._record_count(contents, response)
+        return response
+
+    async def count_tokens_async(self, contents):
+        response = await self.model.count_tokens_async(contents)
+        self._record_count(contents, response)
+        return response
+
+    def create_cached_content(self, system_instruction, display_name, ttl_seconds):
+        # 업로드 성공/실패를 기록하여 재생 시 같은 프롬프트 경로(캐시 핸들 또는 전체 프롬프트)를 따름
+        interaction = self._interaction("cache", system_instruction)
+        try:
+            name = self.model.create_cached_content(system_instruction, display_name, ttl_seconds)
+        except Exception as e:
+            interaction["error"] = {"type": type(e).__name__, "message": str(e), "code": getattr(e, "code", None)}
+            self.cassette.record(interaction)
+            raise
+        interaction["name"] = name
+        self.cassette.record(interaction)
+        self._cached_prefixes[name] = make_prefix_id(system_instruction)
+        return name
+
+    def with_cached_content(self, cached_content):
+        return RecordingModel(self.model.with_cached_content(cached_content), self.cassette,
+                              self._cached_prefixes.get(cached_content, cached_content))
+
+    def _interaction(self, kind, contents, generation_config=None):
+        return {
+            "kind": kind,
+            "key": make_interaction_key(self.model_name, contents, generation_config, self.cached_prefix),
+            "model": self.model_name,
+            "prompt": str(contents),
+            "generation_config": generation_config,
+            "cached_prefix": self.cached_prefix
+        }
+
+    def _record_response(self, contents, generation_config, response, started, chunks=None, offsets=None):
+        interaction = self._interaction("generate", contents, generation_config)
+        interaction.update({
+            "text": "".join(chunks) if chunks is not None else _response_text(response),
+            "candidates": _candidate_texts(response),
+            "usage": _usage_dict(response),
+            "latency_seconds": round(time.perf_counter() - started, 4)
+        })
+        if chunks is not None:
+            interaction.update({"chunks": chunks, "chunk_offsets": offsets})
+        self.cassette.record(interaction)
+
+    def _record_error(self, contents, generation_config, stream, started, error):
+        interaction = self._interaction("generate", contents, generation_config)
+        interaction.update({
+            "stream": stream,
+            "error": {"type": type(error).__name__, "message": str(error), "code": getattr(error, "code", None)},
+            "latency_seconds": round(time.perf_counter() - started, 4)
+        })
+        self.cassette.record(interaction)
+
+    def _record_count(self, contents, response):
+        interaction = self._interaction("count_tokens", contents)
+        interaction["total_tokens"] = response.total_tokens
+        self.cassette.record(interaction)
+
+
+class RecordingStream:
+    """
+    스트리밍 응답을 그대로 전달하면서 조각과 도착 시각을 기록 (스트림이 끝까지 소비되면 카세트에 기록)
+    """
+
+    def __init__(self, recorder, response, contents, generation_config, started):
+        self._recorder = recorder
+        self._response = response
+        self._contents = contents
+        self._generation_config = generation_config
+        self._started = started
+
+    @property
+    def usage_metadata(self):
+        return getattr(self._response, "usage_metadata", None)
+
+    def __iter__(self):
+        chunks, offsets = [], []
+        for chunk in self._response:
+            if chunk.parts:
+                chunks.append(chunk.text)
+                offsets.append(round(time.perf_counter() - self._started, 4))
+            yield chunk
+        self._recorder._record_response(self._contents, self._generation_config, self._response, self._started,
+                                        chunks, offsets)
+
+
+_replayed_errors = {}
+
+
+def _replayed_error(error):
+    # 기록된 오류와 같은 이름의 예외 클래스를 만들어 재시도/쿼터 판별이 녹화 당시와 같게 동작하도록 함
+    cls = _replayed_errors.get(error["type"])
+    if cls is None:
+        cls = _replayed_errors[error["type"]] = type(error["type"], (Exception,), {})
+    replayed = cls(error["message"])
+    if error.get("code") is not None:
+        replayed.code = error["code"]
+    return replayed
+
+
+class ReplayResponse:
+    """
+    재생 응답 (text, parts, candidates, usage_metadata, 스트리밍 반복)
+    """
+
+    def __init__(self, interaction, cassette=None):
+        self.text = interaction.get("text") or ""
+        self.parts = [self.text] if self.text else []
+        self.usage_metadata = types.SimpleNamespace(**interaction["usage"]) if interaction.get("usage") else None
+        self.candidates = [
+            types.SimpleNamespace(content=types.SimpleNamespace(parts=[types.SimpleNamespace(text=text)]))
+            for text in interaction.get("candidates") or [self.text]
+        ]
+        self._interaction = interaction
+        self._cassette = cassette
+
+    def __iter__(self):
+        if self._cassette is None:
+            yield self
+            return
+        # 기록된 조각 도착 시각(호출 시작 기준)에 맞춰 조각을 순차적으로 반환
+        elapsed = 0.0
+        chunks = self._interaction.get("chunks") or [self.text]
+        offsets = self._interaction.get("chunk_offsets") or [0.0] * len(chunks)
+        for text, offset in zip(chunks, offsets):
+            time.sleep(self._cassette.delay(max(0.0, offset - elapsed)))
+            elapsed = max(elapsed, offset)
+            yield types.SimpleNamespace(text=text, parts=[text])
+
+
+class ReplayModel:
+    """
+    카세트에서 응답을 돌려주는 GenerativeModel 대역 (네트워크와 Gemini SDK를 사용하지 않음)
+    """
+
+    def __init__(self, model_name, cassette, cached_prefix=None):
+        self.model_name = model_name
+        self.cassette = cassette
+        self.cached_prefix = cached_prefix
+
+    def generate_content(self, contents, generation_config=None, stream=False, request_options=None):
+        interaction = self._next(contents, generation_config)
+        if stream and "error" not in interaction:
+            # 첫 조각까지의 대기는 조각 반복 중에 수행
+            return ReplayResponse(interaction, self.cassette)
+        time.sleep(self.cassette.delay(interaction.get("latency_seconds")))
+        return self._response(interaction)
+
+    async def generate_content_async(self, contents, generation_config=None, request_options=None):
+        interaction = self._next(contents, generation_config)
+        await asyncio.sleep(self.cassette.delay(interaction.get("latency_seconds")))
+        return self._response(interaction)
+
+    def count_tokens(self, contents):
+        # 기록이 없으면 로컬 추정치 사용 (토큰 계산은 재생 결과에 영향이 작으므로 실패시키지 않음)
+        interaction = self.cassette.next(
+            "count_tokens", make_interaction_key(self.model_name, contents, cached_prefix=self.cached_prefix)
+        )
+        total = interaction["total_tokens"] if interaction else estimate_tokens(str(contents))
+        return types.SimpleNamespace(total_tokens=total)
+
+    async def count_tokens_async(self, contents):
+        return self.count_tokens(contents)
+
+    def create_cached_content(self, system_instruction, display_name, ttl_seconds):
+        # 녹화 당시 업로드가 없었거나 실패했으면 같은 방식으로 실패하여 전체 프롬프트 전송으로 재생
+        key = make_interaction_key(self.model_name, system_instruction, cached_prefix=self.cached_prefix)
+        interaction = self.cassette.next("cache", key)
+        if interaction is None:
+            raise CassetteMiss(f"카세트에 기록되지 않은 캐시 업로드입니다 (모델 {self.model_name})")
+        if "error" in interaction:
+            raise _replayed_error(interaction["error"])
+        return f"cassette/{make_prefix_id(system_instruction)}"
+
+    def with_cached_content(self, cached_content):
+        return ReplayModel(self.model_name, self.cassette, cached_content.rsplit("/", 1)[-1])
+
+    def _next(self, contents, generation_config):
+        key = make_interaction_key(self.model_name, contents, generation_config, self.cached_prefix)
+        interaction = self.cassette.next("generate", key)
+        if interaction is None:
+            raise CassetteMiss(f"카세트에 기록되지 않은 호출입니다 (모델 {self.model_name}, 키 {key[:12]})")
+        return interaction
+
+    @staticmethod
+    def _response(interaction):
+        if "error" in interaction:
+            raise _replayed_error(interaction["error"])
+        return ReplayResponse(interaction)
+
+
+_active = None
+_active_lock = threading.Lock()
+
+
+def active_cassette():
+    """
+    환경 변수로 설정된 프로세스 전역 카세트 (설정이 없으면 None)
+    """
+    global _active
+    with _active_lock:
+        if _active is None and os.environ.get("CREATOR_PARTNER_CASSETTE"):
+            _active = Cassette.from_env()
+        return _active
@@ -0,0 +1,223 @@
+# ============================================================================
+# 단계별 체크포인트 저장소
+# 각 전문가 단계가 끝나는 즉시 결과를 저장하여, 중간 단계에서 실패(쿼터 오류, 시간 초과,
+# 브라우저 새로고침 등)한 실행을 다시 시도할 때 이미 완료된 단계를 건너뜀
+# 체크포인트는 실행 ID와 입력 해시로 식별하며 메모리 매핑(st.session_state)과 디스크에 함께 저장
+# 단계별 입력 지문(그 단계 프롬프트가 실제로 읽는 입력 키 + 읽는 앞 단계들의 지문)을 함께 기록하여,
+# 입력 일부만 바꿔 다시 실행하면 입력이 바뀐 첫 단계부터만 다시 생성하고 앞 단계 결과는 재사용
+# ============================================================================
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+# 기본 디스크 체크포인트 경로 (환경 변수로 변경 가능)
+DEFAULT_CHECKPOINT_DIR = os.environ.get(
+    "CREATOR_PARTNER_CHECKPOINT_DIR",
+    os.path.join(os.path.expanduser("~"), ".creator_partner", "checkpoints")
+)
+
+
+def make_input_hash(service_type, input_data, model_name=""):
+    """
+    실행 입력 해시 생성 (같은 입력의 재실행을 같은 체크포인트로 연결)
+    Args:
+        service_type (str): 요청 서비스 유형
+        input_data (dict): 사용자 입력 데이터
+        model_name (str): 사용 모델 이름
+    Returns:
+        str: SHA-256 해시 문자열
+    """
+    payload = json.dumps(
+        {"service_type": service_type, "input_data": input_data, "model": model_name},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_stage_keys(service_type, input_data, model_name, stage_fields):
+    """
+    단계별 입력 지문 생성
+    각 단계의 지문은 그 단계가 읽는 앞 단계들의 지문과 입력 값으로 만들므로,
+    어떤 단계의 입력이 바뀌면 그 단계와 그 출력을 읽는 뒤 단계의 지문이 모두 바뀜
+    Args:
+        service_type (str): 요청 서비스 유형
+        input_data (dict): 사용자 입력 데이터
+        model_name (str): 사용 모델 이름 (라우팅 설정 요약)
+        stage_fields (list): 실행 순서대로 (단계, 그 단계가 읽는 입력 키 목록 또는 None=전체[, 읽는 앞 단계 목록]) 목록
+                             (앞 단계 목록이 없으면 바로 앞 단계 하나를 읽는 직선 체인으로 처리)
+    Returns:
+        dict: 단계 -> SHA-256 해시 문자열
+    """
+    stage_keys = {}
+    previous = ""
+    for stage, fields, *needs in stage_fields:
+        if needs:
+            # 앞 단계가 하나뿐이면 직선 체인과 같은 지문 (기존 체크포인트와 호환)
+            previous = ",".join(stage_keys[need] for need in needs[0])
+        inputs = input_data if fields is None else {key: input_data.get(key) for key in fields}
+        payload = json.dumps(
+            {"service_type": service_type, "model": model_name, "stage": stage, "previous": previous,
+             "inputs": inputs},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        previous = stage_keys[stage] = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return stage_keys
+
+
+class CheckpointStore:
+    """
+    단계별 결과 체크포인트 저장소
+    """
+
+    def __init__(self, directory=DEFAULT_CHECKPOINT_DIR, memory=None):
+        """
+        체크포인트 저장소 초기화
+        Args:
+            directory (str): 디스크 저장 경로 (None이면 메모리에만 저장)
+            memory (dict): 메모리 저장소로 사용할 매핑 (예: st.session_state 내부 dict)
+        """
+        self.directory = directory
+        self.memory = memory if memory is not None else {}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def begin(self, service_type, input_data, model_name="", stage_fields=None):
+        """
+        실행 시작: 같은 입력의 미완료 체크포인트가 있으면 이어서 진행
+        없으면 같은 서비스 유형의 마지막 완료 실행에서 입력이 바뀌지 않은 앞 단계 결과를 가져옴
+        Args:
+            stage_fields (list): 실행 순서대로 (단계, 그 단계가 읽는 입력 키 목록[, 읽는 앞 단계 목록]) 목록
+                                 (없으면 단계 재사용 안 함)
+        Returns:
+            CheckpointRun: 단계 결과 조회/저장용 실행 핸들
+        """
+        input_hash = make_input_hash(service_type, input_data, model_name)
+        stage_keys = make_stage_keys(service_type, input_data, model_name, stage_fields) if stage_fields else {}
+        checkpoint = self.load(input_hash)
+        if checkpoint is None:
+            checkpoint = {
+                "run_id": uuid.uuid4().hex,
+                "input_hash": input_hash,
+                "service_type": service_type,
+                "stages": self._reusable_stages(service_type, stage_keys),
+                "stage_keys": stage_keys,
+                "updated_at": time.time()
+            }
+        return CheckpointRun(self, checkpoint)
+
+    def load(self, input_hash):
+        """
+        체크포인트 조회 (메모리 -> 디스크 순)
+        Returns:
+            dict | None: 체크포인트, 없으면 None
+        """
+        with self._lock:
+            if input_hash in self.memory:
+                return self.memory[input_hash]
+            path = self._path(input_hash)
+            if path and os.path.exists(path):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        checkpoint = json.load(f)
+                except (OSError, ValueError):
+                    return None
+                self.memory[input_hash] = checkpoint
+                return checkpoint
+        return None
+
+    def save(self, checkpoint):
+        """
+        체크포인트를 메모리와 디스크에 저장 (디스크는 임시 파일 교체 방식으로 원자적 저장)
+        """
+        checkpoint["updated_at"] = time.time()
+        with self._lock:
+            self.memory[checkpoint["input_hash"]] = checkpoint
+            path = self._path(checkpoint["input_hash"])
+            if path:
+                tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(checkpoint, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+
+    def complete(self, checkpoint):
+        """
+        끝까지 완료된 실행을 서비스 유형별 마지막 완료 실행으로 기록하고 체크포인트 정리
+        """
+        if checkpoint.get("stage_keys"):
+            with self._lock:
+                self.memory[f"completed:{checkpoint['service_type']}"] = {
+                    "stage_keys": checkpoint["stage_keys"],
+                    "stages": dict(checkpoint["stages"])
+                }
+        self.clear(checkpoint["input_hash"])
+
+    def clear(self, input_hash):
+        """
+        실행이 끝까지 완료된 체크포인트 삭제
+        """
+        with self._lock:
+            self.memory.pop(input_hash, None)
+            path = self._path(input_hash)
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    def _reusable_stages(self, service_type, stage_keys):
+        # 마지막 완료 실행과 입력 지문이 같은 단계 결과
+        # 지문에 읽는 앞 단계들의 지문이 포함되므로, 지문이 같으면 그 단계가 의존하는 단계도 모두 같음
+        with self._lock:
+            completed = self.memory.get(f"completed:{service_type}")
+        stages = {}
+        if not completed or not stage_keys:
+            return stages
+        for stage, stage_key in stage_keys.items():
+            if completed["stage_keys"].get(stage) == stage_key and stage in completed["stages"]:
+                stages[stage] = completed["stages"][stage]
+        return stages
+
+    def _path(self, input_hash):
+        if not self.directory:
+            return None
+        return os.path.join(self.directory, f"{input_hash}.json")
+
+
+class CheckpointRun:
+    """
+    하나의 워크플로우 실행에 대한 체크포인트 핸들
+    저장소 없이 만들면 아무것도 저장하지 않음
+    """
+
+    def __init__(self, store=None, checkpoint=None):
+        self.store = store
+        self.checkpoint = checkpoint or {"run_id": uuid.uuid4().hex, "input_hash": None, "stages": {}}
+        # 이전 실행에서 이미 완료되어 이번 실행에서 재사용되는 단계
+        self.resumed_stages = set(self.checkpoint["stages"])
+
+    @property
+    def run_id(self):
+        return self.checkpoint["run_id"]
+
+    def get(self, stage):
+        """
+        이미 완료된 단계 결과 반환 (없으면 None)
+        """
+        return self.checkpoint["stages"].get(stage)
+
+    def save(self, stage, text):
+        """
+        완료된 단계 결과를 즉시 저장
+        """
+        self.checkpoint["stages"][stage] = text
+        if self.store is not None:
+            self.store.save(self.checkpoint)
+
+    def complete(self):
+        """
+        모든 단계가 완료되면 체크포인트 정리 (단계 결과는 다음 실행의 재사용용으로 보관)
+        """
+        if self.store is not None:
+            self.store.complete(self.checkpoint)
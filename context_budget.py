@@ -0,0 +1,215 @@
+# ============================================================================
+# 단계 간 컨텍스트 토큰 예산 관리
+# 이전 전문가의 출력을 다음 전문가 프롬프트에 넘기기 전에 count_tokens로 크기를 재고,
+# 예산을 넘으면 추출식 축약 또는 저렴한 모델의 요약 호출로 압축
+# 요약 호출은 팀이 넘겨주는 요약 함수로 보내므로 다른 단계와 같은 스케줄러, 재시도, 지표, 캐시, 토큰 예산을 거침
+# 앞 단계가 아무리 길게 답해도 2, 3단계의 입력 토큰이 예산 안에서 유지됨
+# ============================================================================
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from rate_limiter import estimate_tokens
+
+# 압축 단계에서 제목/번호 목록/글머리표로 취급할 줄
+_HEADING_LINE = re.compile(r"^\s*(#{1,6}\s|\*\*.+\*\*\s*:?\s*$|\d+[.)]\s)")
+_BULLET_LINE = re.compile(r"^\s*([-*•]|\d+\.\d+\.?)\s")
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+")
+
+
+def _first_sentence(line):
+    parts = _SENTENCE_END.split(line.strip(), maxsplit=1)
+    return parts[0] if parts else line
+
+
+def extractive_trim(text, budget_tokens, count=estimate_tokens):
+    """
+    추출식 축약: 구조(제목, 번호 목록, 글머리표)를 최대한 남기고 세부 설명부터 줄임
+    Args:
+        text (str): 원문
+        budget_tokens (int): 목표 토큰 수
+        count (callable): 토큰 수 계산 함수
+    Returns:
+        str: 예산 안으로 줄인 텍스트
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+
+    def kind(line):
+        if _HEADING_LINE.match(line):
+            return 0
+        if _BULLET_LINE.match(line):
+            return 1
+        return 2
+
+    # 1) 일반 문단은 첫 문장만, 2) 일반 문단 제거, 3) 글머리표 제거 순으로 시도
+    candidates = [
+        [_first_sentence(line) if kind(line) == 2 else line for line in lines],
+        [line for line in lines if kind(line) <= 1],
+        [line for line in lines if kind(line) == 0],
+    ]
+    for candidate in candidates:
+        trimmed = "\n".join(candidate)
+        if candidate and count(trimmed) <= budget_tokens:
+            return trimmed
+
+    # 4) 그래도 넘으면 앞부분만 남기고 자름
+    kept = []
+    for line in candidates[0]:
+        if count("\n".join(kept + [line])) > budget_tokens:
+            break
+        kept.append(line)
+    if not kept and candidates[0]:
+        # 첫 줄만으로도 넘으면(줄바꿈 없는 긴 문단 등) 첫 줄을 예산에 맞는 길이까지 자름
+        line = candidates[0][0]
+        low, high = 0, len(line)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if count(line[:middle]) <= budget_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        kept.append(line[:low])
+    return "\n".join(kept) + "\n...(이하 생략)"
+
+
+class HandoffCompressor:
+    """
+    단계 간 전달 텍스트(handoff) 압축기
+    """
+
+    def __init__(self, budget_tokens=4000, mode="extractive", cache_size=64):
+        """
+        Args:
+            budget_tokens (int): 다음 단계로 넘길 이전 단계 출력의 최대 토큰 수
+            mode (str): "extractive"(추출식 축약) 또는 "summarize"(요약 호출, 실패 시 추출식)
+            cache_size (int): 같은 텍스트의 반복 압축을 피하기 위한 결과 캐시 크기
+        """
+        self.budget_tokens = budget_tokens
+        self.mode = mode
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        환경 변수 설정으로 압축기 생성
+        CREATOR_PARTNER_HANDOFF_BUDGET, CREATOR_PARTNER_HANDOFF_MODE
+        """
+        return cls(
+            budget_tokens=int(os.environ.get("CREATOR_PARTNER_HANDOFF_BUDGET", 4000)),
+            mode=os.environ.get("CREATOR_PARTNER_HANDOFF_MODE", "extractive")
+        )
+
+    def compress(self, text, stage, model, budget=None, summarize=None):
+        """
+        이전 단계 출력을 예산 안으로 압축
+        Args:
+            text (str): 이전 단계 출력
+            stage (str): 이 텍스트를 받을 단계 이름
+            model (GenerativeModel): 토큰 수를 셀 모델 (다음 단계에서 사용할 모델)
+            budget (TokenBudget): 토큰 계산 호출을 정산할 토큰 예산 (없으면 정산하지 않음)
+            summarize (callable): 요약 모드의 요약 함수 summarize(텍스트, 목표 토큰 수) -> 요약
+                                  (없으면 추출식 축약만 사용)
+        Returns:
+            tuple: (다음 단계에 넘길 텍스트, 압축 보고서 dict)
+        """
+        cached = self._cached(text)
+        if cached is not None:
+            return cached[0], dict(cached[1], stage=stage)
+
+        original_tokens = self._count(model, text, budget)
+        if original_tokens <= self.budget_tokens:
+            return text, self._report(stage, original_tokens, original_tokens, "none")
+
+        compressed, method = None, "extractive"
+        if self.mode == "summarize" and summarize is not None:
+            try:
+                compressed, method = summarize(text, self.budget_tokens // 2), "summarize"
+            except Exception:
+                compressed = None
+        if compressed is None or self._count(model, compressed, budget) > self.budget_tokens:
+            compressed, method = self._extractive(text, original_tokens), "extractive"
+
+        return self._finish(text, compressed, stage, original_tokens, self._count(model, compressed, budget), method)
+
+    async def compress_async(self, text, stage, model, budget=None, summarize=None):
+        """
+        compress의 비동기 버전 (summarize는 코루틴 함수)
+        """
+        cached = self._cached(text)
+        if cached is not None:
+            return cached[0], dict(cached[1], stage=stage)
+
+        original_tokens = await self._count_async(model, text, budget)
+        if original_tokens <= self.budget_tokens:
+            return text, self._report(stage, original_tokens, original_tokens, "none")
+
+        compressed, method = None, "extractive"
+        if self.mode == "summarize" and summarize is not None:
+            try:
+                compressed, method = await summarize(text, self.budget_tokens // 2), "summarize"
+            except Exception:
+                compressed = None
+        if compressed is None or await self._count_async(model, compressed, budget) > self.budget_tokens:
+            compressed, method = self._extractive(text, original_tokens), "extractive"
+
+        final_tokens = await self._count_async(model, compressed, budget)
+        return self._finish(text, compressed, stage, original_tokens, final_tokens, method)
+
+    def _count(self, model, text, budget=None):
+        # 로컬 추정치가 예산의 절반보다 작으면 API 호출 없이 통과
+        estimate = estimate_tokens(text)
+        if estimate < self.budget_tokens // 2:
+            return estimate
+        try:
+            tokens = model.count_tokens(text).total_tokens
+        except Exception:
+            return estimate
+        if budget is not None:
+            budget.charge_count()
+        return tokens
+
+    async def _count_async(self, model, text, budget=None):
+        estimate = estimate_tokens(text)
+        if estimate < self.budget_tokens // 2:
+            return estimate
+        try:
+            tokens = (await model.count_tokens_async(text)).total_tokens
+        except Exception:
+            return estimate
+        if budget is not None:
+            budget.charge_count()
+        return tokens
+
+    def _extractive(self, text, original_tokens):
+        # 실제 토큰 수와 로컬 추정치의 비율로 보정한 추정 함수로 반복 계산 (API 호출 최소화)
+        scale = original_tokens / max(1, estimate_tokens(text))
+        return extractive_trim(text, self.budget_tokens, lambda t: estimate_tokens(t) * scale)
+
+    def _finish(self, text, compressed, stage, original_tokens, final_tokens, method):
+        report = self._report(stage, original_tokens, final_tokens, method)
+        with self._lock:
+            self._cache[text] = (compressed, report)
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed, report
+
+    def _cached(self, text):
+        with self._lock:
+            if text in self._cache:
+                self._cache.move_to_end(text)
+                return self._cache[text]
+        return None
+
+    def _report(self, stage, original_tokens, final_tokens, method):
+        return {
+            "stage": stage,
+            "original_tokens": original_tokens,
+            "final_tokens": final_tokens,
+            "saved_tokens": max(0, original_tokens - final_tokens),
+            "method": method
+        }
@@ -0,0 +1,1289 @@
+# ============================================================================
+# 에이전틱 워크플로우 기반 창작 파트너 시스템
+# 3명의 특화된 창작 전문가가 팀을 이루어 사용자를 지원
+# Streamlit에 의존하지 않는 파이프라인 핵심 모듈 (CreativeTeam과 전문가 클래스)
+# Streamlit UI(creator_partner), 배치 실행(batch_runner), 벤치마크가 함께 사용하며,
+# Gemini SDK는 모델을 처음 만들 때 임포트하므로 이 모듈의 임포트는 가벼움
+# ============================================================================
+
+import asyncio
+import contextvars
+import json
+import re
+import threading
+import time
+import types
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+from difflib import SequenceMatcher
+
+from checkpoint_store import CheckpointRun
+from metrics import new_stage_metrics, record_usage
+from model_router import ModelRouter
+from prompt_templates import (FUSED_RESPONSE_SCHEMA, FUSED_SECTIONS, PERSONAS, VARIANT_BATCH_SCHEMA, get_template,
+                              get_variant_template)
+from rate_limiter import estimate_tokens
+from response_cache import make_cache_key
+from single_flight import make_key_scope
+from stage_graph import DEFAULT_STAGE_GRAPH
+from token_budget import DOWNGRADE
+
+# 통합 콘텐츠 병렬 분석(fan-out) 시 동시에 실행할 개별 플랫폼
+INTEGRATED_PLATFORMS = ["YouTube", "블로그", "인스타그램"]
+
+# 기본 파이프라인 단계 (기본 단계 그래프의 실행 순서)
+PIPELINE_STAGES = DEFAULT_STAGE_GRAPH.order
+
+# 팀 인스턴스가 메모리에 보관하는 최근 워크플로우 로그 수
+# 팀은 풀과 작업 워커에서 오래 재사용되므로 개수를 제한하고, 전체 기록은 HistoryStore에 저장
+WORKFLOW_LOG_LIMIT = 100
+
+def _ignore_progress(stage, status):
+    """
+    진행 상황 콜백이 없을 때 사용하는 기본 콜백
+    """
+
+
+# 동기 코드(Streamlit 스크립트)에서 비동기 파이프라인을 실행하기 위한 공용 이벤트 루프
+# 비동기 gRPC 클라이언트는 처음 사용된 루프에 묶이므로 실행마다 새 루프를 만들지 않음
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+
+def run_coroutine_sync(coro):
+    """
+    백그라운드 이벤트 루프에서 코루틴을 실행하고 결과를 기다림
+    Args:
+        coro (coroutine): 실행할 코루틴
+    Returns:
+        코루틴의 반환값
+    """
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(target=_background_loop.run_forever, daemon=True).start()
+    
+    # 호출한 스레드의 컨텍스트 변수(세션 ID 등)를 백그라운드 루프의 태스크로 전달
+    context = contextvars.copy_context()
+    
+    async def run_in_context():
+        for var, value in context.items():
+            var.set(value)
+        return await coro
+    
+    return asyncio.run_coroutine_threadsafe(run_in_context(), _background_loop).result()
+
+
+class CreativeTeam:
+    """
+    AI 기반 창작 파트너 팀을 관리하는 클래스
+    각 전문가의 협업을 조율하고 최종 결과를 제공
+    """
+    
+    def __init__(self, api_key, cache=None, model=None, scheduler=None, resilience=None, compressor=None,
+                 prefix_cache=None, metrics=None, router=None, history=None, single_flight=None, graph=None,
+                 budget=None):
+        """
+        창작 파트너 팀 초기화
+        Args:
+            api_key (str): Google AI API 키
+            cache (ResponseCache): 전문가들이 공유할 응답 캐시 (없으면 캐시 사용 안 함)
+            model (GenerativeModel): 모든 단계에 사용할 단일 모델 (주어지면 router 대신 사용)
+            scheduler (RateLimitScheduler): 모든 모델 호출이 거쳐 갈 요청 스케줄러 (없으면 제한 없음)
+            resilience (ResiliencePolicy): 단계별 시간 제한, 재시도, 헤징 정책 (없으면 적용 안 함)
+            compressor (HandoffCompressor): 단계 간 전달 텍스트 압축기 (없으면 원문 그대로 전달)
+            prefix_cache (LocalPrefixCache): 프롬프트 고정 접두부 컨텍스트 캐시 (없으면 전체 프롬프트 전송)
+            metrics (MetricsCollector): 단계별 호출 지표 수집기 (없으면 워크플로우 로그에만 기록)
+            router (ModelRouter): 단계별/서비스 유형별 모델 라우터 (없으면 환경 변수 설정으로 생성)
+            history (HistoryStore): 완료된 실행의 입력과 결과를 저장할 기록 저장소 (없으면 저장 안 함)
+            single_flight (SingleFlight): 진행 중인 동일 요청 합치기 (없으면 같은 요청도 각각 전송,
+                                          여러 키가 공유해도 같은 API 키의 요청끼리만 합침)
+            graph (StageGraph): 단계 그래프 (없으면 전략가 -> 작가 -> 플랫폼 전문가의 기본 그래프)
+            budget (TokenBudget): 세션별/전역 토큰 예산 (없으면 사전 검사와 사용량 제한 없음)
+        """
+        self.api_key = api_key
+        # 전역 genai.configure 대신 API 키 전용 클라이언트를 쓰는 모델을 단계별로 선택
+        if model is not None:
+            router = ModelRouter.single(model)
+        self.router = router or ModelRouter.from_env(api_key)
+        self.cache = cache
+        self.scheduler = scheduler
+        self.resilience = resilience
+        self.compressor = compressor
+        self.prefix_cache = prefix_cache
+        self.metrics = metrics
+        self.history = history
+        self.budget = budget
+        if single_flight is not None:
+            # 다른 API 키의 응답(과 쿼터 오류)을 공유하지 않도록 키별 범위로 나눔
+            single_flight = single_flight.scoped(make_key_scope(api_key))
+        
+        # 3명의 특화된 창작 전문가 초기화
+        expert_args = (self.router, cache, scheduler, resilience, prefix_cache, metrics, single_flight, budget)
+        self.content_strategist = ContentStrategist(*expert_args)  # 콘텐츠 전략 및 기획 전문가
+        self.creative_writer = CreativeWriter(*expert_args)      # 창작 및 스토리텔링 전문가
+        self.platform_specialist = PlatformSpecialist(*expert_args)  # 플랫폼 최적화 및 유통 전문가
+        self.fused_expert = FusedExpert(*expert_args)  # 세 전문가의 역할을 한 번에 수행하는 통합 모드
+        self.variant_expert = VariantExpert(*expert_args)  # 제목, 썸네일 등 한 섹션의 변형 후보 생성
+        self.handoff_summarizer = HandoffSummarizer(*expert_args)  # 요약 모드의 단계 간 전달 텍스트 요약
+        
+        # 단계 그래프와 단계별 전문가 (클래스로 선언된 단계는 같은 설정으로 전문가를 새로 만듦)
+        self.graph = graph or DEFAULT_STAGE_GRAPH
+        self._stage_experts = {node.name: self._stage_expert(node, expert_args) for node in self.graph}
+        
+        # 최근 워크플로우 로그 (오래된 로그는 자동으로 버려짐)
+        self.workflow_logs = deque(maxlen=WORKFLOW_LOG_LIMIT)
+    
+    def get_creative_advice(self, service_type, input_data, stream=False, checkpoints=None, progress=None,
+                            fused=False):
+        """
+        사용자 요청에 따라 단계 그래프의 전문가들이 협업하여 창작 지원 제공
+        기본 그래프는 3명의 전문가가 순차적으로 진행하며, 서로 독립적인 단계는 동시에 실행
+        UI를 직접 호출하지 않으므로 Streamlit 없이(배치 실행 등)도 사용 가능
+        Args:
+            service_type (str): 요청 서비스 유형 (YouTube, 블로그, 인스타그램)
+            input_data (dict): 사용자 입력 데이터
+            stream (bool): True이면 (단계, 응답 조각) 튜플을 순차적으로 돌려주는 제너레이터 반환
+            checkpoints (CheckpointStore): 단계별 체크포인트 저장소 (있으면 완료된 단계를 건너뜀)
+            progress (callable): 진행 상황 콜백 progress(단계, 상태), 상태는 "start" | "resumed" | "done"
+            fused (bool): True이면 세 전문가의 결과를 JSON 응답 한 번으로 받고,
+                          응답 검증에 실패하면 3단계 체인으로 다시 실행 (stream은 무시)
+        Returns:
+            dict: 각 단계의 조언, 단계 간 압축 보고서("handoffs"), 단계 이름 -> 전문가 이름("stages")을
+                  포함한 최종 결과 (토큰 예산이 있으면 사전 검사 보고서("preflight") 포함)
+        Raises:
+            BudgetExceeded: 예상 토큰 수가 세션별/전역 예산을 넘는 경우 (모델을 호출하기 전에 거절)
+        """
+        progress = progress or _ignore_progress
+        # 모델을 호출하기 전에 토큰 예산 확인 (긴 입력 축약, 통합 모드 전환 또는 거절)
+        requested_fused = fused
+        input_data, fused, preflight = self._preflight(service_type, input_data, fused)
+        if stream and not requested_fused:
+            return self._stream_creative_advice(service_type, input_data, checkpoints, fused, preflight)
+        if fused:
+            result = self._fused_creative_advice(service_type, input_data, progress)
+            if result is not None:
+                return self._attach_preflight(result, preflight)
+        
+        # 워크플로우 기록 시작
+        workflow_log = self._new_workflow_log(service_type)
+        run = self._begin_run(checkpoints, service_type, input_data)
+        handoffs = []
+        stage_metrics = {}
+        save_lock = threading.Lock()
+        
+        def execute(node, outputs):
+            # 앞 단계 출력을 압축해 넘기고, 단계가 끝나는 즉시 체크포인트 저장 (동시에 끝나는 단계끼리 직렬화)
+            previous = self._stage_previous(node, outputs, handoffs, service_type)
+            text = self._stage_experts[node.name].run(service_type, input_data, previous,
+                                                       metrics=stage_metrics.setdefault(node.name, {}),
+                                                       stage=node.name)
+            with save_lock:
+                run.save(node.name, text)
+            return text
+        
+        # 단계 그래프 실행: 앞 단계가 모두 끝난 단계부터 동시에 실행하고, 체크포인트에 있는 단계는 재사용
+        outputs, timings = self.graph.run(execute, self._resumed_outputs(run), progress)
+        result = self._finish_graph(workflow_log, run, outputs, timings, stage_metrics, handoffs)
+        
+        # 워크플로우 로그와 실행 기록 저장 및 체크포인트 정리
+        self._record(workflow_log, input_data, result)
+        run.complete()
+        return self._attach_preflight(result, preflight)
+    
+    def _stream_creative_advice(self, service_type, input_data, checkpoints=None, fused=False, preflight=None):
+        """
+        스트리밍 모드 워크플로우
+        각 단계의 응답 조각을 생성되는 즉시 (단계 이름, 조각) 형태로 반환하며,
+        이전 단계의 스트림이 끝나는 즉시 그래프의 위상 순서상 다음 단계를 시작
+        체크포인트에 이미 완료된 단계는 저장된 결과 전체를 한 조각으로 반환
+        단계 간 압축기가 있으면 압축 보고서를 ("handoff", 보고서) 형태로 함께 반환
+        토큰 예산 사전 검사 보고서는 맨 처음에 ("preflight", 보고서) 형태로 반환
+        """
+        if preflight is not None:
+            yield "preflight", preflight
+        if fused:
+            # 토큰 예산 때문에 통합 모드로 전환된 경우: 통합 응답을 단계별로 한 조각씩 반환
+            result = self._fused_creative_advice(service_type, input_data, _ignore_progress)
+            if result is not None:
+                for key in FUSED_SECTIONS:
+                    yield key, result[key]
+                return
+        
+        workflow_log = self._new_workflow_log(service_type)
+        run = self._begin_run(checkpoints, service_type, input_data)
+        handoffs = []
+        stage_metrics = {}
+        
+        def execute(node, outputs):
+            previous = self._stage_previous(node, outputs, handoffs, service_type)
+            if node.needs and self.compressor is not None:
+                for report in handoffs[-len(node.needs):]:
+                    yield "handoff", report
+            chunks = []
+            for chunk in self._stage_experts[node.name].run(service_type, input_data, previous, stream=True,
+                                                            metrics=stage_metrics.setdefault(node.name, {}),
+                                                            stage=node.name):
+                chunks.append(chunk)
+                yield node.name, chunk
+            run.save(node.name, "".join(chunks))
+        
+        # 스트리밍은 카드를 하나씩 채우므로 그래프의 위상 순서대로 한 단계씩 실행
+        outputs, timings = yield from self.graph.stream(execute, self._resumed_outputs(run))
+        result = self._finish_graph(workflow_log, run, outputs, timings, stage_metrics, handoffs)
+        self._record(workflow_log, input_data, result)
+        run.complete()
+    
+    async def get_creative_advice_async(self, service_type, input_data, checkpoints=None, fused=False,
+                                        record=True, check_budget=True):
+        """
+        get_creative_advice의 비동기 버전
+        UI 호출 없이 단계 그래프의 분석을 await 하므로, 여러 사용자의 워크플로우를
+        하나의 이벤트 루프에서 동시에 실행할 수 있음
+        Args:
+            service_type (str): 요청 서비스 유형 (YouTube, 블로그, 인스타그램)
+            input_data (dict): 사용자 입력 데이터
+            checkpoints (CheckpointStore): 단계별 체크포인트 저장소 (있으면 완료된 단계를 건너뜀)
+            fused (bool): True이면 단일 호출 통합 모드를 먼저 시도
+            record (bool): 실행 기록 저장소에 저장할지 여부 (fan-out의 플랫폼별 실행은 통합 결과 하나로만 저장)
+            check_budget (bool): 토큰 예산 사전 검사 여부 (fan-out의 플랫폼별 실행은 fan-out 전체로 한 번만 검사)
+        Returns:
+            dict: 각 전문가의 조언을 포함한 최종 결과
+        """
+        preflight = None
+        if check_budget and self.budget is not None:
+            # count_tokens 호출이 이벤트 루프를 막지 않도록 스레드에서 검사
+            input_data, fused, preflight = await asyncio.to_thread(self._preflight, service_type, input_data, fused)
+        if fused:
+            workflow_log = self._new_workflow_log(service_type)
+            fused_metrics = {}
+            sections = await self.fused_expert.generate_async(service_type, input_data, metrics=fused_metrics)
+            result = self._finish_fused(workflow_log, input_data, sections, fused_metrics)
+            if result is not None:
+                return self._attach_preflight(result, preflight)
+        
+        workflow_log = self._new_workflow_log(service_type)
+        run = self._begin_run(checkpoints, service_type, input_data)
+        handoffs = []
+        stage_metrics = {}
+        
+        async def execute(node, outputs):
+            previous = await self._stage_previous_async(node, outputs, handoffs, service_type)
+            text = await self._stage_experts[node.name].run_async(service_type, input_data, previous,
+                                                                   metrics=stage_metrics.setdefault(node.name, {}),
+                                                                   stage=node.name)
+            run.save(node.name, text)
+            return text
+        
+        outputs, timings = await self.graph.run_async(execute, self._resumed_outputs(run))
+        result = self._finish_graph(workflow_log, run, outputs, timings, stage_metrics, handoffs)
+        if record:
+            self._record(workflow_log, input_data, result)
+        else:
+            self.workflow_logs.append(workflow_log)
+        run.complete()
+        return self._attach_preflight(result, preflight)
+    
+    def get_integrated_advice_fanout(self, input_data, checkpoints=None):
+        """
+        통합 콘텐츠 병렬 분석 (fan-out 모드)
+        YouTube, 블로그, 인스타그램 파이프라인을 동시에 실행한 뒤, 짧은 통합 호출 한 번으로
+        크로스 플랫폼 시너지를 정리. 전체 소요 시간은 가장 느린 플랫폼 파이프라인 + 통합 호출 수준
+        Args:
+            input_data (dict): 통합 콘텐츠 입력 데이터
+            checkpoints (CheckpointStore): 단계별 체크포인트 저장소 (플랫폼별 파이프라인에 적용)
+        Returns:
+            dict: 각 전문가의 조언을 포함한 최종 결과
+        """
+        return run_coroutine_sync(self.get_integrated_advice_fanout_async(input_data, checkpoints))
+    
+    async def get_integrated_advice_fanout_async(self, input_data, checkpoints=None):
+        """
+        get_integrated_advice_fanout의 비동기 버전
+        """
+        # 세 플랫폼 파이프라인과 통합 호출 전체를 한 번에 예산과 비교 (넘으면 플랫폼별 통합 모드로 전환)
+        fused, preflight = False, None
+        if self.budget is not None:
+            input_data, fused, preflight = await asyncio.to_thread(self._preflight, "통합 콘텐츠", input_data, False,
+                                                                   self._fanout_calls)
+        workflow_log = self._new_workflow_log("통합 콘텐츠")
+        
+        # 플랫폼별 3단계 파이프라인 동시 실행
+        platform_results = await asyncio.gather(*[
+            self.get_creative_advice_async(platform, self._platform_input(platform, input_data), checkpoints,
+                                           fused=fused, record=False, check_budget=False)
+            for platform in INTEGRATED_PLATFORMS
+        ])
+        platform_results = dict(zip(INTEGRATED_PLATFORMS, platform_results))
+        workflow_log["steps"].append({
+            "expert": "CreativeTeam",
+            "action": "platform_fanout",
+            "platforms": list(INTEGRATED_PLATFORMS)
+        })
+        
+        # 플랫폼 간 시너지 통합 (짧은 단일 호출)
+        merge_metrics = {}
+        synergy = await self.platform_specialist.merge_async(
+            {platform: result["platform"] for platform, result in platform_results.items()}, input_data,
+            metrics=merge_metrics
+        )
+        workflow_log["steps"].append({
+            "expert": "PlatformSpecialist",
+            "action": "cross_platform_merge",
+            "metrics": merge_metrics
+        })
+        
+        def sections(key):
+            return "\n\n".join(f"#### {platform}\n\n{result.get(key, '')}"
+                               for platform, result in platform_results.items())
+        
+        # 플랫폼별 실행이 통합 모드로 전환되었을 수 있으므로 실제 결과의 단계 구성을 따름
+        stages = next(iter(platform_results.values()))["stages"]
+        result = {key: sections(key) for key in stages}
+        result.update({
+            "platform": f"#### 크로스 플랫폼 통합 전략\n\n{synergy}\n\n{sections('platform')}",
+            "handoffs": [report for result in platform_results.values() for report in result["handoffs"]],
+            "stages": stages
+        })
+        self._record(workflow_log, input_data, result)
+        return self._attach_preflight(result, preflight)
+    
+    def get_variants(self, service_type, input_data, section, count=4, plan=None, batch=False):
+        """
+        한 섹션(제목, 썸네일 등)의 변형 후보를 한 번의 호출로 생성
+        파이프라인 전체를 다시 실행하지 않고 후보 수만큼의 대안을 받아 거의 같은 후보는 제거
+        Args:
+            service_type (str): 서비스 유형
+            input_data (dict): 사용자 입력 데이터
+            section (str): VARIANT_SECTIONS에 등록된 섹션 이름
+            count (int): 요청할 후보 수
+            plan (str): 후보가 따를 창작 계획 (보통 콘텐츠 작가의 결과, 없으면 입력만 사용)
+            batch (bool): True이면 candidate_count 대신 한 응답에 JSON 배열로 받음
+        Returns:
+            list: 중복을 제거한 후보 텍스트 목록
+        """
+        workflow_log = self._new_workflow_log(service_type)
+        variant_metrics = {}
+        variants = self.variant_expert.generate(service_type, input_data, section, count, plan, batch,
+                                                metrics=variant_metrics)
+        workflow_log["steps"].append({
+            "expert": "CreativeWriter",
+            "action": f"variants:{section}",
+            "requested": count,
+            "unique": len(variants),
+            "metrics": variant_metrics
+        })
+        self.workflow_logs.append(workflow_log)
+        return variants
+    
+    def _fused_creative_advice(self, service_type, input_data, progress):
+        """
+        단일 호출 통합 모드 실행 (응답 검증에 실패하면 None)
+        """
+        workflow_log = self._new_workflow_log(service_type)
+        fused_metrics = {}
+        progress("fused", "start")
+        sections = self.fused_expert.generate(service_type, input_data, metrics=fused_metrics)
+        progress("fused", "done")
+        return self._finish_fused(workflow_log, input_data, sections, fused_metrics)
+    
+    def _finish_fused(self, workflow_log, input_data, sections, fused_metrics):
+        """
+        통합 모드 응답을 워크플로우 로그에 기록하고 일반 모드와 같은 형식의 결과로 변환
+        """
+        workflow_log["steps"].append({
+            "expert": "CreativeTeam",
+            "action": "fused_generation" if sections is not None else "fused_generation_rejected",
+            "metrics": fused_metrics
+        })
+        if sections is None:
+            # 응답 검증 실패: 호출한 쪽에서 3단계 체인으로 다시 실행
+            self.workflow_logs.append(workflow_log)
+            return None
+        stages = {key: PERSONAS[key]["name"] for key in FUSED_SECTIONS}
+        result = dict(sections, handoffs=[], fused=True, stages=stages)
+        self._record(workflow_log, input_data, result)
+        return result
+    
+    def _preflight(self, service_type, input_data, fused=False, plan=None):
+        """
+        모델을 호출하기 전에 실행 한 번의 토큰 수를 추정하고 세션별/전역 예산과 비교
+        필드별 한도를 넘는 입력은 축약하고, 예산을 넘으면 단일 호출 통합 모드로 전환하며(다운그레이드 모드),
+        그래도 넘으면 BudgetExceeded로 거절
+        Args:
+            service_type (str): 서비스 유형
+            input_data (dict): 사용자 입력 데이터
+            fused (bool): 단일 호출 통합 모드 요청 여부
+            plan (callable): plan(입력, 통합 모드 여부) -> 예상 호출 목록 (기본값: 단계 그래프 한 번 실행)
+        Returns:
+            tuple: (실행에 사용할 입력, 통합 모드 여부, 사전 검사 보고서 - 예산이 없으면 None)
+        """
+        if self.budget is None:
+            return input_data, fused, None
+        plan = plan or (lambda data, fused: self._planned_calls(service_type, data, fused))
+        input_data, trimmed = self.budget.limit_fields(input_data)
+        downgrades = [f"긴 입력 축약 ({', '.join(trimmed)})"] if trimmed else []
+        estimated, counted_by = self.budget.estimate(plan(input_data, fused), self.router.model)
+        if not fused and self.budget.action == DOWNGRADE and not self.budget.fits(estimated):
+            fused_estimated, fused_counted_by = self.budget.estimate(plan(input_data, True), self.router.model)
+            if fused_estimated < estimated:
+                fused, estimated, counted_by = True, fused_estimated, fused_counted_by
+                downgrades.append("단일 호출 통합 모드로 전환")
+                self.budget.record_downgrade()
+        self.budget.check(estimated)
+        return input_data, fused, {"estimated_tokens": estimated, "counted_by": counted_by, "downgrades": downgrades}
+    
+    def _planned_calls(self, service_type, input_data, fused=False):
+        """
+        사전 토큰 추정용 예상 호출 목록: (모델 이름, 프롬프트 텍스트, 프롬프트 밖의 예상 토큰 수)
+        앞 단계 출력은 아직 없으므로 단계 간 압축 예산(압축기가 없으면 예상 출력 토큰 수)만큼 더함
+        """
+        output_tokens = self.budget.expected_output_tokens
+        if fused:
+            prompt = get_template("fused", service_type).render(service_type, input_data)
+            return [(self.router.route("fused", service_type).model_name, prompt.text,
+                     output_tokens * len(FUSED_SECTIONS))]
+        handoff_tokens = output_tokens
+        if self.compressor is not None:
+            handoff_tokens = min(output_tokens, self.compressor.budget_tokens)
+        calls = []
+        for node in self.graph:
+            stage = self._stage_experts[node.name].stage
+            prompt = get_template(stage, service_type).render(service_type, input_data)
+            calls.append((self.router.route(stage, service_type).model_name, prompt.text,
+                          handoff_tokens * len(node.needs) + output_tokens))
+        return calls
+    
+    def _fanout_calls(self, input_data, fused=False):
+        # 통합 콘텐츠 fan-out의 예상 호출: 플랫폼별 파이프라인 + 플랫폼 최종 조언을 읽는 통합 호출 한 번
+        output_tokens = self.budget.expected_output_tokens
+        calls = [call for platform in INTEGRATED_PLATFORMS
+                 for call in self._planned_calls(platform, self._platform_input(platform, input_data), fused)]
+        calls.append((self.router.route("platform", "통합 콘텐츠").model_name, "",
+                      output_tokens * (len(INTEGRATED_PLATFORMS) + 1)))
+        return calls
+    
+    def _attach_preflight(self, result, preflight):
+        # 사전 검사 보고서를 결과에 포함 (예산이 없으면 결과 그대로)
+        if preflight is not None:
+            result["preflight"] = preflight
+        return result
+    
+    def _platform_input(self, platform, input_data):
+        """
+        통합 콘텐츠 입력을 개별 플랫폼 파이프라인의 입력 형식으로 변환
+        """
+        platform_input = {
+            "topic": input_data.get("topic", ""),
+            "goals": input_data.get("goals", ""),
+            "target_audience": input_data.get("target_audience", ""),
+            "additional_info": input_data.get("additional_info", "")
+        }
+        brand_style = input_data.get("brand_style", "")
+        current_status = input_data.get("current_status", "신규/소규모")
+        if platform == "YouTube":
+            platform_input.update({"channel_style": brand_style, "channel_size": current_status})
+        elif platform == "블로그":
+            platform_input.update({"blog_style": brand_style})
+        elif platform == "인스타그램":
+            platform_input.update({"visual_style": brand_style, "account_size": current_status})
+        return platform_input
+    
+    def _new_workflow_log(self, service_type):
+        """
+        워크플로우 기록 생성
+        """
+        return {
+            "service_type": service_type,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "experts_involved": list(dict.fromkeys(type(expert).__name__ for expert in self._stage_experts.values())),
+            "steps": []
+        }
+    
+    def _record(self, workflow_log, input_data, result):
+        """
+        완료된 실행의 워크플로우 로그를 보관하고 기록 저장소가 있으면 입력과 결과를 함께 저장
+        """
+        self.workflow_logs.append(workflow_log)
+        if self.history is not None:
+            workflow_log["history_id"] = self.history.save(workflow_log, input_data, result)
+    
+    def _begin_run(self, checkpoints, service_type, input_data):
+        """
+        체크포인트 실행 핸들 생성 (저장소가 없으면 아무것도 저장하지 않는 핸들)
+        단계별 프롬프트 템플릿이 읽는 입력 키를 함께 넘겨, 입력이 바뀌지 않은 앞 단계는 이전 결과를 재사용
+        """
+        if checkpoints is None:
+            return CheckpointRun()
+        stage_fields = [
+            (node.name,
+             node.fields if node.fields is not None else get_template(self._stage_experts[node.name].stage,
+                                                                       service_type).fields,
+             node.needs)
+            for node in self.graph
+        ]
+        return checkpoints.begin(service_type, input_data, self.router.signature(), stage_fields)
+    
+    def _resumed_outputs(self, run):
+        """
+        체크포인트에서 재사용할 단계 출력 (단계 지문에 앞 단계 지문이 포함되므로 단계별로 그대로 사용)
+        """
+        return {node.name: run.get(node.name) for node in self.graph if run.get(node.name) is not None}
+    
+    def _stage_previous(self, node, outputs, handoffs, service_type=None):
+        """
+        단계 프롬프트의 이전 단계 분석 (앞 단계 출력을 각각 압축한 뒤 이어 붙임, 앞 단계가 없으면 None)
+        """
+        if not node.needs:
+            return None
+        return "\n\n".join(self._handoff(outputs[need], node.name, handoffs, service_type) for need in node.needs)
+    
+    async def _stage_previous_async(self, node, outputs, handoffs, service_type=None):
+        if not node.needs:
+            return None
+        return "\n\n".join([await self._handoff_async(outputs[need], node.name, handoffs, service_type)
+                            for need in node.needs])
+    
+    def _finish_graph(self, workflow_log, run, outputs, timings, stage_metrics, handoffs):
+        """
+        그래프 실행 결과를 위상 순서대로 워크플로우 로그에 기록하고 결과 딕셔너리 생성
+        """
+        for node in self.graph:
+            self._log_step(workflow_log, type(self._stage_experts[node.name]).__name__, node.action, run, node.name,
+                           stage_metrics, timings.get(node.name))
+        return dict(outputs, handoffs=handoffs, stages=self.stage_labels())
+    
+    def _stage_expert(self, node, expert_args):
+        """
+        그래프 노드를 실행할 전문가 (단계가 정해지지 않은 CreativeExpert는 노드 이름의 등록된 단계로 실행)
+        """
+        if isinstance(node.expert, str):
+            return getattr(self, node.expert)
+        if node.expert.stage is None:
+            return node.expert(*expert_args, stage=node.name)
+        return node.expert(*expert_args)
+    
+    def stage_labels(self):
+        """
+        단계 그래프의 단계 이름 -> 전문가 이름 (위상 순서, 결과 카드 제목과 압축 보고서 표시에 사용)
+        """
+        return {node.name: getattr(self._stage_experts[node.name], "expert_name", node.name) for node in self.graph}
+    
+    def _handoff(self, text, stage, handoffs, service_type=None):
+        """
+        이전 단계 출력을 다음 단계로 넘기기 전에 토큰 예산 안으로 압축
+        요약 모드의 요약 호출은 요약 담당 전문가를 거쳐 다른 단계와 같은 호출 경로로 보냄
+        Args:
+            text (str): 이전 단계 출력
+            stage (str): 이 텍스트를 받을 단계
+            handoffs (list): 압축 보고서를 추가할 목록
+            service_type (str): 서비스 유형 (요약 호출 지표 구분용)
+        Returns:
+            str: 다음 단계에 넘길 텍스트
+        """
+        if self.compressor is None:
+            return text
+        
+        def summarize(text, max_tokens):
+            return self.handoff_summarizer.summarize(text, max_tokens, service_type)
+        
+        text, report = self.compressor.compress(text, stage, self._stage_model(stage), self.budget, summarize)
+        handoffs.append(report)
+        return text
+    
+    async def _handoff_async(self, text, stage, handoffs, service_type=None):
+        if self.compressor is None:
+            return text
+        
+        async def summarize(text, max_tokens):
+            return await self.handoff_summarizer.summarize_async(text, max_tokens, service_type)
+        
+        text, report = await self.compressor.compress_async(text, stage, self._stage_model(stage), self.budget,
+                                                             summarize)
+        handoffs.append(report)
+        return text
+    
+    def _stage_model(self, stage):
+        # 단계의 주 모델 (다음 단계 입력의 토큰 수 계산용)
+        return self.router.model(self.router.route(stage).model_name)
+    
+    def _log_step(self, workflow_log, expert, action, run, stage, stage_metrics=None, timing=None):
+        """
+        워크플로우 로그에 단계 기록 추가
+        이번 실행에서 모델을 호출한 단계는 호출 지표(소요 시간, TTFT, 토큰 수, 재시도, 캐시 적중)를 함께 기록
+        timing은 그래프 실행 시작 기준 단계의 준비/시작/종료 시각 (앞 단계를 기다린 시간과 동시 실행 확인용)
+        """
+        workflow_log["run_id"] = run.run_id
+        step = {
+            "expert": expert,
+            "action": action,
+            "resumed": stage in run.resumed_stages
+        }
+        if stage_metrics and stage in stage_metrics:
+            step["metrics"] = stage_metrics[stage]
+        if timing is not None:
+            step["timing"] = timing
+        workflow_log["steps"].append(step)
+
+
+def _total_tokens(response):
+    """
+    응답의 usage_metadata에서 총 토큰 수 추출 (없으면 None)
+    """
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "total_token_count", None) or None
+
+
+def _request_options(timeout):
+    """
+    호출 시간 제한을 SDK request_options 형식으로 변환
+    """
+    return {"timeout": timeout} if timeout else None
+
+
+class _async_nullcontext:
+    """
+    아무 일도 하지 않는 비동기 컨텍스트 매니저
+    """
+    
+    def __init__(self, value=None):
+        self.value = value
+    
+    async def __aenter__(self):
+        return self.value
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class CreativeExpert:
+    """
+    세 전문가가 공유하는 AI 모델 호출 로직
+    일반 응답과 스트리밍 응답 생성, 모델 라우팅, 응답 캐시 조회/저장, 요청 스케줄링, 재시도/시간 제한을 담당
+    """
+    
+    # 단계 이름 (모델 라우팅, 단계별 시간 제한, 재시도, 헤징 정책, 프롬프트 템플릿 구분용)
+    stage = None
+    
+    def __init__(self, router, cache=None, scheduler=None, resilience=None, prefix_cache=None, metrics=None,
+                 single_flight=None, budget=None, stage=None):
+        if stage is not None:
+            # register_stage로 등록한 단계를 하위 클래스 없이 실행
+            self.stage = stage
+        self.router = router  # ModelRouter (단계별/서비스 유형별 모델 선택)
+        self.cache = cache  # ResponseCache (없으면 캐시 사용 안 함)
+        self.scheduler = scheduler  # RateLimitScheduler (없으면 호출량 제한 안 함)
+        self.resilience = resilience  # ResiliencePolicy (없으면 재시도/시간 제한 없음)
+        self.prefix_cache = prefix_cache  # LocalPrefixCache (없으면 전체 프롬프트 전송)
+        self.metrics = metrics  # MetricsCollector (없으면 호출별 지표를 수집기에 기록하지 않음)
+        self.single_flight = single_flight  # SingleFlight (없으면 진행 중인 동일 요청도 따로 전송)
+        self.budget = budget  # TokenBudget (없으면 토큰 사용량 제한 없음)
+        
+        # 전문가 소개 (프롬프트 템플릿 레지스트리와 공유)
+        persona = PERSONAS[self.stage]
+        self.expertise = persona["expertise"]
+        self.expert_name = persona["name"]
+        self.expert_intro = persona["intro"]
+    
+    def run(self, service_type, input_data, previous=None, stream=False, metrics=None, stage=None):
+        """
+        단계 그래프에서 부르는 공통 실행 함수
+        전문가 단계의 프롬프트 템플릿에 요청 값과 앞 단계 출력을 채워 응답 생성
+        Args:
+            service_type (str): 서비스 유형
+            input_data (dict): 사용자 입력 데이터
+            previous (str): 앞 단계 출력 (없으면 생략)
+            stream (bool): True이면 응답 조각 제너레이터 반환
+            metrics (dict): 호출 지표를 채울 기록
+            stage (str): 지표에 남길 단계 이름 (기본값: 전문가의 단계)
+        Returns:
+            str | generator: 전체 응답 텍스트 또는 응답 조각 제너레이터
+        """
+        prompt = get_template(self.stage, service_type).render(service_type, input_data, previous)
+        return self._generate(prompt, service_type, stream=stream, metrics=metrics, stage=stage)
+    
+    async def run_async(self, service_type, input_data, previous=None, metrics=None, stage=None):
+        """
+        run의 비동기 버전
+        """
+        prompt = get_template(self.stage, service_type).render(service_type, input_data, previous)
+        return await self._generate_async(prompt, service_type, metrics, stage)
+    
+    def _generate(self, prompt, service_type, stream=False, metrics=None, stage=None):
+        """
+        완성된 프롬프트로 AI 모델 응답 생성
+        Args:
+            prompt (RenderedPrompt): 템플릿으로 만든 최종 프롬프트
+            service_type (str): 서비스 유형 (모델 라우팅, 지표 구분용)
+            stream (bool): True이면 응답 조각을 순차적으로 돌려주는 제너레이터 반환
+            metrics (dict): 호출 지표를 받아볼 기록 (있으면 이 딕셔너리를 채움)
+            stage (str): 지표에 남길 단계 이름 (기본값: 전문가의 단계)
+        Returns:
+            str | generator: 전체 응답 텍스트 또는 응답 조각 제너레이터
+        """
+        metrics = self._begin_metrics(service_type, metrics, stage)
+        route = self.router.route(self.stage, service_type)
+        if stream:
+            return self._generate_stream(prompt, route, metrics)
+        
+        started = time.perf_counter()
+        try:
+            cache_key = self._cache_key(prompt, route)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                metrics["cache_hit"] = True
+                return cached
+            self._check_budget(prompt)
+            
+            def call(timeout):
+                # 재시도와 헤징 요청마다 스케줄러 슬롯을 따로 받고, 두 번째 시도부터는 보조 모델 사용
+                metrics["attempts"] += 1
+                selected = self._select_model(route, metrics)
+                with self._slot(prompt) as ticket:
+                    model, contents = self._bind(selected, prompt)
+                    try:
+                        response = model.generate_content(contents, generation_config=self._generation_config(route),
+                                                          request_options=_request_options(timeout))
+                    except Exception as e:
+                        self.router.report_failure(selected.model_name, e)
+                        raise
+                    ticket.used_tokens = _total_tokens(response)
+                return response
+            
+            def fetch():
+                if self.resilience is None:
+                    response = call(None)
+                else:
+                    response = self.resilience.call(self.stage, call)
+                record_usage(metrics, response)
+                text = self._response_text(response)
+                self._cache_set(cache_key, text)
+                return text
+            
+            if self.single_flight is None:
+                text = fetch()
+            else:
+                # 같은 요청이 진행 중이면 보내지 않고 그 결과를 공유
+                text, metrics["coalesced"] = self.single_flight.call(self._flight_key(prompt, route), fetch)
+            # 스트리밍이 아니면 응답 전체가 한 번에 도착하므로 첫 토큰 시각 = 응답 도착 시각
+            metrics["ttft_seconds"] = time.perf_counter() - started
+            return text
+        except Exception as e:
+            metrics["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._finish_metrics(metrics, started)
+    
+    async def _generate_async(self, prompt, service_type, metrics=None, stage=None):
+        """
+        비동기 모드로 AI 모델 응답 생성
+        여러 사용자의 워크플로우가 하나의 이벤트 루프에서 동시에 진행될 수 있도록 generate_content_async 사용
+        """
+        metrics = self._begin_metrics(service_type, metrics, stage)
+        route = self.router.route(self.stage, service_type)
+        started = time.perf_counter()
+        try:
+            cache_key = self._cache_key(prompt, route)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                metrics["cache_hit"] = True
+                return cached
+            self._check_budget(prompt)
+            
+            async def call(timeout):
+                metrics["attempts"] += 1
+                selected = self._select_model(route, metrics)
+                async with self._slot_async(prompt) as ticket:
+                    model, contents = self._bind(selected, prompt)
+                    try:
+                        response = await model.generate_content_async(contents,
+                                                                      generation_config=self._generation_config(route),
+                                                                      request_options=_request_options(timeout))
+                    except Exception as e:
+                        self.router.report_failure(selected.model_name, e)
+                        raise
+                    ticket.used_tokens = _total_tokens(response)
+                return response
+            
+            async def fetch():
+                if self.resilience is None:
+                    response = await call(None)
+                else:
+                    response = await self.resilience.call_async(self.stage, call)
+                record_usage(metrics, response)
+                text = self._response_text(response)
+                self._cache_set(cache_key, text)
+                return text
+            
+            if self.single_flight is None:
+                text = await fetch()
+            else:
+                text, metrics["coalesced"] = await self.single_flight.call_async(self._flight_key(prompt, route),
+                                                                                 fetch)
+            metrics["ttft_seconds"] = time.perf_counter() - started
+            return text
+        except Exception as e:
+            metrics["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._finish_metrics(metrics, started)
+    
+    def _generate_stream(self, prompt, route, metrics):
+        """
+        스트리밍 모드로 응답 조각을 생성되는 즉시 반환
+        캐시에 있으면 전체 응답을 한 번에 반환하고, 스트림이 끝까지 완료된 경우에만 캐시에 저장
+        재시도는 첫 조각이 화면에 나가기 전에 실패한 경우에만 수행 (헤징은 스트리밍에 적용하지 않음)
+        """
+        started = time.perf_counter()
+        try:
+            cache_key = self._cache_key(prompt, route)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                metrics["cache_hit"] = True
+                yield cached
+                return
+            self._check_budget(prompt)
+            
+            flight = None
+            if self.single_flight is not None:
+                flight_key = self._flight_key(prompt, route)
+                future, leader = self.single_flight.begin(flight_key)
+                if leader:
+                    flight = (flight_key, future)
+                else:
+                    # 같은 요청이 진행 중: 그 스트림이 끝나면 전체 응답을 한 번에 반환
+                    # (리더가 일시적 오류가 아닌 이유로 실패하면 이 호출이 직접 스트리밍)
+                    try:
+                        text = future.result()
+                    except Exception as e:
+                        if self.single_flight.shares_error(e):
+                            raise
+                    else:
+                        metrics["coalesced"] = True
+                        metrics["ttft_seconds"] = time.perf_counter() - started
+                        yield text
+                        return
+            
+            try:
+                text = yield from self._stream_model(prompt, route, metrics, started, cache_key)
+            except BaseException as e:
+                # 스트림 도중 실패하거나 화면 갱신이 중단되면(GeneratorExit) 기다리던 호출에도 오류 전달
+                if flight is not None:
+                    self.single_flight.finish(*flight, error=e)
+                raise
+            if flight is not None:
+                self.single_flight.finish(*flight, result=text)
+        except Exception as e:
+            metrics["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._finish_metrics(metrics, started)
+    
+    def _stream_model(self, prompt, route, metrics, started, cache_key):
+        """
+        모델 스트림을 조각 단위로 반환하고 끝나면 전체 응답 텍스트를 반환 (재시도 포함)
+        """
+        policy = self.resilience.for_stage(self.stage) if self.resilience else None
+        while True:
+            metrics["attempts"] += 1
+            selected = self._select_model(route, metrics)
+            chunks = []
+            try:
+                # 스트림이 끝날 때까지 스케줄러 슬롯을 유지
+                with self._slot(prompt) as ticket:
+                    model, contents = self._bind(selected, prompt)
+                    response = model.generate_content(
+                        contents, generation_config=self._generation_config(route), stream=True,
+                        request_options=_request_options(policy.timeout if policy else None)
+                    )
+                    for chunk in response:
+                        # 안전 필터 등으로 텍스트가 없는 조각은 건너뜀
+                        if chunk.parts:
+                            if not chunks:
+                                metrics["ttft_seconds"] = time.perf_counter() - started
+                            chunks.append(chunk.text)
+                            yield chunk.text
+                    ticket.used_tokens = _total_tokens(response)
+                break
+            except Exception as e:
+                if not chunks:
+                    self.router.report_failure(selected.model_name, e)
+                if chunks or policy is None or not self.resilience.should_retry(self.stage, e, metrics["attempts"]):
+                    raise
+                time.sleep(policy.backoff(metrics["attempts"]))
+        record_usage(metrics, response)
+        text = "".join(chunks)
+        self._cache_set(cache_key, text)
+        return text
+    
+    def _begin_metrics(self, service_type, metrics=None, stage=None):
+        """
+        호출 지표 기록 준비
+        Args:
+            service_type (str): 서비스 유형
+            metrics (dict): 호출한 쪽에서 결과를 받아볼 기록 (있으면 이 딕셔너리를 채움)
+            stage (str): 지표에 남길 단계 이름 (기본값: 전문가의 단계)
+        Returns:
+            dict: 지표 기록
+        """
+        record = new_stage_metrics(stage or self.stage, service_type)
+        if metrics is None:
+            return record
+        metrics.clear()
+        metrics.update(record)
+        return metrics
+    
+    def _finish_metrics(self, metrics, started):
+        # 소요 시간과 재시도 횟수(헤징 요청 포함)를 채우고 수집기에 기록
+        metrics["wall_seconds"] = time.perf_counter() - started
+        metrics["retries"] = max(0, metrics["attempts"] - 1)
+        if self.metrics is not None:
+            self.metrics.record(metrics)
+        # 실제로 보낸 호출만 토큰 예산에 정산 (캐시 적중, 합쳐진 요청은 비용 없음)
+        if self.budget is not None and not metrics["cache_hit"] and not metrics["coalesced"]:
+            self.budget.charge(metrics["total_tokens"])
+    
+    def _check_budget(self, prompt):
+        # 호출 직전 예산 확인: 이번 호출의 예상 토큰 수(프롬프트 + 예상 출력)가 남은 예산을 넘으면 거절
+        if self.budget is not None:
+            self.budget.check(estimate_tokens(prompt.text) + self.budget.expected_output_tokens)
+    
+    def _generation_config(self, route):
+        # 라우팅에 설정된 생성 설정 (전문가별로 덮어쓸 수 있음)
+        return route.generation_config
+    
+    def _response_text(self, response):
+        # 응답에서 캐시하고 돌려줄 텍스트 (전문가별로 덮어쓸 수 있음)
+        return response.text
+    
+    def _select_model(self, route, metrics):
+        # 이번 시도에 사용할 모델을 고르고 지표에 기록 (헤징 시에는 마지막으로 시도한 모델)
+        model = self.router.select(route, metrics["attempts"])
+        metrics["model"] = model.model_name
+        metrics["fallback"] = model.model_name != route.model_name
+        return model
+    
+    def _bind(self, model, prompt):
+        # 접두부 캐시가 있으면 캐시 핸들에 묶인 모델과 요청별 접미부만 사용
+        if self.prefix_cache is None:
+            return model, prompt.text
+        return self.prefix_cache.bind(model, prompt)
+    
+    def _slot(self, prompt):
+        # 스케줄러 실행 슬롯 (스케줄러가 없으면 바로 실행)
+        if self.scheduler is None:
+            return nullcontext(types.SimpleNamespace(used_tokens=None))
+        return self.scheduler.slot(prompt.text)
+    
+    def _slot_async(self, prompt):
+        if self.scheduler is None:
+            return _async_nullcontext(types.SimpleNamespace(used_tokens=None))
+        return self.scheduler.slot_async(prompt.text)
+    
+    def _cache_key(self, prompt, route):
+        # 보조 모델로 받은 응답도 주 모델 라우팅의 캐시 키로 저장 (같은 요청은 같은 키)
+        if self.cache is None:
+            return None
+        return make_cache_key(route.model_name, prompt.text, self._generation_config(route))
+    
+    def _flight_key(self, prompt, route):
+        # 진행 중인 동일 요청 구분 키 (응답 캐시 키와 같은 구성: 모델 이름 + 프롬프트 + 생성 설정)
+        return make_cache_key(route.model_name, prompt.text, self._generation_config(route))
+    
+    def _cache_get(self, cache_key):
+        if cache_key is None:
+            return None
+        return self.cache.get(cache_key)
+    
+    def _cache_set(self, cache_key, text):
+        if cache_key is not None and text:
+            self.cache.set(cache_key, text)
+
+
+class ContentStrategist(CreativeExpert):
+    """
+    콘텐츠 전략 및 기획 전문가
+    트렌드 분석, 타겟 오디언스 정의, 콘텐츠 방향성 설정 담당
+    """
+    
+    stage = "strategy"
+    
+    def analyze(self, service_type, input_data, stream=False, metrics=None):
+        """
+        사용자 요청에 대한 콘텐츠 전략 수립
+        stream=True이면 응답 조각 제너레이터 반환, metrics를 넘기면 호출 지표를 채움
+        """
+        prompt = self._build_prompt(service_type, input_data)
+        
+        # AI 모델을 통한 응답 생성
+        return self._generate(prompt, service_type, stream=stream, metrics=metrics)
+    
+    async def analyze_async(self, service_type, input_data, metrics=None):
+        """
+        analyze의 비동기 버전 (이벤트 루프를 막지 않음)
+        """
+        prompt = self._build_prompt(service_type, input_data)
+        return await self._generate_async(prompt, service_type, metrics)
+    
+    def _build_prompt(self, service_type, input_data):
+        """
+        서비스 유형별 전략 템플릿에 요청 값을 채운 프롬프트 생성
+        """
+        return get_template(self.stage, service_type).render(service_type, input_data)
+
+
+class CreativeWriter(CreativeExpert):
+    """
+    창작 및 스토리텔링 전문가
+    매력적인 콘텐츠 개발, 스토리 구조, 시각적 요소 기획 담당
+    """
+    
+    stage = "content"
+    
+    def enhance(self, previous_strategy, service_type, input_data, stream=False, metrics=None):
+        """
+        전략가의 분석을 바탕으로 창의적 콘텐츠 개발
+        stream=True이면 응답 조각 제너레이터 반환, metrics를 넘기면 호출 지표를 채움
+        """
+        prompt = self._build_prompt(previous_strategy, service_type, input_data)
+        
+        # AI 모델을 통한 응답 생성
+        return self._generate(prompt, service_type, stream=stream, metrics=metrics)
+    
+    async def enhance_async(self, previous_strategy, service_type, input_data, metrics=None):
+        """
+        enhance의 비동기 버전 (이벤트 루프를 막지 않음)
+        """
+        prompt = self._build_prompt(previous_strategy, service_type, input_data)
+        return await self._generate_async(prompt, service_type, metrics)
+    
+    def _build_prompt(self, previous_strategy, service_type, input_data):
+        """
+        서비스 유형별 창작 템플릿에 전략가의 분석과 요청 값을 채운 프롬프트 생성
+        """
+        return get_template(self.stage, service_type).render(service_type, input_data, previous_strategy)
+
+
+class PlatformSpecialist(CreativeExpert):
+    """
+    플랫폼 최적화 및 유통 전문가
+    플랫폼별 최적화, 성과 측정, 배포 전략 담당
+    """
+    
+    stage = "platform"
+    
+    def finalize(self, previous_content, service_type, input_data, stream=False, metrics=None):
+        """
+        전략가와 창작가의 분석을 바탕으로 최종 플랫폼 최적화 및 유통 전략 제공
+        stream=True이면 응답 조각 제너레이터 반환, metrics를 넘기면 호출 지표를 채움
+        """
+        prompt = self._build_prompt(previous_content, service_type, input_data)
+        
+        # AI 모델을 통한 응답 생성
+        return self._generate(prompt, service_type, stream=stream, metrics=metrics)
+    
+    async def finalize_async(self, previous_content, service_type, input_data, metrics=None):
+        """
+        finalize의 비동기 버전 (이벤트 루프를 막지 않음)
+        """
+        prompt = self._build_prompt(previous_content, service_type, input_data)
+        return await self._generate_async(prompt, service_type, metrics)
+    
+    def _build_prompt(self, previous_content, service_type, input_data):
+        """
+        서비스 유형별 플랫폼 템플릿에 이전 전문가들의 분석과 요청 값을 채운 프롬프트 생성
+        """
+        return get_template(self.stage, service_type).render(service_type, input_data, previous_content)
+    
+    async def merge_async(self, platform_advice, input_data, metrics=None):
+        """
+        플랫폼별로 따로 완성된 최종 조언을 하나의 크로스 플랫폼 시너지 전략으로 통합
+        Args:
+            platform_advice (dict): 플랫폼 이름 -> 해당 플랫폼의 최종 조언
+            input_data (dict): 통합 콘텐츠 입력 데이터
+            metrics (dict): 호출 지표를 채울 기록 (단계 이름은 "merge"로 기록)
+        Returns:
+            str: 크로스 플랫폼 통합 전략
+        """
+        prompt = self._build_merge_prompt(platform_advice, input_data)
+        return await self._generate_async(prompt, "통합 콘텐츠", metrics, stage="merge")
+    
+    def _build_merge_prompt(self, platform_advice, input_data):
+        advice_sections = "\n\n".join(
+            f"=== {platform} 최종 조언 ===\n{advice}\n=== {platform} 끝 ===" for platform, advice in platform_advice.items()
+        )
+        return get_template(self.stage, "merge").render("통합 콘텐츠", input_data, advice_sections)
+
+
+class FusedExpert(CreativeExpert):
+    """
+    통합(fused) 모드 전문가
+    세 전문가의 작업 지시를 한 프롬프트로 합쳐 한 번 호출하고, strategy/content/platform 세 항목의
+    JSON 응답을 받음. 왕복 1회에 이전 단계 출력을 다시 보내지 않으므로 입력 토큰이 크게 줄어듦
+    """
+    
+    stage = "fused"
+    
+    def generate(self, service_type, input_data, metrics=None):
+        """
+        세 전문가의 결과를 한 번의 호출로 생성
+        Returns:
+            dict | None: {"strategy", "content", "platform"} (응답 검증에 실패하면 None)
+        """
+        prompt = get_template(self.stage, service_type).render(service_type, input_data)
+        return self.parse(self._generate(prompt, service_type, metrics=metrics))
+    
+    async def generate_async(self, service_type, input_data, metrics=None):
+        """
+        generate의 비동기 버전
+        """
+        prompt = get_template(self.stage, service_type).render(service_type, input_data)
+        return self.parse(await self._generate_async(prompt, service_type, metrics))
+    
+    @staticmethod
+    def parse(text):
+        """
+        통합 모드 응답 검증: 세 항목이 모두 비어 있지 않은 문자열인 JSON 객체여야 함
+        Returns:
+            dict | None: 검증된 세 항목 (실패하면 None)
+        """
+        try:
+            data = json.loads(text)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(data, dict):
+            return None
+        sections = {key: data.get(key) for key in FUSED_SECTIONS}
+        if not all(isinstance(value, str) and value.strip() for value in sections.values()):
+            return None
+        return sections
+    
+    def _generation_config(self, route):
+        # 라우팅 생성 설정에 JSON 응답 스키마를 더함
+        config = dict(route.generation_config or {})
+        config.update({"response_mime_type": "application/json", "response_schema": FUSED_RESPONSE_SCHEMA})
+        return config
+    
+    def _cache_set(self, cache_key, text):
+        # 검증에 실패한 응답은 캐시하지 않음 (다음 요청에서 다시 시도)
+        if self.parse(text) is not None:
+            super()._cache_set(cache_key, text)
+
+
+# 변형 후보 요청 옵션: (후보 수, 배치 모드) - 재시도/헤징 스레드에도 컨텍스트로 전달됨
+_variant_request = contextvars.ContextVar("variant_request", default=(1, False))
+
+
+def _normalize_variant(text):
+    # 비교용 정규화: 마크다운 기호, 문장 부호, 공백 차이 무시
+    return re.sub(r"[\W_]+", " ", text.lower()).strip()
+
+
+def dedupe_variants(texts, threshold=0.85):
+    """
+    거의 같은 후보 제거 (먼저 나온 후보 유지)
+    Args:
+        texts (list): 후보 텍스트 목록
+        threshold (float): 정규화한 두 후보의 유사도가 이 값 이상이면 중복으로 판단 (0~1)
+    Returns:
+        list: 중복을 제거한 후보 목록
+    """
+    kept, normalized = [], []
+    for text in texts:
+        text = text.strip()
+        key = _normalize_variant(text)
+        if not key:
+            continue
+        if any(SequenceMatcher(None, key, other).ratio() >= threshold for other in normalized):
+            continue
+        kept.append(text)
+        normalized.append(key)
+    return kept
+
+
+class VariantExpert(CreativeExpert):
+    """
+    변형 후보 생성 전문가 (콘텐츠 작가)
+    한 섹션의 대안을 API의 candidate_count로 한 번에 여러 개 받거나(기본),
+    배치 모드에서는 한 응답에 JSON 배열로 받음. 어느 쪽이든 호출 한 번의 지연 시간으로 후보 N개를 얻음
+    """
+    
+    stage = "variants"
+    
+    def generate(self, service_type, input_data, section, count, plan=None, batch=False, metrics=None):
+        """
+        변형 후보 생성
+        Returns:
+            list: 중복을 제거한 후보 텍스트 목록
+        """
+        template = get_variant_template(service_type, section, batch)
+        prompt = template.render(service_type, dict(input_data, variant_count=count), previous=plan)
+        token = _variant_request.set((count, batch))
+        try:
+            candidates = json.loads(self._generate(prompt, service_type, metrics=metrics))
+        finally:
+            _variant_request.reset(token)
+        if batch:
+            candidates = [item for text in candidates for item in self._parse_batch(text)]
+        return dedupe_variants(candidates)[:count]
+    
+    @staticmethod
+    def _parse_batch(text):
+        # 배치 모드 응답: 문자열 배열 JSON (형식이 맞지 않으면 줄 단위로 나눔)
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return [re.sub(r"^\s*(?:[-*]|\d+[.)])\s*", "", line) for line in text.splitlines()]
+        if isinstance(data, list):
+            return [str(item) for item in data]
+        return [str(data)]
+    
+    def _generation_config(self, route):
+        # 후보 수 모드는 candidate_count, 배치 모드는 문자열 배열 응답 스키마를 더함
+        count, batch = _variant_request.get()
+        config = dict(route.generation_config or {})
+        if batch:
+            config.update({"response_mime_type": "application/json", "response_schema": VARIANT_BATCH_SCHEMA})
+        else:
+            config["candidate_count"] = count
+        return config
+    
+    def _response_text(self, response):
+        # 후보가 여러 개면 response.text를 쓸 수 없으므로 후보별 텍스트를 JSON 배열로 묶어 캐시
+        candidates = getattr(response, "candidates", None)
+        if not candidates:
+            return json.dumps([response.text], ensure_ascii=False)
+        texts = ["".join(getattr(part, "text", "") for part in candidate.content.parts) for candidate in candidates]
+        return json.dumps(texts, ensure_ascii=False)
+
+
+class HandoffSummarizer(CreativeExpert):
+    """
+    단계 간 전달 텍스트 요약 담당 (요약 모드 압축기가 사용)
+    다른 전문가와 같은 호출 경로(스케줄러, 재시도, 지표, 응답 캐시, 토큰 예산)로 저렴한 요약 모델 호출
+    """
+    
+    stage = "summary"
+    
+    def summarize(self, text, max_tokens, service_type=None):
+        """
+        이전 단계 출력을 목표 토큰 수 이내로 요약
+        Args:
+            text (str): 이전 단계 출력
+            max_tokens (int): 요약 목표 토큰 수
+            service_type (str): 서비스 유형 (지표 구분용)
+        Returns:
+            str: 요약
+        """
+        return self._generate(self._build_summary_prompt(text, max_tokens, service_type), service_type)
+    
+    async def summarize_async(self, text, max_tokens, service_type=None):
+        """
+        summarize의 비동기 버전
+        """
+        return await self._generate_async(self._build_summary_prompt(text, max_tokens, service_type), service_type)
+    
+    def _build_summary_prompt(self, text, max_tokens, service_type):
+        return get_template(self.stage, service_type).render(service_type, {"summary_tokens": max_tokens}, text)
@@ -1,612 +1,911 @@
 # 필요한 라이브러리 임포트
 import streamlit as st
-from google.generativeai import GenerativeModel
-import google.generativeai as genai
-import os
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from response_cache import ResponseCache
+from checkpoint_store import CheckpointStore
+from model_pool import ModelPool
+from rate_limiter import RateLimitScheduler, session_scope
+from resilience import ResiliencePolicy
+from context_budget import HandoffCompressor
+from prompt_templates import VARIANT_SECTIONS, create_prefix_cache
+from metrics import MetricsCollector
+from history_store import HistoryStore
+from single_flight import SingleFlight
+from cassette import active_cassette
+from job_queue import ACTIVE_STATUSES, DONE, INTERRUPTED, JobWorkerPool
+from token_budget import BudgetExceeded, TokenBudget
+# 파이프라인 핵심 (Streamlit 없이도 임포트 가능한 모듈)
+from creative_team import CreativeTeam
 
 # ============================================================================
-# 에이전틱 워크플로우 기반 창작 파트너 시스템
-# 3명의 특화된 창작 전문가가 팀을 이루어 사용자를 지원
+# Streamlit 웹 애플리케이션 구현
 # ============================================================================
 
-class CreativeTeam:
+# 결과 카드 구성: (결과 키, 카드 스타일 클래스, 카드 제목)
+EXPERT_CARDS = [
+    ("strategy", "strategist-card", "김지원 콘텐츠 전략가"),
+    ("content", "creative-card", "이민호 콘텐츠 작가"),
+    ("platform", "platform-card", "박서연 플랫폼 전문가 (최종 통합 조언)"),
+]
+
+# 단계 그래프에 추가한 단계(SEO 분석 등)의 카드 스타일 클래스
+DEFAULT_CARD_CLASS = "creative-card"
+
+
+def result_stages(result):
     """
-    AI 기반 창작 파트너 팀을 관리하는 클래스
-    각 전문가의 협업을 조율하고 최종 결과를 제공
+    결과의 단계 이름 -> 전문가 이름 (단계 구성이 없는 이전 결과는 기본 세 단계)
     """
-    
-    def __init__(self, api_key):
-        """
-        창작 파트너 팀 초기화
-        Args:
-            api_key (str): Google AI API 키
-        """
-        self.api_key = api_key
-        genai.configure(api_key=api_key)
-        self.model = GenerativeModel('gemini-2.5-pro-preview-05-06')
-        
-        # 3명의 특화된 창작 전문가 초기화
-        self.content_strategist = ContentStrategist(self.model)  # 콘텐츠 전략 및 기획 전문가
-        self.creative_writer = CreativeWriter(self.model)      # 창작 및 스토리텔링 전문가
-        self.platform_specialist = PlatformSpecialist(self.model)  # 플랫폼 최적화 및 유통 전문가
-        
-        # 워크플로우 로그 초기화
-        self.workflow_logs = []
-    
-    def get_creative_advice(self, service_type, input_data):
-        """
-        사용자 요청에 따라 3명의 전문가가 순차적으로 협업하여 창작 지원 제공
-        Args:
-            service_type (str): 요청 서비스 유형 (YouTube, 블로그, 인스타그램)
-            input_data (dict): 사용자 입력 데이터
-        Returns:
-            dict: 각 전문가의 조언을 포함한 최종 결과
-        """
-        # 워크플로우 기록 시작
-        workflow_log = {
-            "service_type": service_type,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "experts_involved": ["ContentStrategist", "CreativeWriter", "PlatformSpecialist"],
-            "steps": []
-        }
-        
-        # 1단계: 콘텐츠 전략가의 초기 분석 및 기획
-        st.markdown("### 1단계: 콘텐츠 전략 및 기획 중...")
-        with st.spinner("콘텐츠 전략가가 기획을 수립 중입니다..."):
-            initial_strategy = self.content_strategist.analyze(service_type, input_data)
-            workflow_log["steps"].append({
-                "expert": "ContentStrategist",
-                "action": "initial_strategy"
-            })
-        
-        # 2단계: 창작 작가의 콘텐츠 개발 및 스토리텔링
-        st.markdown("### 2단계: 콘텐츠 개발 및 스토리텔링 중...")
-        with st.spinner("창작 작가가 콘텐츠를 발전시키는 중입니다..."):
-            content_enhanced = self.creative_writer.enhance(initial_strategy, service_type, input_data)
-            workflow_log["steps"].append({
-                "expert": "CreativeWriter",
-                "action": "content_enhancement"
-            })
-        
-        # 3단계: 플랫폼 전문가의 최적화 및 배포 전략
-        st.markdown("### 3단계: 플랫폼 최적화 및 배포 전략 수립 중...")
-        with st.spinner("플랫폼 전문가가 최종 조언을 준비 중입니다..."):
-            final_advice = self.platform_specialist.finalize(content_enhanced, service_type, input_data)
-            workflow_log["steps"].append({
-                "expert": "PlatformSpecialist",
-                "action": "finalization"
-            })
-        
-        # 워크플로우 로그 저장
-        self.workflow_logs.append(workflow_log)
-        
-        # 각 전문가별 결과를 모두 반환
-        return {
-            "strategy": initial_strategy,
-            "content": content_enhanced,
-            "platform": final_advice
-        }
+    return result.get("stages") or {key: title for key, _, title in EXPERT_CARDS}
+
+
+def result_cards(stages):
+    """
+    단계별 결과 카드 구성 (기본 세 단계는 EXPERT_CARDS, 그래프에 추가한 단계는 전문가 이름을 제목으로 사용)
+    Args:
+        stages (dict): 단계 이름 -> 전문가 이름 (위상 순서)
+    Returns:
+        list: (결과 키, 카드 스타일 클래스, 카드 제목) 목록
+    """
+    known = {key: (card_class, title) for key, card_class, title in EXPERT_CARDS}
+    return [(key, *known.get(key, (DEFAULT_CARD_CLASS, label))) for key, label in stages.items()]
+
+
+def expert_card_html(card_class, title, text):
+    """
+    전문가 답변 카드 하나의 HTML
+    """
+    return f"""<div class="expert-card {card_class}"><b>{title}</b><br><br>{text}</div>"""
+
+
+def render_expert_card(container, card_class, title, text):
+    """
+    전문가 답변 카드 하나를 주어진 컨테이너(또는 st.empty 플레이스홀더)에 표시
+    """
+    container.markdown(expert_card_html(card_class, title, text), unsafe_allow_html=True)
+
+
+@st.cache_resource
+def get_response_cache():
+    """
+    모든 세션이 공유하는 응답 캐시 (프로세스당 하나)
+    """
+    return ResponseCache()
+
+
+@st.cache_resource
+def get_metrics():
+    """
+    모든 세션이 공유하는 단계별 호출 지표 수집기 (프로세스당 하나)
+    """
+    return MetricsCollector.from_env()
+
+
+@st.cache_resource
+def get_single_flight():
+    """
+    모든 세션과 API 키가 공유하는 동일 요청 합치기 (프로세스당 하나, 팀마다 API 키별 범위로 나누어 사용)
+    """
+    return SingleFlight()
+
+
+@st.cache_resource
+def get_history_store():
+    """
+    모든 세션이 공유하는 워크플로우 실행 기록 저장소 (프로세스당 하나)
+    """
+    return HistoryStore()
+
+
+@st.cache_resource
+def get_token_budget():
+    """
+    모든 세션이 공유하는 세션별/전역 토큰 예산 (프로세스당 하나, 사용량은 작업자 프로세스와 함께 집계)
+    """
+    return TokenBudget.from_env()
+
+
+@st.cache_resource
+def get_team_pool():
+    """
+    API 키별 창작 파트너 팀 풀 (프로세스당 하나, 30분 미사용 시 정리)
+    버튼을 누를 때마다 모델과 전문가 객체를 새로 만들지 않고 재사용
+    쿼터는 API 키 단위이므로 요청 스케줄러도 키마다 하나씩 두고 그 키를 쓰는 모든 세션이 공유
+    """
+    return ModelPool(lambda api_key: CreativeTeam(api_key, cache=get_response_cache(),
+                                                  scheduler=RateLimitScheduler.from_env(),
+                                                  resilience=ResiliencePolicy.from_env(),
+                                                  compressor=HandoffCompressor.from_env(),
+                                                  prefix_cache=create_prefix_cache(),
+                                                  metrics=get_metrics(), history=get_history_store(),
+                                                  single_flight=get_single_flight(), budget=get_token_budget()))
+
+
+@st.cache_resource
+def get_job_pool():
+    """
+    분석 작업자 프로세스 풀 (서버 프로세스당 하나, 작업자 수는 CREATOR_PARTNER_WORKERS)
+    작업자 프로세스는 첫 백그라운드 작업을 등록할 때 시작하고, 여기서는 이전 서버 프로세스가 남긴 작업만 정리
+    """
+    pool = JobWorkerPool.from_env()
+    pool.store.interrupt_orphaned()
+    return pool
+
+
+def get_session_id():
+    """
+    현재 브라우저 세션 ID (요청 스케줄러의 공정 대기열과 백그라운드 작업 구분용)
+    URL 쿼리 파라미터에도 기록하여 페이지를 새로고침해도 같은 ID로 진행 중인 작업을 다시 찾음
+    """
+    session_id = st.session_state.get("session_id") or st.query_params.get("sid") or uuid.uuid4().hex
+    st.session_state["session_id"] = session_id
+    if st.query_params.get("sid") != session_id:
+        st.query_params["sid"] = session_id
+    return session_id
+
+
+@contextmanager
+def budget_guard():
+    """
+    토큰 예산 초과로 거절된 요청을 오류 메시지로 표시 (모델을 호출하기 전에 거절되므로 비용 없음)
+    """
+    try:
+        yield
+    except BudgetExceeded as e:
+        st.error(f"💰 {e}")
 
 
-class ContentStrategist:
+def get_checkpoint_store():
     """
-    콘텐츠 전략 및 기획 전문가
-    트렌드 분석, 타겟 오디언스 정의, 콘텐츠 방향성 설정 담당
+    현재 세션의 단계별 체크포인트 저장소
+    세션 상태와 디스크에 함께 저장하므로 새로고침 후에도 완료된 단계를 재사용
+    """
+    return CheckpointStore(memory=st.session_state.setdefault("stage_checkpoints", {}))
+
+
+# 단계별 진행 상황 표시 문구: 단계 -> (제목, 진행 중 메시지)
+STAGE_MESSAGES = {
+    "strategy": ("### 1단계: 콘텐츠 전략 및 기획 중...", "콘텐츠 전략가가 기획을 수립 중입니다..."),
+    "content": ("### 2단계: 콘텐츠 개발 및 스토리텔링 중...", "창작 작가가 콘텐츠를 발전시키는 중입니다..."),
+    "platform": ("### 3단계: 플랫폼 최적화 및 배포 전략 수립 중...", "플랫폼 전문가가 최종 조언을 준비 중입니다..."),
+    "fused": ("### 창작 파트너 팀 통합 분석 중...", "세 전문가의 분석을 한 번의 호출로 준비 중입니다..."),
+}
+
+
+def stage_messages(stage):
+    """
+    단계 진행 상황 표시 문구 (STAGE_MESSAGES에 없는 그래프 단계는 단계 이름으로 표시)
+    """
+    return STAGE_MESSAGES.get(stage) or (f"### '{stage}' 단계 진행 중...", f"'{stage}' 단계를 진행 중입니다...")
+
+
+class StageProgressView:
+    """
+    get_creative_advice의 진행 상황 콜백을 Streamlit 화면에 표시
+    단계 그래프에서 독립적인 단계가 동시에 진행될 수 있으므로 단계마다 진행 표시를 따로 둠
     """
     
-    def __init__(self, model):
-        self.model = model
-        self.expertise = "content_strategy"
-        self.expert_name = "김지원 콘텐츠 전략가"
-        self.expert_intro = """
-        안녕하세요, 김지원 콘텐츠 전략가입니다. 
-        저는 트렌드 분석, 타겟 오디언스 정의, 콘텐츠 방향성 설정을 전문으로 합니다.
-        10년간의 디지털 콘텐츠 전략 경험을 바탕으로 여러분의 창작물이 목표 청중에게 효과적으로 도달할 수 있도록 지원하겠습니다.
-        """
+    def __init__(self):
+        self._placeholders = {}
     
-    def analyze(self, service_type, input_data):
-        """
-        사용자 요청에 대한 콘텐츠 전략 수립
-        """
-        # 서비스 유형별 맞춤 프롬프트 생성
-        if service_type == "YouTube":
-            prompt = self._create_youtube_strategy_prompt(input_data)
-        elif service_type == "블로그":
-            prompt = self._create_blog_strategy_prompt(input_data)
-        elif service_type == "인스타그램":
-            prompt = self._create_instagram_strategy_prompt(input_data)
-        elif service_type == "통합 콘텐츠":
-            prompt = self._create_integrated_strategy_prompt(input_data)
+    def __call__(self, stage, status):
+        heading, message = stage_messages(stage)
+        if status == "start":
+            st.markdown(heading)
+            self._placeholders[stage] = st.empty()
+            self._placeholders[stage].info(f"⏳ {message}")
+        elif status == "done" and stage in self._placeholders:
+            self._placeholders.pop(stage).empty()
+        elif status == "resumed":
+            st.markdown(heading)
+            st.caption("이전 실행에서 완료된 결과를 재사용합니다.")
+
+
+def build_result_blocks(result):
+    """
+    완성된 분석 결과를 화면 블록 목록으로 변환 (세션 상태에 저장해 두고 다시 실행할 때 그대로 표시)
+    Returns:
+        list: ("markdown" | "html" | "caption", 내용) 튜플 목록
+    """
+    blocks = [("markdown", "### 📊 창작 파트너 팀 분석 결과")]
+    stages = result_stages(result)
+    for key, card_class, title in result_cards(stages):
+        blocks.append(("html", expert_card_html(card_class, title, result.get(key, ""))))
+    if result.get("fused"):
+        blocks.append(("caption", "⚡ 단일 호출 통합 모드: 세 전문가의 분석을 한 번의 모델 호출로 받았습니다"))
+    savings = handoff_savings_caption(result.get("handoffs", []), stages)
+    if savings:
+        blocks.append(("caption", savings))
+    preflight = preflight_caption(result.get("preflight"))
+    if preflight:
+        blocks.append(("caption", preflight))
+    return blocks
+
+
+def render_blocks(blocks):
+    """
+    build_result_blocks로 만든 화면 블록 표시
+    """
+    for kind, body in blocks:
+        if kind == "caption":
+            st.caption(body)
         else:
-            prompt = self._create_general_strategy_prompt(input_data, service_type)
-        
-        # 전문가 정보 추가
-        prompt = f"""
-        당신은 '{self.expert_name}'이라는 콘텐츠 전략 전문가입니다.
-        {self.expert_intro}
-        
-        {prompt}
-        
-        분석 결과에 트렌드 분석, 타겟 오디언스 인사이트, 콘텐츠 차별화 전략을 반드시 포함해 주세요.
-        전문적이면서도 실용적인 전략을 제시해 주세요.
-        """
-        
-        # AI 모델을 통한 응답 생성
-        response = self.model.generate_content(prompt)
-        return response.text
+            st.markdown(body, unsafe_allow_html=kind == "html")
+
+
+def render_result_cards(result):
+    """
+    완성된 분석 결과를 세 전문가 카드로 표시
+    Returns:
+        list: 표시한 화면 블록 목록
+    """
+    blocks = build_result_blocks(result)
+    render_blocks(blocks)
+    return blocks
+
+
+def save_rendered_result(service_type, blocks, input_data=None, result=None):
+    """
+    서비스 유형별 마지막 결과 화면을 세션 상태에 저장 (다른 위젯을 조작해도 결과가 사라지지 않음)
+    입력과 결과도 함께 저장하여 변형 후보 생성에 사용
+    """
+    st.session_state.setdefault("result_blocks", {})[service_type] = blocks
+    if result is not None:
+        st.session_state.setdefault("last_runs", {})[service_type] = {"input_data": input_data, "result": result}
+        # 새 결과에는 이전 결과의 변형 후보를 표시하지 않음
+        st.session_state.setdefault("variants", {}).pop(service_type, None)
+
+
+def render_saved_results(service_type):
+    """
+    세션 상태에 저장된 서비스 유형별 마지막 결과 화면 표시 (모델을 다시 호출하지 않음)
+    """
+    blocks = st.session_state.get("result_blocks", {}).get(service_type)
+    if blocks:
+        render_blocks(blocks)
+
+
+def render_variants_panel(api_key, service_type):
+    """
+    마지막 결과의 한 섹션(제목, 썸네일 등)에 대한 변형 후보를 한 번의 호출로 만들어 나란히 표시
+    """
+    last_run = st.session_state.get("last_runs", {}).get(service_type)
+    sections = VARIANT_SECTIONS.get(service_type)
+    if last_run is None or not sections:
+        return
     
-    def _create_youtube_strategy_prompt(self, input_data):
-        return f"""
-        다음 YouTube 콘텐츠 아이디어에 대한 전략을 수립해주세요:
-        
-        주제/아이디어: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 시청자: {input_data.get('target_audience', '')}
-        
-        다음 항목을 포함하는 YouTube 콘텐츠 전략을 제공해주세요:
-        1. 콘텐츠 시장성 및 트렌드 분석
-        2. 타겟 시청자 세부 페르소나 및 니즈
-        3. 유사 콘텐츠 분석 및 차별화 전략
-        4. 핵심 메시지 및 가치 제안
-        5. 시리즈/에피소드 구조 제안
-        6. 시청자 참여 유도 전략
-        """
+    with st.expander("🎲 변형 후보 만들기 (제목, 썸네일 등 A/B 테스트용)"):
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            section = st.selectbox("섹션", list(sections), format_func=lambda key: sections[key][0],
+                                   key=f"variant_section_{service_type}")
+        with col2:
+            count = st.slider("후보 수", 2, 8, 4, key=f"variant_count_{service_type}")
+        
+        if st.button("후보 생성", key=f"variant_run_{service_type}"):
+            creative_team = get_team_pool().get(api_key)
+            with budget_guard():
+                with st.spinner(f"{sections[section][0]} 후보를 만드는 중입니다..."), session_scope(get_session_id()):
+                    variants = creative_team.get_variants(service_type, last_run["input_data"], section, count,
+                                                          plan=last_run["result"].get("content"))
+                st.session_state.setdefault("variants", {})[service_type] = (section, count, variants)
+        
+        saved = st.session_state.get("variants", {}).get(service_type)
+        if saved:
+            section, count, variants = saved
+            if len(variants) < count:
+                st.caption(f"요청한 {count}개 중 거의 같은 후보를 제외하고 {len(variants)}개를 표시합니다")
+            columns = st.columns(min(len(variants), 4) or 1)
+            for index, text in enumerate(variants):
+                with columns[index % len(columns)]:
+                    st.markdown(expert_card_html("creative-card", f"{sections[section][0]} 후보 {index + 1}", text),
+                                unsafe_allow_html=True)
+
+
+def handoff_savings_caption(handoffs, stages=None):
+    """
+    단계 간 컨텍스트 압축으로 절약한 토큰 수 문구 (절약한 토큰이 없으면 None)
+    Args:
+        handoffs (list): 압축 보고서 목록
+        stages (dict): 단계 이름 -> 전문가 이름 (없는 단계는 단계 이름으로 표시)
+    """
+    saved = sum(report["saved_tokens"] for report in handoffs)
+    if not saved:
+        return None
+    stages = stages or {}
+    details = ", ".join(
+        f"{stages.get(report['stage'], report['stage'])} 전달분 "
+        f"{report['original_tokens']:,}→{report['final_tokens']:,}"
+        for report in handoffs if report["saved_tokens"]
+    )
+    return f"🗜️ 단계 간 컨텍스트 압축으로 입력 토큰 {saved:,}개 절약 ({details})"
+
+
+def preflight_caption(preflight):
+    """
+    토큰 예산에 맞추려고 요청을 줄인 내역 문구 (줄이지 않았으면 None)
+    """
+    if not preflight or not preflight["downgrades"]:
+        return None
+    return (f"💰 토큰 예산에 맞춰 요청을 조정했습니다: {', '.join(preflight['downgrades'])} "
+            f"(예상 약 {preflight['estimated_tokens']:,} 토큰)")
+
+
+@st.fragment(run_every=5)
+def render_token_usage(budget):
+    """
+    토큰 예산 사용량 (5초마다 이 영역만 다시 조회하여 다른 세션과 작업자 프로세스의 사용량도 반영)
+    """
+    usage = budget.usage(get_session_id())
+    st.markdown("### 💰 토큰 예산")
+    for scope, label in (("session", "이 세션"), ("global", "전체")):
+        used, limit = usage[f"{scope}_used"], usage[f"{scope}_limit"]
+        if limit:
+            st.progress(min(1.0, used / limit), text=f"{label}: {used:,} / {limit:,} 토큰")
+        else:
+            st.caption(f"{label}: {used:,} 토큰 (제한 없음)")
+    stats = budget.stats()
+    st.caption(f"사전 검사: 입력 축약 {stats['trimmed']}회, 통합 모드 전환 {stats['downgraded']}회, "
+               f"거절 {stats['rejected']}회 (count_tokens 사용 {stats['counted']}회)")
+
+
+# 실행 기록 목록의 서비스 유형 필터
+HISTORY_FILTERS = ["전체", "YouTube", "블로그", "인스타그램", "통합 콘텐츠"]
+
+
+def _reset_history_pages():
+    st.session_state["history_cursors"] = [None]
+
+
+def _open_history(record_id):
+    st.session_state["history_open"] = record_id
+
+
+def render_history_sidebar(history, page_size=10):
+    """
+    사이드바 실행 기록 목록 (현재 세션이 실행한 기록만 표시)
+    현재 페이지의 요약만 조회하고(키셋 페이지네이션), 결과 본문은 항목을 열 때 조회
+    Args:
+        history (HistoryStore): 실행 기록 저장소
+        page_size (int): 한 페이지에 표시할 기록 수
+    """
+    st.markdown("### 🗂️ 실행 기록")
+    service_filter = st.selectbox("서비스 유형", HISTORY_FILTERS, key="history_filter", on_change=_reset_history_pages)
+    service_type = None if service_filter == "전체" else service_filter
     
-    def _create_blog_strategy_prompt(self, input_data):
-        return f"""
-        다음 블로그 콘텐츠 아이디어에 대한 전략을 수립해주세요:
-        
-        주제/분야: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 독자: {input_data.get('target_audience', '')}
-        
-        다음 항목을 포함하는 블로그 콘텐츠 전략을 작성해주세요:
-        1. 블로그 시장/니치 분석
-        2. 타겟 독자 페르소나 및 관심사
-        3. 주요 경쟁 블로그 분석 및 차별화 포인트
-        4. 핵심 주제 클러스터 및 콘텐츠 필러
-        5. 타임리스 vs. 시의성 콘텐츠 균형
-        6. SEO 및 독자 유입 전략 방향
-        """
+    # 페이지마다 시작 위치를 쌓아 두어 이전 페이지로 돌아갈 수 있게 함
+    cursors = st.session_state.setdefault("history_cursors", [None])
+    items, next_cursor = history.page(get_session_id(), service_type, page_size, cursors[-1])
+    if not items:
+        st.caption("저장된 기록이 없습니다")
+        return
     
-    def _create_instagram_strategy_prompt(self, input_data):
-        return f"""
-        다음 인스타그램 콘텐츠 아이디어에 대한 전략을 수립해주세요:
-        
-        계정 주제/성격: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 팔로워: {input_data.get('target_audience', '')}
-        
-        다음 구조로 인스타그램 콘텐츠 전략을 제시해주세요:
-        
-        1. 인스타그램 트렌드 및 알고리즘 분석
-           - 현재 인기 있는 콘텐츠 유형
-           - 최신 인스타그램 알고리즘 고려사항
-           - 참여율 높은 콘텐츠 패턴
-        
-        2. 비주얼 아이덴티티 및 브랜딩 전략
-           - 색상 팔레트 및 시각적 일관성
-           - 그리드/피드 구성 컨셉
-           - 스토리와 릴스 활용 방향
-        
-        3. 콘텐츠 필러 및 주제 분류
-           - 핵심 콘텐츠 카테고리
-           - 정기 시리즈 아이디어
-           - 참여 유도 콘텐츠 유형
-        """
+    for item in items:
+        label = (f"{datetime.fromtimestamp(item['created_at']):%m-%d %H:%M} · {item['service_type']} · "
+                 f"{item['topic'] or '(주제 없음)'}")
+        st.button(label, key=f"history_{item['id']}", use_container_width=True,
+                  on_click=_open_history, args=(item["id"],))
     
-    def _create_integrated_strategy_prompt(self, input_data):
-        return f"""
-        다음 통합 콘텐츠 전략(YouTube, 블로그, 인스타그램)을 수립해주세요:
-        
-        주제/브랜드: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 오디언스: {input_data.get('target_audience', '')}
-        주력 플랫폼: {input_data.get('primary_platform', '')}
-        
-        다음 구조로 통합 콘텐츠 전략을 제시해주세요:
-        
-        1. 크로스 플랫폼 브랜드 아이덴티티
-           - 일관된 브랜드 메시지 및 톤
-           - 플랫폼별 브랜딩 변형
-           - 핵심 차별화 포인트
-        
-        2. 콘텐츠 생태계 설계
-           - 플랫폼별 역할 정의
-           - 콘텐츠 재활용 전략
-           - 플랫폼 간 상호 연결 방법
-        
-        3. 통합 오디언스 여정 설계
-           - 오디언스 유입 및 전환 경로
-           - 각 플랫폼별 타겟 오디언스 세그먼트
-           - 교차 홍보 전략
-        """
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("◀ 이전", key="history_prev", disabled=len(cursors) == 1, use_container_width=True,
+                  on_click=cursors.pop)
+    with col2:
+        st.button("다음 ▶", key="history_next", disabled=next_cursor is None, use_container_width=True,
+                  on_click=cursors.append, args=(next_cursor,))
+    st.caption(f"{len(cursors)}페이지 · 전체 {history.count(get_session_id(), service_type):,}건")
+
+
+def render_history_record(history):
+    """
+    사이드바에서 연 실행 기록을 다시 생성하지 않고 결과 카드로 표시
+    """
+    record_id = st.session_state.get("history_open")
+    if record_id is None:
+        return
+    record = history.get(record_id, get_session_id())
+    if record is None:
+        st.session_state.pop("history_open", None)
+        return
     
-    def _create_general_strategy_prompt(self, input_data, service_type):
-        return f"""
-        다음 {service_type} 콘텐츠 요청에 대한 전략을 수립해주세요:
-        
-        요청 내용: {str(input_data)}
-        
-        콘텐츠 시장 분석, 타겟 오디언스 정의, 차별화 전략, 핵심 콘텐츠 방향성을 포함한 종합적인 전략을 제공해주세요.
-        """
+    st.markdown(f"## 🗂️ 저장된 결과: {record['service_type']} · {record['input_data'].get('topic', '')}")
+    st.caption(f"{datetime.fromtimestamp(record['created_at']):%Y-%m-%d %H:%M:%S} 생성 · "
+               f"모델 호출 {record['total_seconds']:.1f}초")
+    render_result_cards(record["result"])
+    st.button("저장된 결과 닫기", key="history_close", on_click=st.session_state.pop, args=("history_open", None))
+    st.markdown("---")
+
 
+def render_metrics_panel(metrics):
+    """
+    사이드바 단계별/서비스 유형별 지연 시간 패널 (p50, p95)
+    """
+    with st.expander("📈 단계별 성능 지표"):
+        def seconds(value):
+            return f"{value:.1f}s" if value is not None else "-"
+        
+        for group_by, title in (("stage", "단계"), ("service_type", "서비스 유형")):
+            rows = metrics.summary(group_by)
+            if not rows:
+                continue
+            st.markdown(f"**{title}별**")
+            st.table([{
+                title: row[group_by],
+                "호출": row["calls"],
+                "p50": seconds(row["p50_seconds"]),
+                "p95": seconds(row["p95_seconds"]),
+                "TTFT p50": seconds(row["p50_ttft_seconds"]),
+                "TTFT p95": seconds(row["p95_ttft_seconds"]),
+                "평균 토큰": f"{row['avg_total_tokens']:,.0f}" if row["avg_total_tokens"] else "-",
+                "캐시 적중": row["cache_hits"],
+                "합쳐진 요청": row["coalesced"],
+                "보조 모델": row["fallbacks"],
+                "재시도": row["retries"],
+                "오류": row["errors"]
+            } for row in rows])
+        
+        if metrics.records():
+            st.download_button("Prometheus 형식으로 내보내기", metrics.to_prometheus(),
+                               file_name="creator_partner_metrics.prom", mime="text/plain")
+        else:
+            st.caption("아직 기록된 호출이 없습니다.")
+
+
+def render_creative_advice(creative_team, service_type, input_data, stream=False, fused=False):
+    """
+    전문가 팀 분석을 실행하고 결과 카드 표시
+    Args:
+        creative_team (CreativeTeam): 창작 파트너 팀
+        service_type (str): 요청 서비스 유형
+        input_data (dict): 사용자 입력 데이터
+        stream (bool): True이면 각 카드에 응답을 생성되는 즉시 채움
+        fused (bool): True이면 단일 호출 통합 모드 사용 (JSON 응답이라 스트리밍하지 않음)
+    Returns:
+        dict: 각 전문가의 조언을 포함한 최종 결과
+    """
+    # 이 세션에서 보내는 모델 호출을 스케줄러의 세션 대기열로 구분 (예산 초과로 거절되면 오류 메시지만 표시)
+    with session_scope(get_session_id()), budget_guard():
+        if fused or not stream:
+            result = creative_team.get_creative_advice(service_type, input_data, checkpoints=get_checkpoint_store(),
+                                                       progress=StageProgressView(), fused=fused)
+            save_rendered_result(service_type, render_result_cards(result), input_data, result)
+            return result
+        
+        # 스트리밍 모드: 카드 자리를 먼저 만들고 응답 조각이 도착할 때마다 갱신
+        st.markdown("### 📊 창작 파트너 팀 분석 결과")
+        stages = creative_team.stage_labels()
+        placeholders = {}
+        for key, card_class, title in result_cards(stages):
+            placeholders[key] = st.empty()
+            render_expert_card(placeholders[key], card_class, title, "분석 대기 중...")
+        
+        cards = {key: (card_class, title) for key, card_class, title in result_cards(stages)}
+        result = {key: "" for key in cards}
+        result["handoffs"] = []
+        result["stages"] = stages
+        current_stage = None
+        chunks = creative_team.get_creative_advice(service_type, input_data, stream=True,
+                                                   checkpoints=get_checkpoint_store())
+        for stage, chunk in chunks:
+            if stage == "handoff":
+                result["handoffs"].append(chunk)
+                continue
+            if stage == "preflight":
+                result["preflight"] = chunk
+                continue
+            if current_stage and stage != current_stage:
+                # 이전 단계 스트림 종료: 커서 표시 제거
+                render_expert_card(placeholders[current_stage], *cards[current_stage], result[current_stage])
+            if stage not in cards:
+                # 카드를 미리 만들지 않은 단계 (통합 모드 전환 등): 카드를 이어서 추가
+                cards[stage] = (DEFAULT_CARD_CLASS, stage)
+                placeholders[stage] = st.empty()
+            current_stage = stage
+            result.setdefault(stage, "")
+            result[stage] += chunk
+            render_expert_card(placeholders[stage], *cards[stage], result[stage] + " ▌")
+        if current_stage:
+            render_expert_card(placeholders[current_stage], *cards[current_stage], result[current_stage])
+        savings = handoff_savings_caption(result["handoffs"], stages)
+        if savings:
+            st.caption(savings)
+        preflight = preflight_caption(result.get("preflight"))
+        if preflight:
+            st.caption(preflight)
+        save_rendered_result(service_type, build_result_blocks(result), input_data, result)
+        return result
+
+
+def submit_analysis_job(api_key, service_type, input_data, fused=False, fanout=False):
+    """
+    전문가 팀 분석을 백그라운드 작업으로 등록 (진행 상황과 결과는 render_job_status에서 표시)
+    Args:
+        api_key (str): Google AI API 키 (작업자 프로세스에 메모리로만 전달)
+        service_type (str): 요청 서비스 유형
+        input_data (dict): 사용자 입력 데이터
+        fused (bool): True이면 단일 호출 통합 모드 사용
+        fanout (bool): True이면 통합 콘텐츠를 플랫폼별 병렬 분석으로 실행
+    Returns:
+        str: 작업 ID
+    """
+    job_id = get_job_pool().submit(api_key, get_session_id(), service_type, input_data,
+                                   {"fused": fused, "fanout": fanout})
+    st.info("분석 작업을 등록했습니다. 페이지를 새로고침하거나 다른 화면으로 이동해도 작업은 계속 진행됩니다.")
+    return job_id
 
-class CreativeWriter:
+
+# 작업 상태 표시 문구
+JOB_STATUS_MESSAGES = {
+    "queued": "⏳ 작업 대기 중입니다...",
+    "running": "⚙️ 전문가 팀이 분석 중입니다...",
+    "error": "분석 작업이 실패했습니다",
+    "interrupted": "분석 작업이 중단되었습니다",
+}
+
+
+def session_job_pending(service_type):
     """
-    창작 및 스토리텔링 전문가
-    매력적인 콘텐츠 개발, 스토리 구조, 시각적 요소 기획 담당
+    현재 세션에 표시할 백그라운드 작업이 있는지 (진행 중이거나 결과/오류를 아직 표시하지 않은 작업)
+    백그라운드 모드를 끈 세션도 새로고침 전에 등록한 작업은 계속 보여 주되, 없으면 작업 상태를 주기적으로 조회하지 않음
+    """
+    job = get_job_pool().store.latest(get_session_id(), service_type)
+    if job is None:
+        return False
+    return job["status"] in ACTIVE_STATUSES or job["id"] not in st.session_state.get("jobs_shown", set())
+
+
+@st.fragment(run_every=2)
+def render_job_status(api_key, service_type):
     """
+    현재 세션의 서비스 유형별 최근 백그라운드 작업 상태 (2초마다 이 영역만 다시 조회)
+    작업이 끝나면 결과를 세션 상태에 저장하고 앱을 한 번 다시 실행하여 결과 카드 영역에 표시
+    """
+    job = get_job_pool().store.latest(get_session_id(), service_type)
+    if job is None:
+        return
+    shown = st.session_state.setdefault("jobs_shown", set())
+    if job["status"] == DONE:
+        if job["id"] not in shown:
+            shown.add(job["id"])
+            save_rendered_result(service_type, build_result_blocks(job["result"]), job["input_data"], job["result"])
+            st.rerun()
+        return
     
-    def __init__(self, model):
-        self.model = model
-        self.expertise = "creative_writing"
-        self.expert_name = "이민호 콘텐츠 작가"
-        self.expert_intro = """
-        안녕하세요, 이민호 콘텐츠 작가입니다.
-        저는 매력적인 스토리텔링, 시각적/청각적 콘텐츠 기획, 창의적 표현을 전문으로 합니다.
-        8년간의 디지털 콘텐츠 제작 경험을 통해 여러분의 메시지가 청중의 마음을 사로잡을 수 있도록 지원하겠습니다.
-        """
+    if job["status"] in ACTIVE_STATUSES:
+        st.info(JOB_STATUS_MESSAGES[job["status"]])
+        # 단계별 최근 상태 (start -> done/resumed 순으로 덮어씀)
+        stages = {}
+        for stage, status, _ in job["progress"]:
+            stages[stage] = status
+        for stage, status in stages.items():
+            heading, message = stage_messages(stage)
+            label = heading.lstrip("# ")
+            if status == "start":
+                st.caption(f"⏳ {message}")
+            elif status == "resumed":
+                st.caption(f"♻️ {label} 이전 실행 결과 재사용")
+            else:
+                st.caption(f"✅ {label} 완료")
+        return
     
-    def enhance(self, previous_strategy, service_type, input_data):
-        """
-        전략가의 분석을 바탕으로 창의적 콘텐츠 개발
-        """
-        # 서비스 유형별 맞춤 프롬프트 생성
-        if service_type == "YouTube":
-            prompt = self._create_youtube_creative_prompt(input_data)
-        elif service_type == "블로그":
-            prompt = self._create_blog_creative_prompt(input_data)
-        elif service_type == "인스타그램":
-            prompt = self._create_instagram_creative_prompt(input_data)
-        elif service_type == "통합 콘텐츠":
-            prompt = self._create_integrated_creative_prompt(input_data)
-        else:
-            prompt = self._create_general_creative_prompt(input_data, service_type)
-        
-        # 전문가 정보 추가
-        prompt = f"""
-        당신은 '{self.expert_name}'이라는 창작 콘텐츠 전문가입니다.
-        {self.expert_intro}
+    if job["id"] in shown:
+        return
+    if job["status"] == INTERRUPTED:
+        st.warning(f"{JOB_STATUS_MESSAGES[job['status']]}: {job['error']}")
+    else:
+        st.error(f"{JOB_STATUS_MESSAGES[job['status']]}: {job['error']}")
+    col1, col2 = st.columns(2)
+    if col1.button("다시 실행", key=f"job_retry_{service_type}",
+                   help="같은 입력으로 다시 실행합니다 (완료된 단계는 체크포인트에서 재사용)"):
+        shown.add(job["id"])
+        get_job_pool().submit(api_key, get_session_id(), service_type, job["input_data"], job["options"])
+        st.rerun(scope="fragment")
+    if col2.button("닫기", key=f"job_dismiss_{service_type}"):
+        shown.add(job["id"])
+        st.rerun(scope="fragment")
+
+
+# 사이드바 전문가 소개 문구: 전문가 이름 -> 마크다운
+EXPERT_PROFILES = {
+    "김지원 콘텐츠 전략가": """
+    **김지원 콘텐츠 전략가**
+
+    콘텐츠 전략 전문가로 10년간 디지털 콘텐츠 기획 및 전략 분야에서 활동했습니다.
+    시장 트렌드 분석, 타겟 오디언스 정의, 콘텐츠 방향성 설정을 통해 효과적인 콘텐츠 전략을 수립합니다.
+
+    * 전문 분야: 콘텐츠 마켓 리서치, 타겟 페르소나 개발, 컨텐츠 차별화 전략
+    * 경력: 글로벌 콘텐츠 에이전시, 디지털 마케팅 컨설턴트, 콘텐츠 전략 디렉터
+    """,
+    "이민호 콘텐츠 작가": """
+    **이민호 콘텐츠 작가**
+
+    창작 및 스토리텔링 전문가로 8년간 다양한 디지털 콘텐츠 제작 분야에서 활동했습니다.
+    매력적인 스토리 구조, 시각적/청각적 요소 기획, 감정적 연결 전략을 전문으로 합니다.
+
+    * 전문 분야: 디지털 스토리텔링, 크리에이티브 콘텐츠 제작, 시청각 콘텐츠 설계
+    * 경력: 크리에이티브 디렉터, 콘텐츠 프로듀서, 디지털 스토리텔러
+    """,
+    "박서연 플랫폼 전문가": """
+    **박서연 플랫폼 전문가**
+
+    플랫폼 최적화 및 유통 전문가로 9년간 디지털 마케팅 및 콘텐츠 최적화 분야에서 활동했습니다.
+    다양한 플랫폼의 알고리즘 이해, 최적화 전략, 효과적인 콘텐츠 유통 방법을 제공합니다.
+
+    * 전문 분야: 플랫폼 알고리즘 최적화, 콘텐츠 유통 전략, 성과 분석 및 최적화
+    * 경력: 디지털 마케팅 전략가, 소셜 미디어 스페셜리스트, 콘텐츠 성과 분석가
+    """,
+}
+
+
+# 결과 카드 스타일 CSS
+APP_CSS = """
+<style>
+/* 기본 Streamlit 테마 유지를 위한 설정 */
+.main {
+    background-color: #0E1117;
+    color: #FAFAFA;
+}
+
+/* 답변 카드 스타일 */
+.expert-card {
+    border-radius: 10px;
+    padding: 20px;
+    margin-bottom: 20px;
+    color: #000000;  /* 카드 내부 글자색을 검정색으로 설정 */
+    background-color: #FFFFFF;  /* 카드 배경색을 흰색으로 설정 */
+}
+
+.strategist-card {
+    border-left: 5px solid #0077B6;
+}
+
+.creative-card {
+    border-left: 5px solid #2D6A4F;
+}
+
+.platform-card {
+    border-left: 5px solid #D4A017;
+}
+
+/* 답변 카드 내부 텍스트 스타일 */
+.expert-card p, .expert-card li, .expert-card div {
+    color: #000000 !important;
+}
+
+/* 나머지 UI 요소들은 기본 다크 테마 유지 */
+.stMarkdown:not(.expert-card), .stText:not(.expert-card) {
+    color: #FAFAFA !important;
+}
+</style>
+"""
+
+
+@st.fragment
+def render_expert_intro():
+    """
+    사이드바 전문가 소개 (선택을 바꿔도 앱 전체를 다시 실행하지 않음)
+    """
+    st.markdown("### 🧠 전문가 소개")
+    expert_tab = st.selectbox("전문가 정보 보기", list(EXPERT_PROFILES))
+    st.markdown(EXPERT_PROFILES[expert_tab])
+
+
+@st.fragment
+def render_youtube_form(api_key, stream_output, fused_mode, background_mode):
+    """
+    YouTube 입력 폼과 결과 영역 (입력을 바꾸거나 제출해도 이 영역만 다시 실행)
+    """
+    st.subheader("📹 YouTube 콘텐츠 개발")
+    
+    with st.form("youtube_form", border=False):
+        topic = st.text_area("주제/아이디어", height=100, placeholder="예: 홈트레이닝 시리즈, 기업가 인터뷰, 제품 리뷰...")
+        goals = st.text_area("목표/목적", height=100, placeholder="예: 구독자 증가, 브랜드 인지도 향상, 제품 판매...")
+        target_audience = st.text_area("타겟 시청자", height=100, placeholder="예: 20-35세 피트니스 초보자, 신생 스타트업 창업자...")
         
-        콘텐츠 전략가가 제공한 다음 분석을 검토하고, 창작 관점에서 보완해주세요:
+        col1, col2 = st.columns(2)
+        with col1:
+            channel_style = st.text_input("채널 스타일/톤", placeholder="예: 유머러스, 교육적, 전문적...")
+            channel_size = st.selectbox("채널 규모", ["신규 채널", "소규모 (1천-1만)", "중규모 (1만-10만)", "대규모 (10만+)"])
         
-        === 콘텐츠 전략가의 분석 ===
-        {previous_strategy}
-        === 분석 끝 ===
+        with col2:
+            content_format = st.selectbox("콘텐츠 형식", ["튜토리얼/하우투", "Vlog", "인터뷰", "리뷰", "엔터테인먼트", "교육", "기타"])
+            video_length = st.selectbox("예상 영상 길이", ["쇼트폼 (1분 미만)", "중간 (1-10분)", "롱폼 (10-30분)", "심층 콘텐츠 (30분+)"])
         
-        {prompt}
+        additional_info = st.text_area("추가 정보 또는 요청사항", height=100)
         
-        매력적인 스토리 구조, 시각적/청각적 요소, 감정적 연결 전략을 반드시 포함해 주세요.
-        """
+        submitted = st.form_submit_button("분석 시작")
+    
+    if not submitted:
+        render_saved_results("YouTube")
+    elif topic and goals and target_audience:
+        # 입력 데이터 구성
+        input_data = {
+            "topic": topic,
+            "goals": goals,
+            "target_audience": target_audience,
+            "channel_style": channel_style,
+            "channel_size": channel_size,
+            "content_format": content_format,
+            "video_length": video_length,
+            "additional_info": additional_info
+        }
         
-        # AI 모델을 통한 응답 생성
-        response = self.model.generate_content(prompt)
-        return response.text
+        # 결과 처리 (백그라운드 모드이면 작업만 등록)
+        if background_mode:
+            submit_analysis_job(api_key, "YouTube", input_data, fused=fused_mode)
+        else:
+            render_creative_advice(get_team_pool().get(api_key), "YouTube", input_data, stream=stream_output,
+                                   fused=fused_mode)
+    else:
+        st.warning("주제, 목표, 타겟 시청자 정보를 모두 입력해주세요.")
+        render_saved_results("YouTube")
     
-    def _create_youtube_creative_prompt(self, input_data):
-        return f"""
-        YouTube 콘텐츠를 위한 창의적 개발 계획을 제안해주세요:
-        
-        1. 영상 구성 및 스토리보드 아이디어
-           - 훅(시작 부분) 디자인
-           - 스토리 구조 및 흐름
-           - 핵심 시각적 장면 구성
-        
-        2. 스크립트 및 내레이션 가이드
-           - 스크립트 톤과 스타일
-           - 핵심 대사 및 표현
-           - 청중 참여 기법
-        
-        3. 시각/청각적 요소 계획
-           - 영상 스타일 및 편집 기법
-           - 음악 및 사운드 디자인
-           - 그래픽 및 애니메이션 요소
-        
-        4. 썸네일 및 타이틀 기획
-           - 클릭을 유도하는 썸네일 컨셉
-           - 매력적인 타이틀 구조
-           - A/B 테스트 옵션
-        
-        주제/아이디어: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 시청자: {input_data.get('target_audience', '')}
-        채널 스타일: {input_data.get('channel_style', '')}
-        """
+    render_variants_panel(api_key, "YouTube")
+
+
+@st.fragment
+def render_blog_form(api_key, stream_output, fused_mode, background_mode):
+    """
+    블로그 입력 폼과 결과 영역 (입력을 바꾸거나 제출해도 이 영역만 다시 실행)
+    """
+    st.subheader("📝 블로그 콘텐츠 개발")
     
-    def _create_blog_creative_prompt(self, input_data):
-        return f"""
-        블로그 콘텐츠를 위한 창의적 개발 계획을 제안해주세요:
-        
-        1. 글 구조 및 스토리텔링 전략
-           - 주목을 끄는 인트로 접근법
-           - 정보 흐름 및 논리 구조
-           - 결론 및 행동 유도 전략
-        
-        2. 콘텐츠 포맷 및 시각적 요소
-           - 섹션 구분 및 소제목 전략
-           - 이미지/그래픽 활용 방안
-           - 인포그래픽 및 시각 자료 아이디어
-        
-        3. 독자 참여 유도 기법
-           - 공감 형성 및 스토리텔링 기법
-           - 질문 및 상호작용 요소
-           - 공유하고 싶은 인사이트 설계
-        
-        4. 제목 및 메타 콘텐츠 기획
-           - 클릭을 유도하는 헤드라인 구조
-           - 서브헤딩 및 메타 설명
-           - 내부/외부 링크 전략
-        
-        주제/분야: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 독자: {input_data.get('target_audience', '')}
-        블로그 스타일: {input_data.get('blog_style', '')}
-        """
+    with st.form("blog_form", border=False):
+        topic = st.text_area("주제/분야", height=100, placeholder="예: 지속가능한 생활 팁, 프로그래밍 튜토리얼, 여행 가이드...")
+        goals = st.text_area("목표/목적", height=100, placeholder="예: 트래픽 증가, 이메일 구독자 확보, 제품 판매...")
+        target_audience = st.text_area("타겟 독자", height=100, placeholder="예: 30-45세 환경 의식이 높은 부모, 주니어 개발자...")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            blog_style = st.text_input("블로그 스타일/톤", placeholder="예: 정보 제공형, 스토리텔링, 오피니언...")
+            blog_platform = st.selectbox("블로그 플랫폼", ["워드프레스", "미디엄", "브런치", "티스토리", "네이버 블로그", "기타"])
+        
+        with col2:
+            content_format = st.selectbox("콘텐츠 형식", ["How-to 가이드", "리스트형", "사례 연구", "인터뷰", "심층 분석", "개인 에세이", "기타"])
+            seo_focus = st.selectbox("SEO 중요도", ["매우 중요", "중요", "보통", "낮음"])
+        
+        additional_info = st.text_area("추가 정보 또는 요청사항", height=100)
+        
+        submitted = st.form_submit_button("분석 시작")
     
-    def _create_instagram_creative_prompt(self, input_data):
-        return f"""
-        인스타그램 콘텐츠를 위한 창의적 개발 계획을 제안해주세요:
-        
-        1. 피드 포스트 창작 전략
-           - 시선을 사로잡는 비주얼 컨셉
-           - 캡션 스토리텔링 접근법
-           - 감정 연결 및 공감 요소
-        
-        2. 스토리 및 릴스 컨텐츠 아이디어
-           - 릴스 포맷 및 구성 아이디어
-           - 스토리 시퀀스 및 상호작용 요소
-           - 오디오/음악 활용 전략
-        
-        3. 비주얼 디자인 가이드
-           - 이미지 스타일 및 편집 접근법
-           - 색상 및 시각적 요소 활용
-           - 텍스트 오버레이 및 그래픽 요소
-        
-        4. 참여 촉진 콘텐츠 아이디어
-           - 질문 및 토론 유도 방식
-           - 해시태그 및 커뮤니티 참여 전략
-           - 공유 가능성 높은 콘텐츠 유형
-        
-        계정 주제/성격: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 팔로워: {input_data.get('target_audience', '')}
-        시각적 스타일: {input_data.get('visual_style', '')}
-        """
+    if not submitted:
+        render_saved_results("블로그")
+    elif topic and goals and target_audience:
+        input_data = {
+            "topic": topic,
+            "goals": goals, 
+            "target_audience": target_audience,
+            "blog_style": blog_style,
+            "blog_platform": blog_platform,
+            "content_format": content_format,
+            "seo_focus": seo_focus,
+            "additional_info": additional_info
+        }
+        
+        if background_mode:
+            submit_analysis_job(api_key, "블로그", input_data, fused=fused_mode)
+        else:
+            render_creative_advice(get_team_pool().get(api_key), "블로그", input_data, stream=stream_output,
+                                   fused=fused_mode)
+    else:
+        st.warning("주제, 목표, 타겟 독자 정보를 모두 입력해주세요.")
+        render_saved_results("블로그")
     
-    def _create_integrated_creative_prompt(self, input_data):
-        return f"""
-        통합 콘텐츠(YouTube, 블로그, 인스타그램)를 위한 창의적 개발 계획을 제안해주세요:
-        
-        1. 핵심 스토리/메시지 개발
-           - 플랫폼 전반의 일관된 스토리 라인
-           - 플랫폼별 변형 접근법
-           - 핵심 메시지 및 테마 요소
-        
-        2. 플랫폼별 창의적 변형 전략
-           - 콘텐츠 재구성 및 리퍼포징 방법
-           - 플랫폼별 강점 활용 접근법
-           - 시각적/텍스트적 변환 가이드
-        
-        3. 크로스 플랫폼 시각적 아이덴티티
-           - 일관된 비주얼 요소 및 브랜딩
-           - 플랫폼별 시각적 변형 방법
-           - 통합 디자인 에셋 아이디어
-        
-        4. 콘텐츠 시리즈 및 캠페인 구조
-           - 플랫폼 간 상호 보완적 시리즈
-           - 시간차 발행 및 연결 전략
-           - 통합 스토리텔링 접근법
-        
-        주제/브랜드: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 오디언스: {input_data.get('target_audience', '')}
-        주력 플랫폼: {input_data.get('primary_platform', '')}
-        브랜드 스타일: {input_data.get('brand_style', '')}
-        """
+    render_variants_panel(api_key, "블로그")
+
+
+@st.fragment
+def render_instagram_form(api_key, stream_output, fused_mode, background_mode):
+    """
+    인스타그램 입력 폼과 결과 영역 (입력을 바꾸거나 제출해도 이 영역만 다시 실행)
+    """
+    st.subheader("📱 인스타그램 콘텐츠 개발")
     
-    def _create_general_creative_prompt(self, input_data, service_type):
-        return f"""
-        다음 {service_type} 콘텐츠 요청에 대한 창의적 개발 계획을 제안해주세요:
+    with st.form("instagram_form", border=False):
+        topic = st.text_area("계정 주제/성격", height=100, placeholder="예: 미니멀 라이프스타일, 요가 강사, 수제 쥬얼리 브랜드...")
+        goals = st.text_area("목표/목적", height=100, placeholder="예: 팔로워 증가, 제품 판매, 인플루언서 포지셔닝...")
+        target_audience = st.text_area("타겟 팔로워", height=100, placeholder="예: 20-35세 패션 관심 여성, 건강 라이프스타일 추구자...")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            visual_style = st.text_input("시각적 스타일", placeholder="예: 밝고 화사한, 모노톤, 자연주의...")
+            account_size = st.selectbox("계정 규모", ["신규 계정", "소규모 (1천 미만)", "중규모 (1천-1만)", "대규모 (1만+)"])
+        
+        with col2:
+            content_focus = st.selectbox("콘텐츠 포커스", ["피드 포스트", "릴스", "스토리", "모두 균형있게"])
+            posting_frequency = st.selectbox("게시 빈도", ["일 1회 이상", "주 3-5회", "주 1-2회", "월 1-3회"])
+        
+        additional_info = st.text_area("추가 정보 또는 요청사항", height=100)
         
-        요청 내용: {str(input_data)}
+        submitted = st.form_submit_button("분석 시작")
+    
+    if not submitted:
+        render_saved_results("인스타그램")
+    elif topic and goals and target_audience:
+        input_data = {
+            "topic": topic,
+            "goals": goals,
+            "target_audience": target_audience,
+            "visual_style": visual_style,
+            "account_size": account_size,
+            "content_focus": content_focus,
+            "posting_frequency": posting_frequency,
+            "additional_info": additional_info
+        }
         
-        매력적인 스토리텔링 구조, 시각적/청각적 요소, 감정적 연결 전략, 참여 유도 방법을 구체적으로 제시해주세요.
-        """
+        if background_mode:
+            submit_analysis_job(api_key, "인스타그램", input_data, fused=fused_mode)
+        else:
+            render_creative_advice(get_team_pool().get(api_key), "인스타그램", input_data, stream=stream_output,
+                                   fused=fused_mode)
+    else:
+        st.warning("주제, 목표, 타겟 팔로워 정보를 모두 입력해주세요.")
+        render_saved_results("인스타그램")
+    
+    render_variants_panel(api_key, "인스타그램")
 
 
-class PlatformSpecialist:
+@st.fragment
+def render_integrated_form(api_key, stream_output, fused_mode, background_mode):
     """
-    플랫폼 최적화 및 유통 전문가
-    플랫폼별 최적화, 성과 측정, 배포 전략 담당
+    통합 콘텐츠 입력 폼과 결과 영역 (입력을 바꾸거나 제출해도 이 영역만 다시 실행)
     """
+    st.subheader("🔄 통합 콘텐츠 전략 개발")
     
-    def __init__(self, model):
-        self.model = model
-        self.expertise = "platform_optimization"
-        self.expert_name = "박서연 플랫폼 전문가"
-        self.expert_intro = """
-        안녕하세요, 박서연 플랫폼 전문가입니다.
-        저는 다양한 디지털 플랫폼의 최적화, 알고리즘 이해, 콘텐츠 배포 전략을 전문으로 합니다.
-        9년간의 디지털 마케팅 및 콘텐츠 최적화 경험을 통해 여러분의 콘텐츠가 목표 청중에게 효과적으로 도달할 수 있도록 지원하겠습니다.
-        """
-    
-    def finalize(self, previous_content, service_type, input_data):
-        """
-        전략가와 창작가의 분석을 바탕으로 최종 플랫폼 최적화 및 유통 전략 제공
-        """
-        # 서비스 유형별 맞춤 프롬프트 생성
-        if service_type == "YouTube":
-            prompt = self._create_youtube_platform_prompt(input_data)
-        elif service_type == "블로그":
-            prompt = self._create_blog_platform_prompt(input_data)
-        elif service_type == "인스타그램":
-            prompt = self._create_instagram_platform_prompt(input_data)
-        elif service_type == "통합 콘텐츠":
-            prompt = self._create_integrated_platform_prompt(input_data)
-        else:
-            prompt = self._create_general_platform_prompt(input_data, service_type)
-        
-        # 전문가 정보 추가
-        prompt = f"""
-        당신은 '{self.expert_name}'이라는 플랫폼 최적화 전문가입니다.
-        {self.expert_intro}
-        
-        콘텐츠 전략가와 창작 작가가 제공한, 다음 분석을 검토하고 최종적으로 완성해주세요:
+    with st.form("integrated_form", border=False):
+        topic = st.text_area("주제/브랜드", height=100, placeholder="예: 건강식품 브랜드, 디지털 마케팅 전문가, 여행 블로거...")
+        goals = st.text_area("목표/목적", height=100, placeholder="예: 브랜드 인지도 향상, 리드 생성, 온라인 커뮤니티 구축...")
+        target_audience = st.text_area("타겟 오디언스", height=100, placeholder="예: 25-40세 건강 의식이 높은 전문직, 소규모 비즈니스 오너...")
         
-        === 이전 전문가들의 분석 ===
-        {previous_content}
-        === 분석 끝 ===
+        col1, col2 = st.columns(2)
+        with col1:
+            primary_platform = st.selectbox("주력 플랫폼", ["YouTube", "블로그", "인스타그램", "모두 동일 비중"])
+            brand_style = st.text_input("브랜드 스타일/톤", placeholder="예: 전문적/교육적, 친근한/대화체, 영감을 주는...")
         
-        {prompt}
+        with col2:
+            current_status = st.selectbox("현재 채널 상태", ["신규 시작", "초기 단계", "성장 중", "안정된 팔로워십"])
+            content_volume = st.selectbox("콘텐츠 생산 역량", ["주 1회 미만", "주 1-2회", "주 3-5회", "주 5회 이상"])
         
-        최종 조언에는 다음 세 전문가의 관점이 균형있게 통합되어야 합니다:
-        1. 콘텐츠 전략가 (전략 및 방향성)
-        2. 창작 작가 (스토리텔링 및 창의적 요소)
-        3. 플랫폼 전문가 (최적화 및 유통 전략)
+        additional_info = st.text_area("추가 정보 또는 요청사항", height=100)
         
-        구체적이고 실행 가능한 단계별 콘텐츠 제작 및 배포 가이드를 제공해주세요.
-        """
+        fanout = st.checkbox("플랫폼별 병렬 분석 (빠른 모드)",
+                             help="YouTube, 블로그, 인스타그램 분석을 동시에 진행한 뒤 크로스 플랫폼 시너지를 한 번에 통합합니다")
         
-        # AI 모델을 통한 응답 생성
-        response = self.model.generate_content(prompt)
-        return response.text
+        submitted = st.form_submit_button("분석 시작")
     
-    def _create_youtube_platform_prompt(self, input_data):
-        return f"""
-        YouTube 콘텐츠를 위한 플랫폼 최적화 및 유통 전략을 제안해주세요:
-        
-        1. YouTube 알고리즘 최적화 전략
-           - 타이틀, 설명, 태그 최적화
-           - 시청 지속성 및 참여율 향상 방법
-           - 추천 알고리즘 활용 전략
-        
-        2. 발행 및 프로모션 계획
-           - 최적 업로드 타이밍 및 주기
-           - 초기 참여 유도 전략
-           - 크로스 프로모션 방법
-        
-        3. 데이터 기반 개선 방법론
-           - 핵심 성과 지표(KPI) 설정
-           - 분석 모니터링 및 인사이트 발굴
-           - A/B 테스트 접근법
-        
-        4. 커뮤니티 구축 및 확장 전략
-           - 댓글 관리 및 시청자 참여 전략
-           - 구독자 확보 및 유지 방법
-           - 콘텐츠 생태계 확장 방안
-        
-        주제/아이디어: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 시청자: {input_data.get('target_audience', '')}
-        채널 규모: {input_data.get('channel_size', '신규/소규모')}
-        """
-    
-    def _create_blog_platform_prompt(self, input_data):
-        return f"""
-        블로그 콘텐츠를 위한 플랫폼 최적화 및 유통 전략을 제안해주세요:
-        
-        1. SEO 최적화 전략
-           - 키워드 리서치 및 활용 방법
-           - 온페이지 SEO 요소 최적화
-           - 내/외부 링크 전략
-        
-        2. 콘텐츠 발행 및 유통 계획
-           - 최적 발행 타이밍 및 주기
-           - 소셜 미디어 공유 전략
-           - 이메일 마케팅 및 뉴스레터 활용
-        
-        3. 데이터 분석 및 성과 최적화
-           - 트래픽 및 참여 지표 모니터링
-           - 전환율 최적화 방법
-           - 콘텐츠 업데이트 및 리퍼포징 전략
-        
-        4. 독자 커뮤니티 구축 방안
-           - 댓글 관리 및 독자 참여 전략
-           - 충성 독자층 개발 방법
-           - 협업 및 게스트 포스팅 활용
-        
-        주제/분야: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 독자: {input_data.get('target_audience', '')}
-        블로그 플랫폼: {input_data.get('blog_platform', '')}
-        """
-    
-    def _create_instagram_platform_prompt(self, input_data):
-        return f"""
-        인스타그램 콘텐츠를 위한 플랫폼 최적화 및 유통 전략을 제안해주세요:
-        
-        1. 인스타그램 알고리즘 최적화
-           - 해시태그 전략 및 최적화
-           - 캡션 및 호출 행동(CTA) 최적화
-           - 탐색 페이지 노출 향상 방법
-        
-        2. 게시 및 참여 전략
-           - 최적 포스팅 타이밍 및 빈도
-           - 스토리, 릴스, 피드 통합 전략
-           - 참여율 증대 전술
-        
-        3. 성장 및 영향력 확대 방법
-           - 팔로워 확보 및 유지 전략
-           - 협업 및 인플루언서 활용
-           - 크로스 프로모션 기회
-        
-        4. 분석 및 최적화 프레임워크
-           - 주요 성과 지표 모니터링
-           - 인사이트 기반 콘텐츠 조정
-           - 지속적 실험 및 최적화 접근법
-        
-        계정 주제/성격: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 팔로워: {input_data.get('target_audience', '')}
-        계정 규모: {input_data.get('account_size', '신규/소규모')}
-        """
-    
-    def _create_integrated_platform_prompt(self, input_data):
-        return f"""
-        통합 콘텐츠(YouTube, 블로그, 인스타그램)를 위한 플랫폼 최적화 및 유통 전략을 제안해주세요:
-        
-        1. 통합 콘텐츠 발행 전략
-           - 플랫폼별 최적 발행 순서 및 타이밍
-           - 크로스 플랫폼 프로모션 흐름
-           - 콘텐츠 형식별 배포 계획
-        
-        2. 플랫폼 간 시너지 최대화
-           - 트래픽 및 청중 이동 경로 최적화
-           - 플랫폼별 강점 극대화 방법
-           - 참여 및 전환 경로 설계
-        
-        3. 통합 데이터 분석 체계
-           - 크로스 플랫폼 성과 측정 방법
-           - 통합 KPI 설정 및 모니터링
-           - 데이터 기반 리소스 배분 전략
-        
-        4. 장기 성장 및 확장 로드맵
-           - 단계별 성장 목표 및 전략
-           - 콘텐츠 에코시스템 확장 방법
-           - 채널 간 상호 강화 메커니즘
-        
-        주제/브랜드: {input_data.get('topic', '')}
-        목표/목적: {input_data.get('goals', '')}
-        타겟 오디언스: {input_data.get('target_audience', '')}
-        주력 플랫폼: {input_data.get('primary_platform', '')}
-        현재 채널 상태: {input_data.get('current_status', '신규/소규모')}
-        """
-    
-    def _create_general_platform_prompt(self, input_data, service_type):
-        return f"""
-        다음 {service_type} 콘텐츠 요청에 대한 플랫폼 최적화 및 유통 전략을 제안해주세요:
-        
-        요청 내용: {str(input_data)}
+    if not submitted:
+        render_saved_results("통합 콘텐츠")
+    elif topic and goals and target_audience:
+        input_data = {
+            "topic": topic,
+            "goals": goals,
+            "target_audience": target_audience,
+            "primary_platform": primary_platform,
+            "brand_style": brand_style,
+            "current_status": current_status,
+            "content_volume": content_volume,
+            "additional_info": additional_info
+        }
         
-        플랫폼 최적화, 발행 및 유통 전략, 성과 측정 방법, 커뮤니티 구축 접근법을 구체적으로 제시해주세요.
-        """
-
+        if background_mode:
+            submit_analysis_job(api_key, "통합 콘텐츠", input_data, fused=fused_mode, fanout=fanout)
+        elif fanout:
+            creative_team = get_team_pool().get(api_key)
+            with budget_guard():
+                with st.spinner("세 플랫폼 전문가 팀이 동시에 분석 중입니다..."), session_scope(get_session_id()):
+                    result = creative_team.get_integrated_advice_fanout(input_data, checkpoints=get_checkpoint_store())
+                save_rendered_result("통합 콘텐츠", render_result_cards(result), input_data, result)
+        else:
+            render_creative_advice(get_team_pool().get(api_key), "통합 콘텐츠", input_data,
+                                   stream=stream_output, fused=fused_mode)
+    else:
+        st.warning("주제, 목표, 타겟 오디언스 정보를 모두 입력해주세요.")
+        render_saved_results("통합 콘텐츠")
+    
+    render_variants_panel(api_key, "통합 콘텐츠")
 
-# ============================================================================
-# Streamlit 웹 애플리케이션 구현
-# ============================================================================
 
 def main():
     """
@@ -636,6 +935,11 @@ def main():
         # API 키 입력 필드 (비밀번호 형식)
         api_key = st.text_input("Google API 키를 입력하세요", type="password")
         
+        # 카세트 재생 모드에서는 API를 호출하지 않으므로 키 없이 실행
+        cassette = active_cassette()
+        if not api_key and cassette is not None and cassette.mode == "replay":
+            api_key = "cassette-replay"
+        
         # API 키가 입력되지 않은 경우 경고 메시지 표시
         if not api_key:
             st.warning("API 키를 입력해주세요.")
@@ -643,45 +947,77 @@ def main():
             
         st.markdown("---")
         
-        # 전문가 소개
-        st.markdown("### 🧠 전문가 소개")
+        # 전문가 소개 (선택을 바꿔도 이 영역만 다시 실행)
+        render_expert_intro()
         
-        expert_tab = st.selectbox("전문가 정보 보기", 
-                                ["김지원 콘텐츠 전략가", "이민호 콘텐츠 작가", "박서연 플랫폼 전문가"])
+        st.markdown("---")
         
-        if expert_tab == "김지원 콘텐츠 전략가":
-            st.markdown("""
-            **김지원 콘텐츠 전략가**
-            
-            콘텐츠 전략 전문가로 10년간 디지털 콘텐츠 기획 및 전략 분야에서 활동했습니다.
-            시장 트렌드 분석, 타겟 오디언스 정의, 콘텐츠 방향성 설정을 통해 효과적인 콘텐츠 전략을 수립합니다.
-            
-            * 전문 분야: 콘텐츠 마켓 리서치, 타겟 페르소나 개발, 컨텐츠 차별화 전략
-            * 경력: 글로벌 콘텐츠 에이전시, 디지털 마케팅 컨설턴트, 콘텐츠 전략 디렉터
-            """)
+        # 출력 방식 설정
+        st.markdown("### ⚙️ 출력 설정")
+        stream_output = st.toggle("실시간 스트리밍 출력", value=True,
+                                  help="각 전문가의 답변을 생성되는 즉시 카드에 표시합니다")
+        fused_mode = st.toggle("단일 호출 통합 모드", value=False,
+                               help="세 전문가의 분석을 JSON 응답 한 번으로 받아 호출 수와 입력 토큰을 줄입니다 "
+                                    "(스트리밍 없음, 응답이 올바르지 않으면 단계별 분석으로 다시 실행)")
+        background_mode = st.toggle("백그라운드 작업으로 실행", value=False,
+                                    help="분석을 작업자 프로세스에서 실행합니다. 새로고침하거나 연결이 끊겨도 작업이 계속되며 "
+                                         "단계별 진행 상황만 표시합니다 (스트리밍 없음)")
+        
+        # 응답 캐시 현황
+        cache_stats = get_response_cache().stats()
+        st.caption(f"응답 캐시: 적중 {cache_stats['hits']}회 / 미적중 {cache_stats['misses']}회 "
+                   f"(적중률 {cache_stats['hit_rate']:.0%})")
+        
+        # 녹화/재생 카세트 현황
+        if cassette is not None:
+            cassette_stats = cassette.stats()
+            if cassette.mode == "record":
+                st.caption(f"카세트 녹화 중: {cassette_stats['recorded']}건 기록 ({cassette.path})")
+            else:
+                speed = f"속도 x{cassette.speed:g}" if cassette.speed else "대기 없음"
+                st.caption(f"카세트 재생 중 ({speed}): 재생 {cassette_stats['replayed']}회, "
+                           f"기록 없음 {cassette_stats['misses']}회 / 기록 {cassette_stats['interactions']}건")
+        
+        # 요청 스케줄러 현황 (같은 API 키를 쓰는 모든 세션 공유)
+        scheduler_stats = get_team_pool().get(api_key).scheduler.stats()
+        st.caption(f"요청 스케줄러: 실행 중 {scheduler_stats['active']}건 / 대기 {scheduler_stats['waiting']}건 "
+                   f"(동시 실행 한도 {scheduler_stats['concurrency_limit']}, 쿼터 초과 {scheduler_stats['rate_limited']}회)")
+        
+        # 백그라운드 작업 대기열 현황 (서버 프로세스 전체, 백그라운드 모드에서만 표시)
+        if background_mode:
+            job_stats = get_job_pool().stats()
+            st.caption(f"작업 대기열: 작업자 {job_stats['workers']}개, 대기 {job_stats['queued']}건 / "
+                       f"실행 중 {job_stats['running']}건 (완료 {job_stats['done']}건, 실패 {job_stats['error']}건)")
+        
+        # 동일 요청 합치기 현황
+        flight_stats = get_single_flight().stats()
+        st.caption(f"동일 요청 합치기: 절약한 호출 {flight_stats['coalesced']}회 "
+                   f"(실제 전송 {flight_stats['leaders']}회, 진행 중 {flight_stats['in_flight']}건)")
+        
+        # 모델 라우팅 현황
+        router_stats = get_team_pool().get(api_key).router.stats()
+        st.caption(f"모델 라우팅: 주 모델 {router_stats['primary']}회 / 보조 모델 {router_stats['fallback']}회")
+        
+        # 프롬프트 접두부 캐시 현황
+        prefix_cache = get_team_pool().get(api_key).prefix_cache
+        if prefix_cache is not None:
+            prefix_stats = prefix_cache.stats()
+            # 제공자 캐시: 업로드 대상이 아닌 단계의 호출 수, 최소 크기보다 작아 전체 프롬프트로 보내는 접두부 수
+            local = prefix_stats.get("local")
+            small = prefix_stats.get("small_prefixes")
+            st.caption(f"접두부 캐시: 핸들 {prefix_stats['handles']}개, 캐시 참조 {prefix_stats['hits']}회 "
+                       f"(약 {prefix_stats['cached_tokens']:,} 토큰 재사용, 전체 전송 {prefix_stats['inline']}회)"
+                       + (f" · 캐시 대상이 아닌 단계 {local}회" if local else "")
+                       + (f" · 최소 크기 미만 접두부 {small}개" if small else ""))
+        
+        # 토큰 예산 사용량 (이 세션 / 전체)
+        render_token_usage(get_token_budget())
+        
+        render_metrics_panel(get_metrics())
         
-        elif expert_tab == "이민호 콘텐츠 작가":
-            st.markdown("""
-            **이민호 콘텐츠 작가**
-            
-            창작 및 스토리텔링 전문가로 8년간 다양한 디지털 콘텐츠 제작 분야에서 활동했습니다.
-            매력적인 스토리 구조, 시각적/청각적 요소 기획, 감정적 연결 전략을 전문으로 합니다.
-            
-            * 전문 분야: 디지털 스토리텔링, 크리에이티브 콘텐츠 제작, 시청각 콘텐츠 설계
-            * 경력: 크리에이티브 디렉터, 콘텐츠 프로듀서, 디지털 스토리텔러
-            """)
+        st.markdown("---")
+        render_history_sidebar(get_history_store())
         
-        elif expert_tab == "박서연 플랫폼 전문가":
-            st.markdown("""
-            **박서연 플랫폼 전문가**
-            
-            플랫폼 최적화 및 유통 전문가로 9년간 디지털 마케팅 및 콘텐츠 최적화 분야에서 활동했습니다.
-            다양한 플랫폼의 알고리즘 이해, 최적화 전략, 효과적인 콘텐츠 유통 방법을 제공합니다.
-            
-            * 전문 분야: 플랫폼 알고리즘 최적화, 콘텐츠 유통 전략, 성과 분석 및 최적화
-            * 경력: 디지털 마케팅 전략가, 소셜 미디어 스페셜리스트, 콘텐츠 성과 분석가
-            """)
-            
         st.markdown("---")
         # 사용 방법 안내
         st.markdown("### ℹ️ 사용 방법")
@@ -699,47 +1035,11 @@ def main():
         ["YouTube", "블로그", "인스타그램", "통합 콘텐츠"]
     )
     
-    # 카드 스타일 CSS 수정
-    st.markdown("""
-    <style>
-    /* 기본 Streamlit 테마 유지를 위한 설정 */
-    .main {
-        background-color: #0E1117;
-        color: #FAFAFA;
-    }
-
-    /* 답변 카드 스타일 */
-    .expert-card {
-        border-radius: 10px;
-        padding: 20px;
-        margin-bottom: 20px;
-        color: #000000;  /* 카드 내부 글자색을 검정색으로 설정 */
-        background-color: #FFFFFF;  /* 카드 배경색을 흰색으로 설정 */
-    }
-
-    .strategist-card {
-        border-left: 5px solid #0077B6;
-    }
-
-    .creative-card {
-        border-left: 5px solid #2D6A4F;
-    }
-
-    .platform-card {
-        border-left: 5px solid #D4A017;
-    }
-
-    /* 답변 카드 내부 텍스트 스타일 */
-    .expert-card p, .expert-card li, .expert-card div {
-        color: #000000 !important;
-    }
-
-    /* 나머지 UI 요소들은 기본 다크 테마 유지 */
-    .stMarkdown:not(.expert-card), .stText:not(.expert-card) {
-        color: #FAFAFA !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # 카드 스타일 CSS
+    st.markdown(APP_CSS, unsafe_allow_html=True)
+    
+    # 사이드바에서 연 이전 실행 결과
+    render_history_record(get_history_store())
     
     # 워크플로우 설명
     with st.expander("에이전틱 워크플로우 프로세스 보기"):
@@ -754,176 +1054,19 @@ def main():
         6. **통합 가이드**: 세 전문가의 관점을 통합한 최종 맞춤형 콘텐츠 가이드 제공
         """)
     
-    # 선택된 서비스에 따른 UI 표시
+    # 선택된 서비스에 따른 UI 표시 (폼마다 독립적으로 다시 실행되는 프래그먼트)
     if service == "YouTube":
-        st.subheader("📹 YouTube 콘텐츠 개발")
-        
-        topic = st.text_area("주제/아이디어", height=100, placeholder="예: 홈트레이닝 시리즈, 기업가 인터뷰, 제품 리뷰...")
-        goals = st.text_area("목표/목적", height=100, placeholder="예: 구독자 증가, 브랜드 인지도 향상, 제품 판매...")
-        target_audience = st.text_area("타겟 시청자", height=100, placeholder="예: 20-35세 피트니스 초보자, 신생 스타트업 창업자...")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            channel_style = st.text_input("채널 스타일/톤", placeholder="예: 유머러스, 교육적, 전문적...")
-            channel_size = st.selectbox("채널 규모", ["신규 채널", "소규모 (1천-1만)", "중규모 (1만-10만)", "대규모 (10만+)"])
-        
-        with col2:
-            content_format = st.selectbox("콘텐츠 형식", ["튜토리얼/하우투", "Vlog", "인터뷰", "리뷰", "엔터테인먼트", "교육", "기타"])
-            video_length = st.selectbox("예상 영상 길이", ["쇼트폼 (1분 미만)", "중간 (1-10분)", "롱폼 (10-30분)", "심층 콘텐츠 (30분+)"])
-        
-        additional_info = st.text_area("추가 정보 또는 요청사항", height=100)
-        
-        # 분석 시작 버튼
-        if st.button("분석 시작"):
-            if topic and goals and target_audience:
-                # 전문가 팀 초기화
-                creative_team = CreativeTeam(api_key)
-                
-                # 입력 데이터 구성
-                input_data = {
-                    "topic": topic,
-                    "goals": goals,
-                    "target_audience": target_audience,
-                    "channel_style": channel_style,
-                    "channel_size": channel_size,
-                    "content_format": content_format,
-                    "video_length": video_length,
-                    "additional_info": additional_info
-                }
-                
-                # 결과 처리
-                result = creative_team.get_creative_advice("YouTube", input_data)
-                
-                # 결과 표시
-                st.markdown("### 📊 창작 파트너 팀 분석 결과")
-                st.markdown(f"""<div class="expert-card strategist-card"><b>김지원 콘텐츠 전략가</b><br><br>{result['strategy']}</div>""", unsafe_allow_html=True)
-                st.markdown(f"""<div class="expert-card creative-card"><b>이민호 콘텐츠 작가</b><br><br>{result['content']}</div>""", unsafe_allow_html=True)
-                st.markdown(f"""<div class="expert-card platform-card"><b>박서연 플랫폼 전문가 (최종 통합 조언)</b><br><br>{result['platform']}</div>""", unsafe_allow_html=True)
-            else:
-                st.warning("주제, 목표, 타겟 시청자 정보를 모두 입력해주세요.")
-                
+        render_youtube_form(api_key, stream_output, fused_mode, background_mode)
     elif service == "블로그":
-        st.subheader("📝 블로그 콘텐츠 개발")
-        
-        topic = st.text_area("주제/분야", height=100, placeholder="예: 지속가능한 생활 팁, 프로그래밍 튜토리얼, 여행 가이드...")
-        goals = st.text_area("목표/목적", height=100, placeholder="예: 트래픽 증가, 이메일 구독자 확보, 제품 판매...")
-        target_audience = st.text_area("타겟 독자", height=100, placeholder="예: 30-45세 환경 의식이 높은 부모, 주니어 개발자...")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            blog_style = st.text_input("블로그 스타일/톤", placeholder="예: 정보 제공형, 스토리텔링, 오피니언...")
-            blog_platform = st.selectbox("블로그 플랫폼", ["워드프레스", "미디엄", "브런치", "티스토리", "네이버 블로그", "기타"])
-        
-        with col2:
-            content_format = st.selectbox("콘텐츠 형식", ["How-to 가이드", "리스트형", "사례 연구", "인터뷰", "심층 분석", "개인 에세이", "기타"])
-            seo_focus = st.selectbox("SEO 중요도", ["매우 중요", "중요", "보통", "낮음"])
-        
-        additional_info = st.text_area("추가 정보 또는 요청사항", height=100)
-        
-        if st.button("분석 시작"):
-            if topic and goals and target_audience:
-                creative_team = CreativeTeam(api_key)
-                input_data = {
-                    "topic": topic,
-                    "goals": goals, 
-                    "target_audience": target_audience,
-                    "blog_style": blog_style,
-                    "blog_platform": blog_platform,
-                    "content_format": content_format,
-                    "seo_focus": seo_focus,
-                    "additional_info": additional_info
-                }
-                
-                result = creative_team.get_creative_advice("블로그", input_data)
-                
-                st.markdown("### 📊 창작 파트너 팀 분석 결과")
-                st.markdown(f"""<div class="expert-card strategist-card"><b>김지원 콘텐츠 전략가</b><br><br>{result['strategy']}</div>""", unsafe_allow_html=True)
-                st.markdown(f"""<div class="expert-card creative-card"><b>이민호 콘텐츠 작가</b><br><br>{result['content']}</div>""", unsafe_allow_html=True)
-                st.markdown(f"""<div class="expert-card platform-card"><b>박서연 플랫폼 전문가 (최종 통합 조언)</b><br><br>{result['platform']}</div>""", unsafe_allow_html=True)
-            else:
-                st.warning("주제, 목표, 타겟 독자 정보를 모두 입력해주세요.")
-    
+        render_blog_form(api_key, stream_output, fused_mode, background_mode)
     elif service == "인스타그램":
-        st.subheader("📱 인스타그램 콘텐츠 개발")
-        
-        topic = st.text_area("계정 주제/성격", height=100, placeholder="예: 미니멀 라이프스타일, 요가 강사, 수제 쥬얼리 브랜드...")
-        goals = st.text_area("목표/목적", height=100, placeholder="예: 팔로워 증가, 제품 판매, 인플루언서 포지셔닝...")
-        target_audience = st.text_area("타겟 팔로워", height=100, placeholder="예: 20-35세 패션 관심 여성, 건강 라이프스타일 추구자...")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            visual_style = st.text_input("시각적 스타일", placeholder="예: 밝고 화사한, 모노톤, 자연주의...")
-            account_size = st.selectbox("계정 규모", ["신규 계정", "소규모 (1천 미만)", "중규모 (1천-1만)", "대규모 (1만+)"])
-        
-        with col2:
-            content_focus = st.selectbox("콘텐츠 포커스", ["피드 포스트", "릴스", "스토리", "모두 균형있게"])
-            posting_frequency = st.selectbox("게시 빈도", ["일 1회 이상", "주 3-5회", "주 1-2회", "월 1-3회"])
-        
-        additional_info = st.text_area("추가 정보 또는 요청사항", height=100)
-        
-        if st.button("분석 시작"):
-            if topic and goals and target_audience:
-                creative_team = CreativeTeam(api_key)
-                input_data = {
-                    "topic": topic,
-                    "goals": goals,
-                    "target_audience": target_audience,
-                    "visual_style": visual_style,
-                    "account_size": account_size,
-                    "content_focus": content_focus,
-                    "posting_frequency": posting_frequency,
-                    "additional_info": additional_info
-                }
-                
-                result = creative_team.get_creative_advice("인스타그램", input_data)
-                
-                st.markdown("### 📊 창작 파트너 팀 분석 결과")
-                st.markdown(f"""<div class="expert-card strategist-card"><b>김지원 콘텐츠 전략가</b><br><br>{result['strategy']}</div>""", unsafe_allow_html=True)
-                st.markdown(f"""<div class="expert-card creative-card"><b>이민호 콘텐츠 작가</b><br><br>{result['content']}</div>""", unsafe_allow_html=True)
-                st.markdown(f"""<div class="expert-card platform-card"><b>박서연 플랫폼 전문가 (최종 통합 조언)</b><br><br>{result['platform']}</div>""", unsafe_allow_html=True)
-            else:
-                st.warning("주제, 목표, 타겟 팔로워 정보를 모두 입력해주세요.")
-    
+        render_instagram_form(api_key, stream_output, fused_mode, background_mode)
     elif service == "통합 콘텐츠":
-        st.subheader("🔄 통합 콘텐츠 전략 개발")
-        
-        topic = st.text_area("주제/브랜드", height=100, placeholder="예: 건강식품 브랜드, 디지털 마케팅 전문가, 여행 블로거...")
-        goals = st.text_area("목표/목적", height=100, placeholder="예: 브랜드 인지도 향상, 리드 생성, 온라인 커뮤니티 구축...")
-        target_audience = st.text_area("타겟 오디언스", height=100, placeholder="예: 25-40세 건강 의식이 높은 전문직, 소규모 비즈니스 오너...")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            primary_platform = st.selectbox("주력 플랫폼", ["YouTube", "블로그", "인스타그램", "모두 동일 비중"])
-            brand_style = st.text_input("브랜드 스타일/톤", placeholder="예: 전문적/교육적, 친근한/대화체, 영감을 주는...")
-        
-        with col2:
-            current_status = st.selectbox("현재 채널 상태", ["신규 시작", "초기 단계", "성장 중", "안정된 팔로워십"])
-            content_volume = st.selectbox("콘텐츠 생산 역량", ["주 1회 미만", "주 1-2회", "주 3-5회", "주 5회 이상"])
-        
-        additional_info = st.text_area("추가 정보 또는 요청사항", height=100)
-        
-        if st.button("분석 시작"):
-            if topic and goals and target_audience:
-                creative_team = CreativeTeam(api_key)
-                input_data = {
-                    "topic": topic,
-                    "goals": goals,
-                    "target_audience": target_audience,
-                    "primary_platform": primary_platform,
-                    "brand_style": brand_style,
-                    "current_status": current_status,
-                    "content_volume": content_volume,
-                    "additional_info": additional_info
-                }
-                
-                result = creative_team.get_creative_advice("통합 콘텐츠", input_data)
-                
-                st.markdown("### 📊 창작 파트너 팀 분석 결과")
-                st.markdown(f"""<div class="expert-card strategist-card"><b>김지원 콘텐츠 전략가</b><br><br>{result['strategy']}</div>""", unsafe_allow_html=True)
-                st.markdown(f"""<div class="expert-card creative-card"><b>이민호 콘텐츠 작가</b><br><br>{result['content']}</div>""", unsafe_allow_html=True)
-                st.markdown(f"""<div class="expert-card platform-card"><b>박서연 플랫폼 전문가 (최종 통합 조언)</b><br><br>{result['platform']}</div>""", unsafe_allow_html=True)
-            else:
-                st.warning("주제, 목표, 타겟 오디언스 정보를 모두 입력해주세요.")
+        render_integrated_form(api_key, stream_output, fused_mode, background_mode)
+    
+    # 이 세션의 백그라운드 작업 진행 상황 (새로고침 후에도 같은 세션 ID로 조회)
+    if background_mode or session_job_pending(service):
+        render_job_status(api_key, service)
 
 # 스크립트가 직접 실행될 때만 main() 함수 실행
 if __name__ == "__main__":
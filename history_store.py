@@ -0,0 +1,227 @@
+# ============================================================================
+# 워크플로우 실행 기록 저장소
+# 실행마다 입력, 단계별 결과, 단계별 소요 시간을 SQLite에 저장하여
+# 앱을 다시 열거나 새로고침한 뒤에도 이전 결과를 다시 생성하지 않고 바로 열 수 있음
+#   - 서비스 유형, 생성 시각, 입력 해시에 인덱스
+#   - 목록은 결과 본문 없이 요약만 페이지 단위로 조회하고, 본문은 항목을 열 때 조회
+#   - 기록마다 소유자(실행한 브라우저 세션 ID)를 저장하고, 조회는 항상 소유자 기록으로만 제한
+#   - 결과는 단계 구성과 상관없이 결과 딕셔너리 전체를 JSON으로 저장 (단계 그래프에 단계를 추가해도 그대로 저장)
+# ============================================================================
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from checkpoint_store import make_input_hash
+from rate_limiter import current_session
+
+# 기본 기록 저장소 경로 (환경 변수로 변경 가능)
+DEFAULT_HISTORY_PATH = os.environ.get(
+    "CREATOR_PARTNER_HISTORY_PATH",
+    os.path.join(os.path.expanduser("~"), ".creator_partner", "history.sqlite3")
+)
+
+# 목록 요약에 표시할 주제 길이 (문자)
+TOPIC_PREVIEW_CHARS = 40
+
+# 결과 JSON 열이 생기기 전의 저장소에 있던 단계별 결과 열
+LEGACY_RESULT_COLUMNS = ("strategy", "content", "platform")
+
+
+def _total_seconds(workflow_log):
+    # 이번 실행에서 모델을 호출한 단계의 소요 시간 합계 (체크포인트에서 재사용한 단계는 0)
+    return sum((step.get("metrics") or {}).get("wall_seconds") or 0.0 for step in workflow_log["steps"])
+
+
+class HistoryStore:
+    """
+    SQLite 워크플로우 실행 기록 저장소
+    여러 Streamlit 세션(스레드)이 하나의 인스턴스를 공유할 수 있도록 잠금으로 보호
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        """
+        기록 저장소 초기화
+        Args:
+            path (str): SQLite 파일 경로 (None이면 프로세스 메모리에만 저장)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT,
+                owner TEXT,
+                service_type TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                input_hash TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                input_data TEXT NOT NULL,
+                result TEXT NOT NULL,
+                fused INTEGER NOT NULL,
+                total_seconds REAL NOT NULL,
+                workflow_log TEXT NOT NULL
+            )
+        """)
+        # 소유자 열이 없던 이전 저장소: 열만 추가 (기존 기록은 소유자가 없어 어느 세션에도 표시되지 않음)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        if "owner" not in columns:
+            self._conn.execute("ALTER TABLE runs ADD COLUMN owner TEXT")
+        # 단계별 결과 열만 있던 이전 저장소: 결과 JSON 열을 추가하고 기존 기록을 옮김 (이전 열은 빈 값으로 계속 채움)
+        self._legacy_columns = all(column in columns for column in LEGACY_RESULT_COLUMNS)
+        if "result" not in columns:
+            self._conn.execute("ALTER TABLE runs ADD COLUMN result TEXT")
+            rows = self._conn.execute("SELECT id, strategy, content, platform, fused FROM runs").fetchall()
+            self._conn.executemany("UPDATE runs SET result = ? WHERE id = ?", [
+                (json.dumps({"strategy": row[1], "content": row[2], "platform": row[3], "handoffs": [],
+                             "fused": bool(row[4])}, ensure_ascii=False), row[0])
+                for row in rows
+            ])
+        self._conn.execute("DROP INDEX IF EXISTS idx_runs_service_type")
+        self._conn.execute("DROP INDEX IF EXISTS idx_runs_created_at")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_owner_service_type "
+                           "ON runs (owner, service_type, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_owner_created_at ON runs (owner, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_input_hash ON runs (input_hash)")
+        self._conn.commit()
+
+    def save(self, workflow_log, input_data, result, owner=None):
+        """
+        완료된 실행 기록 저장
+        Args:
+            workflow_log (dict): 워크플로우 로그 (서비스 유형, 단계별 지표)
+            input_data (dict): 사용자 입력 데이터
+            result (dict): 단계 이름 -> 결과와 압축 보고서 등을 포함한 결과 (그대로 JSON으로 저장)
+            owner (str): 기록 소유자 (기본값: 현재 세션 ID)
+        Returns:
+            int: 저장된 기록 ID
+        """
+        service_type = workflow_log["service_type"]
+        values = {
+            "run_id": workflow_log.get("run_id"),
+            "owner": owner or current_session.get(),
+            "service_type": service_type,
+            "created_at": time.time(),
+            "input_hash": make_input_hash(service_type, input_data),
+            "topic": str(input_data.get("topic", ""))[:TOPIC_PREVIEW_CHARS],
+            "input_data": json.dumps(input_data, ensure_ascii=False, default=str),
+            "result": json.dumps(result, ensure_ascii=False, default=str),
+            "fused": 1 if result.get("fused") else 0,
+            "total_seconds": _total_seconds(workflow_log),
+            "workflow_log": json.dumps(workflow_log, ensure_ascii=False, default=str)
+        }
+        if self._legacy_columns:
+            # 이전 저장소의 NOT NULL 열 채우기 (조회에는 사용하지 않음)
+            values.update({column: str(result.get(column, "")) for column in LEGACY_RESULT_COLUMNS})
+        with self._lock:
+            cursor = self._conn.execute(
+                f"INSERT INTO runs ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+                tuple(values.values())
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def page(self, owner, service_type=None, limit=10, cursor=None):
+        """
+        소유자의 최신순 기록 요약 한 페이지 조회 (결과 본문 제외)
+        Args:
+            owner (str): 기록 소유자 (세션 ID)
+            service_type (str): 서비스 유형 필터 (없으면 전체)
+            limit (int): 페이지 크기
+            cursor (tuple): 이전 페이지가 돌려준 다음 페이지 위치 (없으면 첫 페이지)
+        Returns:
+            tuple: (요약 목록, 다음 페이지 위치 또는 None)
+        """
+        conditions, params = ["owner = ?"], [owner]
+        if service_type:
+            conditions.append("service_type = ?")
+            params.append(service_type)
+        if cursor:
+            # (생성 시각, ID) 기준 키셋 페이지네이션: 앞 페이지를 건너뛰지 않고 인덱스에서 바로 시작
+            conditions.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([cursor[0], cursor[0], cursor[1]])
+        where = f"WHERE {' AND '.join(conditions)}"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, service_type, created_at, topic, fused, total_seconds FROM runs {where} "
+                f"ORDER BY created_at DESC, id DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+
+        items = [
+            {"id": row[0], "service_type": row[1], "created_at": row[2], "topic": row[3], "fused": bool(row[4]),
+             "total_seconds": row[5]}
+            for row in rows[:limit]
+        ]
+        next_cursor = (items[-1]["created_at"], items[-1]["id"]) if len(rows) > limit else None
+        return items, next_cursor
+
+    def get(self, record_id, owner):
+        """
+        기록 하나의 전체 내용 조회 (다른 소유자의 기록은 없는 것으로 처리)
+        Args:
+            record_id (int): 기록 ID
+            owner (str): 기록 소유자 (세션 ID)
+        Returns:
+            dict | None: 입력, 단계별 결과, 워크플로우 로그를 포함한 기록 (없으면 None)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, service_type, created_at, input_data, result, total_seconds, workflow_log "
+                "FROM runs WHERE id = ? AND owner = ?", (record_id, owner)
+            ).fetchone()
+        return self._record(row)
+
+    def find_by_input(self, service_type, input_data, owner):
+        """
+        소유자가 같은 입력으로 만든 가장 최근 기록 조회 (입력 해시 인덱스 사용)
+        Returns:
+            dict | None: 기록 (없으면 None)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, service_type, created_at, input_data, result, total_seconds, workflow_log "
+                "FROM runs WHERE input_hash = ? AND owner = ? ORDER BY created_at DESC LIMIT 1",
+                (make_input_hash(service_type, input_data), owner)
+            ).fetchone()
+        return self._record(row)
+
+    def count(self, owner, service_type=None):
+        """
+        소유자의 저장된 기록 수
+        """
+        with self._lock:
+            if service_type:
+                return self._conn.execute("SELECT COUNT(*) FROM runs WHERE owner = ? AND service_type = ?",
+                                          (owner, service_type)).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM runs WHERE owner = ?", (owner,)).fetchone()[0]
+
+    def delete(self, record_id, owner):
+        """
+        소유자의 기록 하나 삭제
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM runs WHERE id = ? AND owner = ?", (record_id, owner))
+            self._conn.commit()
+
+    @staticmethod
+    def _record(row):
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "service_type": row[1],
+            "created_at": row[2],
+            "input_data": json.loads(row[3]),
+            "result": json.loads(row[4]),
+            "total_seconds": row[5],
+            "workflow_log": json.loads(row[6])
+        }
@@ -0,0 +1,529 @@
+# ============================================================================
+# 백그라운드 분석 작업 대기열
+# '분석 시작'을 누르면 Streamlit 스크립트 실행 안에서 세 전문가를 호출하지 않고 작업만 등록하고,
+# 별도의 작업자 프로세스 풀이 파이프라인을 실행하며 단계별 진행 상황을 SQLite에 기록
+#   - 브라우저 연결이 끊기거나 페이지를 새로고침해도 작업은 작업자 프로세스에서 계속 진행
+#   - 화면은 작업 ID로 진행 상황과 결과를 주기적으로 조회
+#   - 작업자 수는 웹 세션 수와 별개로 설정 (CREATOR_PARTNER_WORKERS)
+# API 키는 디스크에 저장하지 않고 작업자에게 전달하는 프로세스 간 대기열에만 담음
+# 단계 재사용용 체크포인트 메모리는 세션별로 이 저장소에 두어, 어느 작업자가 실행해도 같은 세션의 이전 결과를 재사용
+# ============================================================================
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from collections.abc import MutableMapping
+
+# 기본 작업 저장소 경로와 작업자 수 (환경 변수로 변경 가능)
+DEFAULT_JOB_PATH = os.environ.get(
+    "CREATOR_PARTNER_JOB_PATH",
+    os.path.join(os.path.expanduser("~"), ".creator_partner", "jobs.sqlite3")
+)
+DEFAULT_WORKERS = int(os.environ.get("CREATOR_PARTNER_WORKERS", 2))
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+INTERRUPTED = "interrupted"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+def process_alive(pid):
+    """
+    같은 컴퓨터에서 주어진 프로세스가 아직 실행 중인지 여부
+    """
+    if not pid:
+        return False
+    if os.name == "nt":
+        # Windows의 os.kill은 프로세스를 종료하므로 프로세스 핸들로 확인
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """
+    SQLite 작업 저장소 (웹 프로세스와 작업자 프로세스가 같은 파일을 공유)
+    """
+
+    def __init__(self, path=DEFAULT_JOB_PATH):
+        """
+        작업 저장소 초기화
+        Args:
+            path (str): SQLite 파일 경로 (작업자 프로세스와 공유해야 하므로 메모리 저장소는 지원하지 않음)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                service_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                worker_pid INTEGER,
+                owner_pid INTEGER,
+                input_data TEXT NOT NULL,
+                options TEXT NOT NULL,
+                progress TEXT NOT NULL,
+                result TEXT,
+                error TEXT
+            )
+        """)
+        # 작업을 등록한 서버 프로세스 열이 없던 이전 저장소: 열만 추가
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "owner_pid" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS session_memory (
+                session_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (session_id, key)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_session ON jobs (session_id, service_type, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+        self._conn.commit()
+
+    def submit(self, session_id, service_type, input_data, options=None):
+        """
+        새 작업 등록
+        Args:
+            session_id (str): 작업을 등록한 브라우저 세션 ID (새로고침 후 작업을 다시 찾는 데 사용)
+            service_type (str): 요청 서비스 유형
+            input_data (dict): 사용자 입력 데이터
+            options (dict): 실행 옵션 ({"fused": bool, "fanout": bool})
+        Returns:
+            str: 작업 ID
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, session_id, service_type, status, created_at, owner_pid, input_data, options, "
+                "progress) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, session_id, service_type, QUEUED, time.time(), os.getpid(),
+                 json.dumps(input_data, ensure_ascii=False, default=str),
+                 json.dumps(options or {}, ensure_ascii=False), "[]")
+            )
+            self._conn.commit()
+        return job_id
+
+    def claim(self, job_id, worker_pid):
+        """
+        대기 중인 작업을 실행 상태로 전환 (다른 작업자가 이미 가져갔거나 중단된 작업이면 False)
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, worker_pid = ? WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), worker_pid, job_id, QUEUED)
+            )
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def add_progress(self, job_id, stage, status):
+        """
+        단계 진행 상황 한 건 추가 (get_creative_advice의 진행 상황 콜백 형식)
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT progress FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            progress = json.loads(row[0])
+            progress.append([stage, status, time.time()])
+            self._conn.execute("UPDATE jobs SET progress = ? WHERE id = ?", (json.dumps(progress), job_id))
+            self._conn.commit()
+
+    def finish(self, job_id, result):
+        """
+        작업 완료 기록
+        """
+        self._close(job_id, DONE, result=json.dumps(result, ensure_ascii=False, default=str))
+
+    def fail(self, job_id, error, status=ERROR):
+        """
+        작업 실패(또는 중단) 기록
+        """
+        self._close(job_id, status, error=error)
+
+    def _close(self, job_id, status, result=None, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+                (status, time.time(), result, error, job_id)
+            )
+            self._conn.commit()
+
+    def get(self, job_id):
+        """
+        작업 하나 조회
+        Returns:
+            dict | None: 작업 (없으면 None)
+        """
+        with self._lock:
+            row = self._conn.execute(f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row)
+
+    def latest(self, session_id, service_type):
+        """
+        세션의 서비스 유형별 가장 최근 작업 조회
+        Returns:
+            dict | None: 작업 (없으면 None)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE session_id = ? AND service_type = ? "
+                f"ORDER BY created_at DESC LIMIT 1",
+                (session_id, service_type)
+            ).fetchone()
+        return self._job(row)
+
+    def interrupt_running(self, worker_pids=None, reason="작업자 프로세스가 종료되어 작업이 중단되었습니다"):
+        """
+        끝나지 않은 작업을 중단 상태로 표시
+        Args:
+            worker_pids (list): 이 작업자들이 실행 중이던 작업만 표시 (None이면 대기/실행 중인 모든 작업)
+        Returns:
+            int: 중단 상태로 바꾼 작업 수
+        """
+        with self._lock:
+            if worker_pids is None:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE status IN (?, ?)",
+                    (INTERRUPTED, time.time(), reason, *ACTIVE_STATUSES)
+                )
+            else:
+                marks = ", ".join("?" for _ in worker_pids)
+                cursor = self._conn.execute(
+                    f"UPDATE jobs SET status = ?, finished_at = ?, error = ? "
+                    f"WHERE status = ? AND worker_pid IN ({marks})",
+                    (INTERRUPTED, time.time(), reason, RUNNING, *worker_pids)
+                )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def interrupt_orphaned(self, reason="서버가 다시 시작되어 작업이 중단되었습니다"):
+        """
+        실행할 프로세스가 없어진 작업만 중단 상태로 표시 (같은 저장소를 쓰는 다른 서버 프로세스의 작업은 유지)
+        대기 중인 작업은 등록한 서버 프로세스의 대기열에만 있으므로 그 서버가 종료되었으면 중단,
+        실행 중인 작업은 실행하던 작업자 프로세스가 종료되었으면 중단
+        Returns:
+            int: 중단 상태로 바꾼 작업 수
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, status, worker_pid, owner_pid FROM jobs WHERE status IN (?, ?)", ACTIVE_STATUSES
+            ).fetchall()
+        orphaned = [job_id for job_id, status, worker_pid, owner_pid in rows
+                    if not process_alive(worker_pid if status == RUNNING else owner_pid)]
+        if not orphaned:
+            return 0
+        marks = ", ".join("?" for _ in orphaned)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE status IN (?, ?) AND id IN ({marks})",
+                (INTERRUPTED, time.time(), reason, *ACTIVE_STATUSES, *orphaned)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def session_memory(self, session_id):
+        """
+        세션별 체크포인트 메모리 (CheckpointStore의 memory로 사용, 모든 작업자 프로세스가 공유)
+        """
+        return SessionMemory(self, session_id)
+
+    def counts(self):
+        """
+        상태별 작업 수
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    _COLUMNS = ("id, session_id, service_type, status, created_at, started_at, finished_at, input_data, options, "
+                "progress, result, error")
+
+    @staticmethod
+    def _job(row):
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "session_id": row[1],
+            "service_type": row[2],
+            "status": row[3],
+            "created_at": row[4],
+            "started_at": row[5],
+            "finished_at": row[6],
+            "input_data": json.loads(row[7]),
+            "options": json.loads(row[8]),
+            "progress": json.loads(row[9]),
+            "result": json.loads(row[10]) if row[10] else None,
+            "error": row[11]
+        }
+
+
+class SessionMemory(MutableMapping):
+    """
+    작업 저장소에 보관하는 세션 하나의 키-값 메모리 (값은 JSON)
+    """
+
+    def __init__(self, store, session_id):
+        self.store = store
+        self.session_id = session_id
+
+    def __getitem__(self, key):
+        with self.store._lock:
+            row = self.store._conn.execute("SELECT value FROM session_memory WHERE session_id = ? AND key = ?",
+                                           (self.session_id, key)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key, value):
+        with self.store._lock:
+            self.store._conn.execute(
+                "INSERT OR REPLACE INTO session_memory (session_id, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                (self.session_id, key, json.dumps(value, ensure_ascii=False, default=str), time.time())
+            )
+            self.store._conn.commit()
+
+    def __delitem__(self, key):
+        with self.store._lock:
+            cursor = self.store._conn.execute("DELETE FROM session_memory WHERE session_id = ? AND key = ?",
+                                              (self.session_id, key))
+            self.store._conn.commit()
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+
+    def __iter__(self):
+        with self.store._lock:
+            rows = self.store._conn.execute("SELECT key FROM session_memory WHERE session_id = ?",
+                                            (self.session_id,)).fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self):
+        with self.store._lock:
+            return self.store._conn.execute("SELECT COUNT(*) FROM session_memory WHERE session_id = ?",
+                                            (self.session_id,)).fetchone()[0]
+
+
+def create_worker_team(api_key, workers=1):
+    """
+    작업자 프로세스용 창작 파트너 팀 생성 (작업자 프로세스 안에서 API 키별로 한 번)
+    API 키 쿼터는 모든 작업자 프로세스가 나눠 쓰므로 분당 요청/토큰 한도를 작업자 수로 나눔
+    Args:
+        api_key (str): Google AI API 키
+        workers (int): 전체 작업자 프로세스 수
+    Returns:
+        CreativeTeam: 창작 파트너 팀
+    """
+    # 작업자 프로세스에서만 필요한 모듈 (웹 프로세스의 작업 등록 경로는 모델 SDK를 불러오지 않음)
+    from context_budget import HandoffCompressor
+    from creative_team import CreativeTeam
+    from history_store import HistoryStore
+    from metrics import MetricsCollector
+    from prompt_templates import create_prefix_cache
+    from rate_limiter import RateLimitScheduler
+    from resilience import ResiliencePolicy
+    from response_cache import ResponseCache
+    from single_flight import SingleFlight
+    from token_budget import TokenBudget
+
+    shared = RateLimitScheduler.from_env()
+    scheduler = RateLimitScheduler(rpm=max(1, int(shared.rpm_bucket.capacity) // workers),
+                                   tpm=max(1, int(shared.tpm_bucket.capacity) // workers),
+                                   max_concurrency=shared.max_concurrency)
+    return CreativeTeam(api_key, cache=ResponseCache(), scheduler=scheduler, resilience=ResiliencePolicy.from_env(),
+                        compressor=HandoffCompressor.from_env(), prefix_cache=create_prefix_cache(),
+                        metrics=MetricsCollector.from_env(), history=HistoryStore(), single_flight=SingleFlight(),
+                        budget=TokenBudget.from_env())
+
+
+def run_job(team, job, progress=None, checkpoints=None):
+    """
+    작업 하나 실행
+    Args:
+        team (CreativeTeam): 창작 파트너 팀
+        job (dict): JobStore.get이 반환한 작업
+        progress (callable): 단계 진행 상황 콜백 (stage, status)
+        checkpoints (CheckpointStore): 단계별 체크포인트 저장소 (중단된 작업을 다시 실행할 때 완료된 단계 재사용)
+    Returns:
+        dict: 각 전문가의 조언을 포함한 최종 결과
+    """
+    options = job["options"]
+    if job["service_type"] == "통합 콘텐츠" and options.get("fanout"):
+        return team.get_integrated_advice_fanout(job["input_data"], checkpoints=checkpoints)
+    return team.get_creative_advice(job["service_type"], job["input_data"], checkpoints=checkpoints,
+                                    progress=progress, fused=options.get("fused", False))
+
+
+def _worker_main(path, tasks, workers, team_factory):
+    # 작업자 프로세스 본체: 대기열에서 (작업 ID, API 키, 세션 ID)를 받아 하나씩 실행 (None이면 종료)
+    from checkpoint_store import CheckpointStore
+    from rate_limiter import session_scope
+
+    store = JobStore(path)
+    teams = {}
+    pid = os.getpid()
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        job_id, api_key, session_id = task
+        if not store.claim(job_id, pid):
+            continue
+        job = store.get(job_id)
+        try:
+            team = teams.get(api_key)
+            if team is None:
+                team = teams[api_key] = team_factory(api_key, workers)
+            # 체크포인트 메모리는 세션별로 작업 저장소에 두어 다른 세션의 결과를 재사용하지 않고,
+            # 같은 세션의 작업은 어느 작업자가 실행해도 이전 실행의 단계 결과를 재사용
+            checkpoints = CheckpointStore(memory=store.session_memory(session_id))
+            # 작업을 등록한 세션 단위로 스케줄러의 공정 대기열 구분
+            with session_scope(session_id):
+                result = run_job(team, job, lambda stage, status: store.add_progress(job_id, stage, status),
+                                 checkpoints)
+            store.finish(job_id, result)
+        except Exception as e:
+            store.fail(job_id, f"{type(e).__name__}: {e}")
+            traceback.print_exc()
+
+
+class JobWorkerPool:
+    """
+    분석 작업자 프로세스 풀 (웹 서버 프로세스당 하나)
+    작업자 프로세스는 spawn 방식으로 시작하여 Streamlit 서버의 스레드와 상태를 물려받지 않음
+    start를 따로 부르지 않으면 첫 작업을 등록할 때 작업자 프로세스를 시작 (백그라운드 작업을 쓰지 않으면 만들지 않음)
+    """
+
+    def __init__(self, path=DEFAULT_JOB_PATH, workers=DEFAULT_WORKERS, team_factory=create_worker_team):
+        """
+        Args:
+            path (str): 작업 저장소 경로
+            workers (int): 작업자 프로세스 수
+            team_factory (callable): (API 키, 작업자 수)를 받아 팀을 만드는 최상위 함수 (작업자 프로세스로 전달)
+        """
+        self.path = path
+        self.workers = max(1, workers)
+        self.team_factory = team_factory
+        self.store = JobStore(path)
+        self._context = multiprocessing.get_context("spawn")
+        self._tasks = self._context.Queue()
+        self._processes = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        환경 변수 설정으로 작업자 풀 생성
+        CREATOR_PARTNER_JOB_PATH, CREATOR_PARTNER_WORKERS
+        """
+        return cls(DEFAULT_JOB_PATH, DEFAULT_WORKERS)
+
+    def start(self):
+        """
+        작업자 프로세스 시작
+        종료된 이전 서버 프로세스에서 끝나지 않은 작업은 API 키가 남아 있지 않아 이어서 실행할 수 없으므로 중단 상태로 표시
+        (같은 저장소를 쓰는 다른 서버 프로세스가 살아 있으면 그 작업은 건드리지 않음,
+        다시 제출하면 단계별 체크포인트로 완료된 단계부터 이어서 진행)
+        이미 시작한 풀은 다시 시작하지 않음
+        """
+        with self._lock:
+            if self._started:
+                return self
+            self._started = True
+        self.store.interrupt_orphaned()
+        with self._lock:
+            while len(self._processes) < self.workers:
+                self._processes.append(self._spawn())
+        return self
+
+    def submit(self, api_key, session_id, service_type, input_data, options=None):
+        """
+        분석 작업 등록
+        Returns:
+            str: 작업 ID
+        """
+        # 첫 작업이면 작업자 프로세스 시작, 이후에는 종료된 작업자만 다시 시작
+        self.start()
+        self.ensure_workers()
+        job_id = self.store.submit(session_id, service_type, input_data, options)
+        self._tasks.put((job_id, api_key, session_id))
+        return job_id
+
+    def ensure_workers(self):
+        """
+        종료된 작업자 프로세스를 새로 시작하고, 그 작업자가 실행 중이던 작업을 중단 상태로 표시
+        """
+        with self._lock:
+            dead = [process for process in self._processes if not process.is_alive()]
+            if not dead:
+                return
+            self.store.interrupt_running([process.pid for process in dead])
+            self._processes = [process for process in self._processes if process.is_alive()]
+            while len(self._processes) < self.workers:
+                self._processes.append(self._spawn())
+
+    def stop(self, timeout=10.0):
+        """
+        작업자 프로세스 종료 (진행 중인 작업이 끝난 뒤 종료)
+        """
+        with self._lock:
+            for _ in self._processes:
+                self._tasks.put(None)
+            for process in self._processes:
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+            self._processes = []
+
+    def stats(self):
+        """
+        작업자 풀 현황 (시작하지 않은 풀은 작업자 프로세스를 만들지 않고 0개로 표시)
+        Returns:
+            dict: {"workers": 살아 있는 작업자 수, "queued", "running", "done", "error", "interrupted"}
+        """
+        self.ensure_workers()
+        counts = self.store.counts()
+        with self._lock:
+            alive = sum(1 for process in self._processes if process.is_alive())
+        return {"workers": alive, **{status: counts.get(status, 0)
+                                     for status in (QUEUED, RUNNING, DONE, ERROR, INTERRUPTED)}}
+
+    def _spawn(self):
+        process = self._context.Process(target=_worker_main, name="creator-partner-worker",
+                                        args=(self.path, self._tasks, self.workers, self.team_factory), daemon=True)
+        process.start()
+        return process
@@ -0,0 +1,229 @@
+# ============================================================================
+# 단계별 호출 지표 수집 및 내보내기
+# 전문가 호출 한 번마다 소요 시간, 첫 토큰까지의 시간(TTFT), usage_metadata 토큰 수,
+# 재시도 횟수, 응답 캐시 적중 여부, 진행 중인 동일 요청과 합쳐졌는지 여부, 오류를 기록
+#   - 최근 기록으로 단계별/서비스 유형별 p50, p95 계산 (사이드바 패널)
+#   - Prometheus 텍스트 형식 내보내기
+#   - JSONL 파일 기록 (한 호출당 한 줄)
+# ============================================================================
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# 토큰 수 지표 종류: 기록 필드 -> Prometheus kind 라벨
+TOKEN_FIELDS = {"prompt_tokens": "prompt", "response_tokens": "response", "total_tokens": "total",
+                "cached_tokens": "cached"}
+
+
+def new_stage_metrics(stage, service_type):
+    """
+    전문가 호출 한 번의 지표 기록 생성
+    Args:
+        stage (str): 단계 이름
+        service_type (str): 서비스 유형
+    Returns:
+        dict: 호출이 끝나면 값이 채워지는 지표 기록
+    """
+    return {
+        "stage": stage,
+        "service_type": service_type,
+        "started_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "wall_seconds": None,
+        "ttft_seconds": None,
+        "prompt_tokens": None,
+        "response_tokens": None,
+        "total_tokens": None,
+        "cached_tokens": None,
+        "model": None,
+        "fallback": False,
+        "attempts": 0,
+        "retries": 0,
+        "cache_hit": False,
+        "coalesced": False,
+        "error": None
+    }
+
+
+def record_usage(metrics, response):
+    """
+    응답의 usage_metadata에서 토큰 수를 지표 기록에 반영
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    metrics["prompt_tokens"] = getattr(usage, "prompt_token_count", None)
+    metrics["response_tokens"] = getattr(usage, "candidates_token_count", None)
+    metrics["total_tokens"] = getattr(usage, "total_token_count", None)
+    metrics["cached_tokens"] = getattr(usage, "cached_content_token_count", None)
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsCollector:
+    """
+    단계별 호출 지표 수집기 (프로세스 전역에서 공유)
+    백분위는 최근 window개 기록으로 계산하고, 누적 카운터는 프로세스가 끝날 때까지 유지
+    """
+
+    def __init__(self, window=1000, jsonl_path=None):
+        """
+        Args:
+            window (int): 백분위 계산에 사용할 최근 기록 수
+            jsonl_path (str): 기록을 한 줄씩 추가할 JSONL 파일 경로 (없으면 기록 안 함)
+        """
+        self.window = window
+        self.jsonl_path = jsonl_path
+        self._records = deque(maxlen=window)
+        self._totals = {}  # (단계, 서비스 유형) -> 누적 카운터
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        환경 변수 설정으로 수집기 생성
+        CREATOR_PARTNER_METRICS_JSONL
+        """
+        return cls(jsonl_path=os.environ.get("CREATOR_PARTNER_METRICS_JSONL") or None)
+
+    def record(self, metrics):
+        """
+        끝난 호출 한 번의 지표 기록 추가
+        """
+        metrics = dict(metrics)
+        key = (metrics["stage"], metrics["service_type"])
+        with self._lock:
+            self._records.append(metrics)
+            totals = self._totals.setdefault(key, {
+                "calls": 0, "errors": 0, "retries": 0, "cache_hits": 0, "coalesced": 0, "fallbacks": 0,
+                "wall_seconds": 0.0, "ttft_seconds": 0.0, "ttft_count": 0,
+                **{field: 0 for field in TOKEN_FIELDS}
+            })
+            totals["calls"] += 1
+            totals["errors"] += 1 if metrics["error"] else 0
+            totals["retries"] += metrics["retries"]
+            totals["cache_hits"] += 1 if metrics["cache_hit"] else 0
+            totals["coalesced"] += 1 if metrics.get("coalesced") else 0
+            totals["fallbacks"] += 1 if metrics["fallback"] else 0
+            totals["wall_seconds"] += metrics["wall_seconds"] or 0.0
+            if metrics["ttft_seconds"] is not None:
+                totals["ttft_seconds"] += metrics["ttft_seconds"]
+                totals["ttft_count"] += 1
+            for field in TOKEN_FIELDS:
+                totals[field] += metrics[field] or 0
+
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(metrics, ensure_ascii=False) + "\n")
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def summary(self, group_by="stage"):
+        """
+        최근 기록의 그룹별 요약
+        Args:
+            group_by (str): "stage" 또는 "service_type"
+        Returns:
+            list: {그룹, calls, p50/p95 소요 시간, p50/p95 TTFT, 평균 총 토큰, 캐시 적중, 합쳐진 요청, 보조 모델 전환, 재시도, 오류} 목록
+        """
+        groups = {}
+        for metrics in self.records():
+            groups.setdefault(metrics[group_by], []).append(metrics)
+
+        rows = []
+        for name, items in groups.items():
+            # 캐시 적중, 합쳐진 요청, 오류는 지연 시간 분포에서 제외
+            calls = [m for m in items if not m["cache_hit"] and not m.get("coalesced") and not m["error"]]
+            walls = [m["wall_seconds"] for m in calls if m["wall_seconds"] is not None]
+            ttfts = [m["ttft_seconds"] for m in calls if m["ttft_seconds"] is not None]
+            tokens = [m["total_tokens"] for m in calls if m["total_tokens"]]
+            rows.append({
+                group_by: name,
+                "calls": len(items),
+                "p50_seconds": _percentile(walls, 0.5),
+                "p95_seconds": _percentile(walls, 0.95),
+                "p50_ttft_seconds": _percentile(ttfts, 0.5),
+                "p95_ttft_seconds": _percentile(ttfts, 0.95),
+                "avg_total_tokens": sum(tokens) / len(tokens) if tokens else None,
+                "cache_hits": sum(1 for m in items if m["cache_hit"]),
+                "coalesced": sum(1 for m in items if m.get("coalesced")),
+                "fallbacks": sum(1 for m in items if m["fallback"]),
+                "retries": sum(m["retries"] for m in items),
+                "errors": sum(1 for m in items if m["error"])
+            })
+        return rows
+
+    def to_prometheus(self):
+        """
+        Prometheus 텍스트 노출 형식으로 지표 변환
+        """
+        records = self.records()
+        with self._lock:
+            totals = {key: dict(value) for key, value in self._totals.items()}
+
+        lines = []
+        for name, field, count_field, help_text in (
+            ("creator_partner_stage_seconds", "wall_seconds", "calls", "전문가 단계 호출 소요 시간 (초)"),
+            ("creator_partner_stage_ttft_seconds", "ttft_seconds", "ttft_count", "첫 토큰까지의 시간 (초)"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for (stage, service_type), total in sorted(totals.items()):
+                values = [m[field] for m in records
+                          if (m["stage"], m["service_type"]) == (stage, service_type)
+                          and m[field] is not None and not m["cache_hit"] and not m.get("coalesced") and not m["error"]]
+                for q in (0.5, 0.95):
+                    value = _percentile(values, q)
+                    if value is not None:
+                        lines.append(f"{name}{_labels(stage=stage, service_type=service_type, quantile=q)} {value:.6f}")
+                labels = _labels(stage=stage, service_type=service_type)
+                lines.append(f"{name}_sum{labels} {total[field]:.6f}")
+                lines.append(f"{name}_count{labels} {total[count_field]}")
+
+        lines.append("# HELP creator_partner_stage_tokens_total usage_metadata 기준 누적 토큰 수")
+        lines.append("# TYPE creator_partner_stage_tokens_total counter")
+        for (stage, service_type), total in sorted(totals.items()):
+            for field, kind in TOKEN_FIELDS.items():
+                lines.append(f"creator_partner_stage_tokens_total"
+                             f"{_labels(stage=stage, service_type=service_type, kind=kind)} {total[field]}")
+
+        for name, field, help_text in (
+            ("creator_partner_stage_calls_total", "calls", "전문가 단계 호출 수"),
+            ("creator_partner_stage_retries_total", "retries", "재시도 및 헤징 요청 수"),
+            ("creator_partner_stage_cache_hits_total", "cache_hits", "응답 캐시 적중 수"),
+            ("creator_partner_stage_coalesced_total", "coalesced", "진행 중인 동일 요청과 합쳐져 보내지 않은 호출 수"),
+            ("creator_partner_stage_fallbacks_total", "fallbacks", "보조 모델로 전환된 호출 수"),
+            ("creator_partner_stage_errors_total", "errors", "실패한 호출 수"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (stage, service_type), total in sorted(totals.items()):
+                lines.append(f"{name}{_labels(stage=stage, service_type=service_type)} {total[field]}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Prometheus 텍스트 형식 파일로 저장 (node_exporter textfile 수집기용, 원자적 교체)
+        """
+        temp_path = f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
@@ -0,0 +1,202 @@
+# ============================================================================
+# API 키별 모델 핸들 및 창작 파트너 팀 풀
+# 프로세스 전역 genai.configure 대신 API 키마다 전용 클라이언트를 만들어 모델에 연결하므로,
+# 서로 다른 키를 쓰는 세션이 전역 설정을 두고 경쟁하지 않음
+# SDK 내부 속성(_client 등)에 의존하지 않도록 공개 클라이언트(generativelanguage)와 응답 타입만 사용
+# ============================================================================
+
+import hashlib
+import threading
+import time
+from datetime import timedelta
+
+from cassette import active_cassette
+
+# 기본 사용 모델
+DEFAULT_MODEL_NAME = "gemini-2.5-pro-preview-05-06"
+
+
+def create_model(api_key, model_name=DEFAULT_MODEL_NAME, generation_config=None):
+    """
+    API 키 전용 클라이언트를 사용하는 GenerativeModel 생성
+    Args:
+        api_key (str): Google AI API 키
+        model_name (str): 모델 이름
+        generation_config (dict): 모델 기본 생성 설정
+    Returns:
+        KeyedGenerativeModel: 전용 클라이언트가 연결된 모델 (카세트가 설정되어 있으면 녹화/재생 모델)
+    """
+    # 녹화/재생 카세트가 설정되어 있으면 모델 호출을 카세트로 감쌈 (재생 모드는 SDK를 불러오지 않음)
+    cassette = active_cassette()
+    if cassette is not None:
+        return cassette.wrap(model_name, lambda: _create_sdk_model(api_key, model_name, generation_config))
+    return _create_sdk_model(api_key, model_name, generation_config)
+
+
+def _create_sdk_model(api_key, model_name, generation_config):
+    # Gemini SDK는 실제로 모델을 만들 때만 임포트
+    from google.ai import generativelanguage_v1beta as glm
+
+    # 전역 설정 대신 키마다 공개 클라이언트를 직접 생성
+    client_options = {"api_key": api_key}
+    clients = {
+        "generative": glm.GenerativeServiceClient(client_options=client_options),
+        "generative_async": glm.GenerativeServiceAsyncClient(client_options=client_options),
+        "cache": glm.CacheServiceClient(client_options=client_options)
+    }
+    return KeyedGenerativeModel(model_name, clients, generation_config)
+
+
+class KeyedGenerativeModel:
+    """
+    API 키 전용 클라이언트로 호출하는 모델
+    GenerativeModel과 같은 호출 방식(generate_content, count_tokens 등)과 응답 타입을 제공하고,
+    접두부 컨텍스트 캐시 생성과 캐시 핸들에 묶인 모델 생성도 같은 키의 클라이언트로 처리
+    """
+
+    def __init__(self, model_name, clients, generation_config=None, cached_content=None):
+        """
+        Args:
+            model_name (str): 모델 이름
+            clients (dict): "generative" | "generative_async" | "cache" -> 공개 서비스 클라이언트
+            generation_config (dict): 모델 기본 생성 설정
+            cached_content (str): 요청에 붙일 컨텍스트 캐시 이름 (없으면 None)
+        """
+        self.model_name = model_name
+        self._resource_name = model_name if "/" in model_name else f"models/{model_name}"
+        self.clients = clients
+        self.generation_config = dict(generation_config or {})
+        self.cached_content = cached_content
+
+    def generate_content(self, contents, generation_config=None, stream=False, request_options=None):
+        from google.generativeai.types import GenerateContentResponse
+
+        request = self._request(contents, generation_config)
+        client = self.clients["generative"]
+        if stream:
+            return GenerateContentResponse.from_iterator(
+                client.stream_generate_content(request, **(request_options or {}))
+            )
+        return GenerateContentResponse.from_response(client.generate_content(request, **(request_options or {})))
+
+    async def generate_content_async(self, contents, generation_config=None, request_options=None):
+        from google.generativeai.types import AsyncGenerateContentResponse
+
+        request = self._request(contents, generation_config)
+        response = await self.clients["generative_async"].generate_content(request, **(request_options or {}))
+        return AsyncGenerateContentResponse.from_response(response)
+
+    def count_tokens(self, contents):
+        return self.clients["generative"].count_tokens(self._count_request(contents))
+
+    async def count_tokens_async(self, contents):
+        return await self.clients["generative_async"].count_tokens(self._count_request(contents))
+
+    def create_cached_content(self, system_instruction, display_name, ttl_seconds):
+        """
+        system_instruction을 제공자 측 컨텍스트 캐시로 업로드
+        Args:
+            system_instruction (str): 캐시할 고정 접두부
+            display_name (str): 캐시 표시 이름
+            ttl_seconds (int): 캐시 보관 시간 (초)
+        Returns:
+            str: 캐시 이름 (with_cached_content에 전달)
+        """
+        from google.generativeai import protos
+
+        cached = self.clients["cache"].create_cached_content(protos.CreateCachedContentRequest(
+            cached_content=protos.CachedContent(
+                model=self._resource_name,
+                display_name=display_name,
+                system_instruction=protos.Content(parts=[protos.Part(text=system_instruction)]),
+                ttl=timedelta(seconds=ttl_seconds)
+            )
+        ))
+        return cached.name
+
+    def with_cached_content(self, cached_content):
+        """
+        같은 클라이언트를 쓰면서 요청마다 컨텍스트 캐시를 참조하는 모델 반환
+        """
+        return KeyedGenerativeModel(self.model_name, self.clients, self.generation_config, cached_content)
+
+    def _contents(self, contents):
+        from google.generativeai import protos
+
+        if isinstance(contents, str):
+            contents = [contents]
+        return [protos.Content(role="user", parts=[protos.Part(text=text)]) for text in contents]
+
+    def _request(self, contents, generation_config):
+        from google.generativeai import protos
+        from google.generativeai.types.generation_types import to_generation_config_dict
+
+        config = dict(self.generation_config)
+        config.update(generation_config or {})
+        return protos.GenerateContentRequest(
+            model=self._resource_name,
+            contents=self._contents(contents),
+            # SDK와 같은 방식으로 정규화 (JSON 스키마 딕셔너리 response_schema -> protos.Schema)
+            generation_config=protos.GenerationConfig(**to_generation_config_dict(config)),
+            cached_content=self.cached_content
+        )
+
+    def _count_request(self, contents):
+        from google.generativeai import protos
+
+        if self.cached_content:
+            # 캐시된 접두부 토큰까지 포함해 세도록 전체 요청 형태로 전달
+            return protos.CountTokensRequest(
+                model=self._resource_name,
+                generate_content_request=protos.GenerateContentRequest(
+                    model=self._resource_name, contents=self._contents(contents), cached_content=self.cached_content
+                )
+            )
+        return protos.CountTokensRequest(model=self._resource_name, contents=self._contents(contents))
+
+
+class ModelPool:
+    """
+    API 키별 리소스(모델, 창작 파트너 팀 등) 풀
+    같은 키의 요청은 기존 리소스를 재사용하고, 일정 시간 사용되지 않은 리소스는 정리
+    잠금은 풀 조회/등록 시에만 잡으므로 리소스 사용 자체는 세션 간에 직렬화되지 않음
+    """
+
+    def __init__(self, factory, idle_seconds=30 * 60):
+        """
+        풀 초기화
+        Args:
+            factory (callable): API 키를 받아 새 리소스를 만드는 함수
+            idle_seconds (int): 이 시간(초) 동안 사용되지 않은 리소스는 정리
+        """
+        self.factory = factory
+        self.idle_seconds = idle_seconds
+        self._entries = {}  # 키 해시 -> [리소스, 마지막 사용 시각]
+        self._lock = threading.Lock()
+
+    def get(self, api_key):
+        """
+        API 키에 해당하는 리소스 반환 (없으면 새로 생성)
+        """
+        key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = [self.factory(api_key), now]
+                self._entries[key] = entry
+            entry[1] = now
+            return entry[0]
+
+    def size(self):
+        """
+        현재 풀에 있는 리소스 수
+        """
+        with self._lock:
+            return len(self._entries)
+
+    def _evict_idle(self, now):
+        idle_keys = [key for key, (_, last_used) in self._entries.items() if now - last_used > self.idle_seconds]
+        for key in idle_keys:
+            del self._entries[key]
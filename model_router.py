@@ -0,0 +1,157 @@
+# ============================================================================
+# 단계별/서비스 유형별 모델 라우팅
+# 중간 초안(전략, 창작)은 빠르고 저렴한 flash 계열, 최종 통합(플랫폼)은 pro 모델로 보내고,
+# 주 모델이 느리거나 과부하일 때는 보조 모델로 자동 전환
+#   - 같은 호출의 두 번째 시도부터(재시도, 헤징 요청)는 보조 모델 사용
+#   - 주 모델이 일시적 오류(쿼터 초과, 과부하, 시간 초과)를 내면 잠시 동안 새 호출도 보조 모델로 보냄
+# ============================================================================
+
+import json
+import os
+import threading
+import time
+
+from model_pool import DEFAULT_MODEL_NAME, create_model
+from resilience import is_transient_error
+
+# flash 계열 기본 모델
+DEFAULT_FAST_MODEL_NAME = "gemini-2.5-flash-preview-05-20"
+FALLBACK_FAST_MODEL_NAME = "gemini-2.0-flash"
+
+# 기본 라우팅: 단계 -> {"model", "fallback", "generation_config"}
+DEFAULT_ROUTES = {
+    "strategy": {"model": DEFAULT_FAST_MODEL_NAME, "fallback": FALLBACK_FAST_MODEL_NAME},
+    "content": {"model": DEFAULT_FAST_MODEL_NAME, "fallback": FALLBACK_FAST_MODEL_NAME},
+    "platform": {"model": DEFAULT_MODEL_NAME, "fallback": DEFAULT_FAST_MODEL_NAME},
+    "fused": {"model": DEFAULT_MODEL_NAME, "fallback": DEFAULT_FAST_MODEL_NAME},
+    "variants": {"model": DEFAULT_FAST_MODEL_NAME, "fallback": FALLBACK_FAST_MODEL_NAME},
+    # 단계 간 요약 압축은 가장 저렴한 모델 사용
+    "summary": {"model": FALLBACK_FAST_MODEL_NAME},
+}
+
+
+class ModelRoute:
+    """
+    한 단계(와 서비스 유형)의 모델 설정
+    """
+
+    def __init__(self, model_name, fallback_name=None, generation_config=None):
+        """
+        Args:
+            model_name (str): 주 모델 이름
+            fallback_name (str): 주 모델이 느리거나 과부하일 때 사용할 보조 모델 이름
+            generation_config (dict): 생성 설정 (temperature, max_output_tokens 등)
+        """
+        self.model_name = model_name
+        self.fallback_name = fallback_name
+        self.generation_config = generation_config
+
+    @classmethod
+    def from_dict(cls, spec):
+        return cls(spec["model"], spec.get("fallback"), spec.get("generation_config"))
+
+    def to_dict(self):
+        return {"model": self.model_name, "fallback": self.fallback_name, "generation_config": self.generation_config}
+
+
+class ModelRouter:
+    """
+    단계별/서비스 유형별 모델 선택기 (API 키 하나당 하나)
+    모델 핸들은 이름별로 한 번만 만들어 재사용
+    """
+
+    def __init__(self, factory, routes=None, default=None, cooldown_seconds=60.0):
+        """
+        Args:
+            factory (callable): 모델 이름을 받아 GenerativeModel을 만드는 함수
+            routes (dict): "단계" 또는 "단계/서비스 유형" -> ModelRoute
+            default (ModelRoute): 일치하는 라우팅이 없을 때 사용할 설정
+            cooldown_seconds (float): 주 모델이 일시적 오류를 낸 뒤 새 호출을 보조 모델로 보낼 시간 (초)
+        """
+        self.factory = factory
+        self.routes = routes or {}
+        self.default = default or ModelRoute(DEFAULT_MODEL_NAME)
+        self.cooldown_seconds = cooldown_seconds
+        self._models = {}
+        self._cooldown_until = {}
+        self._lock = threading.Lock()
+        self._stats = {"primary": 0, "fallback": 0}
+
+    @classmethod
+    def from_env(cls, api_key):
+        """
+        환경 변수 설정으로 라우터 생성
+        CREATOR_PARTNER_MODEL_ROUTES: 기본 라우팅을 덮어쓸 JSON
+            예: {"content": {"model": "gemini-2.0-flash"}, "platform/블로그": {"model": "...", "fallback": "..."}}
+        CREATOR_PARTNER_MODEL_COOLDOWN: 주 모델 과부하 시 보조 모델로 보낼 시간 (초)
+        """
+        specs = dict(DEFAULT_ROUTES)
+        specs.update(json.loads(os.environ.get("CREATOR_PARTNER_MODEL_ROUTES") or "{}"))
+        return cls(
+            lambda model_name: create_model(api_key, model_name),
+            {key: ModelRoute.from_dict(spec) for key, spec in specs.items()},
+            cooldown_seconds=float(os.environ.get("CREATOR_PARTNER_MODEL_COOLDOWN", 60))
+        )
+
+    @classmethod
+    def single(cls, model):
+        """
+        모든 단계가 주어진 모델 하나를 사용하는 라우터 (테스트, 벤치마크용)
+        """
+        return cls(lambda model_name: model, default=ModelRoute(model.model_name))
+
+    def route(self, stage, service_type=None):
+        """
+        단계와 서비스 유형에 맞는 라우팅 반환 ("단계/서비스 유형" -> "단계" -> 기본값 순으로 조회)
+        """
+        return self.routes.get(f"{stage}/{service_type}") or self.routes.get(stage) or self.default
+
+    def model(self, model_name):
+        """
+        이름에 해당하는 모델 핸들 반환 (없으면 생성)
+        """
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = self._models[model_name] = self.factory(model_name)
+            return model
+
+    def default_model(self):
+        return self.model(self.default.model_name)
+
+    def select(self, route, attempt):
+        """
+        호출 시도에 사용할 모델 선택
+        Args:
+            route (ModelRoute): 단계 라우팅
+            attempt (int): 같은 호출의 몇 번째 시도인지 (1부터, 헤징 요청 포함)
+        Returns:
+            GenerativeModel: 사용할 모델
+        """
+        use_fallback = route.fallback_name is not None and (attempt > 1 or self._cooling_down(route.model_name))
+        with self._lock:
+            self._stats["fallback" if use_fallback else "primary"] += 1
+        return self.model(route.fallback_name if use_fallback else route.model_name)
+
+    def report_failure(self, model_name, error):
+        """
+        모델 호출 실패 기록 (일시적 오류면 잠시 동안 새 호출을 보조 모델로 보냄)
+        """
+        if is_transient_error(error):
+            with self._lock:
+                self._cooldown_until[model_name] = time.monotonic() + self.cooldown_seconds
+
+    def signature(self):
+        """
+        라우팅 설정 요약 (체크포인트 구분용, 설정이 바뀌면 이전 체크포인트를 이어 쓰지 않음)
+        """
+        routes = {key: route.to_dict() for key, route in sorted(self.routes.items())}
+        return json.dumps({"default": self.default.to_dict(), "routes": routes}, ensure_ascii=False, sort_keys=True)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _cooling_down(self, model_name):
+        with self._lock:
+            return time.monotonic() < self._cooldown_until.get(model_name, 0.0)
@@ -0,0 +1,829 @@
+# ============================================================================
+# 전문가 프롬프트 템플릿 레지스트리 및 접두부 컨텍스트 캐시
+# 모든 프롬프트를 "고정 접두부(전문가 소개 + 작업 지시) + 요청별 접미부(입력 필드, 이전 단계 분석)"로
+# 나누어 모듈 로드 시 한 번만 만들어 둠
+# 제공자 최소 캐시 크기를 넘는 고정 접두부(통합 모드)는 제공자 측 컨텍스트 캐시(cached content)로 한 번 업로드하고
+# 호출마다 핸들로 참조하므로, 매 호출에는 요청별 접미부만 전송되어 정가로 과금됨
+# 3단계 체인의 단계별 접두부는 최소 크기보다 작아 제공자가 캐시하지 않으므로 로컬 핸들만 발급하고 전체 프롬프트 전송
+# ============================================================================
+
+import hashlib
+import os
+import threading
+import time
+
+from rate_limiter import estimate_tokens
+
+# 단계별 전문가 소개
+PERSONAS = {
+    "strategy": {
+        "expertise": "content_strategy",
+        "name": "김지원 콘텐츠 전략가",
+        "role": "콘텐츠 전략 전문가",
+        "intro": """
+안녕하세요, 김지원 콘텐츠 전략가입니다.
+저는 트렌드 분석, 타겟 오디언스 정의, 콘텐츠 방향성 설정을 전문으로 합니다.
+10년간의 디지털 콘텐츠 전략 경험을 바탕으로 여러분의 창작물이 목표 청중에게 효과적으로 도달할 수 있도록 지원하겠습니다.
+"""
+    },
+    "content": {
+        "expertise": "creative_writing",
+        "name": "이민호 콘텐츠 작가",
+        "role": "창작 콘텐츠 전문가",
+        "intro": """
+안녕하세요, 이민호 콘텐츠 작가입니다.
+저는 매력적인 스토리텔링, 시각적/청각적 콘텐츠 기획, 창의적 표현을 전문으로 합니다.
+8년간의 디지털 콘텐츠 제작 경험을 통해 여러분의 메시지가 청중의 마음을 사로잡을 수 있도록 지원하겠습니다.
+"""
+    },
+    "platform": {
+        "expertise": "platform_optimization",
+        "name": "박서연 플랫폼 전문가",
+        "role": "플랫폼 최적화 전문가",
+        "intro": """
+안녕하세요, 박서연 플랫폼 전문가입니다.
+저는 다양한 디지털 플랫폼의 최적화, 알고리즘 이해, 콘텐츠 배포 전략을 전문으로 합니다.
+9년간의 디지털 마케팅 및 콘텐츠 최적화 경험을 통해 여러분의 콘텐츠가 목표 청중에게 효과적으로 도달할 수 있도록 지원하겠습니다.
+"""
+    }
+}
+
+# 통합(fused) 모드: 세 전문가의 역할을 한 번의 호출로 수행하는 팀
+PERSONAS["fused"] = {
+    "expertise": "creative_team",
+    "name": "창작 파트너 팀",
+    "role": "세 명의 전문가로 구성된 창작 지원 팀",
+    "intro": """
+콘텐츠 전략가 김지원(트렌드 분석, 타겟 오디언스 정의, 콘텐츠 방향성 설정),
+콘텐츠 작가 이민호(스토리텔링, 시각적/청각적 콘텐츠 기획, 창의적 표현),
+플랫폼 전문가 박서연(플랫폼 최적화, 알고리즘 이해, 콘텐츠 배포 전략)이 순서대로 협업합니다.
+"""
+}
+
+# 통합 모드 응답 스키마 (세 전문가의 결과를 각각 마크다운 문자열로 반환)
+FUSED_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "strategy": {"type": "string", "description": "콘텐츠 전략가의 분석 (마크다운)"},
+        "content": {"type": "string", "description": "콘텐츠 작가의 창작 계획 (마크다운)"},
+        "platform": {"type": "string", "description": "플랫폼 전문가의 최종 조언 (마크다운)"}
+    },
+    "required": ["strategy", "content", "platform"]
+}
+FUSED_SECTIONS = ("strategy", "content", "platform")
+
+# 변형 후보 생성: 콘텐츠 작가가 한 섹션의 대안만 여러 개 작성
+PERSONAS["variants"] = PERSONAS["content"]
+
+# 단계 간 전달 텍스트 요약 (요약 모드 압축기가 사용)
+PERSONAS["summary"] = {
+    "expertise": "handoff_summary",
+    "name": "단계 간 요약 담당",
+    "role": "전문가 간 인수인계 요약 담당자",
+    "intro": """
+앞 전문가의 분석을 다음 전문가가 이어서 작업할 수 있도록 핵심만 간결하게 정리합니다.
+"""
+}
+
+# 서비스 유형별 변형 후보 섹션: 섹션 -> (표시 이름, 작성 지시)
+VARIANT_SECTIONS = {
+    "YouTube": {
+        "title": ("영상 제목", "클릭을 부르는 YouTube 영상 제목 하나를 작성하세요. 60자 이내로 핵심 키워드를 앞쪽에 배치하세요."),
+        "thumbnail": ("썸네일", "썸네일 문구(10자 이내)와 화면 구성(인물, 색감, 강조 요소)을 두세 줄로 작성하세요."),
+        "hook": ("오프닝 훅", "영상 첫 15초에 말할 오프닝 멘트를 작성하세요. 시청자가 끝까지 볼 이유를 바로 제시하세요."),
+    },
+    "블로그": {
+        "title": ("글 제목", "검색과 클릭을 모두 고려한 블로그 글 제목 하나를 작성하세요. 핵심 키워드를 포함하세요."),
+        "meta": ("메타 설명", "검색 결과에 표시될 메타 설명을 150자 이내로 작성하세요."),
+        "intro": ("도입부", "독자가 계속 읽고 싶어지는 도입부 첫 문단을 작성하세요."),
+    },
+    "인스타그램": {
+        "caption": ("캡션", "게시물 캡션을 작성하세요. 첫 줄에서 관심을 끌고 마지막에 참여를 유도하는 문장을 넣으세요."),
+        "hashtags": ("해시태그", "대형, 중형, 틈새 해시태그를 섞어 15개 내외의 해시태그 세트를 작성하세요."),
+        "reel_hook": ("릴스 훅", "릴스 첫 3초에 화면에 띄울 훅 문구를 작성하세요."),
+    },
+    "통합 콘텐츠": {
+        "slogan": ("캠페인 슬로건", "모든 플랫폼에 공통으로 쓸 캠페인 슬로건 하나를 작성하세요."),
+        "bio": ("프로필 소개", "플랫폼 프로필에 공통으로 쓸 소개 문구를 두세 문장으로 작성하세요."),
+    },
+}
+
+# 한 번의 호출로 여러 후보를 받는 배치 모드의 응답 스키마 (후보 문자열 배열)
+VARIANT_BATCH_SCHEMA = {"type": "array", "items": {"type": "string"}}
+
+# 단계별 이전 분석 안내와 마무리 지시
+_STAGE_FRAMES = {
+    "strategy": {
+        "previous_label": None,
+        "review": "",
+        "closing": """
+분석 결과에 트렌드 분석, 타겟 오디언스 인사이트, 콘텐츠 차별화 전략을 반드시 포함해 주세요.
+전문적이면서도 실용적인 전략을 제시해 주세요.
+"""
+    },
+    "content": {
+        "previous_label": "콘텐츠 전략가의 분석",
+        "review": "요청 정보와 함께 제공되는 콘텐츠 전략가의 분석을 검토하고, 창작 관점에서 보완해주세요.",
+        "closing": """
+매력적인 스토리 구조, 시각적/청각적 요소, 감정적 연결 전략을 반드시 포함해 주세요.
+"""
+    },
+    "platform": {
+        "previous_label": "이전 전문가들의 분석",
+        "review": "요청 정보와 함께 제공되는 콘텐츠 전략가와 창작 작가의 분석을 검토하고 최종적으로 완성해주세요.",
+        "closing": """
+최종 조언에는 다음 세 전문가의 관점이 균형있게 통합되어야 합니다:
+1. 콘텐츠 전략가 (전략 및 방향성)
+2. 창작 작가 (스토리텔링 및 창의적 요소)
+3. 플랫폼 전문가 (최적화 및 유통 전략)
+
+구체적이고 실행 가능한 단계별 콘텐츠 제작 및 배포 가이드를 제공해주세요.
+"""
+    }
+}
+
+# 서비스 유형별 입력 필드: (표시 이름, 입력 키, 기본값)
+_YOUTUBE_INPUTS = [("주제/아이디어", "topic", ""), ("목표/목적", "goals", ""), ("타겟 시청자", "target_audience", "")]
+_BLOG_INPUTS = [("주제/분야", "topic", ""), ("목표/목적", "goals", ""), ("타겟 독자", "target_audience", "")]
+_INSTAGRAM_INPUTS = [("계정 주제/성격", "topic", ""), ("목표/목적", "goals", ""), ("타겟 팔로워", "target_audience", "")]
+_INTEGRATED_INPUTS = [("주제/브랜드", "topic", ""), ("목표/목적", "goals", ""), ("타겟 오디언스", "target_audience", ""),
+                      ("주력 플랫폼", "primary_platform", "")]
+
+# 변형 후보 생성에 쓰는 서비스 유형별 입력 필드 (기본 필드 + 스타일/톤)
+_VARIANT_INPUTS = {
+    "YouTube": _YOUTUBE_INPUTS + [("채널 스타일/톤", "channel_style", "")],
+    "블로그": _BLOG_INPUTS + [("블로그 스타일/톤", "blog_style", "")],
+    "인스타그램": _INSTAGRAM_INPUTS + [("시각적 스타일", "visual_style", "")],
+    "통합 콘텐츠": _INTEGRATED_INPUTS + [("브랜드 스타일/톤", "brand_style", "")],
+}
+
+# (단계, 서비스 유형) -> (작업 지시, 입력 필드 목록)
+# 서비스 유형이 None인 항목은 등록되지 않은 서비스 유형에 사용하는 일반 템플릿 (입력 전체를 그대로 전달)
+_TASKS = {
+    ("strategy", "YouTube"): ("""
+요청 정보의 YouTube 콘텐츠 아이디어에 대한 전략을 수립해주세요.
+
+다음 항목을 포함하는 YouTube 콘텐츠 전략을 제공해주세요:
+1. 콘텐츠 시장성 및 트렌드 분석
+2. 타겟 시청자 세부 페르소나 및 니즈
+3. 유사 콘텐츠 분석 및 차별화 전략
+4. 핵심 메시지 및 가치 제안
+5. 시리즈/에피소드 구조 제안
+6. 시청자 참여 유도 전략
+""", _YOUTUBE_INPUTS),
+    ("strategy", "블로그"): ("""
+요청 정보의 블로그 콘텐츠 아이디어에 대한 전략을 수립해주세요.
+
+다음 항목을 포함하는 블로그 콘텐츠 전략을 작성해주세요:
+1. 블로그 시장/니치 분석
+2. 타겟 독자 페르소나 및 관심사
+3. 주요 경쟁 블로그 분석 및 차별화 포인트
+4. 핵심 주제 클러스터 및 콘텐츠 필러
+5. 타임리스 vs. 시의성 콘텐츠 균형
+6. SEO 및 독자 유입 전략 방향
+""", _BLOG_INPUTS),
+    ("strategy", "인스타그램"): ("""
+요청 정보의 인스타그램 콘텐츠 아이디어에 대한 전략을 수립해주세요.
+
+다음 구조로 인스타그램 콘텐츠 전략을 제시해주세요:
+
+1. 인스타그램 트렌드 및 알고리즘 분석
+   - 현재 인기 있는 콘텐츠 유형
+   - 최신 인스타그램 알고리즘 고려사항
+   - 참여율 높은 콘텐츠 패턴
+
+2. 비주얼 아이덴티티 및 브랜딩 전략
+   - 색상 팔레트 및 시각적 일관성
+   - 그리드/피드 구성 컨셉
+   - 스토리와 릴스 활용 방향
+
+3. 콘텐츠 필러 및 주제 분류
+   - 핵심 콘텐츠 카테고리
+   - 정기 시리즈 아이디어
+   - 참여 유도 콘텐츠 유형
+""", _INSTAGRAM_INPUTS),
+    ("strategy", "통합 콘텐츠"): ("""
+요청 정보에 대한 통합 콘텐츠 전략(YouTube, 블로그, 인스타그램)을 수립해주세요.
+
+다음 구조로 통합 콘텐츠 전략을 제시해주세요:
+
+1. 크로스 플랫폼 브랜드 아이덴티티
+   - 일관된 브랜드 메시지 및 톤
+   - 플랫폼별 브랜딩 변형
+   - 핵심 차별화 포인트
+
+2. 콘텐츠 생태계 설계
+   - 플랫폼별 역할 정의
+   - 콘텐츠 재활용 전략
+   - 플랫폼 간 상호 연결 방법
+
+3. 통합 오디언스 여정 설계
+   - 오디언스 유입 및 전환 경로
+   - 각 플랫폼별 타겟 오디언스 세그먼트
+   - 교차 홍보 전략
+""", _INTEGRATED_INPUTS),
+    ("strategy", None): ("""
+요청 정보의 콘텐츠 요청에 대한 전략을 수립해주세요.
+
+콘텐츠 시장 분석, 타겟 오디언스 정의, 차별화 전략, 핵심 콘텐츠 방향성을 포함한 종합적인 전략을 제공해주세요.
+""", None),
+
+    ("content", "YouTube"): ("""
+YouTube 콘텐츠를 위한 창의적 개발 계획을 제안해주세요:
+
+1. 영상 구성 및 스토리보드 아이디어
+   - 훅(시작 부분) 디자인
+   - 스토리 구조 및 흐름
+   - 핵심 시각적 장면 구성
+
+2. 스크립트 및 내레이션 가이드
+   - 스크립트 톤과 스타일
+   - 핵심 대사 및 표현
+   - 청중 참여 기법
+
+3. 시각/청각적 요소 계획
+   - 영상 스타일 및 편집 기법
+   - 음악 및 사운드 디자인
+   - 그래픽 및 애니메이션 요소
+
+4. 썸네일 및 타이틀 기획
+   - 클릭을 유도하는 썸네일 컨셉
+   - 매력적인 타이틀 구조
+   - A/B 테스트 옵션
+""", _YOUTUBE_INPUTS + [("채널 스타일", "channel_style", "")]),
+    ("content", "블로그"): ("""
+블로그 콘텐츠를 위한 창의적 개발 계획을 제안해주세요:
+
+1. 글 구조 및 스토리텔링 전략
+   - 주목을 끄는 인트로 접근법
+   - 정보 흐름 및 논리 구조
+   - 결론 및 행동 유도 전략
+
+2. 콘텐츠 포맷 및 시각적 요소
+   - 섹션 구분 및 소제목 전략
+   - 이미지/그래픽 활용 방안
+   - 인포그래픽 및 시각 자료 아이디어
+
+3. 독자 참여 유도 기법
+   - 공감 형성 및 스토리텔링 기법
+   - 질문 및 상호작용 요소
+   - 공유하고 싶은 인사이트 설계
+
+4. 제목 및 메타 콘텐츠 기획
+   - 클릭을 유도하는 헤드라인 구조
+   - 서브헤딩 및 메타 설명
+   - 내부/외부 링크 전략
+""", _BLOG_INPUTS + [("블로그 스타일", "blog_style", "")]),
+    ("content", "인스타그램"): ("""
+인스타그램 콘텐츠를 위한 창의적 개발 계획을 제안해주세요:
+
+1. 피드 포스트 창작 전략
+   - 시선을 사로잡는 비주얼 컨셉
+   - 캡션 스토리텔링 접근법
+   - 감정 연결 및 공감 요소
+
+2. 스토리 및 릴스 컨텐츠 아이디어
+   - 릴스 포맷 및 구성 아이디어
+   - 스토리 시퀀스 및 상호작용 요소
+   - 오디오/음악 활용 전략
+
+3. 비주얼 디자인 가이드
+   - 이미지 스타일 및 편집 접근법
+   - 색상 및 시각적 요소 활용
+   - 텍스트 오버레이 및 그래픽 요소
+
+4. 참여 촉진 콘텐츠 아이디어
+   - 질문 및 토론 유도 방식
+   - 해시태그 및 커뮤니티 참여 전략
+   - 공유 가능성 높은 콘텐츠 유형
+""", _INSTAGRAM_INPUTS + [("시각적 스타일", "visual_style", "")]),
+    ("content", "통합 콘텐츠"): ("""
+통합 콘텐츠(YouTube, 블로그, 인스타그램)를 위한 창의적 개발 계획을 제안해주세요:
+
+1. 핵심 스토리/메시지 개발
+   - 플랫폼 전반의 일관된 스토리 라인
+   - 플랫폼별 변형 접근법
+   - 핵심 메시지 및 테마 요소
+
+2. 플랫폼별 창의적 변형 전략
+   - 콘텐츠 재구성 및 리퍼포징 방법
+   - 플랫폼별 강점 활용 접근법
+   - 시각적/텍스트적 변환 가이드
+
+3. 크로스 플랫폼 시각적 아이덴티티
+   - 일관된 비주얼 요소 및 브랜딩
+   - 플랫폼별 시각적 변형 방법
+   - 통합 디자인 에셋 아이디어
+
+4. 콘텐츠 시리즈 및 캠페인 구조
+   - 플랫폼 간 상호 보완적 시리즈
+   - 시간차 발행 및 연결 전략
+   - 통합 스토리텔링 접근법
+""", _INTEGRATED_INPUTS + [("브랜드 스타일", "brand_style", "")]),
+    ("content", None): ("""
+요청 정보의 콘텐츠 요청에 대한 창의적 개발 계획을 제안해주세요.
+
+매력적인 스토리텔링 구조, 시각적/청각적 요소, 감정적 연결 전략, 참여 유도 방법을 구체적으로 제시해주세요.
+""", None),
+
+    ("platform", "YouTube"): ("""
+YouTube 콘텐츠를 위한 플랫폼 최적화 및 유통 전략을 제안해주세요:
+
+1. YouTube 알고리즘 최적화 전략
+   - 타이틀, 설명, 태그 최적화
+   - 시청 지속성 및 참여율 향상 방법
+   - 추천 알고리즘 활용 전략
+
+2. 발행 및 프로모션 계획
+   - 최적 업로드 타이밍 및 주기
+   - 초기 참여 유도 전략
+   - 크로스 프로모션 방법
+
+3. 데이터 기반 개선 방법론
+   - 핵심 성과 지표(KPI) 설정
+   - 분석 모니터링 및 인사이트 발굴
+   - A/B 테스트 접근법
+
+4. 커뮤니티 구축 및 확장 전략
+   - 댓글 관리 및 시청자 참여 전략
+   - 구독자 확보 및 유지 방법
+   - 콘텐츠 생태계 확장 방안
+""", _YOUTUBE_INPUTS + [("채널 규모", "channel_size", "신규/소규모")]),
+    ("platform", "블로그"): ("""
+블로그 콘텐츠를 위한 플랫폼 최적화 및 유통 전략을 제안해주세요:
+
+1. SEO 최적화 전략
+   - 키워드 리서치 및 활용 방법
+   - 온페이지 SEO 요소 최적화
+   - 내/외부 링크 전략
+
+2. 콘텐츠 발행 및 유통 계획
+   - 최적 발행 타이밍 및 주기
+   - 소셜 미디어 공유 전략
+   - 이메일 마케팅 및 뉴스레터 활용
+
+3. 데이터 분석 및 성과 최적화
+   - 트래픽 및 참여 지표 모니터링
+   - 전환율 최적화 방법
+   - 콘텐츠 업데이트 및 리퍼포징 전략
+
+4. 독자 커뮤니티 구축 방안
+   - 댓글 관리 및 독자 참여 전략
+   - 충성 독자층 개발 방법
+   - 협업 및 게스트 포스팅 활용
+""", _BLOG_INPUTS + [("블로그 플랫폼", "blog_platform", "")]),
+    ("platform", "인스타그램"): ("""
+인스타그램 콘텐츠를 위한 플랫폼 최적화 및 유통 전략을 제안해주세요:
+
+1. 인스타그램 알고리즘 최적화
+   - 해시태그 전략 및 최적화
+   - 캡션 및 호출 행동(CTA) 최적화
+   - 탐색 페이지 노출 향상 방법
+
+2. 게시 및 참여 전략
+   - 최적 포스팅 타이밍 및 빈도
+   - 스토리, 릴스, 피드 통합 전략
+   - 참여율 증대 전술
+
+3. 성장 및 영향력 확대 방법
+   - 팔로워 확보 및 유지 전략
+   - 협업 및 인플루언서 활용
+   - 크로스 프로모션 기회
+
+4. 분석 및 최적화 프레임워크
+   - 주요 성과 지표 모니터링
+   - 인사이트 기반 콘텐츠 조정
+   - 지속적 실험 및 최적화 접근법
+""", _INSTAGRAM_INPUTS + [("계정 규모", "account_size", "신규/소규모")]),
+    ("platform", "통합 콘텐츠"): ("""
+통합 콘텐츠(YouTube, 블로그, 인스타그램)를 위한 플랫폼 최적화 및 유통 전략을 제안해주세요:
+
+1. 통합 콘텐츠 발행 전략
+   - 플랫폼별 최적 발행 순서 및 타이밍
+   - 크로스 플랫폼 프로모션 흐름
+   - 콘텐츠 형식별 배포 계획
+
+2. 플랫폼 간 시너지 최대화
+   - 트래픽 및 청중 이동 경로 최적화
+   - 플랫폼별 강점 극대화 방법
+   - 참여 및 전환 경로 설계
+
+3. 통합 데이터 분석 체계
+   - 크로스 플랫폼 성과 측정 방법
+   - 통합 KPI 설정 및 모니터링
+   - 데이터 기반 리소스 배분 전략
+
+4. 장기 성장 및 확장 로드맵
+   - 단계별 성장 목표 및 전략
+   - 콘텐츠 에코시스템 확장 방법
+   - 채널 간 상호 강화 메커니즘
+""", _INTEGRATED_INPUTS + [("현재 채널 상태", "current_status", "신규/소규모")]),
+    ("platform", None): ("""
+요청 정보의 콘텐츠 요청에 대한 플랫폼 최적화 및 유통 전략을 제안해주세요.
+
+플랫폼 최적화, 발행 및 유통 전략, 성과 측정 방법, 커뮤니티 구축 접근법을 구체적으로 제시해주세요.
+""", None),
+}
+
+# 통합 콘텐츠 fan-out 모드의 크로스 플랫폼 통합 호출
+_MERGE_TASK = """
+요청 정보와 함께 같은 브랜드를 위해 플랫폼별로 따로 수립된 최종 조언이 제공됩니다.
+
+개별 조언을 반복하지 말고, 플랫폼 간 시너지에만 집중하여 간결하게 정리해주세요:
+1. 플랫폼별 역할 분담과 발행 순서 및 타이밍
+2. 콘텐츠 리퍼포징 및 교차 홍보 흐름
+3. 통합 KPI와 리소스 배분 우선순위
+"""
+_MERGE_INPUTS = [("주제/브랜드", "topic", ""), ("목표/목적", "goals", ""), ("주력 플랫폼", "primary_platform", ""),
+                 ("콘텐츠 생산 역량", "content_volume", "")]
+
+# 단계 간 전달 텍스트 요약 (요약 분량은 압축기의 예산에 맞춰 요청마다 전달)
+_SUMMARY_TASK = """
+요청 정보와 함께 제공되는 전문가 분석을 다음 전문가가 이어서 작업할 수 있도록 요약해주세요.
+핵심 결론, 타겟 오디언스, 구조(번호 목록), 구체적인 수치와 아이디어는 반드시 남기고
+요청 정보의 요약 분량 이내로 작성해주세요.
+"""
+_SUMMARY_INPUTS = [("요약 분량(토큰)", "summary_tokens", "")]
+
+
+class RenderedPrompt:
+    """
+    템플릿에 요청 값을 채운 프롬프트
+    고정 접두부(template.prefix)와 요청별 접미부(suffix)를 따로 보관
+    """
+
+    def __init__(self, template, suffix):
+        self.template = template
+        self.suffix = suffix
+
+    @property
+    def prefix(self):
+        return self.template.prefix
+
+    @property
+    def text(self):
+        """
+        접두부와 접미부를 이어 붙인 전체 프롬프트 (접두부 캐시를 쓰지 않을 때 전송하는 내용)
+        """
+        return f"{self.template.prefix}\n\n{self.suffix}"
+
+    def __str__(self):
+        return self.text
+
+
+class PromptTemplate:
+    """
+    미리 만들어 둔 전문가 프롬프트 템플릿
+    """
+
+    def __init__(self, stage, service_type, prefix, inputs=None, previous_label=None):
+        """
+        Args:
+            stage (str): 단계 이름
+            service_type (str): 서비스 유형 (None이면 일반 템플릿)
+            prefix (str): 요청과 무관한 고정 접두부 (전문가 소개 + 작업 지시)
+            inputs (list): (표시 이름, 입력 키, 기본값) 목록 (None이면 입력 전체를 그대로 전달)
+            previous_label (str): 이전 단계 분석을 감쌀 구분선 이름 (None이면 그대로 붙임)
+        """
+        self.stage = stage
+        self.service_type = service_type
+        self.prefix = prefix
+        self.inputs = inputs
+        self.previous_label = previous_label
+        # 접두부 내용 해시 (캐시 핸들 구분용)
+        self.prefix_id = hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def fields(self):
+        """
+        이 템플릿이 사용하는 입력 키 목록 (None이면 모든 입력을 사용)
+        """
+        if self.inputs is None:
+            return None
+        return tuple(key for _, key, _ in self.inputs)
+
+    def render(self, service_type, input_data, previous=None):
+        """
+        요청별 접미부를 채워 프롬프트 생성
+        Args:
+            service_type (str): 서비스 유형
+            input_data (dict): 사용자 입력 데이터
+            previous (str): 이전 단계 분석 (없으면 생략)
+        Returns:
+            RenderedPrompt: 완성된 프롬프트
+        """
+        lines = ["=== 요청 정보 ==="]
+        if self.inputs is None:
+            lines.append(f"서비스 유형: {service_type}")
+            lines.append(f"요청 내용: {str(input_data)}")
+        else:
+            lines.extend(f"{label}: {input_data.get(key, default)}" for label, key, default in self.inputs)
+        suffix = "\n".join(lines)
+
+        if previous is not None:
+            if self.previous_label:
+                previous = f"=== {self.previous_label} ===\n{previous}\n=== 분석 끝 ==="
+            suffix = f"{previous}\n\n{suffix}"
+        return RenderedPrompt(self, suffix)
+
+
+def _persona_header(stage):
+    persona = PERSONAS[stage]
+    return f"당신은 '{persona['name']}'이라는 {persona['role']}입니다.\n{persona['intro'].strip()}"
+
+
+def _stage_template(stage, service_type, task, inputs):
+    """
+    단계 프롬프트 템플릿 하나 생성 (전문가 소개 + 이전 분석 안내 + 작업 지시 + 마무리 지시)
+    """
+    frame = _STAGE_FRAMES[stage]
+    parts = [_persona_header(stage), frame["review"], task.strip(), frame["closing"].strip()]
+    prefix = "\n\n".join(part for part in parts if part)
+    return PromptTemplate(stage, service_type, prefix, inputs, frame["previous_label"])
+
+
+def _compile_templates():
+    """
+    등록된 작업 지시로 모든 템플릿의 고정 접두부를 미리 생성
+    """
+    templates = {}
+    for (stage, service_type), (task, inputs) in _TASKS.items():
+        templates[(stage, service_type)] = _stage_template(stage, service_type, task, inputs)
+
+    merge_prefix = f"{_persona_header('platform')}\n\n{_MERGE_TASK.strip()}"
+    templates[("platform", "merge")] = PromptTemplate("platform", "merge", merge_prefix, _MERGE_INPUTS)
+
+    summary_prefix = f"{_persona_header('summary')}\n\n{_SUMMARY_TASK.strip()}"
+    templates[("summary", None)] = PromptTemplate("summary", None, summary_prefix, _SUMMARY_INPUTS, "분석")
+
+    # 통합 모드: 서비스 유형별로 세 단계의 작업 지시를 한 프롬프트로 합치고 입력 필드는 합집합 사용
+    for service_type in {service_type for _, service_type in _TASKS}:
+        sections, inputs = [], {}
+        for stage in FUSED_SECTIONS:
+            task, stage_inputs = _TASKS[(stage, service_type)]
+            persona = PERSONAS[stage]
+            sections.append(f"### \"{stage}\" 항목: {persona['name']}\n{task.strip()}\n\n{_STAGE_FRAMES[stage]['closing'].strip()}")
+            for label, key, default in stage_inputs or []:
+                inputs.setdefault(key, (label, key, default))
+        prefix = "\n\n".join([
+            _persona_header("fused"),
+            "세 전문가의 작업을 순서대로 수행하되, 뒤 전문가는 앞 전문가의 결과를 이어받아 보완해주세요.\n"
+            "결과는 strategy, content, platform 세 항목을 가진 JSON 객체로만 답하고, "
+            "각 항목의 값은 해당 전문가의 분석을 담은 마크다운 문자열로 작성해주세요.",
+            *sections
+        ])
+        templates[("fused", service_type)] = PromptTemplate(
+            "fused", service_type, prefix, list(inputs.values()) if service_type is not None else None
+        )
+
+    # 변형 후보: (서비스 유형, 섹션, 배치 모드)마다 템플릿 하나
+    # 후보 수 모드는 후보 하나를 작성하게 하고 API의 candidate_count로 여러 개를 받으며,
+    # 배치 모드는 요청 정보의 후보 개수만큼 서로 다른 후보를 JSON 배열로 작성하게 함
+    for service_type, sections in VARIANT_SECTIONS.items():
+        for section, (label, instruction) in sections.items():
+            for batch in (False, True):
+                answer = (f"서로 다른 방향의 {label} 후보를 요청 정보의 '후보 개수'만큼 작성하여 문자열 배열(JSON)로만 답하세요."
+                          if batch else f"설명이나 번호 없이 {label} 결과만 답하세요.")
+                prefix = "\n\n".join([
+                    _persona_header("variants"),
+                    "요청 정보와 함께 제공되는 창작 계획이 있으면 그 방향에 맞춰 작성해주세요.",
+                    instruction,
+                    answer
+                ])
+                inputs = _VARIANT_INPUTS[service_type] + ([("후보 개수", "variant_count", 3)] if batch else [])
+                templates[("variants", (service_type, section, batch))] = PromptTemplate(
+                    "variants", service_type, prefix, inputs, "창작 계획"
+                )
+    return templates
+
+
+# (단계, 서비스 유형) -> PromptTemplate
+TEMPLATES = _compile_templates()
+
+
+def get_template(stage, service_type):
+    """
+    단계와 서비스 유형에 맞는 템플릿 반환 (등록되지 않은 서비스 유형은 일반 템플릿)
+    """
+    return TEMPLATES.get((stage, service_type)) or TEMPLATES[(stage, None)]
+
+
+def get_variant_template(service_type, section, batch=False):
+    """
+    변형 후보 섹션 템플릿 반환
+    Args:
+        service_type (str): 서비스 유형 (VARIANT_SECTIONS에 등록된 유형)
+        section (str): 섹션 이름
+        batch (bool): True이면 한 응답에 여러 후보를 JSON 배열로 받는 템플릿
+    """
+    return TEMPLATES[("variants", (service_type, section, batch))]
+
+
+def register_stage(stage, persona, task, inputs=None, service_type=None, previous_label="이전 단계의 분석",
+                   review="", closing=""):
+    """
+    새 전문가 단계(SEO 분석, 썸네일 아이디어, 해시태그 조사 등)의 전문가 소개와 프롬프트 템플릿 등록
+    등록한 단계는 StageNode(단계, CreativeExpert, needs=...)로 그래프에 추가하면 파이프라인 코드 수정 없이 실행됨
+    같은 단계를 다시 등록하면 전문가 소개와 해당 서비스 유형의 템플릿을 교체
+    Args:
+        stage (str): 단계 이름 (모델 라우팅, 재시도 정책, 지표에도 같은 이름 사용)
+        persona (dict): 전문가 소개 {"expertise", "name", "role", "intro"}
+        task (str): 작업 지시
+        inputs (list): (표시 이름, 입력 키, 기본값) 목록 (None이면 입력 전체를 그대로 전달)
+        service_type (str): 이 템플릿을 쓸 서비스 유형 (None이면 모든 서비스 유형에 쓰는 일반 템플릿)
+        previous_label (str): 앞 단계 출력을 감쌀 구분선 이름
+        review (str): 앞 단계 출력을 어떻게 읽을지에 대한 안내 (작업 지시 앞에 붙음)
+        closing (str): 마무리 지시 (작업 지시 뒤에 붙음)
+    Returns:
+        PromptTemplate: 등록된 템플릿
+    Raises:
+        ValueError: 기존 전문가 단계 이름을 쓰거나 전문가 소개에 필요한 항목이 없는 경우
+    """
+    if stage in FUSED_SECTIONS or stage in ("fused", "variants", "summary"):
+        raise ValueError(f"기본 전문가 단계는 다시 등록할 수 없습니다: {stage}")
+    missing = [key for key in ("expertise", "name", "role", "intro") if key not in persona]
+    if missing:
+        raise ValueError(f"전문가 소개에 필요한 항목이 없습니다: {', '.join(missing)}")
+    PERSONAS[stage] = dict(persona)
+    _STAGE_FRAMES[stage] = {"previous_label": previous_label, "review": review, "closing": closing}
+    _TASKS[(stage, service_type)] = (task, inputs)
+    template = TEMPLATES[(stage, service_type)] = _stage_template(stage, service_type, task, inputs)
+    return template
+
+
+# ============================================================================
+# 접두부 컨텍스트 캐시
+# ============================================================================
+
+# 제공자 컨텍스트 캐시의 최소 크기 (토큰, 이보다 작은 접두부는 제공자가 캐시를 만들지 않음)
+PROVIDER_MIN_CACHE_TOKENS = 1024
+
+# 제공자 캐시에 업로드하는 단계
+# 현재 템플릿 접두부는 로컬 추정으로 약 110~890 토큰이고 통합 모드 접두부만 최소 크기에 가까우므로,
+# 기본값은 통합 모드만 업로드하고 나머지 단계는 로컬 대역(LocalPrefixCache)과 같이 전체 프롬프트를 전송
+# (업로드 대상 단계도 실제 토큰 수가 최소 크기보다 작으면 전체 프롬프트 전송, 건너뛴 수는 stats()의 small_prefixes)
+PROVIDER_CACHE_STAGES = ("fused",)
+
+class LocalPrefixCache:
+    """
+    오프라인 테스트용 접두부 캐시 대역
+    접두부마다 로컬 핸들을 한 번만 발급하고 캐시됐다면 절약됐을 토큰 수를 기록하지만,
+    실제 호출에는 접두부와 접미부 전체를 그대로 전송
+    """
+
+    def __init__(self):
+        self._handles = {}  # (모델 이름, 접두부 해시) -> 핸들
+        self._lock = threading.Lock()
+        self._stats = {"handles": 0, "hits": 0, "inline": 0, "cached_tokens": 0, "suffix_tokens": 0}
+
+    def bind(self, model, prompt):
+        """
+        호출에 사용할 모델과 전송할 내용 결정
+        Args:
+            model (GenerativeModel): 전문가가 사용하는 기본 모델
+            prompt (RenderedPrompt): 완성된 프롬프트
+        Returns:
+            tuple: (호출할 모델, 전송할 프롬프트 텍스트)
+        """
+        key = (model.model_name, prompt.template.prefix_id)
+        with self._lock:
+            if key not in self._handles:
+                self._handles[key] = f"local/{prompt.template.prefix_id}"
+                self._stats["handles"] += 1
+            self._record_hit(prompt)
+        return model, prompt.text
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _record_hit(self, prompt):
+        # 잠금을 잡은 상태에서 호출
+        self._stats["hits"] += 1
+        self._stats["cached_tokens"] += estimate_tokens(prompt.prefix)
+        self._stats["suffix_tokens"] += estimate_tokens(prompt.suffix)
+
+
+class ProviderPrefixCache(LocalPrefixCache):
+    """
+    제공자 측 컨텍스트 캐시(cached content)를 사용하는 접두부 캐시
+    업로드 대상 단계의 접두부를 system_instruction으로 한 번 업로드하고, 이후 호출은 캐시 핸들에 묶인 모델로 접미부만 전송
+    대상이 아닌 단계는 로컬 대역과 같이 처리하고, 최소 캐시 크기보다 작은 접두부이거나 업로드에 실패하면 전체 프롬프트 전송
+    """
+
+    def __init__(self, ttl_seconds=3600, min_prefix_tokens=PROVIDER_MIN_CACHE_TOKENS, stages=PROVIDER_CACHE_STAGES):
+        """
+        Args:
+            ttl_seconds (int): 캐시 보관 시간 (초, 만료 직전에 다시 업로드)
+            min_prefix_tokens (int): 이보다 짧은 접두부는 업로드하지 않음 (제공자 최소 캐시 크기)
+            stages (tuple): 제공자 캐시에 업로드할 단계 (None이면 모든 단계)
+        """
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.min_prefix_tokens = min_prefix_tokens
+        self.stages = None if stages is None else frozenset(stages)
+        self._stats.update({"small_prefixes": 0, "local": 0})
+        self._models = {}   # (모델 이름, 접두부 해시) -> (캐시에 묶인 모델, 만료 시각)
+        self._failed = set()
+        self._upload_locks = {}  # (모델 이름, 접두부 해시) -> 업로드 잠금
+
+    def bind(self, model, prompt):
+        if self.stages is not None and prompt.template.stage not in self.stages:
+            # 업로드 대상이 아닌 단계: 로컬 대역과 같이 전체 프롬프트 전송 (캐시 참조로는 집계하지 않음)
+            with self._lock:
+                self._stats["local"] += 1
+            return model, prompt.text
+        key = (model.model_name, prompt.template.prefix_id)
+        bound = self._bound_model(key, model, prompt.template)
+        with self._lock:
+            if bound is None:
+                self._stats["inline"] += 1
+                return model, prompt.text
+            self._record_hit(prompt)
+        return bound, prompt.suffix
+
+    def _bound_model(self, key, model, template):
+        found, bound = self._lookup(key)
+        if found:
+            return bound
+        with self._lock:
+            upload_lock = self._upload_locks.setdefault(key, threading.Lock())
+        # 같은 접두부의 첫 호출이 동시에 들어와도 업로드는 한 번만 (나머지는 업로드가 끝나면 같은 캐시 사용)
+        with upload_lock:
+            found, bound = self._lookup(key)
+            if found:
+                return bound
+            if not self._large_enough(model, template):
+                with self._lock:
+                    self._failed.add(key)
+                    self._stats["small_prefixes"] += 1
+                return None
+
+            try:
+                bound = self._upload(model, template)
+            except Exception:
+                # 지원하지 않는 모델, 권한 문제 등은 다시 시도하지 않고 전체 프롬프트 전송
+                with self._lock:
+                    self._failed.add(key)
+                return None
+            with self._lock:
+                self._models[key] = (bound, time.monotonic() + self.ttl_seconds * 0.9)
+                self._stats["handles"] += 1
+            return bound
+
+    def _lookup(self, key):
+        # (판단 완료 여부, 캐시에 묶인 모델): 업로드하지 않기로 한 접두부는 (True, None), 만료되었거나 처음이면 (False, None)
+        with self._lock:
+            if key in self._failed:
+                return True, None
+            entry = self._models.get(key)
+            if entry is not None and time.monotonic() < entry[1]:
+                return True, entry[0]
+        return False, None
+
+    def _large_enough(self, model, template):
+        # 로컬 추정치가 최소 크기의 절반보다 작으면 API 호출 없이 건너뛰고, 가까우면 실제 토큰 수로 판단
+        estimate = estimate_tokens(template.prefix)
+        if estimate < self.min_prefix_tokens // 2:
+            return False
+        try:
+            tokens = model.count_tokens(template.prefix).total_tokens
+        except Exception:
+            tokens = estimate
+        return tokens >= self.min_prefix_tokens
+
+    def _upload(self, model, template):
+        # 모델에 연결된 API 키 전용 클라이언트로 캐시를 만들고, 같은 클라이언트로 캐시를 참조하는 모델 생성
+        # (이 기능이 없는 모델(벤치마크용 가짜 모델 등)은 AttributeError로 실패하여 전체 프롬프트 전송)
+        name = model.create_cached_content(template.prefix, f"creator-partner-{template.prefix_id}",
+                                           self.ttl_seconds)
+        return model.with_cached_content(name)
+
+
+def create_prefix_cache(mode=None):
+    """
+    설정에 맞는 접두부 캐시 생성
+    provider 모드도 CREATOR_PARTNER_PREFIX_CACHE_STAGES(쉼표 구분, 기본값: 통합 모드)의 단계만 업로드하고
+    나머지 단계는 local 모드와 같이 전체 프롬프트를 전송 ("all"이면 크기 검사를 통과한 모든 단계 업로드)
+    Args:
+        mode (str): "provider" | "local" | "off" (기본값: CREATOR_PARTNER_PREFIX_CACHE 또는 "provider")
+    Returns:
+        LocalPrefixCache | ProviderPrefixCache | None
+    """
+    mode = mode or os.environ.get("CREATOR_PARTNER_PREFIX_CACHE", "provider")
+    if mode == "off":
+        return None
+    if mode == "local":
+        return LocalPrefixCache()
+    stages = os.environ.get("CREATOR_PARTNER_PREFIX_CACHE_STAGES")
+    if stages is None:
+        stages = PROVIDER_CACHE_STAGES
+    elif stages.strip() == "all":
+        stages = None
+    else:
+        stages = tuple(stage.strip() for stage in stages.split(",") if stage.strip())
+    return ProviderPrefixCache(
+        ttl_seconds=int(os.environ.get("CREATOR_PARTNER_PREFIX_CACHE_TTL", 3600)),
+        min_prefix_tokens=int(os.environ.get("CREATOR_PARTNER_PREFIX_CACHE_MIN_TOKENS", PROVIDER_MIN_CACHE_TOKENS)),
+        stages=stages
+    )
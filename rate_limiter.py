@@ -0,0 +1,305 @@
+# ============================================================================
+# 쿼터 인식 요청 스케줄러
+# 모든 전문가의 모델 호출이 거쳐 가는 공용 스케줄러
+#   - 토큰 버킷으로 분당 요청 수(RPM)와 분당 토큰 수(TPM) 제한
+#   - 세션별 대기열을 라운드 로빈으로 처리하여 세션 간 공정한 순서 보장
+#   - 429(쿼터 초과) 응답을 받으면 동시 실행 한도를 절반으로 줄이고 잠시 요청을 멈춤,
+#     이후 성공이 이어지면 한도를 하나씩 다시 늘림 (AIMD)
+# 동기 코드(Streamlit 스레드)와 비동기 코드(이벤트 루프)에서 함께 사용할 수 있음
+# ============================================================================
+
+import asyncio
+import contextvars
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+# 현재 요청을 보낸 세션 ID (공정 대기열 구분용)
+current_session = contextvars.ContextVar("creator_partner_session", default="default")
+
+# 429 계열 예외 이름 (SDK를 임포트하지 않고 판별)
+RATE_LIMIT_ERRORS = {"ResourceExhausted", "TooManyRequests"}
+
+
+@contextmanager
+def session_scope(session_id):
+    """
+    블록 안에서 실행되는 모델 호출을 주어진 세션의 요청으로 표시
+    """
+    token = current_session.set(session_id)
+    try:
+        yield
+    finally:
+        current_session.reset(token)
+
+
+def estimate_tokens(text):
+    """
+    로컬 토큰 수 추정 (한국어 기준 약 2글자당 1토큰)
+    """
+    return max(1, len(text) // 2)
+
+
+def is_rate_limit_error(error):
+    """
+    쿼터 초과(429) 오류 여부 판별
+    """
+    return type(error).__name__ in RATE_LIMIT_ERRORS or getattr(error, "code", None) == 429
+
+
+class TokenBucket:
+    """
+    분당 허용량을 초 단위로 채우는 토큰 버킷
+    실제 사용량 정산을 위해 잔량이 음수(빚)가 될 수 있음
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount):
+        # 버킷 용량보다 큰 요청은 가득 찼을 때 통과시킴
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self.tokens -= amount
+
+    def drain(self):
+        self.tokens = min(self.tokens, 0.0)
+
+
+class _Ticket:
+    """
+    스케줄러 대기열 항목
+    호출이 끝난 뒤 used_tokens에 실제 사용 토큰 수를 기록하면 TPM 버킷을 정산함
+    """
+
+    _ids = itertools.count()
+
+    def __init__(self, session_id, tokens):
+        self.id = next(self._ids)
+        self.session_id = session_id
+        self.tokens = tokens
+        self.used_tokens = None
+
+
+class RateLimitScheduler:
+    """
+    RPM/TPM 토큰 버킷 + 세션 공정 대기열 + 적응형 동시 실행 한도 스케줄러
+    """
+
+    def __init__(self, rpm=60, tpm=1_000_000, max_concurrency=8, min_concurrency=1,
+                 expected_output_tokens=2048, cooldown_seconds=5.0, poll_interval=0.05):
+        """
+        스케줄러 초기화
+        Args:
+            rpm (int): 분당 최대 요청 수
+            tpm (int): 분당 최대 토큰 수 (입력 + 출력)
+            max_concurrency (int): 최대 동시 실행 수
+            min_concurrency (int): 429를 받아도 유지할 최소 동시 실행 수
+            expected_output_tokens (int): 호출 전 TPM 예약 시 더할 예상 출력 토큰 수
+            cooldown_seconds (float): 429를 받은 뒤 새 요청을 보내지 않을 시간 (초)
+            poll_interval (float): 비동기 대기 시 상태 확인 간격 (초)
+        """
+        self.rpm_bucket = TokenBucket(rpm)
+        self.tpm_bucket = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = max_concurrency
+        self.expected_output_tokens = expected_output_tokens
+        self.cooldown_seconds = cooldown_seconds
+        self.poll_interval = poll_interval
+
+        self._cond = threading.Condition()
+        self._queues = {}         # 세션 ID -> 대기 중인 티켓 deque
+        self._rotation = deque()  # 대기 티켓이 있는 세션의 라운드 로빈 순서
+        self._active = 0
+        self._success_streak = 0
+        self._paused_until = 0.0
+        self._stats = {"granted": 0, "rate_limited": 0, "wait_seconds": 0.0}
+
+    @classmethod
+    def from_env(cls):
+        """
+        환경 변수 설정으로 스케줄러 생성
+        CREATOR_PARTNER_RPM, CREATOR_PARTNER_TPM, CREATOR_PARTNER_MAX_CONCURRENCY
+        """
+        return cls(
+            rpm=int(os.environ.get("CREATOR_PARTNER_RPM", 60)),
+            tpm=int(os.environ.get("CREATOR_PARTNER_TPM", 1_000_000)),
+            max_concurrency=int(os.environ.get("CREATOR_PARTNER_MAX_CONCURRENCY", 8))
+        )
+
+    @contextmanager
+    def slot(self, prompt):
+        """
+        모델 호출 한 번을 위한 실행 슬롯 (동기)
+        블록 안에서 429 오류가 발생하면 동시 실행 한도를 줄임
+        """
+        ticket = self.acquire(self._reserve_tokens(prompt))
+        rate_limited = False
+        try:
+            yield ticket
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            raise
+        finally:
+            self.release(ticket, rate_limited)
+
+    @asynccontextmanager
+    async def slot_async(self, prompt):
+        """
+        모델 호출 한 번을 위한 실행 슬롯 (비동기)
+        """
+        ticket = await self.acquire_async(self._reserve_tokens(prompt))
+        rate_limited = False
+        try:
+            yield ticket
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            raise
+        finally:
+            self.release(ticket, rate_limited)
+
+    def acquire(self, tokens):
+        """
+        차례가 오고 쿼터가 허용될 때까지 대기한 뒤 티켓 반환 (동기)
+        """
+        ticket = self._enqueue(tokens)
+        started = time.monotonic()
+        try:
+            with self._cond:
+                while True:
+                    wait = self._try_grant(ticket)
+                    if wait is None:
+                        self._stats["wait_seconds"] += time.monotonic() - started
+                        return ticket
+                    self._cond.wait(timeout=wait)
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+    async def acquire_async(self, tokens):
+        """
+        차례가 오고 쿼터가 허용될 때까지 대기한 뒤 티켓 반환 (비동기)
+        """
+        ticket = self._enqueue(tokens)
+        started = time.monotonic()
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_grant(ticket)
+                if wait is None:
+                    with self._cond:
+                        self._stats["wait_seconds"] += time.monotonic() - started
+                    return ticket
+                await asyncio.sleep(min(wait, self.poll_interval))
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+    def release(self, ticket, rate_limited=False):
+        """
+        호출 종료 처리: 실제 사용 토큰 정산 및 동시 실행 한도 조정
+        """
+        with self._cond:
+            self._active -= 1
+            if ticket.used_tokens is not None:
+                # 예약한 토큰과 실제 사용량의 차이를 돌려주거나 추가로 차감
+                self.tpm_bucket.tokens += ticket.tokens - ticket.used_tokens
+            if rate_limited:
+                self._stats["rate_limited"] += 1
+                self._success_streak = 0
+                self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit // 2)
+                self.rpm_bucket.drain()
+                self._paused_until = time.monotonic() + self.cooldown_seconds
+            else:
+                self._success_streak += 1
+                if self._success_streak >= self.concurrency_limit and self.concurrency_limit < self.max_concurrency:
+                    self.concurrency_limit += 1
+                    self._success_streak = 0
+            self._cond.notify_all()
+
+    def stats(self):
+        """
+        스케줄러 현황 반환
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "active": self._active,
+                "waiting": sum(len(queue) for queue in self._queues.values()),
+                "concurrency_limit": self.concurrency_limit
+            })
+        return stats
+
+    def _reserve_tokens(self, prompt):
+        return estimate_tokens(prompt) + self.expected_output_tokens
+
+    def _enqueue(self, tokens):
+        ticket = _Ticket(current_session.get(), tokens)
+        with self._cond:
+            queue = self._queues.get(ticket.session_id)
+            if queue is None:
+                queue = self._queues[ticket.session_id] = deque()
+                self._rotation.append(ticket.session_id)
+            queue.append(ticket)
+        return ticket
+
+    def _try_grant(self, ticket):
+        # 잠금을 잡은 상태에서 호출. 허용되면 None, 아니면 다시 확인할 때까지의 대기 시간 반환
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        # 라운드 로빈 차례인 세션의 첫 번째 티켓만 진행 가능
+        head_session = self._rotation[0]
+        if self._queues[head_session][0] is not ticket:
+            return 1.0
+        if self._active >= self.concurrency_limit:
+            return 1.0
+
+        self.rpm_bucket.refill(now)
+        self.tpm_bucket.refill(now)
+        wait = max(self.rpm_bucket.wait_time(1), self.tpm_bucket.wait_time(ticket.tokens))
+        if wait > 0:
+            return wait
+
+        self.rpm_bucket.consume(1)
+        self.tpm_bucket.consume(ticket.tokens)
+        self._active += 1
+        self._stats["granted"] += 1
+        self._dequeue(ticket)
+        # 대기열 차례가 바뀌었으므로 다른 대기자에게 알림
+        self._cond.notify_all()
+        return None
+
+    def _dequeue(self, ticket):
+        # 티켓을 대기열에서 빼고, 그 세션에 대기 티켓이 남아 있으면 순서의 맨 뒤로 보냄
+        queue = self._queues[ticket.session_id]
+        queue.remove(ticket)
+        self._rotation.remove(ticket.session_id)
+        if queue:
+            self._rotation.append(ticket.session_id)
+        else:
+            del self._queues[ticket.session_id]
+
+    def _cancel(self, ticket):
+        # 대기 중에 취소된 티켓 정리
+        with self._cond:
+            queue = self._queues.get(ticket.session_id)
+            if queue is not None and ticket in queue:
+                self._dequeue(ticket)
+                self._cond.notify_all()
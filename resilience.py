@@ -0,0 +1,252 @@
+# ============================================================================
+# 모델 호출 안정성 정책
+#   - 단계별 시간 제한 (request_options 타임아웃 + 비동기 wait_for)
+#   - 일시적 오류(쿼터 초과, 서버 과부하, 시간 초과 등)에 대한 지수 백오프 재시도
+#   - 선택적 헤징: 단계의 p95 지연 시간을 넘기면 같은 요청을 하나 더 보내고 먼저 온 응답을 사용
+# ============================================================================
+
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# 재시도할 일시적 오류 이름 (SDK를 임포트하지 않고 판별)
+TRANSIENT_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "Aborted", "TimeoutError", "ConnectionError"
+}
+
+# 동기 헤징 요청을 실행할 공용 스레드 풀
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="creator-partner-hedge")
+
+
+def is_transient_error(error):
+    """
+    재시도로 해결될 수 있는 일시적 오류인지 판별
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return type(error).__name__ in TRANSIENT_ERRORS or getattr(error, "code", None) in (429, 500, 503, 504)
+
+
+class StagePolicy:
+    """
+    한 단계의 호출 정책
+    """
+
+    def __init__(self, timeout=180.0, max_attempts=3, base_delay=1.0, max_delay=30.0,
+                 hedge=False, hedge_delay=None):
+        """
+        Args:
+            timeout (float): 호출 한 번의 시간 제한 (초, None이면 제한 없음)
+            max_attempts (int): 최대 시도 횟수 (첫 시도 포함)
+            base_delay (float): 첫 재시도 전 기본 대기 시간 (초)
+            max_delay (float): 재시도 대기 시간 상한 (초)
+            hedge (bool): 헤징 요청 사용 여부
+            hedge_delay (float): 지연 시간 기록이 충분하지 않을 때 사용할 헤징 기준 시간 (초)
+        """
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+
+    def backoff(self, attempt):
+        """
+        attempt번째 실패 후 대기 시간 (지수 백오프 + full jitter)
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class LatencyTracker:
+    """
+    단계별 최근 호출 지연 시간 기록 (헤징 기준 p95 계산용)
+    """
+
+    def __init__(self, window=200, min_samples=20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._samples.setdefault(stage, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, stage, q):
+        """
+        단계의 지연 시간 백분위 (기록이 min_samples보다 적으면 None)
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(stage, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class ResiliencePolicy:
+    """
+    단계별 시간 제한, 재시도, 헤징 정책 모음
+    """
+
+    def __init__(self, default=None, stages=None):
+        """
+        Args:
+            default (StagePolicy): 단계별 정책이 없을 때 사용할 기본 정책
+            stages (dict): 단계 이름("strategy", "content", "platform") -> StagePolicy
+        """
+        self.default = default or StagePolicy()
+        self.stages = stages or {}
+        self.latency = LatencyTracker()
+        self._lock = threading.Lock()
+        self._stats = {"retries": 0, "timeouts": 0, "hedged": 0, "hedge_wins": 0}
+
+    @classmethod
+    def from_env(cls):
+        """
+        환경 변수 설정으로 정책 생성
+        CREATOR_PARTNER_STAGE_TIMEOUT, CREATOR_PARTNER_MAX_ATTEMPTS, CREATOR_PARTNER_HEDGE
+        """
+        timeout = os.environ.get("CREATOR_PARTNER_STAGE_TIMEOUT", "180")
+        return cls(StagePolicy(
+            timeout=float(timeout) if timeout else None,
+            max_attempts=int(os.environ.get("CREATOR_PARTNER_MAX_ATTEMPTS", 3)),
+            hedge=os.environ.get("CREATOR_PARTNER_HEDGE", "0") == "1"
+        ))
+
+    def for_stage(self, stage):
+        return self.stages.get(stage, self.default)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def should_retry(self, stage, error, attempt):
+        """
+        attempt번째 시도가 error로 실패했을 때 재시도할지 판단 (재시도하면 통계 기록)
+        """
+        policy = self.for_stage(stage)
+        if attempt >= policy.max_attempts or not is_transient_error(error):
+            return False
+        self._count("retries")
+        if type(error).__name__ in ("DeadlineExceeded", "TimeoutError") or isinstance(error, TimeoutError):
+            self._count("timeouts")
+        return True
+
+    def call(self, stage, fn):
+        """
+        정책을 적용하여 동기 호출 실행
+        Args:
+            stage (str): 단계 이름
+            fn (callable): fn(timeout) 형태의 실제 호출 함수
+        Returns:
+            fn의 반환값
+        """
+        policy = self.for_stage(stage)
+        attempt = 0
+        while True:
+            attempt += 1
+            started = time.monotonic()
+            try:
+                result = self._hedged_call(stage, policy, fn) if policy.hedge else fn(policy.timeout)
+            except Exception as e:
+                if not self.should_retry(stage, e, attempt):
+                    raise
+                time.sleep(policy.backoff(attempt))
+                continue
+            self.latency.record(stage, time.monotonic() - started)
+            return result
+
+    async def call_async(self, stage, fn):
+        """
+        정책을 적용하여 비동기 호출 실행
+        Args:
+            stage (str): 단계 이름
+            fn (callable): fn(timeout) 형태로 코루틴을 반환하는 함수
+        Returns:
+            코루틴의 반환값
+        """
+        policy = self.for_stage(stage)
+        attempt = 0
+        while True:
+            attempt += 1
+            started = time.monotonic()
+            try:
+                if policy.hedge:
+                    result = await self._hedged_call_async(stage, policy, fn)
+                else:
+                    result = await asyncio.wait_for(fn(policy.timeout), policy.timeout)
+            except Exception as e:
+                if not self.should_retry(stage, e, attempt):
+                    raise
+                await asyncio.sleep(policy.backoff(attempt))
+                continue
+            self.latency.record(stage, time.monotonic() - started)
+            return result
+
+    def _hedge_delay(self, stage, policy):
+        p95 = self.latency.percentile(stage, 0.95)
+        return p95 if p95 is not None else policy.hedge_delay
+
+    def _hedged_call(self, stage, policy, fn):
+        # 첫 요청이 p95 안에 끝나지 않으면 같은 요청을 하나 더 보내고 먼저 성공한 응답 사용
+        # (스레드의 세션 ID 등 컨텍스트 변수를 유지하도록 컨텍스트를 복사하여 실행)
+        delay = self._hedge_delay(stage, policy)
+        primary = _hedge_executor.submit(contextvars.copy_context().run, fn, policy.timeout)
+        if delay is None:
+            return primary.result()
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count("hedged")
+        secondary = _hedge_executor.submit(contextvars.copy_context().run, fn, policy.timeout)
+        pending = {primary, secondary}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        self._count("hedge_wins")
+                    # 늦은 요청은 취소할 수 없으므로 결과를 버림
+                    return future.result()
+                first_error = first_error or future.exception()
+        raise first_error
+
+    async def _hedged_call_async(self, stage, policy, fn):
+        delay = self._hedge_delay(stage, policy)
+        primary = asyncio.ensure_future(asyncio.wait_for(fn(policy.timeout), policy.timeout))
+        if delay is None:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count("hedged")
+        secondary = asyncio.ensure_future(asyncio.wait_for(fn(policy.timeout), policy.timeout))
+        pending = {primary, secondary}
+        first_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is secondary:
+                            self._count("hedge_wins")
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            # 느린 쪽 요청은 취소
+            for task in pending:
+                task.cancel()
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
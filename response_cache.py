@@ -0,0 +1,175 @@
+# ============================================================================
+# AI 모델 응답 캐시
+# 모델 이름 + 최종 프롬프트 + 생성 설정의 해시를 키로 사용하는 2계층 캐시
+#   1계층: 프로세스 내 메모리 LRU (크기 제한)
+#   2계층: SQLite 디스크 캐시 (TTL 및 용량 기반 정리)
+# ============================================================================
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# 기본 디스크 캐시 경로 (환경 변수로 변경 가능)
+DEFAULT_CACHE_PATH = os.environ.get(
+    "CREATOR_PARTNER_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".creator_partner", "response_cache.sqlite3")
+)
+
+
+def make_cache_key(model_name, prompt, generation_config=None):
+    """
+    응답 캐시 키 생성
+    Args:
+        model_name (str): 모델 이름
+        prompt (str): 전문가 정보가 포함된 최종 프롬프트
+        generation_config (dict): 생성 설정 (없으면 None)
+    Returns:
+        str: SHA-256 해시 문자열
+    """
+    payload = json.dumps(
+        {"model": model_name, "prompt": prompt, "config": generation_config or {}},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    메모리 LRU + SQLite 2계층 응답 캐시
+    여러 Streamlit 세션(스레드)이 하나의 인스턴스를 공유할 수 있도록 잠금으로 보호
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_size=256, ttl_seconds=7 * 24 * 3600,
+                 max_disk_bytes=200 * 1024 * 1024):
+        """
+        응답 캐시 초기화
+        Args:
+            path (str): SQLite 파일 경로 (None이면 메모리 계층만 사용)
+            memory_size (int): 메모리 계층에 보관할 최대 응답 수
+            ttl_seconds (int): 디스크 계층 항목의 유효 기간 (초)
+            max_disk_bytes (int): 디스크 계층에 보관할 응답 텍스트의 최대 총 크기 (바이트)
+        """
+        self.memory_size = memory_size
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+            self._conn.commit()
+
+    def get(self, key):
+        """
+        캐시된 응답 조회 (메모리 -> 디스크 순)
+        Returns:
+            str | None: 캐시된 응답 텍스트, 없으면 None
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    response, created_at = row
+                    now = time.time()
+                    if now - created_at <= self.ttl_seconds:
+                        self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        self._remember(key, response)
+                        self._stats["disk_hits"] += 1
+                        return response
+                    # 만료된 항목 삭제
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key, response):
+        """
+        응답을 두 계층 모두에 저장
+        """
+        with self._lock:
+            self._remember(key, response)
+            self._stats["writes"] += 1
+            if self._conn is not None:
+                now = time.time()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, response, len(response.encode("utf-8")), now, now)
+                )
+                self._evict_disk(now)
+                self._conn.commit()
+
+    def clear(self):
+        """
+        모든 캐시 항목 삭제
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def stats(self):
+        """
+        캐시 적중/실패 통계 반환
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        total = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_rate"] = hits / total if total else 0.0
+        return stats
+
+    def _remember(self, key, response):
+        # 메모리 LRU 계층에 저장하고 용량 초과 시 가장 오래 사용되지 않은 항목 제거
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        # 만료 항목 삭제 후, 총 크기가 한도를 넘으면 오래 사용되지 않은 항목부터 삭제
+        cursor = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._stats["evictions"] += max(cursor.rowcount, 0)
+
+        total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size <= self.max_disk_bytes:
+            return
+        stale_keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC"):
+            if total_size <= self.max_disk_bytes:
+                break
+            stale_keys.append((key,))
+            total_size -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+        self._stats["evictions"] += len(stale_keys)
@@ -0,0 +1,179 @@
+# ============================================================================
+# 동일 요청 합치기 (single-flight)
+# 같은 프롬프트와 같은 모델 설정의 요청이 이미 진행 중이면 새로 보내지 않고
+# 진행 중인 요청의 결과를 함께 기다림 (여러 사용자가 같은 템플릿 브리프를 동시에 제출하는 경우)
+# 동기 호출(Streamlit 세션 스레드)과 비동기 호출(이벤트 루프)이 같은 요청을 함께 기다릴 수 있도록
+# concurrent.futures.Future를 공유
+#   - 요청 키는 API 키별 범위(scoped)로 나누어, 다른 키의 요청끼리는 응답과 오류를 공유하지 않음
+#   - 리더가 일시적 오류(쿼터 초과, 과부하)로 실패하면 기다리던 호출도 같은 오류를 받고(동시 재시도 폭주 방지),
+#     그 밖의 오류(중단, 잘못된 요청 등)는 리더만의 문제일 수 있으므로 기다리던 호출이 직접 다시 실행
+# ============================================================================
+
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future
+
+from resilience import is_transient_error
+
+
+class FlightAborted(RuntimeError):
+    """
+    리더 호출이 오류가 아닌 이유(취소, 스트림 중단 등)로 끝나 결과를 받지 못한 경우 기다리던 호출에 전달하는 오류
+    """
+
+
+def make_key_scope(api_key):
+    """
+    API 키별 요청 합치기 범위 (키 원문 대신 해시 앞부분 사용)
+    """
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class SingleFlight:
+    """
+    프로세스 전역 동일 요청 합치기
+    먼저 도착한 호출(리더)만 실제로 실행하고, 리더가 끝나기 전에 같은 키로 도착한 호출은 리더의 결과를 공유
+    결과는 보관하지 않으므로 리더가 끝난 뒤 도착한 호출은 새로 실행 (결과 재사용은 응답 캐시가 담당)
+    """
+
+    def __init__(self):
+        self._flights = {}  # 키 -> 진행 중인 요청의 Future
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "coalesced": 0, "errors": 0, "retried": 0}
+
+    def scoped(self, scope):
+        """
+        키 앞에 범위(API 키 해시 등)를 붙이는 보기 반환 (잠금과 통계는 이 객체와 공유)
+        """
+        return ScopedSingleFlight(self, scope)
+
+    def shares_error(self, error):
+        """
+        리더의 오류를 기다리던 호출에 그대로 전달할지 여부 (일시적 오류만 공유하고 나머지는 직접 다시 실행)
+        """
+        if is_transient_error(error):
+            return True
+        with self._lock:
+            # 합쳐진 호출로 세었던 것을 직접 실행한 호출로 옮김
+            self._stats["coalesced"] -= 1
+            self._stats["retried"] += 1
+        return False
+
+    def begin(self, key):
+        """
+        요청 시작: 같은 키의 요청이 진행 중이면 그 Future를 반환
+        Returns:
+            tuple: (Future, 리더 여부) - 리더이면 실행 후 반드시 finish를 호출해야 함
+        """
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future, False
+            future = self._flights[key] = Future()
+            self._stats["leaders"] += 1
+            return future, True
+
+    def finish(self, key, future, result=None, error=None):
+        """
+        리더의 요청 종료: 기다리던 호출에 결과(또는 오류)를 전달
+        """
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+            if error is not None:
+                self._stats["errors"] += 1
+        if error is not None:
+            if not isinstance(error, Exception):
+                error = FlightAborted(f"동일 요청의 리더 호출이 중단되었습니다: {type(error).__name__}")
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def call(self, key, fn):
+        """
+        동기 호출 실행 (같은 키의 요청이 진행 중이면 그 결과를 기다림)
+        Args:
+            key (str): 요청 키 (모델 이름 + 프롬프트 + 생성 설정 해시)
+            fn (callable): 리더일 때 실행할 함수
+        Returns:
+            tuple: (결과, 다른 호출의 결과를 공유했는지 여부)
+        """
+        future, leader = self.begin(key)
+        if not leader:
+            try:
+                return future.result(), True
+            except Exception as e:
+                if self.shares_error(e):
+                    raise
+            return fn(), False
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result, False
+
+    async def call_async(self, key, fn):
+        """
+        call의 비동기 버전
+        Args:
+            fn (callable): 리더일 때 실행할 코루틴 함수
+        """
+        future, leader = self.begin(key)
+        if not leader:
+            try:
+                return await asyncio.wrap_future(future), True
+            except Exception as e:
+                if self.shares_error(e):
+                    raise
+            return await fn(), False
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result, False
+
+    def stats(self):
+        """
+        요청 합치기 통계 (coalesced = 보내지 않고 절약한 모델 호출 수, retried = 리더 실패 후 직접 다시 실행한 수)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._flights)
+        return stats
+
+
+class ScopedSingleFlight:
+    """
+    범위가 정해진 요청 합치기 (같은 범위 안의 같은 요청만 합침)
+    """
+
+    def __init__(self, flight, scope):
+        self.flight = flight
+        self.scope = scope
+
+    def begin(self, key):
+        return self.flight.begin(self._key(key))
+
+    def finish(self, key, future, result=None, error=None):
+        self.flight.finish(self._key(key), future, result, error)
+
+    def call(self, key, fn):
+        return self.flight.call(self._key(key), fn)
+
+    async def call_async(self, key, fn):
+        return await self.flight.call_async(self._key(key), fn)
+
+    def shares_error(self, error):
+        return self.flight.shares_error(error)
+
+    def stats(self):
+        return self.flight.stats()
+
+    def _key(self, key):
+        return f"{self.scope}:{key}"
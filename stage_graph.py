@@ -0,0 +1,236 @@
+# ============================================================================
+# 선언형 단계 그래프 (DAG) 실행기
+# 각 단계가 읽는 입력(사용자 입력 키, 다른 단계의 출력)을 선언하면, 앞 단계가 모두 끝난 단계부터
+# 동시에 실행하고 단계별 대기/실행 시간을 기록
+#   - 기본 그래프는 전략가 -> 작가 -> 플랫폼 전문가의 직선 그래프 (기존 3단계 체인과 같은 순서)
+#   - 서로 독립적인 단계(SEO 분석, 썸네일 아이디어, 해시태그 조사 등)는 register_stage로 프롬프트를 등록하고
+#     노드만 추가하면 병렬로 실행
+#   - 모델 호출, 단계 간 압축, 체크포인트 저장은 실행 함수(CreativeTeam)가 담당하고 이 모듈은 순서만 관리
+# ============================================================================
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class StageNode:
+    """
+    그래프의 단계 하나 선언
+    """
+
+    def __init__(self, name, expert, needs=(), fields=None, action=None):
+        """
+        Args:
+            name (str): 단계 이름 (결과 키, 체크포인트, 진행 상황 콜백에 사용)
+            expert (str | type): CreativeTeam의 전문가 속성 이름 또는 CreativeExpert 하위 클래스
+                                 (클래스이면 팀이 같은 설정으로 전문가를 만들어 사용,
+                                  CreativeExpert이면 register_stage로 등록한 name 단계의 템플릿으로 실행)
+            needs (tuple): 이 단계가 읽는 앞 단계 이름 (출력이 프롬프트의 이전 단계 분석으로 들어감)
+            fields (tuple): 이 단계가 읽는 사용자 입력 키 (None이면 전문가 단계 프롬프트 템플릿의 입력 키)
+            action (str): 워크플로우 로그에 남길 작업 이름 (기본값: name)
+        """
+        self.name = name
+        self.expert = expert
+        self.needs = tuple(needs)
+        self.fields = fields
+        self.action = action or name
+
+    def __repr__(self):
+        return f"StageNode({self.name!r}, needs={self.needs!r})"
+
+
+class StageGraph:
+    """
+    단계 그래프 (생성 시 없는 앞 단계와 순환 참조를 검사)
+    """
+
+    def __init__(self, nodes):
+        """
+        Args:
+            nodes (list): StageNode 목록 (같은 위상의 단계는 선언 순서대로 시작)
+        """
+        self.nodes = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"단계 이름이 중복되었습니다: {node.name}")
+            self.nodes[node.name] = node
+        for node in self.nodes.values():
+            missing = [need for need in node.needs if need not in self.nodes]
+            if missing:
+                raise ValueError(f"'{node.name}' 단계가 읽는 단계가 그래프에 없습니다: {', '.join(missing)}")
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        order, done = [], set()
+        pending = list(self.nodes.values())
+        while pending:
+            ready = [node for node in pending if all(need in done for need in node.needs)]
+            if not ready:
+                raise ValueError(f"단계 그래프에 순환 참조가 있습니다: {', '.join(node.name for node in pending)}")
+            for node in ready:
+                order.append(node.name)
+                done.add(node.name)
+            pending = [node for node in pending if node.name not in done]
+        return tuple(order)
+
+    def __iter__(self):
+        return (self.nodes[name] for name in self.order)
+
+    def run(self, execute, done=None, progress=None):
+        """
+        그래프 실행 (동기): 앞 단계가 모두 끝난 단계를 스레드 풀에서 동시에 실행
+        진행 상황 콜백은 항상 호출한 스레드에서 부르므로 Streamlit 화면 갱신에 그대로 사용할 수 있음
+        Args:
+            execute (callable): execute(node, outputs) -> 단계 출력 (outputs는 앞 단계 출력 딕셔너리)
+            done (dict): 이미 완료된 단계 출력 (체크포인트에서 재사용, 실행하지 않음)
+            progress (callable): 진행 상황 콜백 progress(단계, "start" | "done" | "resumed")
+        Returns:
+            tuple: (단계 이름 -> 출력, 단계 이름 -> 시간 기록)
+        """
+        run = _GraphRun(self, done, progress)
+        futures = {}
+        with ThreadPoolExecutor(max_workers=max(1, len(self.nodes)), thread_name_prefix="stage") as executor:
+            while True:
+                ready = run.ready()
+                if not ready and not futures:
+                    break
+                if len(ready) == 1 and not futures:
+                    # 동시에 실행할 단계가 없으면 호출한 스레드에서 바로 실행 (직선 그래프는 스레드를 쓰지 않음)
+                    node = ready[0]
+                    run.start(node)
+                    try:
+                        run.finish(node, execute(node, run.inputs(node)))
+                    except Exception as e:
+                        run.fail(node, e)
+                    continue
+                for node in ready:
+                    run.start(node)
+                    # 세션 구분 등 컨텍스트 변수를 단계 스레드에도 전달
+                    futures[executor.submit(contextvars.copy_context().run, execute, node, run.inputs(node))] = node
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    node = futures.pop(future)
+                    try:
+                        run.finish(node, future.result())
+                    except Exception as e:
+                        run.fail(node, e)
+        return run.result()
+
+    async def run_async(self, execute, done=None, progress=None):
+        """
+        그래프 실행 (비동기): 앞 단계가 모두 끝난 단계를 태스크로 동시에 실행
+        Args:
+            execute (callable): 코루틴 함수 execute(node, outputs) -> 단계 출력
+        """
+        run = _GraphRun(self, done, progress)
+        tasks = {}
+        while True:
+            for node in run.ready():
+                run.start(node)
+                tasks[asyncio.ensure_future(execute(node, run.inputs(node)))] = node
+            if not tasks:
+                break
+            finished, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                node = tasks.pop(task)
+                try:
+                    run.finish(node, task.result())
+                except Exception as e:
+                    run.fail(node, e)
+        return run.result()
+
+    def stream(self, execute, done=None):
+        """
+        그래프를 위상 순서대로 한 단계씩 실행하며 단계 출력 조각을 반환 (스트리밍 모드)
+        화면의 카드가 한 번에 하나씩 채워지도록 독립적인 단계도 순서대로 실행
+        Args:
+            execute (callable): execute(node, outputs) -> 응답 조각 제너레이터
+        Returns:
+            generator: (단계, 조각) 튜플, 끝나면 StopIteration 값으로 (출력, 시간 기록)
+        """
+        run = _GraphRun(self, done)
+        for node in self:
+            if node.name in run.outputs:
+                yield node.name, run.outputs[node.name]
+                continue
+            run.start(node)
+            chunks = []
+            for stage, chunk in execute(node, run.inputs(node)):
+                if stage == node.name:
+                    chunks.append(chunk)
+                yield stage, chunk
+            run.finish(node, "".join(chunks))
+        return run.result()
+
+
+class _GraphRun:
+    # 그래프 실행 한 번의 상태 (완료된 출력, 단계별 시간 기록, 첫 오류)
+
+    def __init__(self, graph, done=None, progress=None):
+        self.graph = graph
+        self.progress = progress or (lambda stage, status: None)
+        self.started = time.perf_counter()
+        self.outputs = {}
+        self.timings = {}
+        self.error = None
+        self._started = set()
+        self._ready_at = {}
+        for node in graph:
+            if done and node.name in done:
+                self.outputs[node.name] = done[node.name]
+                self._started.add(node.name)
+                self.timings[node.name] = {"resumed": True}
+                self.progress(node.name, "resumed")
+
+    def ready(self):
+        # 오류가 난 뒤에는 새 단계를 시작하지 않고 실행 중인 단계만 마무리
+        if self.error is not None:
+            return []
+        ready = [node for node in self.graph if node.name not in self._started
+                 and all(need in self.outputs for need in node.needs)]
+        now = self._now()
+        for node in ready:
+            self._ready_at.setdefault(node.name, now)
+        return ready
+
+    def inputs(self, node):
+        return {need: self.outputs[need] for need in node.needs}
+
+    def start(self, node):
+        self._started.add(node.name)
+        self.timings[node.name] = {"resumed": False, "ready_at": self._ready_at.get(node.name, self._now()),
+                                   "started_at": self._now()}
+        self.progress(node.name, "start")
+
+    def finish(self, node, output):
+        self.outputs[node.name] = output
+        self._close(node)
+        self.progress(node.name, "done")
+
+    def fail(self, node, error):
+        self._close(node)
+        self.timings[node.name]["error"] = f"{type(error).__name__}: {error}"
+        if self.error is None:
+            self.error = error
+
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        return self.outputs, self.timings
+
+    def _close(self, node):
+        timing = self.timings[node.name]
+        timing["finished_at"] = self._now()
+        timing["seconds"] = round(timing["finished_at"] - timing["started_at"], 4)
+
+    def _now(self):
+        return round(time.perf_counter() - self.started, 4)
+
+
+# 기본 그래프: 기존 3단계 체인 (전략가 -> 작가 -> 플랫폼 전문가)
+DEFAULT_STAGE_GRAPH = StageGraph([
+    StageNode("strategy", "content_strategist", action="initial_strategy"),
+    StageNode("content", "creative_writer", needs=("strategy",), action="content_enhancement"),
+    StageNode("platform", "platform_specialist", needs=("content",), action="finalization"),
+])
@@ -0,0 +1,58 @@
+# ============================================================================
+# 테스트 공통 설정
+# 저장소 루트의 평면 모듈(creative_team, stage_graph 등)과 benchmarks 패키지를 가져올 수 있도록
+# 경로를 추가하고, 실제 Gemini API 대신 benchmarks/fake_model.py의 가짜 모델로 팀을 구성
+# (단계 장애, 컨텍스트 캐시 등을 재현하는 가짜 모델은 fakes.py)
+# ============================================================================
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 응답 캐시/기록/작업 저장소의 기본 경로(~/.creator_partner) 대신 테스트 전용 임시 디렉터리 사용
+# (모듈을 임포트할 때 기본 경로를 읽으므로 저장소 모듈보다 먼저 설정)
+STATE_DIR = tempfile.mkdtemp(prefix="creator-partner-tests-")
+atexit.register(shutil.rmtree, STATE_DIR, True)
+for _name, _filename in (("CREATOR_PARTNER_CACHE_PATH", "response_cache.sqlite3"),
+                         ("CREATOR_PARTNER_CHECKPOINT_DIR", "checkpoints"),
+                         ("CREATOR_PARTNER_HISTORY_PATH", "history.sqlite3"),
+                         ("CREATOR_PARTNER_JOB_PATH", "jobs.sqlite3"),
+                         ("CREATOR_PARTNER_USAGE_PATH", "usage.sqlite3"),
+                         ("CREATOR_PARTNER_BATCH_USAGE_PATH", "batch_usage.sqlite3")):
+    os.environ[_name] = os.path.join(STATE_DIR, _filename)
+
+from benchmarks.fake_model import FakeGenerativeModel  # noqa: E402
+from benchmarks.pipeline_benchmark import make_input  # noqa: E402
+from creative_team import CreativeTeam  # noqa: E402
+
+
+@pytest.fixture
+def fake_model():
+    """
+    지연 없이 바로 응답하는 가짜 모델
+    """
+    return FakeGenerativeModel(latency=0.0, tokens_per_second=1e9, response_tokens=50)
+
+
+@pytest.fixture
+def make_team(fake_model):
+    """
+    가짜 모델을 쓰는 CreativeTeam 생성 함수 (model을 넘기지 않으면 fake_model 사용, 나머지 구성 요소는 키워드 인자로 지정)
+    """
+    def make(model=None, **kwargs):
+        return CreativeTeam("test-key", model=model or fake_model, **kwargs)
+    return make
+
+
+@pytest.fixture
+def sample_input():
+    """
+    벤치마크와 같은 형태의 사용자 입력
+    """
+    return make_input("YouTube", 1)
@@ -0,0 +1,119 @@
+# ============================================================================
+# 테스트용 가짜 모델
+# benchmarks/fake_model.py의 FakeGenerativeModel을 바탕으로 단계 장애, 제공자 컨텍스트 캐시,
+# 정해 둔 응답(통합 모드 JSON, 변형 후보)을 재현
+# ============================================================================
+
+import threading
+import time
+import types
+
+from benchmarks.fake_model import FakeGenerativeModel, FakeResponse
+from rate_limiter import estimate_tokens
+
+
+class FailingModel(FakeGenerativeModel):
+    """
+    프롬프트에 특정 문자열이 들어 있는 호출만 실패시키는 가짜 모델 (단계 하나의 장애 재현용)
+    """
+
+    def __init__(self, fail_on, error=None, **kwargs):
+        """
+        Args:
+            fail_on (str): 이 문자열이 프롬프트에 들어 있으면 실패 (None이면 실패하지 않음)
+            error (Exception): 발생시킬 오류 (기본값: RuntimeError)
+        """
+        kwargs.setdefault("latency", 0.0)
+        kwargs.setdefault("tokens_per_second", 1e9)
+        super().__init__(**kwargs)
+        self.fail_on = fail_on
+        self.error = error or RuntimeError("stage failed")
+
+    def generate_content(self, contents, generation_config=None, stream=False, request_options=None):
+        if self.fail_on is not None and self.fail_on in str(contents):
+            raise self.error
+        return super().generate_content(contents, generation_config, stream, request_options)
+
+    async def generate_content_async(self, contents, generation_config=None, request_options=None):
+        if self.fail_on is not None and self.fail_on in str(contents):
+            raise self.error
+        return await super().generate_content_async(contents, generation_config, request_options)
+
+
+class ScriptedModel(FakeGenerativeModel):
+    """
+    respond(프롬프트, 생성 설정)가 돌려준 텍스트로 응답하는 가짜 모델
+    목록을 돌려주면 후보(candidates)가 여러 개인 응답을 만듦
+    """
+
+    def __init__(self, respond, **kwargs):
+        kwargs.setdefault("latency", 0.0)
+        super().__init__(**kwargs)
+        self.respond = respond
+        self.prompts = []
+        self.configs = []
+
+    def generate_content(self, contents, generation_config=None, stream=False, request_options=None):
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(str(contents))
+            self.configs.append(dict(generation_config or {}))
+        result = self.respond(str(contents), generation_config or {})
+        texts = result if isinstance(result, list) else [result]
+        response = FakeResponse(texts[0], estimate_tokens(str(contents)))
+        if isinstance(result, list):
+            response.candidates = [
+                types.SimpleNamespace(content=types.SimpleNamespace(parts=[types.SimpleNamespace(text=text)]))
+                for text in texts
+            ]
+        return response
+
+    async def generate_content_async(self, contents, generation_config=None, request_options=None):
+        return self.generate_content(contents, generation_config, request_options=request_options)
+
+
+class CachingModel(FakeGenerativeModel):
+    """
+    제공자 컨텍스트 캐시 기능(create_cached_content, with_cached_content)을 흉내 내는 가짜 모델
+    count_tokens는 접두부가 제공자 최소 캐시 크기를 넘는다고 답함
+    """
+
+    def __init__(self, upload_seconds=0.0, prefix_tokens=5000, **kwargs):
+        """
+        Args:
+            upload_seconds (float): 캐시 업로드에 걸리는 시간 (동시 업로드 재현용)
+            prefix_tokens (int): count_tokens가 돌려줄 토큰 수
+        """
+        kwargs.setdefault("latency", 0.0)
+        kwargs.setdefault("tokens_per_second", 1e9)
+        kwargs.setdefault("response_tokens", 20)
+        super().__init__(**kwargs)
+        self.upload_seconds = upload_seconds
+        self.prefix_tokens = prefix_tokens
+        self.uploads = []
+        self.cached_content = None
+        self._upload_lock = threading.Lock()
+
+    def create_cached_content(self, system_instruction, display_name, ttl_seconds):
+        time.sleep(self.upload_seconds)
+        with self._upload_lock:
+            self.uploads.append(system_instruction)
+            return f"cachedContents/{len(self.uploads)}"
+
+    def with_cached_content(self, name):
+        bound = CachingModel(model_name=self.model_name, latency=self.latency,
+                             tokens_per_second=self.tokens_per_second, response_tokens=self.response_tokens)
+        bound.cached_content = name
+        return bound
+
+    def count_tokens(self, contents):
+        return types.SimpleNamespace(total_tokens=self.prefix_tokens)
+
+
+def create_fake_team(api_key, workers=1):
+    """
+    작업자 프로세스용 팀 생성 함수 (JobWorkerPool의 team_factory, spawn으로 전달되도록 최상위 함수)
+    """
+    from creative_team import CreativeTeam
+
+    return CreativeTeam(api_key, model=FakeGenerativeModel(latency=0.0, tokens_per_second=1e9, response_tokens=50))
@@ -0,0 +1,74 @@
+# ============================================================================
+# Streamlit 앱 테스트
+# 앱을 Streamlit 테스트 실행기로 실행하여 API 키 없이는 멈추고,
+# 렌더링한 결과가 다른 위젯 조작으로 다시 실행되어도 세션 상태에서 그대로 표시되는지 확인
+# ============================================================================
+
+import os
+
+import pytest
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "creator_partner.py")
+
+
+@pytest.fixture
+def app():
+    import streamlit as st
+
+    # 프로세스 전역 리소스(팀 풀, 저장소)는 테스트마다 새로 생성
+    st.cache_resource.clear()
+    return AppTest.from_file(APP_PATH, default_timeout=30)
+
+
+def markdown_texts(app):
+    return [element.value for element in app.markdown]
+
+
+def test_app_stops_without_api_key(app):
+    app.run()
+    assert not app.exception
+    assert [warning.value for warning in app.warning] == ["API 키를 입력해주세요."]
+    assert not app.selectbox
+
+
+def test_saved_results_survive_reruns(app):
+    app.session_state["result_blocks"] = {"YouTube": [("markdown", "### 저장된 분석 결과")]}
+    app.run()
+    app.sidebar.text_input[0].input("test-key").run()
+    assert not app.exception
+    assert "### 저장된 분석 결과" in markdown_texts(app)
+
+    # 사이드바 설정을 바꿔 앱 전체가 다시 실행되어도 모델을 다시 호출하지 않고 저장된 결과를 표시
+    app.sidebar.toggle[0].set_value(False).run()
+    assert "### 저장된 분석 결과" in markdown_texts(app)
+
+    # 입력이 부족한 제출은 경고만 표시하고 결과는 그대로 유지
+    app.button[0].click().run()
+    assert "주제, 목표, 타겟 시청자 정보를 모두 입력해주세요." in [warning.value for warning in app.warning]
+    assert "### 저장된 분석 결과" in markdown_texts(app)
+
+
+def test_job_workers_start_only_for_background_jobs(app, monkeypatch, sample_input):
+    from job_queue import DEFAULT_JOB_PATH, JobStore, JobWorkerPool
+
+    spawned = []
+    monkeypatch.setattr(JobWorkerPool, "_spawn", lambda self: spawned.append(self))
+    app.run()
+    app.sidebar.text_input[0].input("test-key").run()
+    # 백그라운드 모드를 켜지 않고 등록한 작업도 없으면 작업자 프로세스를 만들지 않고 작업 상태도 조회하지 않음
+    assert not app.exception
+    assert spawned == []
+    assert "작업 대기열" not in " ".join(caption.value for caption in app.sidebar.caption)
+
+    # 새로고침 전에 등록한 작업이 있으면 백그라운드 모드가 꺼져 있어도 진행 상황 표시
+    JobStore(DEFAULT_JOB_PATH).submit(app.session_state["session_id"], "YouTube", sample_input)
+    app.run()
+    assert "⏳ 작업 대기 중입니다..." in [info.value for info in app.info]
+    assert spawned == []
+
+    # 백그라운드 모드에서는 대기열 현황을 표시하지만 작업자는 첫 작업을 등록할 때 시작
+    app.sidebar.toggle[2].set_value(True).run()
+    assert "작업 대기열: 작업자 0개" in " ".join(caption.value for caption in app.sidebar.caption)
+    assert spawned == []
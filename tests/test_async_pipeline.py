@@ -0,0 +1,39 @@
+# ============================================================================
+# 비동기 파이프라인 테스트
+# 여러 워크플로우를 하나의 이벤트 루프에서 동시에 실행하면 모델 대기 시간이 겹치는지,
+# 결과 형식이 동기 실행과 같은지 확인
+# ============================================================================
+
+import asyncio
+import time
+
+from benchmarks.fake_model import FakeGenerativeModel
+from benchmarks.pipeline_benchmark import make_input
+
+
+def test_async_result_matches_sync_shape(make_team, sample_input):
+    team = make_team()
+    sync_result = team.get_creative_advice("YouTube", sample_input)
+    async_result = asyncio.run(team.get_creative_advice_async("YouTube", dict(sample_input, topic="다른 주제")))
+    assert set(async_result) == set(sync_result)
+    assert async_result["stages"] == sync_result["stages"]
+
+
+def test_concurrent_workflows_share_one_event_loop(make_team):
+    # 호출 한 번에 0.1초, 워크플로우 하나에 순차 호출 3번
+    model = FakeGenerativeModel(latency=0.1, tokens_per_second=1e9, response_tokens=50)
+    team = make_team(model=model)
+    sessions = 5
+
+    async def main():
+        return await asyncio.gather(*(team.get_creative_advice_async("YouTube", make_input("YouTube", index))
+                                      for index in range(sessions)))
+
+    started = time.perf_counter()
+    results = asyncio.run(main())
+    elapsed = time.perf_counter() - started
+
+    assert model.calls == sessions * 3
+    assert all(result["platform"] for result in results)
+    # 순차 실행(5 x 0.3초)보다 훨씬 짧게 끝남
+    assert elapsed < sessions * 0.3 / 2
@@ -0,0 +1,61 @@
+# ============================================================================
+# 헤드리스 배치 실행기 테스트
+# JSONL 브리프를 Streamlit 없이 처리하여 결과를 한 줄씩 기록하고,
+# 다시 실행하면 이미 성공한 브리프를 건너뛰는지 확인
+# ============================================================================
+
+import asyncio
+import json
+
+import pytest
+
+from batch_runner import load_briefs, load_completed_ids, run_batch
+from benchmarks.pipeline_benchmark import make_input
+from fakes import FailingModel
+
+
+def write_briefs(path, briefs):
+    path.write_text("".join(json.dumps(brief, ensure_ascii=False) + "\n" for brief in briefs), encoding="utf-8")
+    return str(path)
+
+
+def test_load_briefs_assigns_ids_and_validates(tmp_path):
+    path = write_briefs(tmp_path / "briefs.jsonl", [
+        {"id": "brief-1", "service_type": "YouTube", "input_data": make_input("YouTube", 1)},
+        {"service_type": "블로그", "input_data": make_input("블로그", 2)}
+    ])
+    briefs = load_briefs(path)
+    assert briefs[0]["id"] == "brief-1"
+    # id가 없으면 서비스 유형과 입력 해시로 만든 id 사용 (같은 입력은 같은 id)
+    assert briefs[1]["id"] == load_briefs(path)[1]["id"]
+
+    broken = write_briefs(tmp_path / "broken.jsonl", [{"service_type": "YouTube"}])
+    with pytest.raises(ValueError):
+        load_briefs(broken)
+
+
+def test_batch_records_results_and_skips_completed_on_rerun(tmp_path, make_team):
+    briefs = [{"id": f"brief-{index}", "service_type": "YouTube", "input_data": make_input("YouTube", index)}
+              for index in range(4)]
+    briefs[2]["input_data"]["topic"] = "실패하는 브리프"
+    model = FailingModel(fail_on="실패하는 브리프", response_tokens=50)
+    output = str(tmp_path / "results.jsonl")
+
+    counts = asyncio.run(run_batch(make_team(model=model), briefs, output, concurrency=2))
+    assert counts == {"ok": 3, "error": 1}
+    records = {record["id"]: record for record in map(json.loads, open(output, encoding="utf-8"))}
+    assert records["brief-2"]["status"] == "error"
+    assert records["brief-0"]["result"]["platform"]
+
+    # 충돌로 마지막 줄이 잘려도 성공한 id는 읽힘
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"id": "brief-9", "sta')
+    completed = load_completed_ids(output)
+    assert completed == {"brief-0", "brief-1", "brief-3"}
+
+    # 장애가 해소된 뒤 다시 실행하면 실패한 브리프만 처리
+    model.fail_on = None
+    calls = model.calls
+    pending = [brief for brief in briefs if brief["id"] not in completed]
+    assert asyncio.run(run_batch(make_team(model=model), pending, output)) == {"ok": 1, "error": 0}
+    assert model.calls == calls + 3
@@ -0,0 +1,68 @@
+# ============================================================================
+# 벤치마크 테스트
+# 가짜 모델이 설정한 지연 시간, 응답 크기, 오류율을 재현 가능하게 흉내 내고,
+# 파이프라인 벤치마크가 수준별 지연 시간/처리량 보고서를 만드는지 확인
+# ============================================================================
+
+import time
+
+import pytest
+
+from benchmarks.fake_model import FakeGenerativeModel, ServiceUnavailable
+from benchmarks.pipeline_benchmark import run_benchmark, run_level
+from rate_limiter import estimate_tokens
+
+
+def outcomes(model, calls):
+    results = []
+    for _ in range(calls):
+        try:
+            model.generate_content("프롬프트")
+            results.append(True)
+        except ServiceUnavailable:
+            results.append(False)
+    return results
+
+
+def test_fake_model_errors_are_reproducible_with_seed():
+    first = FakeGenerativeModel(latency=0.0, tokens_per_second=1e9, error_rate=0.3, seed=7)
+    second = FakeGenerativeModel(latency=0.0, tokens_per_second=1e9, error_rate=0.3, seed=7)
+    assert outcomes(first, 50) == outcomes(second, 50)
+    assert 0 < first.errors < 50
+    assert first.calls == 50
+
+
+def test_fake_model_response_size_and_latency():
+    model = FakeGenerativeModel(latency=0.05, tokens_per_second=1e9, response_tokens=200)
+    started = time.perf_counter()
+    response = model.generate_content("프롬프트")
+    assert time.perf_counter() - started >= 0.05
+    assert estimate_tokens(response.text) >= 200
+    assert response.usage_metadata.prompt_token_count == estimate_tokens("프롬프트")
+    # 호출마다 다른 응답 (응답 캐시가 벤치마크 결과를 왜곡하지 않도록)
+    assert model.generate_content("프롬프트").text != response.text
+
+    chunks = list(model.generate_content("프롬프트", stream=True))
+    assert len(chunks) > 1
+    assert "".join(chunk.text for chunk in chunks).startswith("# 응답 2")
+
+
+def test_run_level_reports_latency_and_errors(make_team):
+    result = run_level(make_team(), "YouTube", concurrency=2, requests=4)
+    assert result["errors"] == 0
+    assert result["throughput_rps"] > 0
+    latency = result["latency_seconds"]
+    assert latency["p50"] <= latency["p95"] <= latency["max"]
+
+
+@pytest.mark.parametrize("error_rate", [0.0, 0.2])
+def test_run_benchmark_report(error_rate):
+    report = run_benchmark({"latency": 0.0, "tokens_per_second": 1e9, "response_tokens": 50,
+                            "error_rate": error_rate, "seed": 3},
+                           concurrency_levels=[1, 2], requests_per_level=2, service_types=["YouTube"],
+                           max_attempts=10)
+    assert [result["concurrency"] for result in report["results"]] == [1, 2]
+    assert all(result["errors"] == 0 for result in report["results"])
+    # 재시도로 흡수한 오류도 모델 호출 수에 포함
+    assert report["model_calls"] == 2 * 2 * 3 + report["model_errors"]
+    assert (report["model_errors"] > 0) == (error_rate > 0)
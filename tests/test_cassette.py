@@ -0,0 +1,67 @@
+# ============================================================================
+# 카세트 녹화/재생 테스트
+# 녹화한 팀 실행을 모델 호출 없이 같은 결과로 재생하는지, 기록에 없는 호출을 거부하는지,
+# 접두부 캐시 업로드도 녹화되어 재생 시 같은 프롬프트 경로(캐시 핸들 + 접미부)를 따르는지 확인
+# ============================================================================
+
+import os
+
+import pytest
+
+from benchmarks.fake_model import FakeGenerativeModel
+from benchmarks.pipeline_benchmark import make_input
+from cassette import Cassette, CassetteMiss
+from fakes import CachingModel
+from prompt_templates import ProviderPrefixCache, get_template
+
+
+def test_recorded_run_replays_without_model_calls(tmp_path, make_team, sample_input):
+    path = str(tmp_path / "run.cassette.jsonl.gz")
+    real = FakeGenerativeModel(latency=0.0, tokens_per_second=1e9, response_tokens=50)
+    recorded = make_team(model=Cassette(path, "record").wrap(real.model_name, lambda: real))
+    original = recorded.get_creative_advice("YouTube", sample_input)
+    assert real.calls > 0
+
+    replay = Cassette(path, "replay")
+    replayed = make_team(model=replay.wrap(real.model_name, None)).get_creative_advice("YouTube", sample_input)
+    for stage in ("strategy", "content", "platform"):
+        assert replayed[stage] == original[stage]
+    assert replay.stats()["misses"] == 0
+    assert replay.stats()["replayed"] > 0
+
+
+def test_unrecorded_call_raises_cassette_miss(tmp_path):
+    path = str(tmp_path / "run.cassette.jsonl.gz")
+    real = FakeGenerativeModel(latency=0.0, tokens_per_second=1e9)
+    Cassette(path, "record").wrap(real.model_name, lambda: real).generate_content("녹화된 프롬프트")
+
+    model = Cassette(path, "replay").wrap(real.model_name, None)
+    assert model.generate_content("녹화된 프롬프트").text
+    with pytest.raises(CassetteMiss):
+        model.generate_content("녹화되지 않은 프롬프트")
+
+
+def test_each_process_records_to_its_own_segment(tmp_path):
+    path = str(tmp_path / "run.cassette.jsonl.gz")
+    real = FakeGenerativeModel(latency=0.0, tokens_per_second=1e9)
+    Cassette(path, "record").wrap(real.model_name, lambda: real).generate_content("프롬프트")
+    assert os.listdir(tmp_path) == [f"run.cassette.{os.getpid()}.jsonl.gz"]
+    assert Cassette(path, "replay").stats()["interactions"] == 1
+
+
+def test_prefix_cache_upload_is_recorded_and_replayed(tmp_path):
+    path = str(tmp_path / "run.cassette.jsonl.gz")
+    prompt = get_template("fused", "YouTube").render("YouTube", make_input("YouTube", 1))
+    real = CachingModel()
+    recorder = Cassette(path, "record").wrap(real.model_name, lambda: real)
+    bound, text = ProviderPrefixCache().bind(recorder, prompt)
+    # 녹화 중에도 운영 환경처럼 캐시 핸들에 접미부만 전송
+    assert real.uploads == [prompt.prefix]
+    assert text == prompt.suffix
+    original = bound.generate_content(text).text
+
+    replay = Cassette(path, "replay")
+    bound, text = ProviderPrefixCache().bind(replay.wrap(real.model_name, None), prompt)
+    assert text == prompt.suffix
+    assert bound.generate_content(text).text == original
+    assert replay.stats()["misses"] == 0
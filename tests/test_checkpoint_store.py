@@ -0,0 +1,40 @@
+# ============================================================================
+# 체크포인트 테스트
+# 중간 단계에서 실패한 실행을 다시 시작하면 완료된 단계를 재사용하는지,
+# 디스크 체크포인트가 새 저장소에서도 이어지는지 확인
+# ============================================================================
+
+import pytest
+
+from checkpoint_store import CheckpointStore
+from fakes import FailingModel
+from prompt_templates import PERSONAS
+
+
+def test_resume_after_failure_skips_completed_stages(make_team, sample_input):
+    store = CheckpointStore(directory=None)
+    # 플랫폼 전문가 단계만 실패하는 모델
+    model = FailingModel(fail_on=PERSONAS["platform"]["name"], response_tokens=50)
+    team = make_team(model=model)
+    with pytest.raises(RuntimeError):
+        team.get_creative_advice("YouTube", sample_input, checkpoints=store)
+    assert model.calls == 2
+
+    # 장애가 해소된 뒤 다시 실행하면 플랫폼 단계만 호출
+    model.fail_on = None
+    events = []
+    result = team.get_creative_advice("YouTube", sample_input, checkpoints=store,
+                                      progress=lambda stage, status: events.append((stage, status)))
+    assert model.calls == 3
+    assert ("strategy", "resumed") in events
+    assert ("content", "resumed") in events
+    assert result["platform"]
+
+
+def test_disk_checkpoint_survives_new_store(tmp_path, sample_input):
+    run = CheckpointStore(directory=str(tmp_path)).begin("YouTube", sample_input)
+    run.save("strategy", "전략 결과")
+
+    resumed = CheckpointStore(directory=str(tmp_path)).begin("YouTube", sample_input)
+    assert resumed.get("strategy") == "전략 결과"
+    assert resumed.run_id == run.run_id
@@ -0,0 +1,16 @@
+# ============================================================================
+# 콜드 스타트 테스트
+# 파이프라인 핵심 모듈이 Streamlit과 Gemini SDK 없이 임포트되는지 새 프로세스에서 확인
+# (임포트 시간 예산은 환경마다 달라 python -m benchmarks.import_benchmark로 따로 측정)
+# ============================================================================
+
+import pytest
+
+from benchmarks.import_benchmark import measure_import
+
+
+@pytest.mark.parametrize("module", ["creative_team", "batch_runner", "job_queue"])
+def test_core_modules_do_not_import_heavy_modules(module):
+    result = measure_import(module, runs=1)
+    assert result["forbidden_loaded"] == []
+
@@ -0,0 +1,76 @@
+# ============================================================================
+# 단계 간 컨텍스트 압축 테스트
+# 이전 단계 출력이 예산을 넘으면 구조를 남기며 줄이거나 요약 호출로 압축하고,
+# 다음 단계 프롬프트가 예산 안에서 유지되는지 확인
+# ============================================================================
+
+import itertools
+
+from context_budget import HandoffCompressor, extractive_trim
+from fakes import ScriptedModel
+from rate_limiter import estimate_tokens
+
+LONG_TEXT = "\n".join([
+    "## 핵심 전략",
+    "시청자가 끝까지 머무르도록 이야기 구조를 세 단계로 나눕니다. 각 단계마다 질문을 던져 참여를 유도합니다.",
+    "1. 타겟 오디언스의 관심사를 중심으로 방향을 설정합니다.",
+    "- 초반 10초 안에 핵심 가치를 전달하는 훅을 배치합니다.",
+] * 10)
+
+
+def test_extractive_trim_keeps_structure_within_budget():
+    trimmed = extractive_trim(LONG_TEXT, 200)
+    assert estimate_tokens(trimmed) <= 200
+    assert "## 핵심 전략" in trimmed
+    assert "1. 타겟 오디언스" in trimmed
+    # 일반 문단은 첫 문장만 남음
+    assert "질문을 던져" not in trimmed
+
+
+def test_extractive_trim_cuts_single_long_line():
+    trimmed = extractive_trim("가" * 1000, 50)
+    assert trimmed.endswith("...(이하 생략)")
+    assert estimate_tokens(trimmed.split("\n")[0]) <= 50
+
+
+def test_compress_passes_short_text_without_counting(fake_model):
+    text, report = HandoffCompressor(budget_tokens=1000).compress("짧은 분석", "content", fake_model)
+    assert text == "짧은 분석"
+    assert report["method"] == "none"
+    assert report["saved_tokens"] == 0
+
+
+def test_summarize_mode_falls_back_to_extractive(fake_model):
+    compressor = HandoffCompressor(budget_tokens=100, mode="summarize")
+    text, report = compressor.compress(LONG_TEXT, "content", fake_model, summarize=lambda text, tokens: "요약")
+    assert (text, report["method"]) == ("요약", "summarize")
+
+    def failing(text, tokens):
+        raise RuntimeError("summary failed")
+
+    text, report = HandoffCompressor(budget_tokens=100, mode="summarize").compress(
+        LONG_TEXT, "content", fake_model, summarize=failing
+    )
+    assert report["method"] == "extractive"
+    assert report["final_tokens"] <= 100 < report["original_tokens"]
+
+
+def test_team_keeps_handoffs_within_budget(make_team, sample_input):
+    stage_calls = itertools.count(1)
+
+    def respond(prompt, config):
+        if "요약 분량(토큰)" in prompt:
+            return "요약된 분석"
+        return f"# 단계 {next(stage_calls)}\n{LONG_TEXT}"
+
+    model = ScriptedModel(respond)
+    team = make_team(model=model, compressor=HandoffCompressor(budget_tokens=100, mode="summarize"))
+    result = team.get_creative_advice("YouTube", sample_input)
+
+    assert [report["stage"] for report in result["handoffs"]] == ["content", "platform"]
+    assert all(report["method"] == "summarize" for report in result["handoffs"])
+    # 세 단계 + 단계 간 요약 두 번이 같은 모델 호출 경로를 거침
+    assert model.calls == 5
+    stage_prompts = [prompt for prompt in model.prompts if "요약 분량(토큰)" not in prompt]
+    assert LONG_TEXT not in stage_prompts[1]
+    assert "요약된 분석" in stage_prompts[1]
@@ -0,0 +1,31 @@
+# ============================================================================
+# 통합 콘텐츠 fan-out 테스트
+# 플랫폼별 파이프라인을 동시에 실행하고 통합 호출 한 번으로 결과를 합치는지 확인
+# ============================================================================
+
+import time
+
+from benchmarks.fake_model import FakeGenerativeModel
+from benchmarks.pipeline_benchmark import make_input
+from creative_team import INTEGRATED_PLATFORMS
+
+
+def test_fanout_runs_each_platform_and_merges_once(fake_model, make_team):
+    result = make_team().get_integrated_advice_fanout(make_input("통합 콘텐츠", 1))
+
+    # 플랫폼마다 3단계 + 통합 호출 1번
+    assert fake_model.calls == len(INTEGRATED_PLATFORMS) * 3 + 1
+    assert "크로스 플랫폼 통합 전략" in result["platform"]
+    for platform in INTEGRATED_PLATFORMS:
+        assert f"#### {platform}" in result["strategy"]
+        assert f"#### {platform}" in result["content"]
+
+
+def test_fanout_platforms_run_concurrently(make_team):
+    model = FakeGenerativeModel(latency=0.1, tokens_per_second=1e9, response_tokens=50)
+    started = time.perf_counter()
+    make_team(model=model).get_integrated_advice_fanout(make_input("통합 콘텐츠", 1))
+    elapsed = time.perf_counter() - started
+
+    # 가장 느린 플랫폼 파이프라인(0.3초) + 통합 호출(0.1초) 수준 (순차 실행이면 1초)
+    assert elapsed < (len(INTEGRATED_PLATFORMS) * 3 + 1) * 0.1 * 0.7
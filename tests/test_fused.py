@@ -0,0 +1,63 @@
+# ============================================================================
+# 단일 호출 통합 모드 테스트
+# 세 전문가의 결과를 JSON 응답 한 번으로 받고, 응답 검증에 실패하면 3단계 체인으로 다시 실행하는지 확인
+# ============================================================================
+
+import asyncio
+import json
+
+import pytest
+
+from creative_team import FusedExpert
+from fakes import ScriptedModel
+from prompt_templates import FUSED_RESPONSE_SCHEMA
+
+SECTIONS = {"strategy": "## 전략", "content": "## 창작 계획", "platform": "## 플랫폼 조언"}
+
+
+def fused_model(fused_text):
+    # 통합 프롬프트에는 fused_text로, 체인 단계 프롬프트에는 일반 마크다운으로 응답
+    return ScriptedModel(lambda prompt, config: fused_text if "response_schema" in config else "## 단계 분석")
+
+
+@pytest.mark.parametrize("text", [
+    "JSON이 아닌 응답",
+    json.dumps(["strategy", "content", "platform"]),
+    json.dumps(dict(SECTIONS, platform="")),
+    json.dumps({"strategy": "## 전략", "content": "## 창작 계획"})
+])
+def test_parse_rejects_invalid_responses(text):
+    assert FusedExpert.parse(text) is None
+
+
+def test_valid_json_is_a_single_call(make_team, sample_input):
+    model = fused_model(json.dumps(SECTIONS, ensure_ascii=False))
+    team = make_team(model=model)
+    result = team.get_creative_advice("YouTube", sample_input, fused=True)
+
+    assert model.calls == 1
+    assert result["fused"] is True
+    assert {key: result[key] for key in SECTIONS} == SECTIONS
+    assert model.configs[0]["response_schema"] == FUSED_RESPONSE_SCHEMA
+    assert team.workflow_logs[-1]["steps"][0]["action"] == "fused_generation"
+
+
+def test_invalid_json_falls_back_to_chain(make_team, sample_input):
+    model = fused_model("```json\n{\"strategy\": ")
+    team = make_team(model=model)
+    result = team.get_creative_advice("YouTube", sample_input, fused=True)
+
+    # 통합 호출 한 번 + 3단계 체인
+    assert model.calls == 4
+    assert "fused" not in result
+    assert result["platform"] == "## 단계 분석"
+    assert set(result["stages"]) == {"strategy", "content", "platform"}
+    actions = [log["steps"][0]["action"] for log in team.workflow_logs]
+    assert actions[0] == "fused_generation_rejected"
+
+
+def test_async_fused_falls_back_to_chain(make_team, sample_input):
+    model = fused_model(json.dumps({"strategy": "## 전략"}))
+    result = asyncio.run(make_team(model=model).get_creative_advice_async("YouTube", sample_input, fused=True))
+    assert model.calls == 4
+    assert result["content"] == "## 단계 분석"
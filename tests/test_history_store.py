@@ -0,0 +1,88 @@
+# ============================================================================
+# 워크플로우 실행 기록 저장소 테스트
+# 실행 결과가 소유자별로 저장/조회되고, 목록은 키셋 페이지네이션으로 나뉘며,
+# 이전 형식의 저장소를 열면 결과가 옮겨지는지 확인
+# ============================================================================
+
+import sqlite3
+
+from history_store import HistoryStore
+from rate_limiter import session_scope
+
+
+def save_run(store, topic, owner="session-a", service_type="YouTube"):
+    workflow_log = {"service_type": service_type, "steps": [{"metrics": {"wall_seconds": 1.5}}]}
+    return store.save(workflow_log, {"topic": topic}, {"strategy": f"{topic} 전략", "handoffs": []}, owner)
+
+
+def test_save_and_get_round_trip():
+    store = HistoryStore(path=None)
+    record_id = save_run(store, "주제")
+    record = store.get(record_id, "session-a")
+    assert record["input_data"] == {"topic": "주제"}
+    assert record["result"]["strategy"] == "주제 전략"
+    assert record["total_seconds"] == 1.5
+    assert store.find_by_input("YouTube", {"topic": "주제"}, "session-a")["id"] == record_id
+
+
+def test_records_are_scoped_to_owner():
+    store = HistoryStore(path=None)
+    record_id = save_run(store, "주제", owner="session-a")
+    assert store.get(record_id, "session-b") is None
+    assert store.page("session-b") == ([], None)
+    assert store.find_by_input("YouTube", {"topic": "주제"}, "session-b") is None
+    store.delete(record_id, "session-b")
+    assert store.count("session-a") == 1
+    store.delete(record_id, "session-a")
+    assert store.count("session-a") == 0
+
+
+def test_pages_are_newest_first_and_filtered():
+    store = HistoryStore(path=None)
+    for index in range(5):
+        save_run(store, f"주제 {index}")
+    save_run(store, "블로그 주제", service_type="블로그")
+
+    first, cursor = store.page("session-a", service_type="YouTube", limit=3)
+    second, last = store.page("session-a", service_type="YouTube", limit=3, cursor=cursor)
+    assert [item["topic"] for item in first + second] == [f"주제 {index}" for index in range(4, -1, -1)]
+    assert last is None
+    assert "strategy" not in first[0]
+    assert store.count("session-a") == 6
+    assert store.count("session-a", "블로그") == 1
+
+
+def test_team_saves_runs_for_current_session(make_team, sample_input, tmp_path):
+    store = HistoryStore(path=str(tmp_path / "history.sqlite3"))
+    with session_scope("session-a"):
+        result = make_team(history=store).get_creative_advice("YouTube", sample_input)
+
+    # 앱을 다시 열어도 같은 세션의 기록을 다시 생성하지 않고 열 수 있음
+    reopened = HistoryStore(path=str(tmp_path / "history.sqlite3"))
+    record = reopened.find_by_input("YouTube", sample_input, "session-a")
+    assert record["result"]["platform"] == result["platform"]
+    assert reopened.count("session-b") == 0
+
+
+def test_legacy_store_is_migrated(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT, service_type TEXT NOT NULL,
+            created_at REAL NOT NULL, input_hash TEXT NOT NULL, topic TEXT NOT NULL, input_data TEXT NOT NULL,
+            strategy TEXT NOT NULL, content TEXT NOT NULL, platform TEXT NOT NULL, fused INTEGER NOT NULL,
+            total_seconds REAL NOT NULL, workflow_log TEXT NOT NULL
+        )
+    """)
+    conn.execute("INSERT INTO runs (service_type, created_at, input_hash, topic, input_data, strategy, content, "
+                 "platform, fused, total_seconds, workflow_log) VALUES ('YouTube', 1, 'hash', '주제', '{}', "
+                 "'전략', '계획', '조언', 0, 1.0, '{}')")
+    conn.commit()
+    conn.close()
+
+    store = HistoryStore(path=path)
+    row = store._conn.execute("SELECT result FROM runs WHERE id = 1").fetchone()
+    assert '"platform": "조언"' in row[0]
+    # 이전 열이 남아 있는 저장소에도 새 기록을 저장할 수 있음
+    assert store.get(save_run(store, "새 주제"), "session-a")["result"]["strategy"] == "새 주제 전략"
@@ -0,0 +1,46 @@
+# ============================================================================
+# 입력 의존성 기반 증분 재분석 테스트
+# 뒤 단계만 읽는 입력이 바뀌면 앞 단계 결과를 재사용하고, 앞 단계 입력이 바뀌면 뒤 단계도 다시 실행하는지 확인
+# ============================================================================
+
+from checkpoint_store import CheckpointStore
+from prompt_templates import get_template
+
+
+def stage_fields(service_type):
+    return [(stage, get_template(stage, service_type).fields) for stage in ("strategy", "content", "platform")]
+
+
+def test_incremental_reuse_when_only_later_fields_change(fake_model, make_team, sample_input):
+    store = CheckpointStore(directory=None)
+    team = make_team()
+    first = team.get_creative_advice("YouTube", sample_input, checkpoints=store)
+    assert fake_model.calls == 3
+
+    # channel_size는 플랫폼 전문가만 읽는 입력
+    assert "channel_size" in get_template("platform", "YouTube").fields
+    assert "channel_size" not in get_template("strategy", "YouTube").fields
+    assert "channel_size" not in get_template("content", "YouTube").fields
+    second = team.get_creative_advice("YouTube", dict(sample_input, channel_size="대형"), checkpoints=store)
+    assert fake_model.calls == 4
+    assert second["strategy"] == first["strategy"]
+    assert second["content"] == first["content"]
+    assert second["platform"] != first["platform"]
+
+
+def test_store_reuses_only_unchanged_prefix(sample_input):
+    store = CheckpointStore(directory=None)
+    run = store.begin("YouTube", sample_input, "fake-gemini", stage_fields("YouTube"))
+    for stage in ("strategy", "content", "platform"):
+        run.save(stage, f"{stage} 결과")
+    run.complete()
+
+    # 전략가가 읽는 입력이 바뀌면 뒤 단계도 모두 다시 실행
+    changed = store.begin("YouTube", dict(sample_input, topic="새 주제"), "fake-gemini", stage_fields("YouTube"))
+    assert changed.resumed_stages == set()
+
+    # 작가만 읽는 입력이 바뀌면 전략 단계만 재사용
+    styled = store.begin("YouTube", dict(sample_input, channel_style="엔터테인먼트형"), "fake-gemini",
+                         stage_fields("YouTube"))
+    assert styled.resumed_stages == {"strategy"}
+    assert styled.get("strategy") == "strategy 결과"
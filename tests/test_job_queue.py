@@ -0,0 +1,104 @@
+# ============================================================================
+# 백그라운드 작업 대기열 테스트
+# 작업 저장소의 상태 전이, 종료된 프로세스의 작업 정리, 작업자 프로세스 풀의 지연 시작과
+# 작업 등록부터 결과 조회까지의 왕복을 확인
+# ============================================================================
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+from checkpoint_store import CheckpointStore
+from fakes import create_fake_team
+from job_queue import DONE, INTERRUPTED, QUEUED, RUNNING, JobStore, JobWorkerPool, run_job
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def dead_pid():
+    # 이미 종료된 프로세스 ID
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def wait_for_job(store, job_id, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = store.get(job_id)
+        if job["status"] not in (QUEUED, RUNNING) or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def test_job_state_round_trip(store, sample_input):
+    job_id = store.submit("session-a", "YouTube", sample_input, {"fused": True})
+    assert store.get(job_id)["status"] == QUEUED
+    assert store.claim(job_id, 1234)
+    # 다른 작업자는 이미 가져간 작업을 다시 가져갈 수 없음
+    assert not store.claim(job_id, 5678)
+
+    store.add_progress(job_id, "strategy", "start")
+    store.finish(job_id, {"platform": "조언"})
+    job = store.latest("session-a", "YouTube")
+    assert job["id"] == job_id
+    assert job["status"] == DONE
+    assert job["input_data"] == sample_input
+    assert job["options"] == {"fused": True}
+    assert [stage for stage, _, _ in job["progress"]] == ["strategy"]
+    assert job["result"] == {"platform": "조언"}
+    assert store.latest("session-b", "YouTube") is None
+    assert store.counts() == {DONE: 1}
+
+
+def test_only_orphaned_jobs_are_interrupted(store, sample_input):
+    alive = store.submit("session-a", "YouTube", sample_input)
+    orphaned = store.submit("session-a", "블로그", sample_input)
+    store.claim(orphaned, dead_pid())
+
+    # 이 프로세스가 등록한 대기 작업은 유지하고, 종료된 작업자가 실행하던 작업만 중단
+    assert store.interrupt_orphaned() == 1
+    assert store.get(alive)["status"] == QUEUED
+    assert store.get(orphaned)["status"] == INTERRUPTED
+
+
+def test_session_memory_reuses_stages_across_jobs(store, make_team, fake_model, sample_input):
+    team = make_team()
+    job = store.get(store.submit("session-a", "YouTube", sample_input))
+    run_job(team, job, checkpoints=CheckpointStore(memory=store.session_memory("session-a")))
+    assert fake_model.calls == 3
+
+    # 같은 세션의 다음 작업은 다른 작업자(새 저장소 연결)가 실행해도 앞 단계 결과를 재사용
+    changed = dict(sample_input, channel_size="대형")
+    job = store.get(store.submit("session-a", "YouTube", changed))
+    reopened = JobStore(store.path)
+    run_job(team, job, checkpoints=CheckpointStore(memory=reopened.session_memory("session-a")))
+    assert fake_model.calls == 4
+
+
+def test_pool_starts_workers_on_first_submit(tmp_path, sample_input):
+    pool = JobWorkerPool(str(tmp_path / "jobs.sqlite3"), workers=1, team_factory=create_fake_team)
+    try:
+        # 작업을 등록하기 전에는 작업자 프로세스를 만들지 않음
+        assert pool.stats()["workers"] == 0
+        assert pool._processes == []
+
+        job_id = pool.submit("test-key", "session-a", "YouTube", sample_input)
+        assert pool.stats()["workers"] == 1
+        job = wait_for_job(pool.store, job_id)
+        assert job["status"] == DONE, job["error"]
+        assert job["result"]["platform"]
+        statuses = [(stage, status) for stage, status, _ in job["progress"]]
+        assert ("strategy", "start") in statuses
+        assert ("platform", "done") in statuses
+
+        # 이미 시작한 풀은 다시 시작하지 않음
+        pool.start()
+        assert len(pool._processes) == 1
+    finally:
+        pool.stop()
@@ -0,0 +1,68 @@
+# ============================================================================
+# 단계별 호출 지표 테스트
+# 전문가 호출마다 소요 시간, TTFT, usage_metadata 토큰 수가 기록되고
+# 요약/Prometheus/JSONL로 내보내지는지 확인
+# ============================================================================
+
+import json
+
+from metrics import MetricsCollector, new_stage_metrics
+from response_cache import ResponseCache
+
+
+def stage_record(stage, wall_seconds, **fields):
+    metrics = new_stage_metrics(stage, "YouTube")
+    metrics.update(wall_seconds=wall_seconds, total_tokens=100, **fields)
+    return metrics
+
+
+def test_summary_excludes_cache_hits_and_errors_from_latency():
+    collector = MetricsCollector()
+    for seconds in (1.0, 2.0, 3.0):
+        collector.record(stage_record("strategy", seconds))
+    collector.record(stage_record("strategy", 0.001, cache_hit=True))
+    collector.record(stage_record("strategy", 30.0, error="TimeoutError"))
+
+    row, = collector.summary()
+    assert row["stage"] == "strategy"
+    assert row["calls"] == 5
+    assert row["p50_seconds"] == 2.0
+    assert row["p95_seconds"] == 3.0
+    assert (row["cache_hits"], row["errors"]) == (1, 1)
+
+
+def test_prometheus_and_jsonl_export(tmp_path):
+    jsonl_path = tmp_path / "metrics.jsonl"
+    collector = MetricsCollector(jsonl_path=str(jsonl_path))
+    collector.record(stage_record("content", 1.5, retries=2, fallback=True))
+
+    text = collector.to_prometheus()
+    labels = '{stage="content",service_type="YouTube"}'
+    assert f"creator_partner_stage_calls_total{labels} 1" in text
+    assert f"creator_partner_stage_retries_total{labels} 2" in text
+    assert f"creator_partner_stage_fallbacks_total{labels} 1" in text
+    assert 'creator_partner_stage_tokens_total{stage="content",service_type="YouTube",kind="total"} 100' in text
+
+    prom_path = tmp_path / "metrics.prom"
+    collector.write_prometheus(str(prom_path))
+    assert prom_path.read_text(encoding="utf-8") == text
+    assert json.loads(jsonl_path.read_text(encoding="utf-8"))["stage"] == "content"
+
+
+def test_team_records_each_stage_call(make_team, sample_input):
+    collector = MetricsCollector()
+    team = make_team(metrics=collector, cache=ResponseCache(path=None))
+    team.get_creative_advice("YouTube", sample_input)
+    list(team.get_creative_advice("YouTube", dict(sample_input, topic="스트리밍"), stream=True))
+    team.get_creative_advice("YouTube", sample_input)
+
+    records = collector.records()
+    assert [record["stage"] for record in records[:3]] == ["strategy", "content", "platform"]
+    assert all(record["total_tokens"] and record["wall_seconds"] is not None for record in records[:3])
+    # 스트리밍 호출은 첫 토큰까지의 시간도 기록
+    assert all(record["ttft_seconds"] is not None for record in records[3:6])
+    # 같은 입력의 두 번째 실행은 응답 캐시 적중으로 기록
+    assert all(record["cache_hit"] for record in records[6:])
+    assert len(records) == 9
+    # 워크플로우 로그의 단계 기록에도 같은 지표가 남음
+    assert team.workflow_logs[-1]["steps"][0]["metrics"]["stage"] == "strategy"
@@ -0,0 +1,108 @@
+# ============================================================================
+# API 키별 모델/팀 풀 테스트
+# 키 전용 클라이언트로 만드는 요청이 SDK 형식(응답 스키마, 후보 수, 컨텍스트 캐시)에 맞는지,
+# 같은 키는 리소스를 재사용하고 오래 쓰지 않은 리소스는 정리되는지 확인
+# ============================================================================
+
+import json
+
+import pytest
+
+from model_pool import KeyedGenerativeModel, ModelPool
+from prompt_templates import FUSED_RESPONSE_SCHEMA, VARIANT_BATCH_SCHEMA
+
+protos = pytest.importorskip("google.generativeai.protos")
+
+
+class RecordingClient:
+    """
+    요청을 기록하고 정해 둔 텍스트로 응답하는 GenerativeServiceClient 대역
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.requests = []
+
+    def generate_content(self, request, **kwargs):
+        self.requests.append(request)
+        return protos.GenerateContentResponse(candidates=[protos.Candidate(
+            content=protos.Content(role="model", parts=[protos.Part(text=self.text)]),
+            finish_reason=protos.Candidate.FinishReason.STOP
+        )])
+
+    def count_tokens(self, request, **kwargs):
+        self.requests.append(request)
+        return protos.CountTokensResponse(total_tokens=7)
+
+
+def keyed_model(text="응답", generation_config=None):
+    client = RecordingClient(text)
+    return KeyedGenerativeModel("gemini-test", {"generative": client}, generation_config), client
+
+
+@pytest.mark.parametrize("schema, schema_type", [
+    (FUSED_RESPONSE_SCHEMA, protos.Type.OBJECT),
+    (VARIANT_BATCH_SCHEMA, protos.Type.ARRAY)
+], ids=["fused", "variants"])
+def test_request_normalizes_response_schema(schema, schema_type):
+    model, _ = keyed_model(generation_config={"temperature": 0.5})
+    request = model._request("프롬프트", {"response_mime_type": "application/json", "response_schema": schema})
+    config = request.generation_config
+    assert request.model == "models/gemini-test"
+    assert config.temperature == 0.5
+    assert config.response_mime_type == "application/json"
+    assert config.response_schema.type_ == schema_type
+
+
+def test_fused_mode_sends_object_schema(make_team, sample_input):
+    sections = {"strategy": "전략", "content": "계획", "platform": "조언"}
+    model, client = keyed_model(json.dumps(sections, ensure_ascii=False))
+    result = make_team(model=model).get_creative_advice("YouTube", sample_input, fused=True)
+
+    assert result["fused"] is True
+    assert result["platform"] == "조언"
+    schema = client.requests[0].generation_config.response_schema
+    assert set(schema.properties) == {"strategy", "content", "platform"}
+    assert list(schema.required) == ["strategy", "content", "platform"]
+
+
+def test_batch_variants_send_array_schema(make_team, sample_input):
+    model, client = keyed_model(json.dumps(["첫 번째 제목", "완전히 다른 두 번째 제목"], ensure_ascii=False))
+    variants = make_team(model=model).get_variants("YouTube", sample_input, "title", count=2, batch=True)
+
+    assert variants == ["첫 번째 제목", "완전히 다른 두 번째 제목"]
+    schema = client.requests[0].generation_config.response_schema
+    assert schema.type_ == protos.Type.ARRAY
+    assert schema.items.type_ == protos.Type.STRING
+
+
+def test_cached_model_references_cache_in_requests():
+    model, client = keyed_model()
+    cached = model.with_cached_content("cachedContents/abc")
+    assert cached.generate_content("접미부").text == "응답"
+    assert client.requests[-1].cached_content == "cachedContents/abc"
+
+    # 캐시된 접두부까지 포함해 세도록 전체 요청 형태로 전달
+    assert cached.count_tokens("접미부").total_tokens == 7
+    assert client.requests[-1].generate_content_request.cached_content == "cachedContents/abc"
+    model.count_tokens("접미부")
+    assert not client.requests[-1].generate_content_request.cached_content
+
+
+def test_pool_reuses_resources_per_key():
+    created = []
+    pool = ModelPool(lambda api_key: created.append(api_key) or object())
+    first = pool.get("key-a")
+    assert pool.get("key-a") is first
+    assert pool.get("key-b") is not first
+    assert created == ["key-a", "key-b"]
+    assert pool.size() == 2
+
+
+def test_pool_evicts_idle_resources():
+    pool = ModelPool(lambda api_key: object(), idle_seconds=0)
+    first = pool.get("key-a")
+    pool.get("key-b")
+    # 사용한 지 idle_seconds가 지난 리소스는 다음 조회 때 정리되고 새로 만들어짐
+    assert pool.get("key-a") is not first
+    assert pool.size() == 1
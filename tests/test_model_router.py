@@ -0,0 +1,66 @@
+# ============================================================================
+# 단계별 모델 라우팅 테스트
+# 단계/서비스 유형마다 지정한 모델로 호출하고, 주 모델이 과부하이면 보조 모델로 전환되는지 확인
+# ============================================================================
+
+from benchmarks.fake_model import FakeGenerativeModel, ServiceUnavailable
+from creative_team import CreativeTeam
+from fakes import FailingModel
+from metrics import MetricsCollector
+from model_router import ModelRoute, ModelRouter
+from resilience import ResiliencePolicy, StagePolicy
+
+
+def make_router(models, **kwargs):
+    routes = {
+        "strategy": ModelRoute("flash"),
+        "content": ModelRoute("flash"),
+        "platform": ModelRoute("pro", "flash"),
+        "platform/블로그": ModelRoute("pro-blog"),
+    }
+    return ModelRouter(lambda name: models[name], routes, default=ModelRoute("flash"), **kwargs)
+
+
+def fake(name):
+    return FakeGenerativeModel(model_name=name, latency=0.0, tokens_per_second=1e9, response_tokens=50)
+
+
+def test_route_lookup_prefers_service_specific_routes():
+    router = make_router({})
+    assert router.route("platform", "블로그").model_name == "pro-blog"
+    assert router.route("platform", "YouTube").model_name == "pro"
+    assert router.route("summary").model_name == "flash"
+
+
+def test_fallback_on_retry_and_during_cooldown():
+    models = {"pro": fake("pro"), "flash": fake("flash")}
+    router = make_router(models, cooldown_seconds=60)
+    route = router.route("platform")
+    assert router.select(route, 1) is models["pro"]
+    # 같은 호출의 두 번째 시도(재시도, 헤징 요청)는 보조 모델
+    assert router.select(route, 2) is models["flash"]
+
+    # 일시적 오류가 아니면 주 모델을 계속 사용하고, 일시적 오류면 잠시 새 호출도 보조 모델로 보냄
+    router.report_failure("pro", ValueError("bad request"))
+    assert router.select(route, 1) is models["pro"]
+    router.report_failure("pro", ServiceUnavailable("overloaded"))
+    assert router.select(route, 1) is models["flash"]
+    assert router.stats() == {"primary": 2, "fallback": 2}
+
+
+def test_team_calls_stage_models_and_falls_back(sample_input):
+    models = {
+        "flash": fake("flash"),
+        "pro": FailingModel(fail_on="", error=ServiceUnavailable("overloaded"), model_name="pro")
+    }
+    collector = MetricsCollector()
+    resilience = ResiliencePolicy(StagePolicy(timeout=None, base_delay=0.001, max_delay=0.01))
+    team = CreativeTeam("test-key", router=make_router(models), metrics=collector, resilience=resilience)
+    result = team.get_creative_advice("YouTube", sample_input)
+
+    assert result["platform"]
+    # 전략/창작 두 번 + 플랫폼 단계의 보조 모델 호출 한 번
+    assert models["flash"].calls == 3
+    platform = [record for record in collector.records() if record["stage"] == "platform"]
+    assert [(record["model"], record["fallback"]) for record in platform] == [("flash", True)]
+    assert platform[0]["retries"] == 1
@@ -0,0 +1,100 @@
+# ============================================================================
+# 프롬프트 템플릿/접두부 캐시 테스트
+# 요청과 무관한 접두부가 미리 만들어져 공유되는지, 제공자 캐시는 대상 단계의 충분히 큰 접두부만
+# 키마다 한 번 업로드하고 이후에는 접미부만 보내는지 확인
+# ============================================================================
+
+import threading
+
+import pytest
+
+from benchmarks.fake_model import FakeGenerativeModel
+from benchmarks.pipeline_benchmark import make_input
+from fakes import CachingModel
+from prompt_templates import (LocalPrefixCache, ProviderPrefixCache, PROVIDER_CACHE_STAGES, create_prefix_cache,
+                              get_template)
+
+
+def render(stage, index=1):
+    return get_template(stage, "YouTube").render("YouTube", make_input("YouTube", index))
+
+
+def test_prefix_is_shared_and_suffix_holds_request_values():
+    first, second = render("strategy", 1), render("strategy", 2)
+    assert first.prefix is second.prefix
+    assert "벤치마크 주제 1" in first.suffix
+    assert "벤치마크 주제" not in first.prefix
+    assert first.text == f"{first.prefix}\n\n{first.suffix}"
+
+
+def test_local_cache_sends_full_prompt_and_counts_savings(fake_model):
+    cache = LocalPrefixCache()
+    for index in range(3):
+        model, text = cache.bind(fake_model, render("strategy", index))
+        assert model is fake_model
+        assert text == render("strategy", index).text
+    stats = cache.stats()
+    assert stats["handles"] == 1
+    assert stats["hits"] == 3
+    assert stats["cached_tokens"] > stats["suffix_tokens"]
+
+
+def test_provider_cache_uploads_fused_prefix_once_under_concurrency():
+    model = CachingModel(upload_seconds=0.05)
+    cache = ProviderPrefixCache()
+    prompt = render("fused")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.bind(model, prompt))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 같은 접두부의 첫 호출이 동시에 들어와도 업로드는 한 번, 모두 같은 캐시 모델로 접미부만 전송
+    assert model.uploads == [prompt.prefix]
+    assert len({id(bound) for bound, _ in results}) == 1
+    assert all(bound.cached_content == "cachedContents/1" and text == prompt.suffix for bound, text in results)
+    assert cache.stats()["hits"] == 8
+
+
+def test_provider_cache_keeps_chain_stages_local():
+    model = CachingModel()
+    cache = ProviderPrefixCache()
+    assert PROVIDER_CACHE_STAGES == ("fused",)
+    bound, text = cache.bind(model, render("strategy"))
+    # 체인 단계 접두부는 제공자 최소 캐시 크기보다 작으므로 업로드하지 않고 전체 프롬프트 전송
+    assert bound is model
+    assert text == render("strategy").text
+    assert model.uploads == []
+    assert cache.stats()["local"] == 1
+
+
+def test_provider_cache_sends_small_or_unsupported_prefixes_inline():
+    small = CachingModel(prefix_tokens=100)
+    cache = ProviderPrefixCache(stages=None)
+    assert cache.bind(small, render("fused")) == (small, render("fused").text)
+    assert small.uploads == []
+    assert cache.stats()["small_prefixes"] == 1
+
+    # 컨텍스트 캐시 기능이 없는 모델은 업로드에 실패하면 다시 시도하지 않음
+    plain = FakeGenerativeModel(latency=0.0)
+    cache = ProviderPrefixCache(min_prefix_tokens=1, stages=None)
+    for _ in range(2):
+        assert cache.bind(plain, render("fused")) == (plain, render("fused").text)
+    assert cache.stats()["inline"] == 2
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, frozenset(PROVIDER_CACHE_STAGES)),
+    ("all", None),
+    ("fused, strategy", frozenset({"fused", "strategy"}))
+])
+def test_create_prefix_cache_reads_stages_from_env(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("CREATOR_PARTNER_PREFIX_CACHE_STAGES", raising=False)
+    else:
+        monkeypatch.setenv("CREATOR_PARTNER_PREFIX_CACHE_STAGES", value)
+    monkeypatch.delenv("CREATOR_PARTNER_PREFIX_CACHE", raising=False)
+    assert create_prefix_cache().stages == expected
+    assert type(create_prefix_cache("local")) is LocalPrefixCache
+    assert create_prefix_cache("off") is None
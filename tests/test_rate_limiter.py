@@ -0,0 +1,133 @@
+# ============================================================================
+# 쿼터 인식 스케줄러 테스트
+# 토큰 버킷 RPM/TPM 제한, 동시 실행 한도, 429 응답 시 한도 축소, 세션 간 공정한 순서를 확인
+# ============================================================================
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rate_limiter import RateLimitScheduler, TokenBucket, session_scope
+
+
+class ResourceExhausted(Exception):
+    """
+    SDK의 429 예외와 같은 이름의 오류
+    """
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_token_bucket_refills_per_second():
+    bucket = TokenBucket(60)
+    bucket.consume(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    bucket.refill(bucket.updated_at + 0.5)
+    assert bucket.tokens == pytest.approx(0.5)
+    # 가득 차도 용량을 넘지 않고, 용량보다 큰 요청은 가득 찼을 때 통과
+    bucket.refill(bucket.updated_at + 120)
+    assert bucket.tokens == 60
+    assert bucket.wait_time(1000) == 0.0
+
+
+def test_rpm_limit_blocks_until_refill():
+    scheduler = RateLimitScheduler(rpm=2, expected_output_tokens=0)
+    for _ in range(2):
+        with scheduler.slot("프롬프트"):
+            pass
+
+    async def third_call():
+        await scheduler.acquire_async(1)
+
+    # 분당 2건을 다 쓰면 다음 요청은 버킷이 다시 찰 때까지 대기, 대기를 취소하면 대기열에서 빠짐
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(third_call(), 0.2))
+    stats = scheduler.stats()
+    assert stats["granted"] == 2
+    assert stats["waiting"] == 0
+
+
+def test_concurrency_limit_is_respected():
+    scheduler = RateLimitScheduler(max_concurrency=2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        with scheduler.slot("프롬프트"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+    assert scheduler.stats()["granted"] == 6
+
+
+def test_rate_limit_error_halves_concurrency():
+    scheduler = RateLimitScheduler(rpm=6000, max_concurrency=4, cooldown_seconds=0.0)
+    with pytest.raises(ResourceExhausted):
+        with scheduler.slot("프롬프트"):
+            raise ResourceExhausted("quota")
+    stats = scheduler.stats()
+    assert stats["rate_limited"] == 1
+    assert stats["concurrency_limit"] == 2
+
+    # 성공이 한도만큼 이어지면 한도를 하나씩 다시 늘림
+    for _ in range(2):
+        with scheduler.slot("프롬프트"):
+            pass
+    assert scheduler.stats()["concurrency_limit"] == 3
+
+
+def test_actual_usage_settles_tpm_reservation():
+    scheduler = RateLimitScheduler(tpm=10_000, expected_output_tokens=1000)
+    with scheduler.slot("프롬프트") as ticket:
+        ticket.used_tokens = 100
+    # 예약한 토큰 중 쓰지 않은 만큼 돌려받음
+    assert scheduler.tpm_bucket.tokens == pytest.approx(9_900, abs=1)
+
+
+def test_sessions_take_turns():
+    scheduler = RateLimitScheduler(max_concurrency=1)
+    order = []
+
+    def call(session_id):
+        with session_scope(session_id):
+            with scheduler.slot("프롬프트"):
+                order.append(session_id)
+
+    blocker = scheduler.acquire(1)
+    threads = []
+    # 세션 a가 요청 3건을 먼저 쌓은 뒤 세션 b가 1건 요청
+    for session_id in ("a", "a", "a", "b"):
+        thread = threading.Thread(target=call, args=(session_id,))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: scheduler.stats()["waiting"] == len(threads))
+    scheduler.release(blocker)
+    for thread in threads:
+        thread.join()
+    # b는 a의 요청이 모두 끝날 때까지 기다리지 않음
+    assert order == ["a", "b", "a", "a"]
+
+
+def test_team_calls_go_through_scheduler(make_team, sample_input):
+    scheduler = RateLimitScheduler()
+    make_team(scheduler=scheduler).get_creative_advice("YouTube", sample_input)
+    stats = scheduler.stats()
+    assert stats["granted"] == 3
+    assert stats["active"] == 0
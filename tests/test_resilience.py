@@ -0,0 +1,109 @@
+# ============================================================================
+# 재시도/시간 제한/헤징 테스트
+# 일시적 오류만 백오프 후 재시도하고, 느린 요청은 헤징 요청이 대신 응답하는지 확인
+# ============================================================================
+
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.fake_model import FakeGenerativeModel, ServiceUnavailable
+from resilience import ResiliencePolicy, StagePolicy, is_transient_error
+
+
+def fast_policy(**kwargs):
+    kwargs.setdefault("timeout", None)
+    return ResiliencePolicy(StagePolicy(base_delay=0.001, max_delay=0.01, **kwargs))
+
+
+def flaky(failures, error=ServiceUnavailable):
+    # 처음 failures번은 실패하고 이후에는 시도 횟수를 돌려주는 호출
+    attempts = [0]
+
+    def fn(timeout):
+        attempts[0] += 1
+        if attempts[0] <= failures:
+            raise error("fail")
+        return attempts[0]
+    return fn
+
+
+def test_transient_errors_are_classified():
+    assert is_transient_error(ServiceUnavailable("overloaded"))
+    assert is_transient_error(TimeoutError())
+    assert not is_transient_error(ValueError("bad request"))
+    coded = RuntimeError("server")
+    coded.code = 503
+    assert is_transient_error(coded)
+
+
+def test_retries_transient_errors_until_success():
+    policy = fast_policy(max_attempts=3)
+    assert policy.call("strategy", flaky(2)) == 3
+    assert policy.stats()["retries"] == 2
+
+
+def test_gives_up_after_max_attempts():
+    policy = fast_policy(max_attempts=2)
+    with pytest.raises(ServiceUnavailable):
+        policy.call("strategy", flaky(5))
+    assert policy.stats()["retries"] == 1
+
+
+def test_does_not_retry_permanent_errors():
+    policy = fast_policy(max_attempts=3)
+    with pytest.raises(ValueError):
+        policy.call("strategy", flaky(1, ValueError))
+    assert policy.stats()["retries"] == 0
+
+
+def test_async_timeout_is_retried():
+    policy = ResiliencePolicy(StagePolicy(timeout=0.05, max_attempts=2, base_delay=0.001))
+    attempts = [0]
+
+    async def fn(timeout):
+        attempts[0] += 1
+        # 첫 시도만 시간 제한을 넘김
+        await asyncio.sleep(0.2 if attempts[0] == 1 else 0)
+        return "응답"
+
+    assert asyncio.run(policy.call_async("content", fn)) == "응답"
+    assert policy.stats()["timeouts"] == 1
+
+
+def test_hedged_request_wins_over_slow_primary():
+    policy = fast_policy(hedge=True, hedge_delay=0.05)
+    attempts = [0]
+
+    def fn(timeout):
+        attempts[0] += 1
+        # 첫 요청은 느리고 헤징 요청은 바로 응답
+        time.sleep(0.5 if attempts[0] == 1 else 0)
+        return attempts[0]
+
+    started = time.monotonic()
+    assert policy.call("platform", fn) == 2
+    assert time.monotonic() - started < 0.4
+    stats = policy.stats()
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_hedge_delay_uses_recorded_p95():
+    policy = fast_policy(hedge=True, hedge_delay=5.0)
+    # 기록이 충분하지 않으면 설정값, 충분하면 최근 p95 사용
+    assert policy._hedge_delay("strategy", policy.default) == 5.0
+    for _ in range(policy.latency.min_samples):
+        policy.latency.record("strategy", 0.1)
+    assert policy._hedge_delay("strategy", policy.default) == 0.1
+
+
+def test_team_retries_fake_model_errors(make_team, sample_input):
+    model = FakeGenerativeModel(latency=0.0, tokens_per_second=1e9, response_tokens=50, error_rate=0.5, seed=1)
+    resilience = fast_policy(max_attempts=10)
+    result = make_team(model=model, resilience=resilience).get_creative_advice("YouTube", sample_input)
+    assert result["platform"]
+    assert model.errors > 0
+    assert model.calls == 3 + model.errors
+    assert resilience.stats()["retries"] == model.errors
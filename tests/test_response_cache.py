@@ -0,0 +1,58 @@
+# ============================================================================
+# 응답 캐시 테스트
+# 캐시 키가 모델/프롬프트/생성 설정 변경에 따라 무효화되는지, 메모리/디스크 계층이 동작하는지,
+# 팀 실행에서 같은 입력은 모델을 다시 호출하지 않는지 확인
+# ============================================================================
+
+from response_cache import ResponseCache, make_cache_key
+
+
+def test_cache_key_changes_with_model_prompt_and_config():
+    base = make_cache_key("gemini-a", "프롬프트", {"temperature": 0.7})
+    assert base == make_cache_key("gemini-a", "프롬프트", {"temperature": 0.7})
+    assert base != make_cache_key("gemini-b", "프롬프트", {"temperature": 0.7})
+    assert base != make_cache_key("gemini-a", "다른 프롬프트", {"temperature": 0.7})
+    assert base != make_cache_key("gemini-a", "프롬프트", {"temperature": 0.2})
+    assert base != make_cache_key("gemini-a", "프롬프트")
+
+
+def test_cache_key_ignores_config_order():
+    first = make_cache_key("gemini-a", "프롬프트", {"temperature": 0.7, "top_p": 0.9})
+    second = make_cache_key("gemini-a", "프롬프트", {"top_p": 0.9, "temperature": 0.7})
+    assert first == second
+
+
+def test_memory_tier_hit_and_miss():
+    cache = ResponseCache(path=None)
+    key = make_cache_key("gemini-a", "프롬프트")
+    assert cache.get(key) is None
+    cache.set(key, "응답")
+    assert cache.get(key) == "응답"
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    key = make_cache_key("gemini-a", "프롬프트")
+    ResponseCache(path=path).set(key, "응답")
+    reopened = ResponseCache(path=path)
+    assert reopened.get(key) == "응답"
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_team_reuses_cached_responses(fake_model, make_team, sample_input):
+    team = make_team(cache=ResponseCache(path=None))
+    first = team.get_creative_advice("YouTube", sample_input)
+    calls = fake_model.calls
+    assert calls == 3
+
+    # 같은 입력은 모델을 다시 호출하지 않고 같은 결과를 돌려줌
+    second = team.get_creative_advice("YouTube", sample_input)
+    assert fake_model.calls == calls
+    assert second["strategy"] == first["strategy"]
+
+    # 입력이 바뀌면 캐시 키가 달라져 다시 호출
+    team.get_creative_advice("YouTube", dict(sample_input, topic="다른 주제"))
+    assert fake_model.calls == calls + 3
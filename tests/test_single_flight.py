@@ -0,0 +1,131 @@
+# ============================================================================
+# 단일 비행(진행 중인 동일 요청 합치기) 테스트
+# 동시에 들어온 같은 요청이 한 번만 실행되는지, 일시적 오류는 대기 중인 요청에 함께 전달되고
+# 그 밖의 오류는 대기 중인 요청이 직접 다시 실행하는지, 범위가 다르면 합치지 않는지 확인
+# ============================================================================
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.fake_model import FakeGenerativeModel, ServiceUnavailable
+from single_flight import SingleFlight
+
+WAITERS = 4
+
+
+def run_concurrently(flight, key, fn, count=WAITERS):
+    """
+    같은 키로 count개 호출을 동시에 시작하고 (결과 또는 오류, 공유 여부) 목록 반환
+    """
+    def call():
+        try:
+            return flight.call(key, fn)
+        except Exception as e:
+            return e, None
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        return list(executor.map(lambda _: call(), range(count)))
+
+
+def slow(calls, result=None, error=None):
+    """
+    다른 호출이 모두 대기열에 들어올 때까지 잠시 머무는 실행 함수
+    """
+    def fn():
+        with calls["lock"]:
+            calls["count"] += 1
+        time.sleep(0.2)
+        if error is not None:
+            raise error
+        return result
+    return fn
+
+
+def make_counter():
+    return {"count": 0, "lock": threading.Lock()}
+
+
+def test_concurrent_calls_are_coalesced():
+    flight = SingleFlight()
+    calls = make_counter()
+    results = run_concurrently(flight, "key", slow(calls, result="응답"))
+    assert calls["count"] == 1
+    assert [result for result, _ in results] == ["응답"] * WAITERS
+    assert sum(1 for _, shared in results if shared) == WAITERS - 1
+    stats = flight.stats()
+    assert stats["leaders"] == 1
+    assert stats["coalesced"] == WAITERS - 1
+    assert stats["in_flight"] == 0
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight()
+    assert flight.call("key", lambda: 1) == (1, False)
+    assert flight.call("key", lambda: 2) == (2, False)
+
+
+def test_transient_error_is_shared_with_followers():
+    flight = SingleFlight()
+    calls = make_counter()
+    results = run_concurrently(flight, "key", slow(calls, error=ServiceUnavailable("overloaded")))
+    assert calls["count"] == 1
+    assert all(isinstance(error, ServiceUnavailable) for error, _ in results)
+    assert flight.stats()["errors"] == 1
+
+
+def test_non_transient_error_is_retried_by_followers():
+    flight = SingleFlight()
+    calls = make_counter()
+    results = run_concurrently(flight, "key", slow(calls, error=ValueError("bad request")))
+    # 요청마다 다른 원인일 수 있는 오류는 공유하지 않고 대기 중인 요청이 각자 실행
+    assert calls["count"] == WAITERS
+    assert all(isinstance(error, ValueError) for error, _ in results)
+    assert flight.stats()["retried"] == WAITERS - 1
+
+
+def test_scopes_do_not_coalesce():
+    flight = SingleFlight()
+    calls = make_counter()
+    fn = slow(calls, result="응답")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(flight.scoped(scope).call, "key", fn) for scope in ("key-a", "key-b")]
+        results = [future.result() for future in futures]
+    assert calls["count"] == 2
+    assert results == [("응답", False), ("응답", False)]
+
+
+def test_async_calls_are_coalesced():
+    flight = SingleFlight()
+    calls = make_counter()
+
+    async def fn():
+        calls["count"] += 1
+        await asyncio.sleep(0.05)
+        return "응답"
+
+    async def main():
+        return await asyncio.gather(*(flight.call_async("key", fn) for _ in range(WAITERS)))
+
+    results = asyncio.run(main())
+    assert calls["count"] == 1
+    assert [result for result, _ in results] == ["응답"] * WAITERS
+
+
+def test_team_coalesces_identical_concurrent_runs(make_team, sample_input):
+    model = FakeGenerativeModel(latency=0.2, tokens_per_second=1e9, response_tokens=50)
+    team = make_team(model=model, single_flight=SingleFlight())
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda _: team.get_creative_advice("YouTube", sample_input), range(2)))
+    assert model.calls == 3
+    assert results[0]["platform"] == results[1]["platform"]
+
+
+@pytest.mark.parametrize("code", [429, 503])
+def test_error_codes_are_shared(code):
+    error = RuntimeError("quota")
+    error.code = code
+    assert SingleFlight().shares_error(error)
@@ -0,0 +1,134 @@
+# ============================================================================
+# 단계 그래프 테스트
+# 의존 순서대로 실행되는지, 독립 단계가 동시에 실행되는지, 한 단계의 오류가 전파되고
+# 뒤 단계는 시작하지 않는지, 잘못된 그래프를 거부하는지, register_stage로 등록한 단계가 팀 실행에 포함되는지 확인
+# ============================================================================
+
+import threading
+
+import pytest
+
+import prompt_templates
+from creative_team import CreativeExpert
+from fakes import ScriptedModel
+from prompt_templates import register_stage
+from stage_graph import DEFAULT_STAGE_GRAPH, StageGraph, StageNode
+
+
+def diamond_graph():
+    return StageGraph([
+        StageNode("strategy", "strategist"),
+        StageNode("seo", "strategist", needs=("strategy",)),
+        StageNode("thumbnail", "strategist", needs=("strategy",)),
+        StageNode("platform", "strategist", needs=("seo", "thumbnail")),
+    ])
+
+
+def test_default_graph_order():
+    assert DEFAULT_STAGE_GRAPH.order == ("strategy", "content", "platform")
+
+
+def test_run_respects_dependencies():
+    graph = diamond_graph()
+    started = []
+    lock = threading.Lock()
+
+    def execute(node, outputs):
+        with lock:
+            started.append(node.name)
+        assert set(outputs) == set(node.needs)
+        return f"{node.name} 출력"
+
+    outputs, timings = graph.run(execute)
+    assert started[0] == "strategy"
+    assert set(started[1:3]) == {"seo", "thumbnail"}
+    assert started[3] == "platform"
+    assert outputs["platform"] == "platform 출력"
+    assert set(timings) == set(graph.order)
+
+
+def test_independent_stages_run_concurrently():
+    graph = diamond_graph()
+    # seo와 thumbnail이 동시에 실행되지 않으면 서로를 기다리다 시간 초과
+    barrier = threading.Barrier(2, timeout=5)
+
+    def execute(node, outputs):
+        if node.name in ("seo", "thumbnail"):
+            barrier.wait()
+        return node.name
+
+    outputs, _ = graph.run(execute)
+    assert outputs["seo"] == "seo"
+    assert outputs["thumbnail"] == "thumbnail"
+
+
+def test_error_propagates_and_stops_dependents():
+    graph = diamond_graph()
+    started = []
+    lock = threading.Lock()
+
+    def execute(node, outputs):
+        with lock:
+            started.append(node.name)
+        if node.name == "seo":
+            raise RuntimeError("seo 실패")
+        return node.name
+
+    with pytest.raises(RuntimeError, match="seo 실패"):
+        graph.run(execute)
+    assert "platform" not in started
+
+
+def test_done_stages_are_resumed_not_executed():
+    graph = diamond_graph()
+    executed = []
+    events = []
+
+    def execute(node, outputs):
+        executed.append(node.name)
+        return node.name
+
+    outputs, timings = graph.run(execute, done={"strategy": "이전 전략"},
+                                 progress=lambda stage, status: events.append((stage, status)))
+    assert "strategy" not in executed
+    assert outputs["strategy"] == "이전 전략"
+    assert timings["strategy"]["resumed"] is True
+    assert ("strategy", "resumed") in events
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError):
+        StageGraph([StageNode("a", "strategist"), StageNode("a", "strategist")])
+    with pytest.raises(ValueError):
+        StageGraph([StageNode("a", "strategist", needs=("missing",))])
+    with pytest.raises(ValueError):
+        StageGraph([StageNode("a", "strategist", needs=("b",)), StageNode("b", "strategist", needs=("a",))])
+
+
+@pytest.fixture
+def seo_stage():
+    register_stage(
+        "seo",
+        {"expertise": "검색 최적화", "name": "SEO 분석가", "role": "검색 노출 분석", "intro": "검색 키워드를 분석합니다."},
+        "전략을 바탕으로 검색 키워드 10개를 제안해주세요.",
+        inputs=[("주제", "topic", "")],
+    )
+    yield "seo"
+    prompt_templates.PERSONAS.pop("seo", None)
+    prompt_templates._STAGE_FRAMES.pop("seo", None)
+    prompt_templates._TASKS.pop(("seo", None), None)
+    prompt_templates.TEMPLATES.pop(("seo", None), None)
+
+
+def test_registered_stage_runs_in_team_graph(seo_stage, make_team, sample_input):
+    model = ScriptedModel(lambda prompt, config: f"응답 {len(prompt)}")
+    graph = StageGraph(list(DEFAULT_STAGE_GRAPH) + [StageNode("seo", CreativeExpert, needs=("strategy",))])
+    result = make_team(model=model, graph=graph).get_creative_advice("YouTube", sample_input)
+
+    seo_prompts = [prompt for prompt in model.prompts if "검색 키워드 10개" in prompt]
+    assert len(seo_prompts) == 1
+    # 앞 단계(전략) 출력과 등록한 입력 키가 프롬프트에 들어감
+    assert result["strategy"] in seo_prompts[0]
+    assert sample_input["topic"] in seo_prompts[0]
+    assert result["seo"]
+    assert result["stages"]["seo"] == "SEO 분석가"
@@ -0,0 +1,41 @@
+# ============================================================================
+# 스트리밍 테스트
+# 단계별 응답이 조각 단위로 생성되는 즉시 (단계, 조각) 순서대로 전달되고,
+# 스트림이 끝난 뒤 일반 실행과 같은 형식의 기록이 남는지 확인
+# ============================================================================
+
+from context_budget import HandoffCompressor
+
+
+def test_stream_yields_chunks_in_stage_order(fake_model, make_team, sample_input):
+    team = make_team()
+    events = list(team.get_creative_advice("YouTube", sample_input, stream=True))
+
+    stages = [stage for stage, _ in events]
+    assert stages == sorted(stages, key=["strategy", "content", "platform"].index)
+    for stage in ("strategy", "content", "platform"):
+        # 응답 전체가 한 번에 오지 않고 여러 조각으로 나뉘어 전달
+        chunks = [chunk for name, chunk in events if name == stage]
+        assert len(chunks) > 1
+        assert "".join(chunks).startswith("# 응답")
+    assert fake_model.calls == 3
+    assert team.workflow_logs[-1]["service_type"] == "YouTube"
+
+
+def test_stream_is_lazy(fake_model, make_team, sample_input):
+    stream = make_team().get_creative_advice("YouTube", sample_input, stream=True)
+    assert fake_model.calls == 0
+
+    # 첫 조각을 받은 시점에는 첫 단계만 호출된 상태
+    stage, _ = next(stream)
+    assert stage == "strategy"
+    assert fake_model.calls == 1
+    stream.close()
+
+
+def test_stream_reports_handoffs_between_stages(make_team, sample_input):
+    team = make_team(compressor=HandoffCompressor(budget_tokens=20, mode="extractive"))
+    events = list(team.get_creative_advice("YouTube", sample_input, stream=True))
+    reports = [chunk for stage, chunk in events if stage == "handoff"]
+    assert [report["stage"] for report in reports] == ["content", "platform"]
+    assert all(report["final_tokens"] <= report["original_tokens"] for report in reports)
@@ -0,0 +1,75 @@
+# ============================================================================
+# 토큰 예산 테스트
+# 예산을 넘는 요청을 모델 호출 전에 거절하는지, 다운그레이드 모드에서 통합 모드로 전환하는지,
+# 필드별 한도와 사용량 집계가 동작하는지 확인
+# ============================================================================
+
+import pytest
+
+from token_budget import COUNT_LOCAL, DOWNGRADE, REJECT, BudgetExceeded, TokenBudget
+
+
+def make_budget(**kwargs):
+    kwargs.setdefault("path", None)
+    kwargs.setdefault("count_mode", COUNT_LOCAL)
+    kwargs.setdefault("global_tokens", 0)
+    return TokenBudget(**kwargs)
+
+
+def test_check_and_charge_session_budget():
+    budget = make_budget(session_tokens=1000, action=REJECT)
+    budget.check(800, session_id="a")
+    budget.charge(800, session_id="a")
+    with pytest.raises(BudgetExceeded) as excinfo:
+        budget.check(300, session_id="a")
+    assert excinfo.value.scope == "session"
+    # 다른 세션의 예산은 따로 집계
+    budget.check(300, session_id="b")
+
+
+def test_global_budget_is_shared_between_sessions():
+    budget = make_budget(session_tokens=0, global_tokens=1000, action=REJECT)
+    budget.charge(700, session_id="a")
+    with pytest.raises(BudgetExceeded) as excinfo:
+        budget.check(400, session_id="b")
+    assert excinfo.value.scope == "global"
+
+
+def test_field_limit_rejects_or_trims():
+    long_text = "가" * 1000
+    with pytest.raises(BudgetExceeded) as excinfo:
+        make_budget(max_field_tokens=100, action=REJECT).limit_fields({"topic": long_text})
+    assert excinfo.value.scope == "field"
+
+    limited, trimmed = make_budget(max_field_tokens=100, action=DOWNGRADE).limit_fields({"topic": long_text})
+    assert trimmed == ["topic"]
+    assert len(limited["topic"]) < len(long_text)
+
+
+def test_reject_before_calling_model(fake_model, make_team, sample_input):
+    team = make_team(budget=make_budget(session_tokens=100, action=REJECT))
+    with pytest.raises(BudgetExceeded):
+        team.get_creative_advice("YouTube", sample_input)
+    assert fake_model.calls == 0
+
+
+def test_downgrade_switches_to_fused_mode(fake_model, make_team, sample_input):
+    budget = make_budget(session_tokens=0, action=DOWNGRADE)
+    team = make_team(budget=budget)
+    chained, _ = budget.estimate(team._planned_calls("YouTube", sample_input), team.router.model)
+    fused, _ = budget.estimate(team._planned_calls("YouTube", sample_input, fused=True), team.router.model)
+    assert fused < chained
+
+    # 3단계 체인은 넘지만 통합 모드는 들어가는 예산
+    budget.session_tokens = (chained + fused) // 2
+    result = team.get_creative_advice("YouTube", sample_input)
+    assert "단일 호출 통합 모드로 전환" in result["preflight"]["downgrades"]
+    assert result["preflight"]["estimated_tokens"] == fused
+    assert budget.stats()["downgraded"] == 1
+
+
+def test_downgrade_still_rejects_when_fused_does_not_fit(fake_model, make_team, sample_input):
+    team = make_team(budget=make_budget(session_tokens=100, action=DOWNGRADE))
+    with pytest.raises(BudgetExceeded):
+        team.get_creative_advice("YouTube", sample_input)
+    assert fake_model.calls == 0
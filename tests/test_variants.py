@@ -0,0 +1,49 @@
+# ============================================================================
+# 변형 후보 생성 테스트
+# 한 섹션의 후보 여러 개를 호출 한 번으로 받고(후보 수 또는 JSON 배열), 거의 같은 후보는 제거하는지 확인
+# ============================================================================
+
+import json
+
+from creative_team import dedupe_variants
+from fakes import ScriptedModel
+
+TITLES = ["홈트 30일 챌린지: 초보자도 가능한 루틴", "장비 없이 집에서 하는 전신 운동 10분", "홈트 30일 챌린지 - 초보자도 가능한 루틴!",
+          "하루 10분, 퇴근 후 홈트레이닝 습관 만들기"]
+
+
+def test_dedupe_removes_near_duplicates_in_order():
+    assert dedupe_variants(TITLES) == [TITLES[0], TITLES[1], TITLES[3]]
+    assert dedupe_variants(["  ", "같은 제목", "같은 제목"]) == ["같은 제목"]
+
+
+def test_candidates_come_from_a_single_call(make_team, sample_input):
+    model = ScriptedModel(lambda prompt, config: TITLES[:config["candidate_count"]])
+    team = make_team(model=model)
+    variants = team.get_variants("YouTube", sample_input, "title", count=4, plan="## 창작 계획\n홈트 시리즈")
+
+    assert model.calls == 1
+    assert model.configs[0]["candidate_count"] == 4
+    assert variants == [TITLES[0], TITLES[1], TITLES[3]]
+    # 창작 계획과 섹션 지시가 프롬프트에 들어감
+    assert "홈트 시리즈" in model.prompts[0]
+    assert "YouTube 영상 제목" in model.prompts[0]
+    step = team.workflow_logs[-1]["steps"][0]
+    assert (step["action"], step["requested"], step["unique"]) == ("variants:title", 4, 3)
+
+
+def test_batch_mode_parses_json_array(make_team, sample_input):
+    model = ScriptedModel(lambda prompt, config: json.dumps(TITLES, ensure_ascii=False))
+    variants = make_team(model=model).get_variants("YouTube", sample_input, "title", count=2, batch=True)
+
+    assert model.calls == 1
+    assert "candidate_count" not in model.configs[0]
+    assert model.configs[0]["response_mime_type"] == "application/json"
+    assert "후보 개수: 2" in model.prompts[0]
+    assert variants == TITLES[:2]
+
+
+def test_batch_mode_accepts_numbered_lines(make_team, sample_input):
+    model = ScriptedModel(lambda prompt, config: "1. 첫 번째 제목\n2. 전혀 다른 두 번째 제목")
+    variants = make_team(model=model).get_variants("YouTube", sample_input, "title", count=3, batch=True)
+    assert variants == ["첫 번째 제목", "전혀 다른 두 번째 제목"]
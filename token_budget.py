@@ -0,0 +1,317 @@
+# ============================================================================
+# 사전 토큰 추정과 세션별/전역 토큰 예산
+# 모델을 호출하기 전에 실행 한 번의 토큰 수를 추정하고(로컬 추정, 예산에 가까우면 count_tokens),
+# 세션별/전역 예산을 넘는 요청은 비용이 들기 전에 줄이거나(다운그레이드) 거절
+#   - 사용자 입력 필드(주제, 추가 정보 등)는 세 단계 프롬프트에 반복해서 들어가므로 필드별 한도로 축약
+#   - 예산을 넘으면 긴 입력 축약 -> 단일 호출 통합 모드 순으로 줄이고, 그래도 넘으면 거절
+#   - 실제 사용량은 호출이 끝날 때 usage_metadata의 총 토큰 수로 정산
+#     (단계 간 요약 호출도 포함, count_tokens 요청은 토큰 과금이 없으므로 호출 수만 기록)
+#   - 사용량은 고정 시간 창(기본 하루) 단위로 SQLite에 기록하여 웹 프로세스와 작업자 프로세스가 함께 집계
+# ============================================================================
+
+import os
+import sqlite3
+import threading
+import time
+
+from rate_limiter import current_session, estimate_tokens
+
+# 기본 사용량 저장소 경로 (환경 변수로 변경 가능)
+DEFAULT_USAGE_PATH = os.environ.get(
+    "CREATOR_PARTNER_USAGE_PATH",
+    os.path.join(os.path.expanduser("~"), ".creator_partner", "usage.sqlite3")
+)
+
+# 배치 실행 사용량 저장소 경로 (웹 앱의 전역 예산과 섞이지 않도록 분리)
+DEFAULT_BATCH_USAGE_PATH = os.environ.get(
+    "CREATOR_PARTNER_BATCH_USAGE_PATH",
+    os.path.join(os.path.expanduser("~"), ".creator_partner", "batch_usage.sqlite3")
+)
+
+# 예산 초과 시 처리 방식
+DOWNGRADE = "downgrade"  # 입력 축약, 통합 모드 전환 후에도 넘으면 거절
+REJECT = "reject"  # 줄이지 않고 바로 거절
+
+# 토큰 수 계산 방식
+COUNT_AUTO = "auto"  # 로컬 추정치가 남은 예산의 절반 이상일 때만 count_tokens 호출
+COUNT_API = "api"  # 항상 count_tokens 호출
+COUNT_LOCAL = "local"  # 로컬 추정만 사용 (API 호출 없음)
+
+
+def trim_to_tokens(text, max_tokens):
+    """
+    입력 텍스트를 앞부분부터 최대 토큰 수만큼 남기고 자름 (가능하면 줄/단어 경계에서 자름)
+    Args:
+        text (str): 사용자 입력
+        max_tokens (int): 남길 최대 토큰 수 (로컬 추정 기준)
+    Returns:
+        str: 자른 텍스트
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # 로컬 추정은 약 2글자당 1토큰
+    cut = text[:max_tokens * 2]
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + "\n...(이하 생략)"
+
+
+class BudgetExceeded(RuntimeError):
+    """
+    토큰 예산을 넘어 모델을 호출하지 않고 거절한 요청
+    """
+
+    def __init__(self, message, scope=None, used=0, limit=0, requested=0):
+        super().__init__(message)
+        self.scope = scope  # "session" | "global" | "field"
+        self.used = used
+        self.limit = limit
+        self.requested = requested
+
+
+class TokenBudget:
+    """
+    세션별/전역 토큰 예산 (프로세스당 하나, 여러 세션 스레드와 이벤트 루프가 공유)
+    한도가 0이면 해당 범위는 제한하지 않음
+    """
+
+    def __init__(self, session_tokens=300_000, global_tokens=5_000_000, window_seconds=86400, max_field_tokens=2000,
+                 action=DOWNGRADE, count_mode=COUNT_AUTO, expected_output_tokens=2048, path=DEFAULT_USAGE_PATH):
+        """
+        Args:
+            session_tokens (int): 세션 하나가 시간 창 안에서 쓸 수 있는 토큰 수 (0이면 제한 없음)
+            global_tokens (int): 모든 세션이 시간 창 안에서 함께 쓸 수 있는 토큰 수 (0이면 제한 없음)
+            window_seconds (int): 사용량을 집계하는 시간 창 길이 (초, 창이 바뀌면 사용량이 0부터 다시 시작)
+            max_field_tokens (int): 사용자 입력 필드 하나의 최대 토큰 수 (0이면 제한 없음)
+            action (str): 예산 초과 시 처리 방식 (DOWNGRADE | REJECT)
+            count_mode (str): 사전 추정 방식 (COUNT_AUTO | COUNT_API | COUNT_LOCAL)
+            expected_output_tokens (int): 호출 한 번의 예상 출력 토큰 수 (사전 추정용)
+            path (str): SQLite 파일 경로 (None이면 프로세스 메모리에만 집계)
+        """
+        if action not in (DOWNGRADE, REJECT):
+            raise ValueError(f"알 수 없는 예산 초과 처리 방식입니다: {action}")
+        if count_mode not in (COUNT_AUTO, COUNT_API, COUNT_LOCAL):
+            raise ValueError(f"알 수 없는 토큰 계산 방식입니다: {count_mode}")
+        self.session_tokens = session_tokens
+        self.global_tokens = global_tokens
+        self.window_seconds = window_seconds
+        self.max_field_tokens = max_field_tokens
+        self.action = action
+        self.count_mode = count_mode
+        self.expected_output_tokens = expected_output_tokens
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = {"checked": 0, "counted": 0, "count_calls": 0, "trimmed": 0, "downgraded": 0, "rejected": 0}
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS token_usage (
+                window INTEGER NOT NULL,
+                session_id TEXT NOT NULL,
+                tokens INTEGER NOT NULL,
+                calls INTEGER NOT NULL,
+                PRIMARY KEY (window, session_id)
+            )
+        """)
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """
+        환경 변수 설정으로 예산 생성
+        CREATOR_PARTNER_SESSION_TOKEN_BUDGET, CREATOR_PARTNER_GLOBAL_TOKEN_BUDGET, CREATOR_PARTNER_BUDGET_WINDOW,
+        CREATOR_PARTNER_MAX_FIELD_TOKENS, CREATOR_PARTNER_BUDGET_ACTION, CREATOR_PARTNER_TOKEN_COUNT
+        Args:
+            overrides: 환경 변수 대신 사용할 생성자 인자 (예: 배치 실행의 path, global_tokens)
+        """
+        settings = {
+            "session_tokens": int(os.environ.get("CREATOR_PARTNER_SESSION_TOKEN_BUDGET", 300_000)),
+            "global_tokens": int(os.environ.get("CREATOR_PARTNER_GLOBAL_TOKEN_BUDGET", 5_000_000)),
+            "window_seconds": int(os.environ.get("CREATOR_PARTNER_BUDGET_WINDOW", 86400)),
+            "max_field_tokens": int(os.environ.get("CREATOR_PARTNER_MAX_FIELD_TOKENS", 2000)),
+            "action": os.environ.get("CREATOR_PARTNER_BUDGET_ACTION", DOWNGRADE),
+            "count_mode": os.environ.get("CREATOR_PARTNER_TOKEN_COUNT", COUNT_AUTO)
+        }
+        settings.update(overrides)
+        return cls(**settings)
+
+    def limit_fields(self, input_data):
+        """
+        필드별 한도를 넘는 사용자 입력을 축약 (REJECT 모드에서는 거절)
+        Args:
+            input_data (dict): 사용자 입력 데이터
+        Returns:
+            tuple: (축약한 입력 데이터, 축약한 필드 이름 목록)
+        """
+        if not self.max_field_tokens:
+            return input_data, []
+        oversized = [key for key, value in input_data.items()
+                     if isinstance(value, str) and estimate_tokens(value) > self.max_field_tokens]
+        if not oversized:
+            return input_data, []
+        if self.action == REJECT:
+            self._count_stat("rejected")
+            raise BudgetExceeded(f"입력이 너무 깁니다: {', '.join(oversized)} 항목을 "
+                                 f"약 {self.max_field_tokens:,} 토큰 이내로 줄여주세요.",
+                                 "field", requested=max(estimate_tokens(input_data[key]) for key in oversized),
+                                 limit=self.max_field_tokens)
+        trimmed = dict(input_data)
+        for key in oversized:
+            trimmed[key] = trim_to_tokens(trimmed[key], self.max_field_tokens)
+        self._count_stat("trimmed")
+        return trimmed, oversized
+
+    def estimate(self, calls, model_for):
+        """
+        실행 한 번의 예상 토큰 수
+        로컬 추정치가 남은 예산에 가까울 때만(COUNT_AUTO) 프롬프트마다 count_tokens를 호출하고,
+        count_tokens가 실패하면 로컬 추정치 사용
+        Args:
+            calls (list): 호출별 (모델 이름, 프롬프트 텍스트, 프롬프트 밖의 예상 토큰 수) 목록
+                          (프롬프트 밖의 토큰은 앞 단계 출력과 예상 출력)
+            model_for (callable): 모델 이름 -> count_tokens를 지원하는 모델
+        Returns:
+            tuple: (예상 토큰 수, 계산 방식 "local" | "count_tokens")
+        """
+        local = sum(estimate_tokens(text) + extra for _, text, extra in calls)
+        remaining = self.remaining()
+        if self.count_mode == COUNT_LOCAL or (
+                self.count_mode == COUNT_AUTO and (remaining is None or local < remaining // 2)):
+            return local, "local"
+
+        total, counted = 0, 0
+        for model_name, text, extra in calls:
+            try:
+                tokens = model_for(model_name).count_tokens(text).total_tokens
+                counted += 1
+            except Exception:
+                tokens = estimate_tokens(text)
+            total += tokens + extra
+        if counted:
+            self._count_stat("counted")
+            self.charge_count(counted)
+        return total, "count_tokens" if counted else "local"
+
+    def fits(self, tokens, session_id=None):
+        """
+        예상 토큰 수가 세션과 전역 예산 안에 들어가는지 여부
+        """
+        remaining = self.remaining(session_id)
+        return remaining is None or tokens <= remaining
+
+    def check(self, tokens, session_id=None):
+        """
+        예상 토큰 수가 예산을 넘으면 BudgetExceeded (모델을 호출하기 전에 확인)
+        Args:
+            tokens (int): 이번 요청의 예상 토큰 수
+            session_id (str): 세션 ID (기본값: 현재 세션)
+        """
+        session_id = session_id or current_session.get()
+        usage = self.usage(session_id)
+        self._count_stat("checked")
+        for scope, name in (("session", "세션"), ("global", "전체")):
+            limit = usage[f"{scope}_limit"]
+            used = usage[f"{scope}_used"]
+            if limit and used + tokens > limit:
+                self._count_stat("rejected")
+                raise BudgetExceeded(f"{name} 토큰 예산을 초과하여 요청을 보내지 않았습니다: "
+                                     f"사용 {used:,} + 예상 {tokens:,} > 한도 {limit:,} 토큰 "
+                                     f"({self._reset_text(usage['resets_in'])} 초기화)",
+                                     scope, used, limit, tokens)
+
+    def charge(self, tokens, session_id=None, calls=1):
+        """
+        끝난 호출의 실제 사용 토큰 수 정산
+        Args:
+            tokens (int): 사용 토큰 수 (usage_metadata가 없으면 None)
+            session_id (str): 세션 ID (기본값: 현재 세션)
+            calls (int): 정산할 API 요청 수
+        """
+        if not tokens and not calls:
+            return
+        session_id = session_id or current_session.get()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO token_usage (window, session_id, tokens, calls) VALUES (?, ?, ?, ?)
+                ON CONFLICT (window, session_id) DO UPDATE SET tokens = tokens + excluded.tokens,
+                                                               calls = calls + excluded.calls
+            """, (self._window(), session_id, int(tokens or 0), calls))
+            self._conn.commit()
+
+    def charge_count(self, calls=1, session_id=None):
+        """
+        count_tokens 요청 정산 (토큰 과금은 없으므로 요청 수만 사용량에 기록)
+        """
+        self.charge(0, session_id, calls)
+        self._count_stat("count_calls", calls)
+
+    def record_downgrade(self):
+        self._count_stat("downgraded")
+
+    def remaining(self, session_id=None):
+        """
+        세션과 전역 예산 중 더 적게 남은 토큰 수 (둘 다 제한이 없으면 None)
+        """
+        usage = self.usage(session_id)
+        remaining = [usage[f"{scope}_limit"] - usage[f"{scope}_used"] for scope in ("session", "global")
+                     if usage[f"{scope}_limit"]]
+        return max(0, min(remaining)) if remaining else None
+
+    def usage(self, session_id=None):
+        """
+        현재 시간 창의 사용량
+        Args:
+            session_id (str): 세션 ID (기본값: 현재 세션)
+        Returns:
+            dict: {session_used, session_limit, session_calls, global_used, global_limit, sessions, resets_in}
+        """
+        session_id = session_id or current_session.get()
+        window = self._window()
+        with self._lock:
+            session_row = self._conn.execute(
+                "SELECT tokens, calls FROM token_usage WHERE window = ? AND session_id = ?", (window, session_id)
+            ).fetchone()
+            global_row = self._conn.execute(
+                "SELECT COALESCE(SUM(tokens), 0), COUNT(*) FROM token_usage WHERE window = ?", (window,)
+            ).fetchone()
+        return {
+            "session_used": session_row[0] if session_row else 0,
+            "session_limit": self.session_tokens,
+            "session_calls": session_row[1] if session_row else 0,
+            "global_used": global_row[0],
+            "global_limit": self.global_tokens,
+            "sessions": global_row[1],
+            "resets_in": (window + 1) * self.window_seconds - time.time()
+        }
+
+    def stats(self):
+        """
+        사전 검사 통계 (이 프로세스 기준: 검사, count_tokens 사용, count_tokens 요청 수, 입력 축약, 다운그레이드, 거절 횟수)
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def prune(self, keep_windows=7):
+        """
+        오래된 시간 창의 사용량 삭제
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM token_usage WHERE window < ?", (self._window() - keep_windows,))
+            self._conn.commit()
+
+    def _window(self):
+        return int(time.time() // self.window_seconds)
+
+    def _count_stat(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    @staticmethod
+    def _reset_text(seconds):
+        hours, minutes = divmod(max(0, int(seconds)) // 60, 60)
+        return f"{hours}시간 {minutes}분 후" if hours else f"{minutes}분 후"